@@ -14,6 +14,7 @@ split into two separate LlmAgents to avoid combining tools + output_schema.
 from google.adk.agents import LlmAgent, SequentialAgent
 from google.adk.tools import FunctionTool
 
+from .._callbacks import prefetch_candidate_points
 from .._schemas import BangumiCandidatesResult
 from ..tools import search_bangumi_subjects
 
@@ -92,4 +93,6 @@ bangumi_candidates_agent = SequentialAgent(
         _bangumi_searcher,
         _candidates_formatter,
     ],
+    # Warm the points cache for the likely choices while the user reads
+    after_agent_callback=prefetch_candidate_points,
 )
@@ -9,6 +9,10 @@ In the simplified Capstone architecture this agent:
 Downstream, PointsSelectionAgent (LlmAgent) is responsible for selecting
 the best 8–12 points for route planning. This keeps deterministic I/O
 separate from LLM decision-making, following ADK best practices.
+
+Its prefetcher warms the client's point cache for the top candidates
+while the user is still choosing (see prefetch_candidate_points in
+_callbacks), so the fetch here is usually a cache hit.
 """
 
 from typing import Any
@@ -18,7 +22,10 @@ from google.adk.events import Event, EventActions
 from pydantic import ConfigDict
 
 from clients.anitabi import AnitabiClient
+from config import get_settings
 from domain.entities import APIError
+from services.deadline import remaining_budget
+from services.prefetch import SpeculativePrefetcher
 from utils.logger import get_logger
 
 
@@ -29,7 +36,13 @@ class PointsSearchAgent(BaseAgent):
 
     def __init__(self, anitabi_client: AnitabiClient | None = None) -> None:
         super().__init__(name="PointsSearchAgent")
-        self.anitabi_client = anitabi_client or AnitabiClient()
+        # Lives as long as the agent, so its hot point lists are worth
+        # refreshing ahead of expiry
+        self.anitabi_client = anitabi_client or AnitabiClient(refresh_ahead=True)
+        self.prefetcher = SpeculativePrefetcher(
+            self.anitabi_client.get_bangumi_point_set,
+            max_concurrency=get_settings().speculative_prefetch_concurrency,
+        )
         self.logger = get_logger(__name__)
 
     async def _run_async_impl(self, ctx):  # type: ignore[override]
@@ -64,13 +77,19 @@ class PointsSearchAgent(BaseAgent):
                 f"Got: {bangumi_id} (type: {type(bangumi_id).__name__})"
             )
 
+        # The session has moved on: stop prefetching the other candidates
+        prefetched = self.prefetcher.claim(ctx.session.id, str(bangumi_id))
+
+        budget = remaining_budget()
         self.logger.info(
             "[PointsSearchAgent] Fetching all bangumi points",
             bangumi_id=bangumi_id,
+            prefetched=prefetched,
+            budget_remaining=None if budget is None else round(budget, 2),
         )
 
         try:
-            points = await self.anitabi_client.get_bangumi_points(str(bangumi_id))
+            point_set = await self.anitabi_client.get_bangumi_point_set(str(bangumi_id))
         except APIError as exc:
             self.logger.error(
                 "[PointsSearchAgent] Failed to get bangumi points",
@@ -83,11 +102,12 @@ class PointsSearchAgent(BaseAgent):
         self.logger.info(
             "[PointsSearchAgent] Points fetched",
             bangumi_id=bangumi_id,
-            total_points=len(points),
+            total_points=len(point_set),
         )
 
         # No distance filtering: expose ALL points to the LLM selector
-        all_points_data = [p.model_dump() for p in points]
+        # Records come straight from the columns, without Point objects
+        all_points_data = point_set.to_records()
         points_meta = {
             "total": len(all_points_data),
             "source": "anitabi",
@@ -0,0 +1,77 @@
+"""ADK agent callbacks that give each user turn one latency budget.
+
+The root agent starts a request deadline (see services.deadline) before it
+routes a turn and clears it afterwards. Every HTTP call, rate limiter wait
+and retry below it then shares that budget, and workflows log how much of
+it is left as each stage starts.
+
+Once Stage 1 has its candidates, the points of the top ones are prefetched
+in the background while the user reads them (see services.prefetch).
+"""
+
+from google.adk.agents.callback_context import CallbackContext
+
+from config import get_settings
+from services.deadline import clear_deadline, remaining_budget, start_deadline
+from utils.logger import get_logger
+
+from ._agents.points_search_agent import points_search_agent
+
+logger = get_logger(__name__)
+
+
+def start_request_deadline(callback_context: CallbackContext) -> None:
+    """Start the latency budget for this turn (before_agent_callback)."""
+    # A turn that errored out may have skipped the after-callback
+    clear_deadline()
+    budget = get_settings().request_deadline_seconds
+    start_deadline(budget)
+    logger.info(
+        "Request deadline started",
+        agent=callback_context.agent_name,
+        invocation_id=callback_context.invocation_id,
+        budget_seconds=budget,
+    )
+    return None
+
+
+def end_request_deadline(callback_context: CallbackContext) -> None:
+    """Log the unused budget and clear the deadline (after_agent_callback)."""
+    remaining = remaining_budget()
+    logger.info(
+        "Request deadline finished",
+        agent=callback_context.agent_name,
+        invocation_id=callback_context.invocation_id,
+        budget_remaining=None if remaining is None else round(remaining, 2),
+    )
+    clear_deadline()
+    return None
+
+
+def log_remaining_budget(callback_context: CallbackContext) -> None:
+    """Log the budget left as an agent starts (before_agent_callback)."""
+    remaining = remaining_budget()
+    logger.info(
+        "Agent hop started",
+        agent=callback_context.agent_name,
+        budget_remaining=None if remaining is None else round(remaining, 2),
+    )
+    return None
+
+
+def prefetch_candidate_points(callback_context: CallbackContext) -> None:
+    """Prefetch the top candidates' points (after_agent_callback)."""
+    settings = get_settings()
+    result = callback_context.state.get("bangumi_candidates")
+    if not settings.speculative_prefetch or not isinstance(result, dict):
+        return None
+
+    candidates = result.get("candidates") or []
+    bangumi_ids = [
+        str(candidate["bangumi_id"])
+        for candidate in candidates[: settings.speculative_prefetch_candidates]
+        if isinstance(candidate, dict) and candidate.get("bangumi_id")
+    ]
+    # Scheduling replaces prefetches left over from an earlier search
+    points_search_agent.prefetcher.schedule(callback_context.session.id, bangumi_ids)
+    return None
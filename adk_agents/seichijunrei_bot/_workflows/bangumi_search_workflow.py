@@ -14,6 +14,7 @@ from google.adk.agents import SequentialAgent
 from .._agents.bangumi_candidates_agent import bangumi_candidates_agent
 from .._agents.extraction_agent import extraction_agent
 from .._agents.user_presentation_agent import user_presentation_agent
+from .._callbacks import log_remaining_budget
 
 bangumi_search_workflow = SequentialAgent(
     name="BangumiSearchWorkflow",
@@ -27,4 +28,5 @@ bangumi_search_workflow = SequentialAgent(
         bangumi_candidates_agent,  # Step 2: Search + format candidate list
         user_presentation_agent,  # Step 3: Generate user-friendly presentation
     ],
+    before_agent_callback=log_remaining_budget,
 )
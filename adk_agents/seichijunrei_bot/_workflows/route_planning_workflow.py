@@ -22,6 +22,7 @@ from .._agents.points_selection_agent import points_selection_agent
 from .._agents.route_planning_agent import route_planning_agent
 from .._agents.route_presentation_agent import route_presentation_agent
 from .._agents.user_selection_agent import user_selection_agent
+from .._callbacks import log_remaining_budget
 
 route_planning_workflow = SequentialAgent(
     name="RoutePlanningWorkflow",
@@ -38,4 +39,5 @@ route_planning_workflow = SequentialAgent(
         route_planning_agent,
         route_presentation_agent,
     ],
+    before_agent_callback=log_remaining_budget,
 )
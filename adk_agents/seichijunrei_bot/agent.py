@@ -19,11 +19,13 @@ from google.adk.tools import FunctionTool
 from config import get_settings
 from utils.logger import get_logger, setup_logging
 
+from ._callbacks import end_request_deadline, start_request_deadline
 from ._workflows.bangumi_search_workflow import bangumi_search_workflow
 from ._workflows.route_planning_workflow import route_planning_workflow
 from .tools import (
     get_anitabi_points,
     get_bangumi_subject,
+    get_bangumi_subjects,
     search_anitabi_bangumi_near_station,
     search_bangumi_subjects,
 )
@@ -56,6 +58,7 @@ session_service = InMemorySessionService()
 # Bangumi and Anitabi query tools
 search_bangumi_tool = FunctionTool(search_bangumi_subjects)
 get_bangumi_tool = FunctionTool(get_bangumi_subject)
+get_bangumi_subjects_tool = FunctionTool(get_bangumi_subjects)
 get_anitabi_points_tool = FunctionTool(get_anitabi_points)
 search_anitabi_bangumi_tool = FunctionTool(search_anitabi_bangumi_near_station)
 
@@ -102,6 +105,9 @@ root_agent = LlmAgent(
         bangumi_search_workflow,
         route_planning_workflow,
     ],
+    # One latency budget per user turn, shared by every hop below
+    before_agent_callback=start_request_deadline,
+    after_agent_callback=end_request_deadline,
 )
 
 
@@ -15,11 +15,18 @@ from .translation import translate_tool
 
 logger = get_logger(__name__)
 
+# Search results the candidate formatter may show (it picks 3-5)
+CANDIDATE_LIMIT = 5
+
 
 async def search_bangumi_subjects(keyword: str) -> dict:
     """
     Search Bangumi subjects (anime) by keyword.
 
+    The top results are completed with air date and summary where the
+    search left them out, in one batch, so candidates need no further
+    lookups.
+
     Args:
         keyword: Search keyword for bangumi name.
 
@@ -37,6 +44,7 @@ async def search_bangumi_subjects(keyword: str) -> dict:
                 keyword=keyword,
                 subject_type=BangumiClient.TYPE_ANIME,
             )
+            results = await _complete_candidates(client, results)
             return {
                 "keyword": keyword,
                 "results": results,
@@ -60,6 +68,31 @@ async def search_bangumi_subjects(keyword: str) -> dict:
             }
 
 
+async def _complete_candidates(
+    client: BangumiClient, results: list[dict]
+) -> list[dict]:
+    """Fill in air_date and summary of the top results from subject details."""
+    incomplete = [
+        result["id"]
+        for result in results[:CANDIDATE_LIMIT]
+        if result.get("id") and not (result.get("air_date") and result.get("summary"))
+    ]
+    if not incomplete:
+        return results
+    details = dict(zip(incomplete, await client.get_subjects(incomplete), strict=True))
+    completed = []
+    for result in results:
+        detail = details.get(result.get("id"))
+        if detail:
+            result = {
+                **result,
+                "air_date": result.get("air_date") or detail.get("air_date"),
+                "summary": result.get("summary") or detail.get("summary"),
+            }
+        completed.append(result)
+    return completed
+
+
 async def get_bangumi_subject(subject_id: int) -> dict:
     """
     Get detailed Bangumi subject information by ID.
@@ -99,6 +132,45 @@ async def get_bangumi_subject(subject_id: int) -> dict:
             }
 
 
+async def get_bangumi_subjects(subject_ids: list[int]) -> dict:
+    """
+    Get the candidate fields of several Bangumi subjects in one call.
+
+    Args:
+        subject_ids: Bangumi subject IDs.
+
+    Returns:
+        {
+            "subject_ids": subject_ids,
+            "subjects": [{id, name, name_cn, air_date, summary} | None, ...],
+            "success": bool,
+            "error": str | None,
+        }
+    """
+    async with BangumiClient() as client:
+        try:
+            subjects = await client.get_subjects(subject_ids)
+            return {
+                "subject_ids": subject_ids,
+                "subjects": subjects,
+                "success": True,
+                "error": None,
+            }
+        except Exception as e:
+            logger.error(
+                "get_bangumi_subjects failed",
+                subject_ids=subject_ids,
+                error=str(e),
+                exc_info=True,
+            )
+            return {
+                "subject_ids": subject_ids,
+                "subjects": [],
+                "success": False,
+                "error": str(e),
+            }
+
+
 async def get_anitabi_points(bangumi_id: str) -> dict:
     """
     Get Anitabi seichijunrei points for a specific bangumi.
@@ -223,6 +295,7 @@ async def search_anitabi_bangumi_near_station(
 __all__ = [
     "search_bangumi_subjects",
     "get_bangumi_subject",
+    "get_bangumi_subjects",
     "get_anitabi_points",
     "search_anitabi_bangumi_near_station",
     "translate_tool",
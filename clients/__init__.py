@@ -9,11 +9,12 @@ Provides:
 
 from clients.anitabi import AnitabiClient
 from clients.bangumi import BangumiClient
-from clients.base import BaseHTTPClient, HTTPMethod
+from clients.base import BaseHTTPClient, ConditionalResponse, HTTPMethod
 
 __all__ = [
     "BaseHTTPClient",
     "HTTPMethod",
+    "ConditionalResponse",
     "AnitabiClient",
     "BangumiClient",
 ]
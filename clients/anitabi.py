@@ -3,11 +3,24 @@ Anitabi API client for anime pilgrimage location data.
 
 Provides methods to:
 - Search for anime near train stations
-- Retrieve pilgrimage points for specific anime
-- Look up station information
+- Retrieve pilgrimage points for specific anime, one or many at a time,
+  as Point entities or as a columnar PointSet, or stream them filtered by
+  area and episode
+- Look up station information, from the local gazetteer when it knows
+  the station
+- Fetch points conditionally for the offline mirror, and answer point
+  lookups from a point catalogue or that mirror first when configured
+- Optionally answer nearby-bangumi searches from the mirror's points
+- Reuse cached /near results for smaller radii around the same centre
 """
 
-from clients.base import BaseHTTPClient
+import asyncio
+from collections.abc import AsyncIterator, Iterable
+from typing import Any
+
+import numpy as np
+
+from clients.base import BaseHTTPClient, ConditionalResponse
 from config.settings import get_settings
 from domain.entities import (
     APIError,
@@ -18,12 +31,269 @@ from domain.entities import (
     Point,
     Station,
 )
+from domain.point_catalogue import PointCatalogue
+from domain.point_set import TEXT_FIELDS, PointSet
+from services.anitabi_mirror import AnitabiMirror, shared_catalogue, shared_mirror
+from services.cache import CacheNamespace, cached_method
+from services.geo_cache import RadiusCoverage, within_radius
+from services.nearby_search import mirrored_areas, shared_nearby_index
+from services.station_gazetteer import StationGazetteer, shared_gazetteer
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 settings = get_settings()
 
 
+# Official API sometimes returns relative image paths
+IMAGE_BASE_URL = "https://image.anitabi.cn"
+
+# Items parsed per step when streaming points
+_STREAM_CHUNK_SIZE = 128
+
+
+def _has_near_results(response: object) -> bool:
+    """Only admit /near responses that actually contain bangumi."""
+    return not isinstance(response, dict) or bool(response.get("data"))
+
+
+def _extract_raw_points(response: Any, bangumi_id: str) -> list[dict[str, Any]]:
+    """
+    Normalise a points response to its list of raw items.
+
+    In older/internal versions we expected a wrapped response:
+      {"data": [...], "total": N}
+    while the official API may return either:
+      - a bare list: [ {...}, {...} ]
+      - or an object with a `points` array.
+
+    Raises:
+        APIError: On an unexpected response shape
+    """
+    if not response:
+        return []
+
+    if isinstance(response, dict):
+        # Our original/proxy shape: {"data": [...]}
+        if isinstance(response.get("data"), list):
+            return response["data"]
+        # Official Anitabi shape: {"points": [...]}
+        if isinstance(response.get("points"), list):
+            return response["points"]
+        raise APIError(
+            f"Unexpected Anitabi response structure for bangumi {bangumi_id}"
+        )
+    if isinstance(response, list):
+        # Official Anitabi /points/detail returns a bare list
+        return response
+
+    raise APIError(
+        f"Invalid Anitabi response type for bangumi {bangumi_id}: "
+        f"{type(response).__name__}"
+    )
+
+
+def _point_values(item: dict[str, Any], bangumi_id: str) -> dict[str, Any]:
+    """
+    Map one raw Anitabi point to Point field values, in field order.
+
+    ``coordinates`` is returned as a raw ``(lat, lng)`` pair that has not
+    yet been range-checked or rounded.
+
+    Raises:
+        KeyError, ValueError, TypeError: If required fields are missing or
+            malformed
+    """
+    # Branch 1: legacy/proxy schema used in internal tests.
+    # Expected fields:
+    #   id, name, cn_name, lat, lng,
+    #   bangumi_id, bangumi_title, episode, time_seconds, screenshot
+    if "lat" in item and "lng" in item:
+        return {
+            "id": item["id"],
+            "name": item["name"],
+            "cn_name": item.get("cn_name") or item["name"],
+            "coordinates": (item["lat"], item["lng"]),
+            "bangumi_id": str(item.get("bangumi_id") or bangumi_id),
+            "bangumi_title": item.get("bangumi_title") or str(bangumi_id),
+            "episode": int(item.get("episode", 0) or 0),
+            "time_seconds": int(item.get("time_seconds", 0) or 0),
+            "screenshot_url": item["screenshot"],
+            "address": item.get("address"),
+            "opening_hours": item.get("opening_hours"),
+            "admission_fee": item.get("admission_fee"),
+        }
+
+    # Branch 2: official Anitabi /points/detail schema.
+    # Example fields:
+    #   id, name, cn, image, ep, s, geo: [lat, lng], origin, originURL
+    geo = item.get("geo") or [None, None]
+    lat, lng = float(geo[0]), float(geo[1])
+
+    episode_raw = item.get("ep", 0)
+    try:
+        episode_int = int(episode_raw)
+    except (ValueError, TypeError):
+        episode_int = 0
+
+    screenshot_url = item.get("image")
+    if screenshot_url and screenshot_url.startswith("/"):
+        screenshot_url = f"{IMAGE_BASE_URL}{screenshot_url}"
+
+    cn_name = item.get("cn") or item.get("name") or ""
+
+    return {
+        "id": item["id"],
+        "name": item.get("name") or cn_name,
+        "cn_name": cn_name,
+        "coordinates": (lat, lng),
+        "bangumi_id": str(bangumi_id),
+        # Use bangumi_id as a fallback title; the orchestrator
+        # also tracks human-readable bangumi_name separately.
+        "bangumi_title": str(bangumi_id),
+        "episode": episode_int,
+        "time_seconds": int(item.get("s", 0) or 0),
+        "screenshot_url": screenshot_url,
+        "address": None,
+        "opening_hours": None,
+        "admission_fee": None,
+    }
+
+
+def _parse_points_validated(
+    raw_points: list[dict[str, Any]], bangumi_id: str
+) -> list[Point]:
+    """Validate each point through Pydantic, skipping invalid items."""
+    points: list[Point] = []
+
+    for item in raw_points:
+        try:
+            values = _point_values(item, bangumi_id)
+            lat, lng = values["coordinates"]
+            values["coordinates"] = Coordinates(latitude=lat, longitude=lng)
+            points.append(Point(**values))
+        except (KeyError, ValueError, TypeError) as e:
+            logger.warning("Skipping invalid point data", error=str(e), data=item)
+
+    return points
+
+
+def parse_points(raw_points: list[dict[str, Any]], bangumi_id: str) -> list[Point]:
+    """
+    Parse raw Anitabi point items into Point entities.
+
+    Args:
+        raw_points: Items from a points response, in either known schema
+        bangumi_id: Anime the points belong to
+
+    Returns:
+        Points sorted by episode and time (invalid items are skipped)
+    """
+    points = _parse_points_validated(raw_points, bangumi_id)
+
+    # Sort by episode and time for consistent ordering
+    points.sort(key=lambda p: (p.episode, p.time_seconds))
+    return points
+
+
+def _selection_mask(
+    lats: np.ndarray,
+    lngs: np.ndarray,
+    episode: np.ndarray,
+    bbox: tuple[float, float, float, float] | None,
+    episodes: Iterable[int] | None,
+) -> np.ndarray:
+    """Rows inside ``bbox`` (which may cross 180°) and ``episodes``."""
+    mask = np.ones(len(lats), dtype=bool)
+    if bbox is not None:
+        min_lat, min_lng, max_lat, max_lng = bbox
+        mask &= (lats >= min_lat) & (lats <= max_lat)
+        if min_lng <= max_lng:
+            mask &= (lngs >= min_lng) & (lngs <= max_lng)
+        else:
+            mask &= (lngs >= min_lng) | (lngs <= max_lng)
+    if episodes is not None:
+        mask &= np.isin(episode, np.fromiter(episodes, dtype=np.float64))
+    return mask
+
+
+def _select_points(
+    raw_points: list[dict[str, Any]],
+    bangumi_id: str,
+    bbox: tuple[float, float, float, float] | None = None,
+    episodes: Iterable[int] | None = None,
+) -> list[tuple[int, dict[str, Any]]]:
+    """
+    Pick raw point items by area and episode before building any Point.
+
+    Items whose fields cannot be read are dropped, as parsing would skip
+    them anyway.
+
+    Args:
+        raw_points: Items from a points response, in either known schema
+        bangumi_id: Anime the points belong to
+        bbox: ``(min_lat, min_lng, max_lat, max_lng)``; a box with
+            ``min_lng > max_lng`` crosses the 180° meridian
+        episodes: Episodes to keep
+
+    Returns:
+        ``(index into raw_points, Point field values)`` pairs, in the
+        episode and time order parse_points sorts by
+    """
+    selected: list[tuple[int, dict[str, Any]]] = []
+    keys: list[tuple[float, float, int, int]] = []
+    for index, item in enumerate(raw_points):
+        try:
+            values = _point_values(item, bangumi_id)
+            lat, lng = values["coordinates"]
+            keys.append(
+                (float(lat), float(lng), values["episode"], values["time_seconds"])
+            )
+        except (KeyError, ValueError, TypeError, OverflowError):
+            continue
+        selected.append((index, values))
+    if not selected:
+        return []
+
+    lats, lngs, episode, seconds = np.array(keys, dtype=np.float64).T
+    mask = _selection_mask(lats, lngs, episode, bbox, episodes)
+
+    # lexsort is stable, so ties keep response order as in parse_points
+    order = np.lexsort((seconds, episode))
+    return [selected[i] for i in order[mask[order]].tolist()]
+
+
+def parse_point_set(raw_points: list[dict[str, Any]], bangumi_id: str) -> PointSet:
+    """
+    Parse raw Anitabi point items into a columnar PointSet.
+
+    The batch is checked column by column as it is built. If any item is
+    invalid, the items are validated one by one instead, so the result
+    matches parse_points exactly (invalid items are skipped).
+
+    Args:
+        raw_points: Items from a points response, in either known schema
+        bangumi_id: Anime the points belong to
+
+    Returns:
+        PointSet sorted by episode and time
+    """
+    try:
+        rows = [_point_values(item, bangumi_id) for item in raw_points]
+        point_set = PointSet.from_columns(
+            latitude=[row["coordinates"][0] for row in rows],
+            longitude=[row["coordinates"][1] for row in rows],
+            episode=[row["episode"] for row in rows],
+            time_seconds=[row["time_seconds"] for row in rows],
+            **{field: [row[field] for row in rows] for field in TEXT_FIELDS},
+        )
+    except (KeyError, ValueError, TypeError):
+        point_set = PointSet.from_points(
+            _parse_points_validated(raw_points, bangumi_id)
+        )
+
+    return point_set.sorted()
+
+
 class AnitabiClient(BaseHTTPClient):
     """
     Client for the Anitabi anime pilgrimage API.
@@ -34,6 +304,25 @@ class AnitabiClient(BaseHTTPClient):
     - Station coordinate information
     """
 
+    # Stations are effectively static, /near results depend on the exact
+    # location so they are short-lived and rarely reused, and points change
+    # only when the community adds new screenshots; on long-lived clients
+    # (refresh_ahead=True) popular point lists are refreshed ahead of expiry
+    # so users never wait on a cold upstream call.
+    CACHE_NAMESPACES = {
+        "station": CacheNamespace(ttl_seconds=7 * 86400, max_size=500, ttl_jitter=0.1),
+        "near": CacheNamespace(
+            ttl_seconds=1800, max_size=100, admit=_has_near_results, ttl_jitter=0.1
+        ),
+        "points": CacheNamespace(
+            ttl_seconds=6 * 3600,
+            max_size=200,
+            refresh_ahead=0.1,
+            ttl_jitter=0.1,
+            early_expiration_beta=1.0,
+        ),
+    }
+
     def __init__(
         self,
         api_key: str | None = None,
@@ -41,6 +330,14 @@ class AnitabiClient(BaseHTTPClient):
         use_cache: bool = True,
         rate_limit_calls: int = 30,
         rate_limit_period: float = 60.0,
+        mirror: AnitabiMirror | None = None,
+        catalogue: PointCatalogue | None = None,
+        use_mirror: bool | None = None,
+        local_search: bool | None = None,
+        near_grid_degrees: float = 0.002,
+        gazetteer: StationGazetteer | None = None,
+        use_gazetteer: bool | None = None,
+        refresh_ahead: bool = False,
     ):
         """
         Initialize Anitabi API client.
@@ -51,6 +348,25 @@ class AnitabiClient(BaseHTTPClient):
             use_cache: Whether to cache GET responses
             rate_limit_calls: Number of calls allowed per period
             rate_limit_period: Rate limit period in seconds
+            mirror: Offline mirror to answer point lookups from before
+                going upstream (defaults to the shared mirror at
+                ANITABI_MIRROR_PATH, if set)
+            catalogue: Point catalogue to answer point lookups from before
+                the mirror (defaults to the shared one at
+                ANITABI_CATALOGUE_PATH, if set)
+            use_mirror: Set False to ignore the mirror and catalogue and
+                always go upstream
+            local_search: Answer search_bangumi from the mirror's points in
+                areas /near has shown to be fully mirrored (defaults to
+                settings; needs a mirror)
+            near_grid_degrees: Grid that /near centres are snapped to, so
+                nearby searches share cached results (0 disables snapping)
+            gazetteer: Station gazetteer consulted before /station (defaults
+                to the shared one at STATION_GAZETTEER_PATH, or the bundled one)
+            use_gazetteer: Set False to always look stations up upstream
+                (defaults to settings)
+            refresh_ahead: Refresh popular point lists before they expire;
+                for long-lived clients only (see BaseHTTPClient)
         """
         super().__init__(
             base_url=base_url or settings.anitabi_api_url,
@@ -61,13 +377,40 @@ class AnitabiClient(BaseHTTPClient):
             rate_limit_period=rate_limit_period,
             use_cache=use_cache,
             cache_ttl_seconds=3600,  # Cache for 1 hour
+            refresh_ahead=refresh_ahead,
+        )
+        if use_mirror is False:
+            mirror = None
+            catalogue = None
+        else:
+            if mirror is None and settings.anitabi_mirror_path:
+                mirror = shared_mirror(settings.anitabi_mirror_path)
+            if catalogue is None and settings.anitabi_catalogue_path:
+                catalogue = shared_catalogue(settings.anitabi_catalogue_path)
+        self.mirror = mirror
+        self.catalogue = catalogue
+        self.local_search = (
+            settings.anitabi_local_search if local_search is None else local_search
         )
+        self._near_coverage = RadiusCoverage(
+            near_grid_degrees, max_centres=self.CACHE_NAMESPACES["near"].max_size
+        )
+        if use_gazetteer is None:
+            use_gazetteer = settings.station_gazetteer
+        if not use_gazetteer:
+            gazetteer = None
+        elif gazetteer is None:
+            gazetteer = shared_gazetteer(settings.station_gazetteer_path or None)
+        self.gazetteer = gazetteer
 
         logger.info(
             "Anitabi client initialized",
             base_url=self.base_url,
             cache_enabled=use_cache,
             rate_limit=f"{rate_limit_calls}/{rate_limit_period}s",
+            mirror=mirror.path if mirror else None,
+            catalogue=catalogue.path if catalogue else None,
+            local_search=self.local_search and mirror is not None,
         )
 
     async def search_bangumi(
@@ -94,18 +437,10 @@ class AnitabiClient(BaseHTTPClient):
                 radius_km=radius_km,
             )
 
-            # Convert km to meters for API
-            radius_meters = int(radius_km * 1000)
-
-            # Make API request
-            response = await self.get(
-                "/near",
-                params={
-                    "lat": station.coordinates.latitude,
-                    "lng": station.coordinates.longitude,
-                    "radius": radius_meters,
-                },
-            )
+            response = await self._search_local(station, radius_km)
+            if response is None:
+                response = await self._search_near(station, radius_km)
+                await self._note_mirrored_area(station, radius_km, response)
 
             # Parse response
             if not response.get("data"):
@@ -135,8 +470,10 @@ class AnitabiClient(BaseHTTPClient):
             if not bangumi_list:
                 raise APIError("Invalid response: No valid bangumi data")
 
-            # Sort by distance
-            bangumi_list.sort(key=lambda b: b.distance_km or float("inf"))
+            # Sort by distance (0 km is a real distance, unlike None)
+            bangumi_list.sort(
+                key=lambda b: float("inf") if b.distance_km is None else b.distance_km
+            )
 
             logger.info(
                 "Bangumi search complete",
@@ -159,10 +496,204 @@ class AnitabiClient(BaseHTTPClient):
             )
             raise APIError(f"Failed to search bangumi: {str(e)}") from e
 
+    async def _search_near(self, station: Station, radius_km: float) -> dict[str, Any]:
+        """
+        Query /near, reusing a cached larger-radius result when there is one.
+
+        The station is snapped to the coverage grid and the snapped centre is
+        queried, so a cached result for a radius of at least ``radius_km``
+        around the same cell contains the answer exactly.
+        """
+        centre = self._near_coverage.snap(
+            station.coordinates.latitude, station.coordinates.longitude
+        )
+        # Convert km to meters for API
+        radius_meters = int(radius_km * 1000)
+
+        def params(radius: int) -> dict[str, Any]:
+            return {"lat": centre[0], "lng": centre[1], "radius": radius}
+
+        if self.use_cache and self._cache:
+            for cached_radius in self._near_coverage.covering(centre, radius_meters):
+                if cached_radius == radius_meters:
+                    # An exact hit is served by the normal cache lookup
+                    break
+                cached = await self._cache.get(
+                    self._cache.generate_key(
+                        self._build_url("/near"), params(cached_radius)
+                    ),
+                    namespace="near",
+                )
+                if cached is None:
+                    self._near_coverage.discard(centre, cached_radius)
+                    continue
+                narrowed = within_radius(cached, radius_km)
+                if narrowed is not None:
+                    logger.debug(
+                        "Near results served from a larger cached radius",
+                        station=station.name,
+                        radius_m=radius_meters,
+                        cached_radius_m=cached_radius,
+                    )
+                    return narrowed
+
+        response = await self.get(
+            "/near", params=params(radius_meters), cache_namespace="near"
+        )
+        if _has_near_results(response):
+            self._near_coverage.add(centre, radius_meters)
+        return response
+
+    async def _search_local(
+        self, station: Station, radius_km: float
+    ) -> dict[str, Any] | None:
+        """
+        Answer a /near query from the mirror, in the /near response shape.
+
+        Only areas where /near was seen to list nothing but mirrored bangumi
+        are answered (see mirrored_areas); elsewhere the mirror may lack
+        some bangumi, so this returns None and the query goes upstream.
+        """
+        if not self.local_search or self.mirror is None:
+            return None
+
+        centre = self._near_coverage.snap(
+            station.coordinates.latitude, station.coordinates.longitude
+        )
+        if not mirrored_areas(self.mirror).covering(centre, int(radius_km * 1000)):
+            logger.debug(
+                "Area not known to be fully mirrored, searching upstream",
+                station=station.name,
+                radius_km=radius_km,
+            )
+            return None
+        index = await shared_nearby_index(self.mirror, self.catalogue)
+        if index is None:
+            return None
+
+        # Same centre as the /near query, so distances match upstream's
+        items = index.near(centre[0], centre[1], radius_km)
+        logger.info(
+            "Bangumi search answered from mirror",
+            station=station.name,
+            found_count=len(items),
+        )
+        return {"data": items, "total": len(items)}
+
+    async def _note_mirrored_area(
+        self, station: Station, radius_km: float, response: dict[str, Any]
+    ) -> None:
+        """Remember the area if /near listed only bangumi the mirror has."""
+        if (
+            not self.local_search
+            or self.mirror is None
+            or not _has_near_results(response)
+        ):
+            return
+        index = await shared_nearby_index(self.mirror, self.catalogue)
+        if index is None:
+            return
+
+        centre = self._near_coverage.snap(
+            station.coordinates.latitude, station.coordinates.longitude
+        )
+        mirrored = {item["id"] for item in index.near(centre[0], centre[1], radius_km)}
+        if all(str(item.get("id")) in mirrored for item in response["data"]):
+            mirrored_areas(self.mirror).add(centre, int(radius_km * 1000))
+
+    def _catalogue_point_set(self, bangumi_id: str) -> PointSet | None:
+        """Zero-copy point set from the catalogue, or None if not in it."""
+        if self.catalogue is None or bangumi_id not in self.catalogue:
+            return None
+        logger.info("Points served from catalogue", bangumi_id=bangumi_id)
+        return self.catalogue.point_set(bangumi_id)
+
+    async def _fetch_raw_points(self, bangumi_id: str) -> list[dict[str, Any]]:
+        """
+        Fetch the raw point items for an anime, in either response shape.
+
+        Args:
+            bangumi_id: Unique identifier of the anime
+
+        Returns:
+            Raw point items (empty if the anime has none)
+
+        Raises:
+            APIError: On API communication failure or an unexpected response
+        """
+        if self.mirror is not None:
+            raw_points = await asyncio.to_thread(self.mirror.get_raw_points, bangumi_id)
+            if raw_points is not None:
+                logger.info("Points served from mirror", bangumi_id=bangumi_id)
+                return raw_points
+
+        logger.info("Getting points for bangumi", bangumi_id=bangumi_id)
+
+        # NOTE:
+        # The official Anitabi API exposes detailed points at:
+        #   GET /bangumi/{subjectID}/points/detail?haveImage=true
+        # When using the default base_url `https://api.anitabi.cn/bangumi`,
+        # we therefore call `/{id}/points/detail` here.
+
+        # Make API request (prefer detailed points with images only)
+        response = await self.get(
+            f"/{bangumi_id}/points/detail",
+            params={"haveImage": "true"},
+            cache_namespace="points",
+        )
+
+        raw_points = _extract_raw_points(response, bangumi_id)
+        if not raw_points:
+            logger.warning("No points found for bangumi", bangumi_id=bangumi_id)
+
+        return raw_points
+
+    async def fetch_raw_points_if_changed(
+        self,
+        bangumi_id: str,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> ConditionalResponse:
+        """
+        Conditionally fetch raw point items for the offline mirror.
+
+        Always goes upstream (never to the cache or mirror), at background
+        priority.
+
+        Args:
+            bangumi_id: Unique identifier of the anime
+            etag: ETag from the previous fetch
+            last_modified: Last-Modified from the previous fetch
+
+        Returns:
+            ConditionalResponse whose data, if modified, is the raw items
+
+        Raises:
+            APIError: On API communication failure or an unexpected response
+        """
+        response = await self.get_if_changed(
+            f"/{bangumi_id}/points/detail",
+            params={"haveImage": "true"},
+            etag=etag,
+            last_modified=last_modified,
+        )
+        if not response.modified:
+            return response
+        return ConditionalResponse(
+            modified=True,
+            data=_extract_raw_points(response.data, bangumi_id),
+            etag=response.etag,
+            last_modified=response.last_modified,
+        )
+
+    @cached_method("bangumi_points", namespace="points")
     async def get_bangumi_points(self, bangumi_id: str) -> list[Point]:
         """
         Get pilgrimage points for a specific anime.
 
+        Parsed results are memoised per client, so cache hits skip response
+        normalisation and Pydantic validation entirely.
+
         Args:
             bangumi_id: Unique identifier of the anime
 
@@ -173,141 +704,134 @@ class AnitabiClient(BaseHTTPClient):
             APIError: On API communication failure or invalid bangumi ID
         """
         try:
-            logger.info("Getting points for bangumi", bangumi_id=bangumi_id)
-
-            # NOTE:
-            # The official Anitabi API exposes detailed points at:
-            #   GET /bangumi/{subjectID}/points/detail?haveImage=true
-            # When using the default base_url `https://api.anitabi.cn/bangumi`,
-            # we therefore call `/{id}/points/detail` here.
-            #
-            # In older/internal versions we expected a wrapped response:
-            #   {"data": [...], "total": N}
-            # while the official API may return either:
-            #   - a bare list: [ {...}, {...} ]
-            #   - or an object with a `points` array.
-            #
-            # This method normalizes all of these shapes into a List[Point].
-
-            # Make API request (prefer detailed points with images only)
-            response = await self.get(
-                f"/{bangumi_id}/points/detail", params={"haveImage": "true"}
-            )
+            point_set = self._catalogue_point_set(str(bangumi_id))
+            if point_set is not None:
+                return point_set.to_points()
 
-            if not response:
-                logger.warning(
-                    "Empty response when fetching bangumi points", bangumi_id=bangumi_id
-                )
+            raw_points = await self._fetch_raw_points(bangumi_id)
+            if not raw_points:
                 return []
 
-            # Normalize different possible response shapes
-            raw_points = None
-
-            if isinstance(response, dict):
-                # Our original/proxy shape: {"data": [...]}
-                if isinstance(response.get("data"), list):
-                    raw_points = response["data"]
-                # Official Anitabi shape: {"points": [...]}
-                elif isinstance(response.get("points"), list):
-                    raw_points = response["points"]
-                else:
-                    raise APIError(
-                        f"Unexpected Anitabi response structure for bangumi {bangumi_id}"
-                    )
-            elif isinstance(response, list):
-                # Official Anitabi /points/detail returns a bare list
-                raw_points = response
-            else:
-                raise APIError(
-                    f"Invalid Anitabi response type for bangumi {bangumi_id}: "
-                    f"{type(response).__name__}"
-                )
+            points = parse_points(raw_points, str(bangumi_id))
 
-            if not raw_points:
-                logger.warning("No points found for bangumi", bangumi_id=bangumi_id)
-                return []
+            logger.info(
+                "Points retrieved successfully",
+                bangumi_id=bangumi_id,
+                points_count=len(points),
+            )
 
-            points: list[Point] = []
+            return points
 
-            for item in raw_points:
-                try:
-                    # Branch 1: legacy/proxy schema used in internal tests.
-                    # Expected fields:
-                    #   id, name, cn_name, lat, lng,
-                    #   bangumi_id, bangumi_title, episode, time_seconds, screenshot
-                    if "lat" in item and "lng" in item:
-                        point = Point(
-                            id=item["id"],
-                            name=item["name"],
-                            cn_name=item.get("cn_name") or item["name"],
-                            coordinates=Coordinates(
-                                latitude=item["lat"], longitude=item["lng"]
-                            ),
-                            bangumi_id=str(item.get("bangumi_id") or bangumi_id),
-                            bangumi_title=item.get("bangumi_title") or str(bangumi_id),
-                            episode=int(item.get("episode", 0) or 0),
-                            time_seconds=int(item.get("time_seconds", 0) or 0),
-                            screenshot_url=item["screenshot"],
-                            address=item.get("address"),
-                            opening_hours=item.get("opening_hours"),
-                            admission_fee=item.get("admission_fee"),
-                        )
-                        points.append(point)
-                        continue
-
-                    # Branch 2: official Anitabi /points/detail schema.
-                    # Example fields:
-                    #   id, name, cn, image, ep, s, geo: [lat, lng], origin, originURL
-                    geo = item.get("geo") or [None, None]
-                    lat, lng = float(geo[0]), float(geo[1])
-
-                    episode_raw = item.get("ep", 0)
-                    try:
-                        episode_int = int(episode_raw)
-                    except (ValueError, TypeError):
-                        episode_int = 0
-
-                    screenshot_url = item.get("image")
-                    if screenshot_url and screenshot_url.startswith("/"):
-                        # Official API sometimes returns relative image paths.
-                        screenshot_url = f"https://image.anitabi.cn{screenshot_url}"
-
-                    cn_name = item.get("cn") or item.get("name") or ""
-
-                    point = Point(
-                        id=item["id"],
-                        name=item.get("name") or cn_name,
-                        cn_name=cn_name,
-                        coordinates=Coordinates(latitude=lat, longitude=lng),
-                        bangumi_id=str(bangumi_id),
-                        # Use bangumi_id as a fallback title; the orchestrator
-                        # also tracks human-readable bangumi_name separately.
-                        bangumi_title=str(bangumi_id),
-                        episode=episode_int,
-                        time_seconds=int(item.get("s", 0) or 0),
-                        screenshot_url=screenshot_url,
-                        address=None,
-                        opening_hours=None,
-                        admission_fee=None,
-                    )
-                    points.append(point)
+        except APIError:
+            raise
+        except Exception as e:
+            logger.error(
+                "Failed to get bangumi points",
+                bangumi_id=bangumi_id,
+                error=str(e),
+                exc_info=True,
+            )
+            raise APIError(f"Failed to get bangumi points: {str(e)}") from e
 
-                except (KeyError, ValueError, TypeError) as e:
-                    logger.warning(
-                        "Skipping invalid point data", error=str(e), data=item
-                    )
+    @cached_method("bangumi_point_set", namespace="points")
+    async def get_bangumi_point_set(self, bangumi_id: str) -> PointSet:
+        """
+        Get pilgrimage points for a specific anime as a columnar PointSet.
 
-            # Sort by episode and time for consistent ordering
-            points.sort(key=lambda p: (p.episode, p.time_seconds))
+        Same data and ordering as get_bangumi_points, but built straight
+        from the response columns without creating a Point per item.
+
+        Args:
+            bangumi_id: Unique identifier of the anime
+
+        Returns:
+            PointSet sorted by episode and time
+
+        Raises:
+            APIError: On API communication failure or invalid bangumi ID
+        """
+        try:
+            point_set = self._catalogue_point_set(str(bangumi_id))
+            if point_set is not None:
+                return point_set
+
+            raw_points = await self._fetch_raw_points(bangumi_id)
+            point_set = parse_point_set(raw_points, str(bangumi_id))
 
             logger.info(
-                "Points retrieved successfully",
+                "Point set retrieved successfully",
                 bangumi_id=bangumi_id,
-                points_count=len(points),
+                points_count=len(point_set),
             )
 
-            return points
+            return point_set
 
+        except APIError:
+            raise
+        except Exception as e:
+            logger.error(
+                "Failed to get bangumi point set",
+                bangumi_id=bangumi_id,
+                error=str(e),
+                exc_info=True,
+            )
+            raise APIError(f"Failed to get bangumi points: {str(e)}") from e
+
+    async def iter_bangumi_points(
+        self,
+        bangumi_id: str,
+        *,
+        bbox: tuple[float, float, float, float] | None = None,
+        episodes: Iterable[int] | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[Point]:
+        """
+        Stream pilgrimage points for an anime, filtered while parsing.
+
+        Points come in the same episode and time order as get_bangumi_points
+        and equal its points, but filters are applied to the raw items first
+        and points are parsed a chunk at a time. Items outside the box or
+        episodes, or past the limit, are never validated, and consumers get
+        the first points without waiting for the rest.
+
+        Args:
+            bangumi_id: Unique identifier of the anime
+            bbox: Only points inside ``(min_lat, min_lng, max_lat, max_lng)``
+            episodes: Only points from these episodes
+            limit: Stop after this many points
+
+        Yields:
+            Point entities in episode and time order
+
+        Raises:
+            ValueError: If limit is negative
+            APIError: On API communication failure or invalid bangumi ID
+        """
+        if limit is not None and limit < 0:
+            raise ValueError(f"limit must not be negative, got {limit}")
+
+        point_set = self._catalogue_point_set(str(bangumi_id))
+        if point_set is not None:
+            # Catalogue rows are already parsed and sorted; only the
+            # selected rows become Points
+            point_set = point_set.filter(
+                _selection_mask(
+                    point_set.latitude,
+                    point_set.longitude,
+                    point_set.episode,
+                    bbox,
+                    episodes,
+                )
+            )[:limit]
+            for start in range(0, len(point_set), _STREAM_CHUNK_SIZE):
+                for point in point_set[start : start + _STREAM_CHUNK_SIZE]:
+                    yield point
+                await asyncio.sleep(0)
+            return
+
+        try:
+            raw_points = await self._fetch_raw_points(bangumi_id)
+            selected = _select_points(raw_points, str(bangumi_id), bbox, episodes)
         except APIError:
             raise
         except Exception as e:
@@ -319,12 +843,89 @@ class AnitabiClient(BaseHTTPClient):
             )
             raise APIError(f"Failed to get bangumi points: {str(e)}") from e
 
+        remaining = len(selected) if limit is None else limit
+        start = 0
+        while remaining > 0 and start < len(selected):
+            chunk = selected[start : start + min(_STREAM_CHUNK_SIZE, remaining)]
+            start += len(chunk)
+            points = _parse_points_validated(
+                [raw_points[index] for index, _ in chunk], str(bangumi_id)
+            )
+            for point in points[:remaining]:
+                yield point
+            remaining -= min(len(points), remaining)
+            # Let other tasks run between chunks of a long stream
+            await asyncio.sleep(0)
+
+    async def get_many_bangumi_points(
+        self, bangumi_ids: Iterable[str], max_concurrency: int = 4
+    ) -> AsyncIterator[tuple[str, list[Point]]]:
+        """
+        Get pilgrimage points for several anime, streaming results.
+
+        Fetches run concurrently (still under the client's rate limiter) and
+        reuse memoised results from get_bangumi_points. Each bangumi is
+        yielded as soon as its points arrive, so completion order is not
+        input order. A point already yielded for an earlier bangumi (e.g.
+        the same location shown in two seasons) is not repeated. Bangumi
+        that fail to load are logged and skipped, so callers get whatever
+        could be fetched.
+
+        Args:
+            bangumi_ids: Anime identifiers; duplicates are fetched once
+            max_concurrency: Maximum fetches in flight at once
+
+        Yields:
+            ``(bangumi_id, points)`` with points not seen earlier in the stream
+        """
+        unique_ids = list(dict.fromkeys(str(bangumi_id) for bangumi_id in bangumi_ids))
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(bangumi_id: str) -> tuple[str, list[Point] | APIError]:
+            async with semaphore:
+                try:
+                    return bangumi_id, await self.get_bangumi_points(bangumi_id)
+                except APIError as e:
+                    return bangumi_id, e
+
+        tasks = [asyncio.create_task(fetch(bangumi_id)) for bangumi_id in unique_ids]
+        seen_point_ids: set[str] = set()
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                bangumi_id, result = await next_done
+                if isinstance(result, APIError):
+                    logger.warning(
+                        "Skipping bangumi whose points failed to load",
+                        bangumi_id=bangumi_id,
+                        error=str(result),
+                    )
+                    continue
+
+                fresh = [p for p in result if p.id not in seen_point_ids]
+                seen_point_ids.update(p.id for p in fresh)
+                yield bangumi_id, fresh
+        finally:
+            # The consumer may stop early; don't leave fetches running
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        logger.info(
+            "Points retrieved for multiple bangumi",
+            bangumi_count=len(unique_ids),
+            unique_points=len(seen_point_ids),
+        )
+
     async def get_station_info(self, station_name: str) -> Station:
         """
         Look up station information by name.
 
+        Names the gazetteer recognises (in Japanese, kana, romaji or Chinese,
+        with or without a 駅/站/station suffix, allowing small romaji typos) are
+        resolved locally; anything else goes to the /station endpoint.
+
         Args:
-            station_name: Name of the station (Japanese)
+            station_name: Name of the station
 
         Returns:
             Station entity with coordinates
@@ -333,11 +934,32 @@ class AnitabiClient(BaseHTTPClient):
             InvalidStationError: If station not found
             APIError: On API communication failure
         """
+        if self.gazetteer is not None:
+            station = self.gazetteer.resolve(station_name)
+            if station is not None:
+                logger.info(
+                    "Station resolved from gazetteer",
+                    station_name=station_name,
+                    station=station.name,
+                )
+                return station
+        return await self._fetch_station_info(station_name)
+
+    @cached_method("station_info", namespace="station")
+    async def _fetch_station_info(self, station_name: str) -> Station:
+        """
+        Look up a station with the /station endpoint.
+
+        Stations are effectively static, so parsed results are memoised
+        in the long-lived ``station`` namespace.
+        """
         try:
             logger.info("Looking up station info", station_name=station_name)
 
             # Make API request
-            response = await self.get("/station", params={"name": station_name})
+            response = await self.get(
+                "/station", params={"name": station_name}, cache_namespace="station"
+            )
 
             # Check if response is valid
             if not response or not isinstance(response, dict):
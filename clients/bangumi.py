@@ -3,17 +3,25 @@ Bangumi API client for anime/manga metadata.
 
 Official API: https://bangumi.github.io/api/
 Provides methods to:
-- Search for anime/manga by keyword
-- Retrieve subject details by ID
+- Search for anime/manga by keyword, from the local title index when it
+  knows the keyword
+- Retrieve subject details by ID, singly or as a concurrent batch projected
+  to the fields candidate lists need
 """
 
+import asyncio
 import urllib.parse
+from collections.abc import Iterable, Sequence
 
 from clients.base import BaseHTTPClient
+from config.settings import get_settings
 from domain.entities import APIError
+from services.cache import CacheNamespace, cached_method
+from services.title_index import TitleIndex, append_subjects, shared_title_index
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
+settings = get_settings()
 
 
 class BangumiClient(BaseHTTPClient):
@@ -39,12 +47,27 @@ class BangumiClient(BaseHTTPClient):
     TYPE_GAME = 4
     TYPE_REAL = 6
 
+    # Subject fields a BangumiCandidate is built from
+    CANDIDATE_FIELDS = ("id", "name", "name_cn", "air_date", "summary")
+
+    # Cache policies per endpoint
+    CACHE_NAMESPACES = {
+        "search": CacheNamespace(ttl_seconds=86400, max_size=300, ttl_jitter=0.1),
+        "subject": CacheNamespace(ttl_seconds=86400, max_size=500, ttl_jitter=0.1),
+        # Projected subjects are small, so many more of them fit
+        "subject_fields": CacheNamespace(
+            ttl_seconds=86400, max_size=5000, ttl_jitter=0.1
+        ),
+    }
+
     def __init__(
         self,
         base_url: str | None = None,
         use_cache: bool = True,
         rate_limit_calls: int = 30,
         rate_limit_period: float = 60.0,
+        title_index: TitleIndex | None = None,
+        use_title_index: bool | None = None,
     ):
         """
         Initialize Bangumi API client.
@@ -54,6 +77,11 @@ class BangumiClient(BaseHTTPClient):
             use_cache: Whether to cache GET responses (default: True)
             rate_limit_calls: Number of calls allowed per period
             rate_limit_period: Rate limit period in seconds
+            title_index: Title index searched before the API (defaults to
+                the shared one at BANGUMI_TITLE_INDEX_PATH)
+            use_title_index: Set False to always search upstream (defaults
+                to settings, which enable the shared index only when it has
+                a file)
         """
         super().__init__(
             base_url=base_url or self.BANGUMI_API_BASE,
@@ -65,20 +93,45 @@ class BangumiClient(BaseHTTPClient):
             use_cache=use_cache,
             cache_ttl_seconds=86400,  # Cache for 24 hours
         )
+        if use_title_index is None:
+            use_title_index = settings.bangumi_title_index
+        if use_title_index is None:
+            # An index learned only from this process's searches knows too
+            # few subjects to be worth consulting
+            use_title_index = title_index is not None or bool(
+                settings.bangumi_title_index_path
+            )
+        # Learned subjects are persisted only to the shared index's file; an
+        # injected index is the caller's to save
+        self._title_index_path = ""
+        if not use_title_index:
+            title_index = None
+        elif title_index is None:
+            title_index = shared_title_index(settings.bangumi_title_index_path)
+            self._title_index_path = settings.bangumi_title_index_path
+        self.title_index = title_index
 
         logger.info(
             "Bangumi client initialized",
             base_url=self.base_url,
             cache_enabled=use_cache,
             rate_limit=f"{rate_limit_calls}/{rate_limit_period}s",
+            title_index=len(title_index) if title_index is not None else None,
         )
 
+    @cached_method("search_subject", namespace="search")
     async def search_subject(
         self, keyword: str, subject_type: int = TYPE_ANIME, max_results: int = 10
     ) -> list[dict]:
         """
         Search for subjects by keyword.
 
+        Keywords that exactly name a subject in the title index are answered
+        locally; others, including parts of titles, go to the API, and the
+        subjects it returns are added to the index (and to its file, if
+        BANGUMI_TITLE_INDEX_PATH is set). Results are memoised per client;
+        concurrent identical searches share a single upstream request.
+
         Args:
             keyword: Search keyword (anime/manga name)
             subject_type: Type filter (1=book, 2=anime, 3=music, 4=game, 6=real)
@@ -104,6 +157,18 @@ class BangumiClient(BaseHTTPClient):
         if not 1 <= max_results <= 20:
             raise ValueError("max_results must be between 1 and 20")
 
+        if self.title_index is not None:
+            local = self.title_index.resolve(
+                keyword, limit=max_results, subject_type=subject_type
+            )
+            if local is not None:
+                logger.info(
+                    "Bangumi search answered from title index",
+                    keyword=keyword,
+                    results_count=len(local),
+                )
+                return local
+
         try:
             logger.info(
                 "Searching bangumi subjects",
@@ -120,10 +185,12 @@ class BangumiClient(BaseHTTPClient):
                 f"/search/subject/{encoded_keyword}",
                 params={"type": subject_type, "max_results": max_results},
                 headers={"User-Agent": self.USER_AGENT},
+                cache_namespace="search",
             )
 
             # Extract results
             results = response.get("list", [])
+            self._learn_subjects(results)
 
             logger.info(
                 "Bangumi search completed", keyword=keyword, results_count=len(results)
@@ -141,6 +208,21 @@ class BangumiClient(BaseHTTPClient):
             )
             raise APIError(f"Bangumi search failed: {str(e)}") from e
 
+    def _learn_subjects(self, subjects: list[dict]) -> None:
+        """Add search results to the title index, so repeat keywords stay local."""
+        if self.title_index is None or not isinstance(subjects, list):
+            return
+        added = self.title_index.add(s for s in subjects if isinstance(s, dict))
+        if added and self._title_index_path:
+            try:
+                append_subjects(self._title_index_path, added)
+            except OSError as e:
+                logger.warning(
+                    "Could not persist title index",
+                    path=self._title_index_path,
+                    error=str(e),
+                )
+
     async def get_subject(self, subject_id: int) -> dict:
         """
         Get detailed information about a subject by ID.
@@ -168,7 +250,9 @@ class BangumiClient(BaseHTTPClient):
             logger.info("Fetching bangumi subject details", subject_id=subject_id)
 
             response = await self.get(
-                f"/subject/{subject_id}", headers={"User-Agent": self.USER_AGENT}
+                f"/subject/{subject_id}",
+                headers={"User-Agent": self.USER_AGENT},
+                cache_namespace="subject",
             )
 
             logger.info(
@@ -190,3 +274,81 @@ class BangumiClient(BaseHTTPClient):
                 exc_info=True,
             )
             raise APIError(f"Failed to fetch subject {subject_id}: {str(e)}") from e
+
+    async def get_subjects(
+        self,
+        subject_ids: Sequence[int],
+        fields: Iterable[str] | None = CANDIDATE_FIELDS,
+    ) -> list[dict | None]:
+        """
+        Get several subjects by ID, fetched concurrently.
+
+        Each distinct ID is fetched once, all at the same time; the rate
+        limiter decides how many actually go out together. Projected
+        subjects are cached per ID and field set, so a batch that overlaps
+        an earlier one only fetches the new IDs.
+
+        Args:
+            subject_ids: Bangumi subject IDs, in the order results are wanted
+            fields: Keys to keep from each subject (default: those a
+                candidate needs); None keeps the whole subject
+
+        Returns:
+            One entry per ID, in input order: the (projected) subject, or
+            None if it could not be fetched
+
+        Raises:
+            ValueError: On a non-positive subject ID
+
+        Example:
+            >>> client = BangumiClient()
+            >>> subjects = await client.get_subjects([160209, 485])
+            >>> [s["air_date"] for s in subjects]
+            ['2016-08-26', '2006-04-02']
+        """
+        if any(subject_id <= 0 for subject_id in subject_ids):
+            raise ValueError("subject_id must be positive")
+        fields = tuple(fields) if fields is not None else None
+
+        unique_ids = list(dict.fromkeys(subject_ids))
+        results = await asyncio.gather(
+            *(
+                self._get_subject_fields(subject_id, fields)
+                for subject_id in unique_ids
+            ),
+            return_exceptions=True,
+        )
+
+        by_id: dict[int, dict | None] = {}
+        for subject_id, result in zip(unique_ids, results, strict=True):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                logger.warning(
+                    "Bangumi subject missing from batch",
+                    subject_id=subject_id,
+                    error=str(result),
+                )
+                result = None
+            by_id[subject_id] = result
+
+        logger.info(
+            "Bangumi subjects fetched",
+            requested=len(subject_ids),
+            unique=len(unique_ids),
+            failed=sum(result is None for result in by_id.values()),
+        )
+        return [by_id[subject_id] for subject_id in subject_ids]
+
+    @cached_method("subject_fields", namespace="subject_fields")
+    async def _get_subject_fields(
+        self, subject_id: int, fields: tuple[str, ...] | None
+    ) -> dict:
+        """One subject for get_subjects, projected to fields."""
+        subject = await self.get_subject(subject_id)
+        if fields is None:
+            return subject
+        if "air_date" not in subject and subject.get("date"):
+            # The v0 API calls it date
+            subject = {**subject, "air_date": subject["date"]}
+        return {field: subject.get(field) for field in fields}
@@ -10,16 +10,25 @@ Provides a foundation for all API clients with:
 """
 
 import asyncio
+from dataclasses import dataclass, replace
 from enum import Enum
-from typing import Any
+from typing import Any, ClassVar
+from urllib.parse import urlparse
 
 import aiohttp
 from aiohttp import ClientError, ClientResponseError, ClientTimeout
 
 from config.settings import get_settings
-from domain.entities import APIError
-from services.cache import ResponseCache
-from services.retry import RateLimiter
+from domain.entities import APIError, DeadlineExceededError, RateLimitedError
+from services.cache import CacheNamespace, ResponseCache, in_background_refresh
+from services.cache_backends import CacheBackend, create_cache_backend
+from services.deadline import DeadlineExceeded, check_deadline, remaining_budget
+from services.rate_limit_backends import (
+    RateLimitBackend,
+    SharedRateLimiter,
+    create_rate_limit_backend,
+)
+from services.retry import Priority, RateLimitLearner, current_priority
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -36,6 +45,21 @@ class HTTPMethod(str, Enum):
     PATCH = "PATCH"
 
 
+@dataclass(frozen=True)
+class ConditionalResponse:
+    """
+    Result of a conditional GET.
+
+    ``etag`` and ``last_modified`` are the validators to send next time;
+    when the upstream answered 304 they are the ones that were sent.
+    """
+
+    modified: bool
+    data: Any = None
+    etag: str | None = None
+    last_modified: str | None = None
+
+
 class BaseHTTPClient:
     """
     Base HTTP client with retry, rate limiting, and caching.
@@ -45,8 +69,16 @@ class BaseHTTPClient:
     - Rate limiting to prevent quota exhaustion
     - Response caching for GET requests
     - Structured error handling and logging
+
+    Subclasses declare per-endpoint cache policies in ``CACHE_NAMESPACES``.
     """
 
+    CACHE_NAMESPACES: ClassVar[dict[str, CacheNamespace]] = {}
+
+    # Share of the rate-limit bucket only interactive requests may use;
+    # speculative and background traffic waits while the bucket is below it.
+    INTERACTIVE_RESERVE: ClassVar[float] = 0.5
+
     def __init__(
         self,
         base_url: str,
@@ -58,6 +90,9 @@ class BaseHTTPClient:
         use_cache: bool = True,
         cache_ttl_seconds: int = 3600,
         session: aiohttp.ClientSession | None = None,
+        cache_backend: CacheBackend | None = None,
+        rate_limit_backend: RateLimitBackend | None = None,
+        refresh_ahead: bool = False,
     ):
         """
         Initialize the base HTTP client.
@@ -67,11 +102,20 @@ class BaseHTTPClient:
             api_key: Optional API key for authentication
             timeout: Request timeout in seconds
             max_retries: Maximum retry attempts
-            rate_limit_calls: Number of calls allowed per period
+            rate_limit_calls: Number of calls allowed per period (a starting
+                point; replaced by limits the upstream advertises)
             rate_limit_period: Rate limit period in seconds
             use_cache: Whether to cache GET responses
             cache_ttl_seconds: Cache TTL in seconds
             session: Optional aiohttp session to use
+            cache_backend: Shared cache backend (defaults to CACHE_BACKEND_URL)
+            rate_limit_backend: Shared rate limit backend (defaults to
+                RATE_LIMIT_BACKEND_URL)
+            refresh_ahead: Refresh hot entries of namespaces that ask for it
+                before they expire. Only worth enabling on long-lived
+                clients: refresh state lives in the client's in-process
+                cache, so a client used for one call never sees the repeat
+                hits that make an entry hot.
         """
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
@@ -83,14 +127,39 @@ class BaseHTTPClient:
         self._session = session
         self._owns_session = session is None
 
-        # Rate limiter
-        self._rate_limiter = RateLimiter(
-            calls_per_period=rate_limit_calls, period_seconds=rate_limit_period
+        # Rate limiter: one budget per upstream host, shared by every client
+        # instance (and every worker, depending on the backend). The backend
+        # is process-wide, so close() leaves it open for other clients.
+        if rate_limit_backend is None:
+            rate_limit_backend = create_rate_limit_backend(
+                settings.rate_limit_backend_url
+            )
+        self._rate_limiter = SharedRateLimiter(
+            calls_per_period=rate_limit_calls,
+            period_seconds=rate_limit_period,
+            backend=rate_limit_backend,
+            key=urlparse(self.base_url).netloc or self.base_url,
+            interactive_reserve=self.INTERACTIVE_RESERVE,
         )
-
-        # Response cache
+        self._rate_limit_learner = RateLimitLearner(self._rate_limiter)
+
+        # Response cache (in-process, optionally backed by a shared tier)
+        if use_cache and cache_backend is None:
+            cache_backend = create_cache_backend(settings.cache_backend_url)
+        namespaces = self.CACHE_NAMESPACES
+        if not refresh_ahead:
+            namespaces = {
+                name: replace(policy, refresh_ahead=0.0)
+                for name, policy in namespaces.items()
+            }
         self._cache = (
-            ResponseCache(default_ttl_seconds=cache_ttl_seconds) if use_cache else None
+            ResponseCache(
+                default_ttl_seconds=cache_ttl_seconds,
+                namespaces=namespaces,
+                backend=cache_backend,
+            )
+            if use_cache
+            else None
         )
 
         logger.info(
@@ -102,6 +171,24 @@ class BaseHTTPClient:
             cache_enabled=use_cache,
         )
 
+    def get_rate_limit_stats(self) -> dict[str, Any]:
+        """
+        Get rate limiter state and per-class wait-time histograms.
+
+        Returns:
+            Budget key, current (possibly learned) limit, queued callers,
+            estimated tokens and a wait-time histogram per priority class
+        """
+        limiter = self._rate_limiter
+        return {
+            "key": limiter.key,
+            "rate_limit": f"{limiter.calls_per_period}/{limiter.period_seconds}s",
+            "learned_from_headers": self._rate_limit_learner.learned_from_headers,
+            "queued": limiter.queued,
+            "available_tokens": round(limiter.available_tokens(), 2),
+            "wait_seconds": limiter.get_wait_stats(),
+        }
+
     def _build_url(self, endpoint: str) -> str:
         """Build full URL from endpoint."""
         if not endpoint.startswith("/"):
@@ -145,6 +232,8 @@ class BaseHTTPClient:
         params: dict[str, Any] | None = None,
         json_data: dict[str, Any] | None = None,
         data: Any | None = None,
+        timeout: float | None = None,
+        response_meta: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
         """
         Make the actual HTTP request.
@@ -156,14 +245,22 @@ class BaseHTTPClient:
             params: Query parameters
             json_data: JSON body
             data: Form data
+            timeout: Total timeout for this call, when the request deadline
+                leaves less than the client's own timeout
+            response_meta: If given, filled with the response status and
+                cache validators, and a 304 returns an empty dict
 
         Returns:
             Response data as dictionary
 
         Raises:
             APIError: On request failure
+            DeadlineExceededError: If the call is cut off by the deadline
         """
         session = await self._get_session()
+        request_kwargs: dict[str, Any] = {}
+        if timeout is not None:
+            request_kwargs["timeout"] = ClientTimeout(total=timeout)
 
         try:
             # Choose the appropriate session method
@@ -171,9 +268,33 @@ class BaseHTTPClient:
 
             # Make the request
             async with request_method(
-                url, headers=headers, params=params, json=json_data, data=data
+                url,
+                headers=headers,
+                params=params,
+                json=json_data,
+                data=data,
+                **request_kwargs,
             ) as response:
+                # Learn the upstream's actual limits from every response
+                retry_after = self._rate_limit_learner.observe(
+                    response.status, response.headers
+                )
+
+                if response_meta is not None:
+                    response_meta["status"] = response.status
+                    response_meta["etag"] = response.headers.get("ETag")
+                    response_meta["last_modified"] = response.headers.get(
+                        "Last-Modified"
+                    )
+                    if response.status == 304:
+                        return {}
+
                 # Check for errors
+                if response.status == 429:
+                    raise RateLimitedError(
+                        f"API request failed with status 429: {await response.text()}",
+                        retry_after=retry_after,
+                    )
                 if response.status >= 400:
                     error_text = await response.text()
                     raise APIError(
@@ -188,7 +309,13 @@ class BaseHTTPClient:
                     text = await response.text()
                     return {"raw_response": text}
 
+        except APIError:
+            raise
         except TimeoutError as e:
+            if timeout is not None:
+                raise DeadlineExceededError(
+                    f"Request cut off by deadline after {timeout:.2f} seconds"
+                ) from e
             raise APIError(f"Request timeout after {self.timeout} seconds") from e
         except ClientResponseError as e:
             raise APIError(f"HTTP {e.status}: {e.message}") from e
@@ -213,10 +340,17 @@ class BaseHTTPClient:
         data: Any | None = None,
         headers: dict[str, str] | None = None,
         skip_cache: bool = False,
+        cache_namespace: str | None = None,
+        priority: Priority | None = None,
+        response_meta: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
         """
         Make an HTTP request with retry, rate limiting, and caching.
 
+        Honours the request deadline (see services.deadline): cached GET
+        responses are still served, but no new call is started, waited for
+        or retried past it.
+
         Args:
             method: HTTP method
             endpoint: API endpoint path
@@ -225,26 +359,42 @@ class BaseHTTPClient:
             data: Form data
             headers: Additional headers
             skip_cache: Skip cache for this request
+            cache_namespace: Cache namespace for GET responses (default if omitted)
+            priority: Rate limiter traffic class (background during cache
+                refreshes, else the request_priority() context's class, else
+                interactive)
+            response_meta: If given, filled with the response status and
+                cache validators (see get_if_changed); the response is then
+                not cached
 
         Returns:
             Response data as dictionary
 
         Raises:
             APIError: On request failure after retries
+            DeadlineExceededError: If the request deadline is reached
         """
+        if priority is None and in_background_refresh():
+            priority = Priority.BACKGROUND
+        if priority is None:
+            priority = current_priority()
+        if priority is None:
+            priority = Priority.INTERACTIVE
+
         # Build URL and headers
         url = self._build_url(endpoint)
         request_headers = self._get_headers(headers)
 
-        # Check cache for GET requests
+        # Check cache for GET requests (background refreshes must reach upstream)
         if (
             method == HTTPMethod.GET
             and self.use_cache
             and not skip_cache
+            and not in_background_refresh()
             and self._cache
         ):
             cache_key = self._cache.generate_key(url, params)
-            cached = await self._cache.get(cache_key)
+            cached = await self._cache.get(cache_key, namespace=cache_namespace)
             if cached is not None:
                 logger.debug("Cache hit", url=url, params=params)
                 return cached
@@ -253,9 +403,13 @@ class BaseHTTPClient:
         last_exception = None
         for attempt in range(self.max_retries):
             try:
+                # Fail fast once the request's latency budget is spent
+                check_deadline(f"{method.value} {endpoint}")
+
                 # Apply rate limiting
-                await self._rate_limiter.acquire()
+                await self._rate_limiter.acquire(priority=priority)
 
+                budget = remaining_budget()
                 logger.debug(
                     "Making request",
                     method=method.value,
@@ -263,6 +417,7 @@ class BaseHTTPClient:
                     params=params,
                     has_body=json_data is not None or data is not None,
                     attempt=attempt + 1,
+                    budget_remaining=None if budget is None else f"{budget:.2f}s",
                 )
 
                 # Make the request
@@ -273,20 +428,46 @@ class BaseHTTPClient:
                     params=params,
                     json_data=json_data,
                     data=data,
+                    timeout=(
+                        min(self.timeout, budget)
+                        if budget is not None and budget < self.timeout
+                        else None
+                    ),
+                    response_meta=response_meta,
                 )
 
                 # Cache successful GET responses
-                if method == HTTPMethod.GET and self.use_cache and self._cache:
+                if (
+                    method == HTTPMethod.GET
+                    and self.use_cache
+                    and self._cache
+                    and response_meta is None
+                ):
                     cache_key = self._cache.generate_key(url, params)
-                    await self._cache.set(cache_key, response)
+                    await self._cache.set(
+                        cache_key, response, namespace=cache_namespace
+                    )
 
                 logger.debug("Request successful", url=url, method=method.value)
                 return response
 
+            except DeadlineExceeded as e:
+                logger.warning(
+                    "Request deadline exceeded",
+                    url=url,
+                    method=method.value,
+                    attempt=attempt + 1,
+                    error=str(e),
+                )
+                raise DeadlineExceededError(str(e)) from e
+
             except APIError as e:
                 last_exception = e
                 error_str = str(e)
 
+                if isinstance(e, DeadlineExceededError):
+                    raise
+
                 # Check if it's a client error (4xx) - don't retry these
                 if any(code in error_str for code in ["400", "401", "403", "404"]):
                     logger.error(
@@ -308,8 +489,24 @@ class BaseHTTPClient:
                     )
                     raise
 
-                # Calculate backoff delay
-                delay = min(2**attempt, 30)  # Exponential backoff capped at 30s
+                # Calculate backoff delay; after a 429 with a hint the rate
+                # limiter is already holding every caller for that long
+                if isinstance(e, RateLimitedError) and e.retry_after is not None:
+                    delay = 0
+                else:
+                    delay = min(2**attempt, 30)  # Exponential backoff capped at 30s
+
+                # Don't sleep past the request deadline just to fail then
+                budget = remaining_budget()
+                if budget is not None and delay >= budget:
+                    logger.error(
+                        "Deadline leaves no time to retry",
+                        url=url,
+                        method=method.value,
+                        error=error_str,
+                        budget_remaining=f"{budget:.2f}s",
+                    )
+                    raise
 
                 logger.warning(
                     "Request failed (will retry)",
@@ -343,6 +540,63 @@ class BaseHTTPClient:
         """Convenience method for GET requests."""
         return await self.request(HTTPMethod.GET, endpoint, params=params, **kwargs)
 
+    async def get_if_changed(
+        self,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        priority: Priority = Priority.BACKGROUND,
+    ) -> ConditionalResponse:
+        """
+        Conditional GET that bypasses the response cache.
+
+        Sends ``If-None-Match`` / ``If-Modified-Since`` from the validators
+        of a previous response, so an unchanged resource costs the upstream
+        a 304 rather than a full body. Meant for sync jobs, hence background
+        priority by default.
+
+        Args:
+            endpoint: API endpoint path
+            params: Query parameters
+            etag: ETag from the previous response
+            last_modified: Last-Modified from the previous response
+            priority: Rate limiter traffic class
+
+        Returns:
+            ConditionalResponse with the body if the resource changed
+
+        Raises:
+            APIError: On request failure after retries
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        meta: dict[str, Any] = {}
+        data = await self.request(
+            HTTPMethod.GET,
+            endpoint,
+            params=params,
+            headers=headers,
+            skip_cache=True,
+            priority=priority,
+            response_meta=meta,
+        )
+
+        if meta.get("status") == 304:
+            return ConditionalResponse(
+                modified=False, etag=etag, last_modified=last_modified
+            )
+        return ConditionalResponse(
+            modified=True,
+            data=data,
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+        )
+
     async def post(
         self, endpoint: str, json_data: dict[str, Any] | None = None, **kwargs
     ) -> dict[str, Any]:
@@ -364,11 +618,13 @@ class BaseHTTPClient:
         return await self.request(HTTPMethod.DELETE, endpoint, **kwargs)
 
     async def close(self) -> None:
-        """Close the HTTP session."""
+        """Close the HTTP session and release the cache backend."""
         if self._session and self._owns_session:
             await self._session.close()
             self._session = None
             logger.debug("HTTP session closed")
+        if self._cache:
+            await self._cache.close()
 
     async def __aenter__(self):
         """Async context manager entry."""
@@ -26,6 +26,76 @@ class Settings(BaseSettings):
     anitabi_api_url: str = Field(
         default="https://api.anitabi.cn/bangumi", description="Anitabi API base URL"
     )
+    anitabi_mirror_path: str = Field(
+        default="",
+        description=(
+            "SQLite file of the offline Anitabi mirror; when set, point "
+            "lookups are answered from it before going upstream"
+        ),
+    )
+    anitabi_catalogue_path: str = Field(
+        default="",
+        description=(
+            "Point catalogue exported from the mirror; when set, point lookups "
+            "and local search read points from it before the mirror. Opened "
+            "once at startup"
+        ),
+    )
+    anitabi_local_search: bool = Field(
+        default=False,
+        description=(
+            "Answer nearby-bangumi searches from the offline mirror's points "
+            "in areas where /near has listed only mirrored bangumi; other "
+            "areas are searched upstream"
+        ),
+    )
+    station_gazetteer: bool = Field(
+        default=True,
+        description=(
+            "Resolve station names from the local gazetteer before calling "
+            "the Anitabi /station endpoint"
+        ),
+    )
+    station_gazetteer_path: str = Field(
+        default="",
+        description="Station gazetteer JSON file; empty uses the bundled one",
+    )
+    bangumi_title_index: bool | None = Field(
+        default=None,
+        description=(
+            "Answer Bangumi title searches from the local title index when a "
+            "keyword exactly names a known subject, calling api.bgm.tv for the "
+            "rest; unset enables it only when BANGUMI_TITLE_INDEX_PATH is set"
+        ),
+    )
+    bangumi_title_index_path: str = Field(
+        default="",
+        description=(
+            "JSON-lines file of Bangumi subjects (e.g. an anime-only Bangumi "
+            "Archive dump) loaded into the title index; search results are "
+            "appended to it. Empty keeps the index in memory only"
+        ),
+    )
+    image_cache_dir: str = Field(
+        default="cache/images",
+        description="Directory of cached point screenshots and thumbnails",
+    )
+    image_cache_concurrency: int = Field(
+        default=8, description="Maximum screenshot downloads in flight at once"
+    )
+    speculative_prefetch: bool = Field(
+        default=True,
+        description=(
+            "Fetch the points of the top Bangumi candidates while the user "
+            "reads the list, so the chosen one is usually cached"
+        ),
+    )
+    speculative_prefetch_candidates: int = Field(
+        default=3, description="Top candidates whose points are prefetched"
+    )
+    speculative_prefetch_concurrency: int = Field(
+        default=2, description="Maximum speculative prefetches in flight at once"
+    )
     weather_api_url: str = Field(
         default="https://api.openweathermap.org/data/2.5",
         description="Weather API base URL",
@@ -45,10 +115,21 @@ class Settings(BaseSettings):
     debug: bool = Field(default=False, description="Debug mode")
     max_retries: int = Field(default=3, description="Maximum API retry attempts")
     timeout_seconds: int = Field(default=30, description="API request timeout")
+    request_deadline_seconds: float = Field(
+        default=90.0,
+        description="Latency budget for one user turn, across every agent and call",
+    )
 
     # Cache Settings
     cache_ttl_seconds: int = Field(default=3600, description="Cache TTL in seconds")
     use_cache: bool = Field(default=True, description="Enable caching")
+    cache_backend_url: str = Field(
+        default="",
+        description=(
+            "Shared cache backend: empty for in-process only, memory://, "
+            "unix:///path/to/socket or redis://host:port/db"
+        ),
+    )
 
     # Output Paths
     output_dir: Path = Field(default=Path("outputs"), description="Output directory")
@@ -59,6 +140,14 @@ class Settings(BaseSettings):
     # Rate Limiting
     rate_limit_calls: int = Field(default=100, description="Rate limit calls")
     rate_limit_period_seconds: int = Field(default=60, description="Rate limit period")
+    rate_limit_backend_url: str = Field(
+        default="",
+        description=(
+            "Shared rate limit budget: empty or memory:// for one budget per "
+            "process, file:///path/to/dir for every process on the host, or "
+            "unix:///path/to/socket / redis://host:port/db across hosts"
+        ),
+    )
 
     @field_validator("log_level")
     @classmethod
@@ -247,3 +247,17 @@ class APIError(DomainException):
     """Raised when external API call fails."""
 
     pass
+
+
+class DeadlineExceededError(APIError):
+    """Raised when an external call cannot finish within the request deadline."""
+
+    pass
+
+
+class RateLimitedError(APIError):
+    """Raised when an upstream rejects a call with HTTP 429."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
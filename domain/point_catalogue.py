@@ -0,0 +1,324 @@
+"""
+Memory-mapped binary catalogue of pilgrimage points.
+
+Provides:
+- write_catalogue(): store many bangumi's PointSets in one compact file
+- PointCatalogue: open a catalogue and get PointSet views or Points per
+  bangumi without parsing anything
+
+The file is laid out so that a PointSet's columns can point straight into
+the mapping: opening a catalogue reads only the header and the bangumi
+table, lookups are zero-copy, and every worker mapping the same file shares
+its pages through the OS page cache. Strings are decoded one at a time, only
+when a caller asks for text.
+
+Layout (little-endian, sections 8-byte aligned, in this order)::
+
+    header         magic, version, bangumi/point/string counts, heap size
+    bangumi table  (id string, first point, point count) per bangumi
+    latitude       float64 per point        (points grouped by bangumi)
+    longitude      float64 per point
+    episode        int64 per point
+    time_seconds   int64 per point
+    text codes     int32 per point for each of TEXT_FIELDS (-1 = None)
+    string offsets uint64 per string, plus one end offset
+    string heap    UTF-8 bytes of every distinct string
+"""
+
+import mmap
+import os
+import struct
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import Any, overload
+
+import numpy as np
+
+from domain.entities import Point
+from domain.point_set import _MISSING, TEXT_FIELDS, PointSet
+
+MAGIC = b"SJPCAT\x00\x00"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sIIQQQQ")
+_BANGUMI_DTYPE = np.dtype(
+    [("id", "<i8"), ("point_start", "<i8"), ("point_count", "<i8")]
+)
+
+
+def _padding(size: int) -> int:
+    return -size % 8
+
+
+class CatalogueFormatError(ValueError):
+    """Raised when a file is not a readable point catalogue."""
+
+    pass
+
+
+class StringHeap(Sequence[str]):
+    """
+    Read-only string table decoded lazily from a catalogue's heap.
+
+    Used as a PointSet string table. Pickles by path, so a PointSet sent to
+    another worker re-maps the same file instead of copying its strings.
+    """
+
+    def __init__(self, path: str, offsets: np.ndarray, heap: memoryview):
+        self.path = path
+        self._offsets = offsets
+        self._heap = heap
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("string index out of range")
+        start, end = self._offsets[index : index + 2].tolist()
+        return str(self._heap[start:end], "utf-8")
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (_open_string_heap, (self.path,))
+
+
+def _open_string_heap(path: str) -> StringHeap:
+    return PointCatalogue(path).strings
+
+
+def write_catalogue(
+    path: str | Path, point_sets: Iterable[tuple[str, PointSet]]
+) -> int:
+    """
+    Write bangumi point sets to a catalogue file.
+
+    Strings are stored once across the whole catalogue. The file is written
+    beside ``path`` and moved into place, so readers that already mapped the
+    old file keep a consistent view.
+
+    Args:
+        path: Destination file
+        point_sets: ``(bangumi_id, PointSet)`` pairs; ids must be unique
+
+    Returns:
+        Number of points written
+
+    Raises:
+        ValueError: If a bangumi id appears twice
+    """
+    table: dict[str, int] = {}
+    bangumi_rows: list[tuple[int, int, int]] = []
+    numeric: dict[str, list[np.ndarray]] = {
+        "latitude": [],
+        "longitude": [],
+        "episode": [],
+        "time_seconds": [],
+    }
+    codes: dict[str, list[np.ndarray]] = {field: [] for field in TEXT_FIELDS}
+    seen: set[str] = set()
+    total = 0
+
+    for bangumi_id, point_set in point_sets:
+        bangumi_id = str(bangumi_id)
+        if bangumi_id in seen:
+            raise ValueError(f"Duplicate bangumi in catalogue: {bangumi_id}")
+        seen.add(bangumi_id)
+        bangumi_code = table.setdefault(bangumi_id, len(table))
+        bangumi_rows.append((bangumi_code, total, len(point_set)))
+        total += len(point_set)
+
+        for field, chunks in numeric.items():
+            chunks.append(getattr(point_set, field))
+
+        # Re-intern only the strings this set actually uses (views share
+        # their parent's table), mapping local codes to catalogue codes
+        local_codes = point_set._codes
+        used = np.unique(np.concatenate([local_codes[f] for f in TEXT_FIELDS]))
+        used = used[used != _MISSING]
+        remap = np.full(len(point_set._strings) + 1, _MISSING, dtype=np.int32)
+        strings = point_set._strings
+        for code in used.tolist():
+            remap[code] = table.setdefault(strings[code], len(table))
+        for field in TEXT_FIELDS:
+            # Index -1 hits the final slot, which stays _MISSING
+            codes[field].append(remap[local_codes[field]])
+
+    encoded = [value.encode("utf-8") for value in table]
+    offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    heap = b"".join(encoded)
+
+    def column(chunks: list[np.ndarray], dtype: str) -> np.ndarray:
+        if not chunks:
+            return np.empty(0, dtype=dtype)
+        return np.concatenate(chunks).astype(dtype, copy=False)
+
+    sections = [
+        np.array(bangumi_rows, dtype=_BANGUMI_DTYPE).reshape(-1),
+        column(numeric["latitude"], "<f8"),
+        column(numeric["longitude"], "<f8"),
+        column(numeric["episode"], "<i8"),
+        column(numeric["time_seconds"], "<i8"),
+        *(column(codes[field], "<i4") for field in TEXT_FIELDS),
+    ]
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(
+            _HEADER.pack(
+                MAGIC, VERSION, 0, len(bangumi_rows), total, len(encoded), len(heap)
+            )
+        )
+        f.write(b"\x00" * _padding(_HEADER.size))
+        for array in sections:
+            f.write(array.tobytes())
+            f.write(b"\x00" * _padding(array.nbytes))
+        f.write(offsets.tobytes())
+        f.write(heap)
+    os.replace(tmp_path, path)
+
+    return total
+
+
+class PointCatalogue:
+    """
+    Read-only, memory-mapped view of a catalogue file.
+
+    Opening costs one header read and a pass over the bangumi table;
+    everything else is paged in by the OS on first touch.
+    """
+
+    def __init__(self, path: str | Path):
+        """
+        Map a catalogue file.
+
+        Args:
+            path: File written by write_catalogue()
+
+        Raises:
+            CatalogueFormatError: If the file is not a catalogue or is
+                truncated
+        """
+        self.path = str(path)
+        with open(self.path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                # Raised for empty files
+                raise CatalogueFormatError(f"Not a point catalogue: {path}") from e
+
+        buffer = memoryview(self._mmap)
+        if len(buffer) < _HEADER.size:
+            raise CatalogueFormatError(f"Not a point catalogue: {path}")
+        magic, version, _, n_bangumi, n_points, n_strings, heap_size = (
+            _HEADER.unpack_from(buffer)
+        )
+        if magic != MAGIC:
+            raise CatalogueFormatError(f"Not a point catalogue: {path}")
+        if version != VERSION:
+            raise CatalogueFormatError(
+                f"Unsupported catalogue version {version} in {path}"
+            )
+
+        offset = _HEADER.size + _padding(_HEADER.size)
+
+        def section(dtype: Any, count: int) -> np.ndarray:
+            nonlocal offset
+            dtype = np.dtype(dtype)
+            end = offset + dtype.itemsize * count
+            if end > len(buffer):
+                raise CatalogueFormatError(f"Truncated point catalogue: {path}")
+            array = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+            offset = end + _padding(dtype.itemsize * count)
+            return array
+
+        bangumi = section(_BANGUMI_DTYPE, n_bangumi)
+        self._latitude = section("<f8", n_points)
+        self._longitude = section("<f8", n_points)
+        self._episode = section("<i8", n_points)
+        self._time_seconds = section("<i8", n_points)
+        self._codes = {field: section("<i4", n_points) for field in TEXT_FIELDS}
+        offsets = section("<u8", n_strings + 1)
+        if offset + heap_size > len(buffer):
+            raise CatalogueFormatError(f"Truncated point catalogue: {path}")
+        self.strings = StringHeap(
+            self.path, offsets, buffer[offset : offset + heap_size]
+        )
+
+        self._ranges = {
+            self.strings[code]: (start, start + count)
+            for code, start, count in bangumi.tolist()
+        }
+
+    def __len__(self) -> int:
+        """Number of points in the catalogue."""
+        return len(self._latitude)
+
+    def __contains__(self, bangumi_id: object) -> bool:
+        return str(bangumi_id) in self._ranges
+
+    def __repr__(self) -> str:
+        return (
+            f"PointCatalogue({len(self._ranges)} bangumi, {len(self)} points, "
+            f"{len(self.strings)} strings)"
+        )
+
+    def bangumi_ids(self) -> list[str]:
+        """Ids of every bangumi in the catalogue, in file order."""
+        return list(self._ranges)
+
+    def _view(self, rows: slice) -> PointSet:
+        return PointSet(
+            self._latitude[rows],
+            self._longitude[rows],
+            self._episode[rows],
+            self._time_seconds[rows],
+            {field: codes[rows] for field, codes in self._codes.items()},
+            self.strings,
+        )
+
+    def point_set(self, bangumi_id: str) -> PointSet:
+        """
+        Zero-copy columnar view of one bangumi's points.
+
+        Args:
+            bangumi_id: Anime identifier
+
+        Returns:
+            PointSet whose columns live in the mapped file
+
+        Raises:
+            KeyError: If the bangumi is not in the catalogue
+        """
+        start, end = self._ranges[str(bangumi_id)]
+        return self._view(slice(start, end))
+
+    def points(self, bangumi_id: str) -> list[Point]:
+        """
+        Point entities for one bangumi, built on demand.
+
+        Raises:
+            KeyError: If the bangumi is not in the catalogue
+        """
+        return self.point_set(bangumi_id).to_points()
+
+    def all_points(self) -> PointSet:
+        """Zero-copy columnar view of every point in the catalogue."""
+        return self._view(slice(0, len(self)))
+
+    def __iter__(self) -> Iterator[tuple[str, PointSet]]:
+        """Iterate ``(bangumi_id, PointSet)`` pairs in file order."""
+        for bangumi_id in self._ranges:
+            yield bangumi_id, self.point_set(bangumi_id)
@@ -0,0 +1,528 @@
+"""
+Columnar storage for pilgrimage points.
+
+Provides:
+- PointSet: points held as contiguous NumPy columns plus one interned
+  string table, instead of one Pydantic object per point
+- Lossless conversion to and from Point entities, model_dump() records
+  and JSON-ready columns
+- Cheap filtered, sliced and sorted views that share the string table
+- Vectorised distances from an origin (see domain.geo)
+
+Numeric work (distances, filters, sorts) runs over whole columns; Point
+objects are only built when a caller asks for them.
+"""
+
+import sys
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any
+
+import numpy as np
+from numpy.typing import DTypeLike
+from pydantic import HttpUrl, TypeAdapter
+
+from domain.entities import Coordinates, Point
+from domain.geo import distances_from
+
+# Text fields of Point, in model field order around the numeric columns
+TEXT_FIELDS = (
+    "id",
+    "name",
+    "cn_name",
+    "bangumi_id",
+    "bangumi_title",
+    "screenshot_url",
+    "address",
+    "opening_hours",
+    "admission_fee",
+)
+OPTIONAL_TEXT_FIELDS = frozenset({"address", "opening_hours", "admission_fee"})
+NUMERIC_FIELDS = ("latitude", "longitude", "episode", "time_seconds")
+
+# String table code for None in optional text columns
+_MISSING = -1
+
+_URL_LIST_ADAPTER = TypeAdapter(list[HttpUrl])
+
+
+def _intern(
+    values: Sequence[str | None], table: dict[str, int], optional: bool
+) -> np.ndarray:
+    """Encode strings as int32 codes into ``table``, adding new entries."""
+    if optional:
+        codes = [
+            _MISSING if value is None else table.setdefault(value, len(table))
+            for value in values
+        ]
+    else:
+        codes = [table.setdefault(value, len(table)) for value in values]
+    return np.array(codes, dtype=np.int32)
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    """Freeze a column so views can safely share it."""
+    array.flags.writeable = False
+    return array
+
+
+class PointSet:
+    """
+    Immutable, columnar collection of pilgrimage points.
+
+    ``latitude``/``longitude`` (float64) and ``episode``/``time_seconds``
+    (int64) are read-only NumPy arrays. Text fields are stored as int32
+    codes into a string table shared by every view derived from the set,
+    so repeated values (bangumi ids and titles, names) are held once.
+
+    Indexing with an int returns a Point; indexing with a slice, boolean
+    mask or index array returns a new PointSet over the selected rows.
+    """
+
+    __slots__ = (
+        "latitude",
+        "longitude",
+        "episode",
+        "time_seconds",
+        "_codes",
+        "_strings",
+    )
+
+    def __init__(
+        self,
+        latitude: np.ndarray,
+        longitude: np.ndarray,
+        episode: np.ndarray,
+        time_seconds: np.ndarray,
+        codes: dict[str, np.ndarray],
+        strings: Sequence[str],
+    ):
+        """
+        Wrap existing columns without copying or validating them.
+
+        Use from_points() or from_columns() to build a set from data.
+
+        Args:
+            latitude: Rounded latitudes
+            longitude: Rounded longitudes
+            episode: Episode numbers
+            time_seconds: Scene timestamps in seconds
+            codes: String table codes per text field
+            strings: Shared string table
+        """
+        self.latitude = _readonly(latitude)
+        self.longitude = _readonly(longitude)
+        self.episode = _readonly(episode)
+        self.time_seconds = _readonly(time_seconds)
+        self._codes = {field: _readonly(codes[field]) for field in TEXT_FIELDS}
+        self._strings = strings
+
+    @classmethod
+    def from_columns(
+        cls,
+        latitude: Iterable[float],
+        longitude: Iterable[float],
+        episode: Iterable[int],
+        time_seconds: Iterable[int],
+        **text: Sequence[str | None],
+    ) -> "PointSet":
+        """
+        Build a set from raw columns, enforcing Point's constraints.
+
+        Checks run once per column: numeric ranges are vectorised, text
+        columns are type-checked, and screenshot URLs are validated in one
+        TypeAdapter call and stored in normalised form. Coordinates are
+        rounded like Coordinates does.
+
+        Args:
+            latitude: Latitudes in degrees
+            longitude: Longitudes in degrees
+            episode: Episode numbers
+            time_seconds: Scene timestamps in seconds
+            **text: One column per name in TEXT_FIELDS; optional fields
+                may be omitted
+
+        Returns:
+            New PointSet
+
+        Raises:
+            ValueError: If columns differ in length or any value would fail
+                Point validation
+            TypeError: If a column holds values of the wrong type
+        """
+        unknown = set(text) - set(TEXT_FIELDS)
+        if unknown:
+            raise TypeError(f"Unknown PointSet text fields: {sorted(unknown)}")
+
+        lat = list(map(float, latitude))
+        lng = list(map(float, longitude))
+        lat_array = np.array(lat, dtype=np.float64)
+        lng_array = np.array(lng, dtype=np.float64)
+        episode = list(episode)
+        time_seconds = list(time_seconds)
+        if set(map(type, episode)) - {int} or set(map(type, time_seconds)) - {int}:
+            raise TypeError("PointSet episode and time_seconds must be integers")
+        try:
+            episode_array = np.array(episode, dtype=np.int64)
+            seconds_array = np.array(time_seconds, dtype=np.int64)
+        except OverflowError as e:
+            raise ValueError(str(e)) from e
+
+        size = len(lat_array)
+        columns: dict[str, Sequence[str | None]] = {}
+        for field in TEXT_FIELDS:
+            if field in text:
+                columns[field] = text[field]
+            elif field in OPTIONAL_TEXT_FIELDS:
+                columns[field] = [None] * size
+            else:
+                raise TypeError(f"Missing PointSet text field: {field}")
+
+        lengths = {len(lng_array), len(episode_array), len(seconds_array)}
+        lengths.update(len(column) for column in columns.values())
+        if lengths != {size}:
+            raise ValueError("PointSet columns must all have the same length")
+
+        # Written so that NaN fails every check
+        if not ((lat_array >= -90) & (lat_array <= 90)).all():
+            raise ValueError("Latitude out of range [-90, 90]")
+        if not ((lng_array >= -180) & (lng_array <= 180)).all():
+            raise ValueError("Longitude out of range [-180, 180]")
+        if (episode_array < 0).any() or (seconds_array < 0).any():
+            raise ValueError("Episode and time_seconds must be non-negative")
+
+        # Same rounding as the Coordinates validators, after the range check
+        lat_array = np.array([round(value, 6) for value in lat], dtype=np.float64)
+        lng_array = np.array([round(value, 6) for value in lng], dtype=np.float64)
+
+        for field, column in columns.items():
+            allowed = {str, type(None)} if field in OPTIONAL_TEXT_FIELDS else {str}
+            if set(map(type, column)) - allowed:
+                raise TypeError(f"PointSet field {field} must contain strings")
+        if not all(columns["id"]):
+            raise ValueError("Point id must not be empty")
+
+        columns["screenshot_url"] = [
+            str(url)
+            for url in _URL_LIST_ADAPTER.validate_python(
+                list(columns["screenshot_url"])
+            )
+        ]
+
+        table: dict[str, int] = {}
+        codes = {
+            field: _intern(columns[field], table, field in OPTIONAL_TEXT_FIELDS)
+            for field in TEXT_FIELDS
+        }
+        return cls(
+            lat_array, lng_array, episode_array, seconds_array, codes, list(table)
+        )
+
+    @classmethod
+    def from_points(cls, points: Iterable[Point]) -> "PointSet":
+        """
+        Build a set from already-validated Point entities.
+
+        Args:
+            points: Points to store
+
+        Returns:
+            New PointSet holding the same data
+        """
+        points = list(points)
+        table: dict[str, int] = {}
+        codes = {
+            field: _intern(
+                [
+                    None if value is None else str(value)
+                    for value in (getattr(p, field) for p in points)
+                ],
+                table,
+                field in OPTIONAL_TEXT_FIELDS,
+            )
+            for field in TEXT_FIELDS
+        }
+        return cls(
+            np.array([p.coordinates.latitude for p in points], dtype=np.float64),
+            np.array([p.coordinates.longitude for p in points], dtype=np.float64),
+            np.array([p.episode for p in points], dtype=np.int64),
+            np.array([p.time_seconds for p in points], dtype=np.int64),
+            codes,
+            list(table),
+        )
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Rebuild through __init__ so unpickled columns are read-only again
+        return (
+            PointSet,
+            (
+                self.latitude,
+                self.longitude,
+                self.episode,
+                self.time_seconds,
+                self._codes,
+                self._strings,
+            ),
+        )
+
+    def to_json_columns(self) -> dict[str, Any]:
+        """
+        Columns as plain lists, for JSON serialisation.
+
+        Only the strings this set uses are written, with codes renumbered to
+        match, so a view of a large shared table (a catalogue's, say) encodes
+        at its own size.
+
+        Returns:
+            Dict accepted by from_json_columns()
+        """
+        used = np.unique(np.concatenate([self._codes[f] for f in TEXT_FIELDS]))
+        used = used[used != _MISSING]
+        codes = {
+            field: np.where(
+                column == _MISSING, _MISSING, np.searchsorted(used, column)
+            ).tolist()
+            for field, column in self._codes.items()
+        }
+        strings = self._strings
+        return {
+            "latitude": self.latitude.tolist(),
+            "longitude": self.longitude.tolist(),
+            "episode": self.episode.tolist(),
+            "time_seconds": self.time_seconds.tolist(),
+            "codes": codes,
+            "strings": [strings[code] for code in used.tolist()],
+        }
+
+    @classmethod
+    def from_json_columns(cls, data: dict[str, Any]) -> "PointSet":
+        """
+        Rebuild a set from to_json_columns() output.
+
+        Args:
+            data: Columns as produced by to_json_columns()
+
+        Returns:
+            New PointSet
+
+        Raises:
+            ValueError: If the columns differ in length or a code is outside
+                the string table
+        """
+        codes = {
+            field: np.array(data["codes"][field], dtype=np.int32)
+            for field in TEXT_FIELDS
+        }
+        strings = [str(value) for value in data["strings"]]
+        point_set = cls(
+            np.array(data["latitude"], dtype=np.float64),
+            np.array(data["longitude"], dtype=np.float64),
+            np.array(data["episode"], dtype=np.int64),
+            np.array(data["time_seconds"], dtype=np.int64),
+            codes,
+            strings,
+        )
+        size = len(point_set)
+        lengths = {
+            len(point_set.longitude),
+            len(point_set.episode),
+            len(point_set.time_seconds),
+        }
+        lengths.update(len(column) for column in codes.values())
+        if lengths - {size}:
+            raise ValueError("PointSet columns must all have the same length")
+        for field, column in codes.items():
+            lowest = _MISSING if field in OPTIONAL_TEXT_FIELDS else 0
+            if column.size and (column.min() < lowest or column.max() >= len(strings)):
+                raise ValueError(f"PointSet {field} code out of range")
+        return point_set
+
+    def __len__(self) -> int:
+        return len(self.latitude)
+
+    def __repr__(self) -> str:
+        return f"PointSet({len(self)} points, {len(self._strings)} strings)"
+
+    def __iter__(self) -> Iterator[Point]:
+        return iter(self.to_points())
+
+    def __getitem__(self, key: Any) -> Any:
+        """Return a Point for an int, or a PointSet view for anything else."""
+        if isinstance(key, int | np.integer):
+            return self.take([key]).to_points()[0]
+        return PointSet(
+            self.latitude[key],
+            self.longitude[key],
+            self.episode[key],
+            self.time_seconds[key],
+            {field: codes[key] for field, codes in self._codes.items()},
+            self._strings,
+        )
+
+    def column(self, field: str) -> list[Any]:
+        """
+        Get one column as Python values.
+
+        Args:
+            field: A name from NUMERIC_FIELDS or TEXT_FIELDS
+
+        Returns:
+            Column values in row order (None for missing optional text)
+
+        Raises:
+            KeyError: If the field is unknown
+        """
+        if field in NUMERIC_FIELDS:
+            return getattr(self, field).tolist()
+
+        strings = self._strings
+        return [
+            strings[code] if code != _MISSING else None
+            for code in self._codes[field].tolist()
+        ]
+
+    def take(self, indices: Sequence[int] | np.ndarray) -> "PointSet":
+        """Select rows by position, in the given order."""
+        return self[np.asarray(indices, dtype=np.intp)]
+
+    def filter(self, mask: np.ndarray) -> "PointSet":
+        """
+        Select rows where ``mask`` is true.
+
+        Args:
+            mask: Boolean array with one entry per point, typically built
+                from the numeric columns (e.g. ``ps.episode == 3``)
+
+        Returns:
+            PointSet over the selected rows
+
+        Raises:
+            ValueError: If the mask is not boolean or has the wrong length
+        """
+        mask = np.asarray(mask)
+        if mask.dtype != np.bool_ or mask.shape != (len(self),):
+            raise ValueError(f"Expected a boolean mask of length {len(self)}")
+        return self[mask]
+
+    def sorted(self, *fields: str) -> "PointSet":
+        """
+        Sort rows by numeric fields (stable).
+
+        Args:
+            *fields: Sort keys from NUMERIC_FIELDS, most significant first;
+                defaults to episode then time_seconds
+
+        Returns:
+            Sorted PointSet
+        """
+        fields = fields or ("episode", "time_seconds")
+        for field in fields:
+            if field not in NUMERIC_FIELDS:
+                raise ValueError(f"Cannot sort PointSet by {field!r}")
+        # lexsort treats its last key as the primary one
+        order = np.lexsort([getattr(self, field) for field in reversed(fields)])
+        return self[order]
+
+    def distances_from(
+        self, origin: Coordinates, dtype: DTypeLike = np.float64
+    ) -> np.ndarray:
+        """
+        Distance from ``origin`` to every point, in kilometres.
+
+        Args:
+            origin: Reference location
+            dtype: np.float64 or np.float32
+
+        Returns:
+            1-D array aligned with the rows of this set
+        """
+        return distances_from(
+            origin.latitude, origin.longitude, self.latitude, self.longitude, dtype
+        )
+
+    def to_points(self) -> list[Point]:
+        """
+        Rebuild Point entities, equal to the ones the set was built from.
+
+        Returns:
+            Points in row order
+        """
+        text = {field: self.column(field) for field in TEXT_FIELDS}
+
+        points: list[Point] = []
+        for i, (lat, lng, episode, seconds) in enumerate(
+            zip(
+                self.latitude.tolist(),
+                self.longitude.tolist(),
+                self.episode.tolist(),
+                self.time_seconds.tolist(),
+                strict=True,
+            )
+        ):
+            points.append(
+                Point(
+                    id=text["id"][i],
+                    name=text["name"][i],
+                    cn_name=text["cn_name"][i],
+                    coordinates=Coordinates(latitude=lat, longitude=lng),
+                    bangumi_id=text["bangumi_id"][i],
+                    bangumi_title=text["bangumi_title"][i],
+                    episode=episode,
+                    time_seconds=seconds,
+                    screenshot_url=text["screenshot_url"][i],
+                    address=text["address"][i],
+                    opening_hours=text["opening_hours"][i],
+                    admission_fee=text["admission_fee"][i],
+                )
+            )
+        return points
+
+    def to_records(self) -> list[dict[str, Any]]:
+        """
+        Build plain dicts without creating Point objects.
+
+        Returns:
+            One dict per row, equal to ``Point.model_dump()``
+        """
+        text = {field: self.column(field) for field in TEXT_FIELDS}
+        text["screenshot_url"] = _URL_LIST_ADAPTER.validate_python(
+            text["screenshot_url"]
+        )
+        return [
+            {
+                "id": text["id"][i],
+                "name": text["name"][i],
+                "cn_name": text["cn_name"][i],
+                "coordinates": {"latitude": lat, "longitude": lng},
+                "bangumi_id": text["bangumi_id"][i],
+                "bangumi_title": text["bangumi_title"][i],
+                "episode": episode,
+                "time_seconds": seconds,
+                "screenshot_url": text["screenshot_url"][i],
+                "address": text["address"][i],
+                "opening_hours": text["opening_hours"][i],
+                "admission_fee": text["admission_fee"][i],
+            }
+            for i, (lat, lng, episode, seconds) in enumerate(
+                zip(
+                    self.latitude.tolist(),
+                    self.longitude.tolist(),
+                    self.episode.tolist(),
+                    self.time_seconds.tolist(),
+                    strict=True,
+                )
+            )
+        ]
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Approximate memory held by the set, including the string table.
+
+        Views share their parent's table, so it is counted in full for each.
+        """
+        arrays = (self.latitude, self.longitude, self.episode, self.time_seconds)
+        total = sum(array.nbytes for array in arrays)
+        total += sum(codes.nbytes for codes in self._codes.values())
+        total += sys.getsizeof(self._strings)
+        total += sum(sys.getsizeof(value) for value in self._strings)
+        return total
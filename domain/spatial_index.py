@@ -0,0 +1,296 @@
+"""
+In-memory spatial index over pilgrimage points.
+
+Provides:
+- SpatialIndex: a latitude/longitude grid of buckets with incremental insert
+- Radius, k-nearest-neighbour and bounding-box queries
+- from_point_set() to index the rows of a PointSet
+
+Buckets only narrow down the candidates; every result is checked with the
+exact haversine distance from domain.geo, so queries return exactly what a
+brute-force scan would.
+"""
+
+import math
+from itertools import chain
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from domain.geo import EARTH_RADIUS_KM, distances_from
+from domain.point_set import PointSet
+
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+HALF_CIRCUMFERENCE_KM = math.pi * EARTH_RADIUS_KM
+
+
+class SpatialIndex:
+    """
+    Grid-bucket index answering "which points are near here" queries.
+
+    Points are identified by their insertion order (0, 1, 2, ...), which
+    for from_point_set() is the row position in the PointSet, so results
+    can be passed straight to PointSet.take().
+
+    Cells are ``cell_km`` tall and the same number of degrees wide, so a
+    query touches a handful of cells at typical search radii. Queries that
+    would touch more cells than are occupied scan every point instead.
+    """
+
+    def __init__(self, cell_km: float = 1.0, capacity: int = 1024):
+        """
+        Create an empty index.
+
+        Args:
+            cell_km: Cell height in kilometres; roughly the typical query
+                radius works well
+            capacity: Initial number of points to reserve space for
+
+        Raises:
+            ValueError: If cell_km is not positive
+        """
+        if cell_km <= 0:
+            raise ValueError("cell_km must be positive")
+
+        self.cell_km = cell_km
+        self._cell_degrees = cell_km / KM_PER_DEGREE
+        self._rows = math.ceil(180 / self._cell_degrees)
+        self._cols = math.ceil(360 / self._cell_degrees)
+
+        self._latitude = np.empty(max(1, capacity), dtype=np.float64)
+        self._longitude = np.empty(max(1, capacity), dtype=np.float64)
+        self._size = 0
+        self._cells: dict[int, list[int]] = {}
+
+    @classmethod
+    def from_point_set(
+        cls, point_set: PointSet, cell_km: float = 1.0
+    ) -> "SpatialIndex":
+        """
+        Index every row of a PointSet.
+
+        Args:
+            point_set: Points to index; ids are row positions
+            cell_km: Cell height in kilometres
+
+        Returns:
+            Populated index
+        """
+        index = cls(cell_km=cell_km, capacity=len(point_set))
+        index.insert_many(point_set.latitude, point_set.longitude)
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def latitude(self) -> np.ndarray:
+        """Latitudes of indexed points, by id (read-only view)."""
+        view = self._latitude[: self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def longitude(self) -> np.ndarray:
+        """Longitudes of indexed points, by id (read-only view)."""
+        view = self._longitude[: self._size]
+        view.flags.writeable = False
+        return view
+
+    def _row(self, lat: float) -> int:
+        row = math.floor((lat + 90) / self._cell_degrees)
+        return min(max(row, 0), self._rows - 1)
+
+    def _col(self, lng: float) -> int:
+        # Wrap first so that 180° and -180° (and 181° and -179°) share a column
+        col = math.floor(((lng + 180) % 360) / self._cell_degrees)
+        return min(max(col, 0), self._cols - 1)
+
+    def _cell_keys(self, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+        """Vectorised ``_row() * cols + _col()`` for many points."""
+        rows = np.floor((lats + 90) / self._cell_degrees).astype(np.int64)
+        cols = np.floor(((lngs + 180) % 360) / self._cell_degrees).astype(np.int64)
+        rows = np.clip(rows, 0, self._rows - 1)
+        return rows * self._cols + np.clip(cols, 0, self._cols - 1)
+
+    def insert(self, lat: float, lng: float) -> int:
+        """
+        Add one point.
+
+        Args:
+            lat: Latitude in degrees
+            lng: Longitude in degrees
+
+        Returns:
+            Id of the new point
+        """
+        return int(self.insert_many([lat], [lng])[0])
+
+    def insert_many(self, lats: ArrayLike, lngs: ArrayLike) -> np.ndarray:
+        """
+        Add many points at once.
+
+        Args:
+            lats: Latitudes in degrees
+            lngs: Longitudes in degrees
+
+        Returns:
+            Ids of the new points, in input order
+
+        Raises:
+            ValueError: If the columns differ in shape or hold coordinates
+                out of range
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        if lats.ndim != 1 or lats.shape != lngs.shape:
+            raise ValueError(
+                "Latitude and longitude must be 1-D arrays of equal length"
+            )
+        if not (
+            ((lats >= -90) & (lats <= 90)).all()
+            and ((lngs >= -180) & (lngs <= 180)).all()
+        ):
+            raise ValueError("Coordinates out of range")
+
+        start, end = self._size, self._size + len(lats)
+        if end > len(self._latitude):
+            capacity = max(end, 2 * len(self._latitude))
+            self._latitude = np.resize(self._latitude, capacity)
+            self._longitude = np.resize(self._longitude, capacity)
+        self._latitude[start:end] = lats
+        self._longitude[start:end] = lngs
+        self._size = end
+
+        ids = np.arange(start, end, dtype=np.int64)
+        keys = self._cell_keys(lats, lngs)
+        # Group ids by cell so each bucket is extended once
+        order = np.argsort(keys, kind="stable")
+        cell_keys, first = np.unique(keys[order], return_index=True)
+        for key, group in zip(
+            cell_keys.tolist(), np.split(ids[order], first[1:]), strict=True
+        ):
+            self._cells.setdefault(key, []).extend(group.tolist())
+
+        return ids
+
+    def _gather(self, rows: range, cols: list[int] | None) -> np.ndarray:
+        """Collect ids from a block of cells (``cols=None`` means every column)."""
+        if cols is None or len(rows) * len(cols) > len(self._cells):
+            # Cheaper to scan every point than to probe that many cells
+            return np.arange(self._size, dtype=np.int64)
+
+        cells = self._cells
+        buckets = (
+            cells[key]
+            for key in (row * self._cols + col for row in rows for col in cols)
+            if key in cells
+        )
+        return np.fromiter(chain.from_iterable(buckets), dtype=np.int64)
+
+    def _col_span(self, min_lng: float, max_lng: float) -> list[int]:
+        """Column indices covering a longitude range, wrapping at 180°."""
+        if max_lng < min_lng:
+            max_lng += 360
+        width = max_lng - min_lng
+        first, last = self._col(min_lng), self._col(max_lng)
+        if (min_lng + 180) % 360 + width < 360:
+            return list(range(first, last + 1))
+        if width >= 360 or last >= first:
+            return list(range(self._cols))
+        return list(range(first, self._cols)) + list(range(0, last + 1))
+
+    def within_radius(
+        self, lat: float, lng: float, radius_km: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find every point within ``radius_km`` of a location.
+
+        Args:
+            lat: Latitude in degrees
+            lng: Longitude in degrees
+            radius_km: Search radius in kilometres
+
+        Returns:
+            ``(ids, distances_km)`` sorted by distance
+        """
+        angle = radius_km / EARTH_RADIUS_KM
+        lat_rad = math.radians(lat)
+        lat_lo, lat_hi = lat_rad - angle, lat_rad + angle
+        rows = range(
+            self._row(math.degrees(max(lat_lo, -math.pi / 2))),
+            self._row(math.degrees(min(lat_hi, math.pi / 2))) + 1,
+        )
+
+        # Widest longitude offset a point within the radius can have
+        cols: list[int] | None = None
+        if lat_lo > -math.pi / 2 and lat_hi < math.pi / 2:
+            ratio = math.sin(angle) / math.cos(lat_rad)
+            if ratio < 1:
+                delta = math.degrees(math.asin(ratio))
+                cols = self._col_span(lng - delta, lng + delta)
+
+        candidates = self._gather(rows, cols)
+        distances = distances_from(
+            lat, lng, self._latitude[candidates], self._longitude[candidates]
+        )
+        inside = distances <= radius_km
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return candidates[order], distances[order]
+
+    def nearest(self, lat: float, lng: float, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find the ``k`` points closest to a location.
+
+        Searches a growing radius until it holds ``k`` points, so the
+        answer is exact. The radius grows with the shortfall, assuming
+        points are spread evenly over the area searched so far.
+
+        Args:
+            lat: Latitude in degrees
+            lng: Longitude in degrees
+            k: Number of neighbours
+
+        Returns:
+            ``(ids, distances_km)`` of up to ``k`` points, nearest first
+        """
+        if k <= 0 or self._size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        k = min(k, self._size)
+        radius = self.cell_km
+        while True:
+            ids, distances = self.within_radius(lat, lng, radius)
+            if len(ids) >= k or radius >= HALF_CIRCUMFERENCE_KM:
+                return ids[:k], distances[:k]
+            radius *= max(2.0, 1.5 * math.sqrt(k / len(ids))) if len(ids) else 4.0
+
+    def within_bbox(
+        self, min_lat: float, min_lng: float, max_lat: float, max_lng: float
+    ) -> np.ndarray:
+        """
+        Find every point inside a latitude/longitude box.
+
+        A box with ``min_lng > max_lng`` crosses the 180° meridian.
+
+        Args:
+            min_lat: Southern edge in degrees
+            min_lng: Western edge in degrees
+            max_lat: Northern edge in degrees
+            max_lng: Eastern edge in degrees
+
+        Returns:
+            Ids of matching points, ascending
+        """
+        rows = range(self._row(min_lat), self._row(max_lat) + 1)
+        candidates = self._gather(rows, self._col_span(min_lng, max_lng))
+
+        lats = self._latitude[candidates]
+        lngs = self._longitude[candidates]
+        inside = (lats >= min_lat) & (lats <= max_lat)
+        if min_lng <= max_lng:
+            inside &= (lngs >= min_lng) & (lngs <= max_lng)
+        else:
+            inside &= (lngs >= min_lng) | (lngs <= max_lng)
+        return np.sort(candidates[inside])
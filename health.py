@@ -112,6 +112,7 @@ async def _check_tools() -> bool:
         from adk_agents.seichijunrei_bot.tools import (
             get_anitabi_points,
             get_bangumi_subject,
+            get_bangumi_subjects,
             search_anitabi_bangumi_near_station,
             search_bangumi_subjects,
             translate_tool,
@@ -120,6 +121,7 @@ async def _check_tools() -> bool:
         # Quick attribute / callability checks
         assert callable(search_bangumi_subjects)
         assert callable(get_bangumi_subject)
+        assert callable(get_bangumi_subjects)
         assert callable(get_anitabi_points)
         assert callable(search_anitabi_bangumi_near_station)
         assert translate_tool is not None
@@ -0,0 +1,95 @@
+"""
+Simulate upstream load after a mass cache warm-up.
+
+Every key is computed at t=0, then a steady stream of random reads runs
+through ResponseCache.get_or_compute. Without jitter all entries expire in
+the same instant and every read misses at once; TTL jitter and XFetch early
+expiration spread the recomputation out.
+
+Usage:
+    uv run python scripts/bench_cache_stampede.py
+"""
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.cache import ResponseCache  # noqa: E402
+
+KEYS = 400
+TTL_SECONDS = 2.0
+DURATION_SECONDS = 5.0
+TICK_SECONDS = 0.01
+READS_PER_TICK = 40
+UPSTREAM_LATENCY_SECONDS = 0.05
+BUCKET_SECONDS = 0.1
+
+
+async def run_scenario(ttl_jitter: float, beta: float) -> list[int]:
+    """Run one simulation and return upstream calls per time bucket."""
+    rng = random.Random(42)
+    cache = ResponseCache(
+        default_ttl_seconds=TTL_SECONDS,
+        max_size=KEYS * 2,
+        cleanup_interval_seconds=0,
+        ttl_jitter=ttl_jitter,
+        early_expiration_beta=beta,
+        rng=random.Random(7),
+    )
+    buckets = [0] * int(DURATION_SECONDS / BUCKET_SECONDS + 1)
+    start = time.monotonic()
+
+    def factory_for(key: str):
+        async def fetch() -> str:
+            buckets[int((time.monotonic() - start) / BUCKET_SECONDS)] += 1
+            await asyncio.sleep(UPSTREAM_LATENCY_SECONDS)
+            return key
+
+        return fetch
+
+    # Mass warm-up
+    await asyncio.gather(
+        *(cache.get_or_compute(str(k), factory_for(str(k))) for k in range(KEYS))
+    )
+
+    pending: set[asyncio.Task] = set()
+    while time.monotonic() - start < DURATION_SECONDS:
+        for _ in range(READS_PER_TICK):
+            key = str(rng.randrange(KEYS))
+            task = asyncio.create_task(cache.get_or_compute(key, factory_for(key)))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        await asyncio.sleep(TICK_SECONDS)
+
+    await asyncio.gather(*pending)
+    await cache.close()
+    return buckets
+
+
+def summarize(name: str, buckets: list[int]) -> None:
+    """Print peak and spread of upstream calls after the warm-up bucket."""
+    steady = buckets[1:-1]
+    print(
+        f"{name:<22} total={sum(steady):5d} "
+        f"peak/{BUCKET_SECONDS:.1f}s={max(steady):4d} "
+        f"stdev={statistics.pstdev(steady):6.1f}"
+    )
+
+
+async def main() -> None:
+    print(
+        f"{KEYS} keys, TTL {TTL_SECONDS}s, "
+        f"{READS_PER_TICK / TICK_SECONDS:.0f} reads/s for {DURATION_SECONDS}s"
+    )
+    summarize("no jitter", await run_scenario(0.0, 0.0))
+    summarize("jitter 0.3", await run_scenario(0.3, 0.0))
+    summarize("jitter 0.3 + xfetch", await run_scenario(0.3, 1.0))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
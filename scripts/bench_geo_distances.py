@@ -0,0 +1,105 @@
+"""
+Compare vectorised haversine with scalar Coordinates.distance_to.
+
+For 10, 100, 1k and 10k points around Kyoto we time:
+- one-to-many: distances from a station to every point
+- pairwise: the full n x n distance matrix
+
+The scalar pairwise loop is skipped above 1k points (100M Python calls).
+Vectorised results are checked against distance_to before timing.
+
+Usage:
+    uv run python scripts/bench_geo_distances.py
+"""
+
+import random
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from domain.entities import Coordinates  # noqa: E402
+from domain.geo import distances_from, pairwise_distances  # noqa: E402
+
+SIZES = (10, 100, 1_000, 10_000)
+SCALAR_PAIRWISE_LIMIT = 1_000
+STATION = Coordinates(latitude=34.985849, longitude=135.758767)
+
+
+def make_coordinates(count: int) -> list[Coordinates]:
+    """Random coordinates within about 30 km of Kyoto station."""
+    rng = random.Random(42)
+    return [
+        Coordinates(
+            latitude=rng.uniform(34.75, 35.25), longitude=rng.uniform(135.5, 136.0)
+        )
+        for _ in range(count)
+    ]
+
+
+def best_ms(func: Callable[[], object], budget_seconds: float = 1.0) -> float:
+    """Best wall time in milliseconds, repeating within a time budget."""
+    best = float("inf")
+    deadline = time.perf_counter() + budget_seconds
+    while True:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        if time.perf_counter() + elapsed > deadline:
+            return best * 1000
+
+
+def format_ms(value: float | None) -> str:
+    return f"{'skipped':>10}" if value is None else f"{value:>10.3f}"
+
+
+def bench_size(size: int) -> dict[str, list[float | None]]:
+    """Check and time both operations for one input size."""
+    coordinates = make_coordinates(size)
+    lats = np.array([c.latitude for c in coordinates])
+    lngs = np.array([c.longitude for c in coordinates])
+
+    expected = [STATION.distance_to(c) for c in coordinates]
+    for dtype, rtol in ((np.float64, 1e-9), (np.float32, 1e-4)):
+        np.testing.assert_allclose(
+            distances_from(STATION.latitude, STATION.longitude, lats, lngs, dtype),
+            expected,
+            rtol=rtol,
+            atol=1e-3,
+        )
+
+    def one_to_many(dtype: type) -> np.ndarray:
+        return distances_from(STATION.latitude, STATION.longitude, lats, lngs, dtype)
+
+    def scalar_pairwise() -> list[list[float]]:
+        return [[a.distance_to(b) for b in coordinates] for a in coordinates]
+
+    return {
+        "one-to-many": [
+            best_ms(lambda: [STATION.distance_to(c) for c in coordinates]),
+            best_ms(lambda: one_to_many(np.float64)),
+            best_ms(lambda: one_to_many(np.float32)),
+        ],
+        "pairwise": [
+            best_ms(scalar_pairwise) if size <= SCALAR_PAIRWISE_LIMIT else None,
+            best_ms(lambda: pairwise_distances(lats, lngs)),
+            best_ms(lambda: pairwise_distances(lats, lngs, np.float32)),
+        ],
+    }
+
+
+def main() -> None:
+    print(f"{'points':>7} {'op':<12} {'scalar ms':>10} {'f64 ms':>10} {'f32 ms':>10}")
+
+    for size in SIZES:
+        for name, timings in bench_size(size).items():
+            print(f"{size:>7} {name:<12} " + " ".join(format_ms(t) for t in timings))
+
+
+if __name__ == "__main__":
+    main()
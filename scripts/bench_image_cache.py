@@ -0,0 +1,156 @@
+"""
+Measure screenshot prefetching: wall time, bytes saved and fetch latency.
+
+A local aiohttp server stands in for image.anitabi.cn, answering each image
+after LATENCY_MS and honouring If-None-Match. One route's screenshots are
+then prefetched four ways:
+
+- serial:      one download at a time (what fetching on display amounts to)
+- prefetch:    cold cache, CONCURRENCY downloads in flight
+- warm:        the same points again, served from disk
+- revalidate:  every entry checked upstream; unchanged images cost a 304
+
+A DUPLICATE_SHARE of the URLs point at an image already listed under
+another URL (the same screenshot with and without ``?plan=``), which
+content addressing stores once.
+
+With Pillow installed the images are real JPEGs and the thumbnail sizes
+are reported too.
+
+Usage:
+    uv run python scripts/bench_image_cache.py
+"""
+
+import asyncio
+import hashlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.image_cache import Image, ImageCache  # noqa: E402
+
+IMAGES = 200
+DUPLICATE_SHARE = 0.1
+LATENCY_MS = 40
+CONCURRENCY = 8
+WIDTH, HEIGHT = 1280, 720
+
+
+def make_image(rng: np.random.Generator) -> bytes:
+    """A screenshot-sized JPEG, or random bytes of similar size."""
+    if Image is None:
+        return rng.bytes(150_000)
+    # Smooth gradients with noise compress like real frames
+    y, x = np.mgrid[0:HEIGHT, 0:WIDTH]
+    base = rng.uniform(0, 255, 3)
+    pixels = np.stack(
+        [(base[c] + x * rng.uniform(-0.1, 0.1) + y * 0.1) % 255 for c in range(3)],
+        axis=-1,
+    )
+    pixels += rng.normal(0, 8, pixels.shape)
+    out = io.BytesIO()
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(
+        out, "JPEG", quality=85
+    )
+    return out.getvalue()
+
+
+async def start_server(images: dict[str, bytes]) -> tuple[web.AppRunner, str]:
+    async def handle(request: web.Request) -> web.Response:
+        await asyncio.sleep(LATENCY_MS / 1000)
+        body = images[request.match_info["name"]]
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(
+            body=body, content_type="image/jpeg", headers={"ETag": etag}
+        )
+
+    app = web.Application()
+    app.router.add_get("/points/{name}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/points"
+
+
+async def run_phase(
+    name: str, cache: ImageCache, urls: list[str], revalidate: bool = False
+) -> None:
+    before = cache.stats.summary()
+    cache.stats.fetch_seconds.clear()
+    start = time.perf_counter()
+    report = await cache.prefetch(urls, revalidate=revalidate)
+    wall = time.perf_counter() - start
+    after = cache.stats.summary()
+    print(
+        f"{name:<11} {wall:>7.2f} s  "
+        f"{len(report.downloaded):>4} new {len(report.unchanged):>4} 304 "
+        f"{len(report.cached):>4} hit  "
+        f"{(after['bytes_downloaded'] - before['bytes_downloaded']) / 1e6:>6.1f} MB "
+        f"down {(after['bytes_saved'] - before['bytes_saved']) / 1e6:>6.1f} MB "
+        f"saved  fetch mean {after['fetch_ms_mean']:>5.1f} ms "
+        f"p95 {after['fetch_ms_p95']:>5.1f} ms"
+    )
+
+
+async def main() -> None:
+    rng = np.random.default_rng(46)
+    unique = int(IMAGES * (1 - DUPLICATE_SHARE))
+    images = {f"{i}.jpg": make_image(rng) for i in range(unique)}
+    for i in range(unique, IMAGES):
+        images[f"{i}.jpg"] = images[f"{rng.integers(unique)}.jpg"]
+    runner, base_url = await start_server(images)
+    urls = [f"{base_url}/{i}.jpg" for i in range(IMAGES)]
+    total = sum(len(body) for body in images.values())
+
+    print(
+        f"{IMAGES} screenshots ({total / 1e6:.1f} MB, {unique} distinct), "
+        f"{LATENCY_MS} ms upstream latency"
+        + ("" if Image is not None else "; Pillow missing, no thumbnails")
+    )
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            async with ImageCache(Path(root) / "serial", max_concurrency=1) as cache:
+                await run_phase("serial", cache, urls)
+
+            async with ImageCache(
+                Path(root) / "cache", max_concurrency=CONCURRENCY
+            ) as cache:
+                await run_phase("prefetch", cache, urls)
+                await run_phase("warm", cache, urls)
+                await run_phase("revalidate", cache, urls, revalidate=True)
+
+                stored = sum(
+                    path.stat().st_size
+                    for path in (Path(root) / "cache" / "originals").rglob("*.jpg")
+                )
+                print(
+                    f"originals on disk {stored / 1e6:.1f} MB "
+                    f"({cache.stats.deduplicated} duplicate downloads stored once)"
+                )
+                thumbnails = [
+                    path.stat().st_size
+                    for path in (Path(root) / "cache" / "thumbnails").rglob("*.jpg")
+                ]
+                if thumbnails:
+                    print(
+                        f"thumbnails {sum(thumbnails) / 1e6:.2f} MB, "
+                        f"mean {np.mean(thumbnails) / 1e3:.1f} kB vs "
+                        f"{stored / len(thumbnails) / 1e3:.1f} kB per original"
+                    )
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+"""
+Replay a /near query trace and measure how often the cache answers it.
+
+The trace models users searching around popular stations: stations are
+picked with a Zipf-like popularity and the radius is one of the bot's usual
+choices. Most centres are the station's own coordinates, as returned by the
+station lookup; JITTERED_SHARE of them are moved by up to JITTER_M instead
+(a map pin, GPS position or a different exit). The same trace is replayed
+through AnitabiClient.search_bangumi three ways:
+
+- exact keys:       only identical (lat, lng, radius) queries hit the cache
+- containment:      smaller radii are also cut from a cached larger radius
+- snap+containment: centres also snap to the grid (the client default)
+
+Upstream is a fake /near backed by NearbyBangumiIndex over random points, so
+every reused answer is checked against a direct query for the same centre.
+
+Usage:
+    uv run python scripts/bench_near_cache.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from clients.anitabi import AnitabiClient  # noqa: E402
+from domain.entities import Coordinates, NoBangumiFoundError, Station  # noqa: E402
+from domain.point_set import TEXT_FIELDS, PointSet  # noqa: E402
+from services.geo_cache import RadiusCoverage  # noqa: E402
+from services.nearby_search import NearbyBangumiIndex  # noqa: E402
+
+STATIONS = 300
+QUERIES = 5_000
+JITTER_M = 80
+JITTERED_SHARE = 0.3
+RADII_KM = (1.0, 3.0, 5.0, 10.0)
+RADIUS_WEIGHTS = (0.15, 0.3, 0.4, 0.15)
+BANGUMI = 400
+POINTS_PER_BANGUMI = 60
+
+
+def make_upstream(rng: np.random.Generator, stations: np.ndarray) -> NearbyBangumiIndex:
+    """Bangumi whose points cluster around random stations."""
+    missing = np.full(POINTS_PER_BANGUMI, -1, dtype=np.int32)
+    zeros = np.zeros(POINTS_PER_BANGUMI, dtype=np.int64)
+    entries = []
+    for b in range(BANGUMI):
+        homes = stations[rng.integers(0, len(stations), POINTS_PER_BANGUMI)]
+        lats = homes[:, 0] + rng.normal(0, 0.03, POINTS_PER_BANGUMI)
+        lngs = homes[:, 1] + rng.normal(0, 0.03, POINTS_PER_BANGUMI)
+        info = {
+            "id": str(b),
+            "title": f"作品{b}",
+            "cn": f"作品{b}",
+            "cover": f"https://lain.bgm.tv/pic/cover/l/{b}.jpg",
+        }
+        point_set = PointSet(
+            lats, lngs, zeros, zeros, dict.fromkeys(TEXT_FIELDS, missing), []
+        )
+        entries.append((info, point_set))
+    return NearbyBangumiIndex(entries)
+
+
+def make_trace(rng: np.random.Generator, stations: np.ndarray) -> list[tuple]:
+    """(lat, lng, radius_km) queries with Zipf-like station popularity."""
+    popularity = 1 / np.arange(1, len(stations) + 1)
+    picks = rng.choice(len(stations), QUERIES, p=popularity / popularity.sum())
+    jitter = rng.uniform(-1, 1, (QUERIES, 2)) * JITTER_M / 111_000
+    jitter[rng.random(QUERIES) >= JITTERED_SHARE] = 0
+    radii = rng.choice(RADII_KM, QUERIES, p=RADIUS_WEIGHTS)
+    centres = stations[picks] + jitter
+    return [
+        (round(lat, 6), round(lng, 6), float(radius))
+        for (lat, lng), radius in zip(centres, radii, strict=True)
+    ]
+
+
+async def replay(
+    mode: str, upstream: NearbyBangumiIndex, trace: list[tuple]
+) -> tuple[int, int]:
+    """Replay the trace; returns (upstream calls, answers checked)."""
+    calls = 0
+
+    async def fake_near(method, url, headers, params, **kwargs) -> dict[str, Any]:
+        nonlocal calls
+        calls += 1
+        items = upstream.near(params["lat"], params["lng"], params["radius"] / 1000)
+        return {"data": items, "total": len(items)}
+
+    client = AnitabiClient(
+        use_cache=True,
+        rate_limit_calls=1_000_000,
+        rate_limit_period=1.0,
+        use_mirror=False,
+        near_grid_degrees=0.002 if mode == "snap+containment" else 0,
+    )
+    if mode == "exact keys":
+        # A registry that forgets every centre at once never offers reuse
+        client._near_coverage = RadiusCoverage(0, max_centres=0)
+    client._make_request = fake_near
+
+    checked = 0
+    for lat, lng, radius_km in trace:
+        station = Station(
+            name="q", coordinates=Coordinates(latitude=lat, longitude=lng)
+        )
+        try:
+            found = [b.id for b in await client.search_bangumi(station, radius_km)]
+        except NoBangumiFoundError:
+            found = []
+        centre = client._near_coverage.snap(lat, lng)
+        expected = [item["id"] for item in upstream.near(*centre, radius_km)]
+        assert found == expected, (mode, lat, lng, radius_km)
+        checked += 1
+    await client.close()
+    return calls, checked
+
+
+async def main() -> None:
+    rng = np.random.default_rng(2024)
+    stations = np.column_stack(
+        [rng.uniform(34.0, 36.0, STATIONS), rng.uniform(135.0, 140.0, STATIONS)]
+    )
+    upstream = make_upstream(rng, stations)
+    trace = make_trace(rng, stations)
+
+    print(
+        f"{QUERIES:,} queries over {STATIONS} stations, "
+        f"{JITTERED_SHARE:.0%} jittered by up to {JITTER_M} m, "
+        f"radii {RADII_KM} km; near cache holds 100 entries"
+    )
+    print(f"{'mode':<18} {'upstream':>9} {'hit rate':>9}")
+    for mode in ("exact keys", "containment", "snap+containment"):
+        calls, checked = await replay(mode, upstream, trace)
+        print(f"{mode:<18} {calls:>9,} {1 - calls / checked:>9.1%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
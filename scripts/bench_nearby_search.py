@@ -0,0 +1,117 @@
+"""
+Time local nearby-bangumi search against a brute-force scan.
+
+For catalogues of 100k and 1M random points across Japan (500 points per
+bangumi) we time one /near-style query: every bangumi with a point within
+RADIUS_KM, with its nearest distance and hit count, sorted by distance.
+
+Brute force is a vectorised distance computation over every point followed
+by the same group-by, so the comparison measures the spatial index. Indexed
+results are checked against brute force before timing.
+
+Usage:
+    uv run python scripts/bench_nearby_search.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from domain.geo import distances_from  # noqa: E402
+from domain.point_set import TEXT_FIELDS, PointSet  # noqa: E402
+from services.nearby_search import NearbyBangumiIndex  # noqa: E402
+
+SIZES = (100_000, 1_000_000)
+POINTS_PER_BANGUMI = 500
+RADIUS_KM = 5.0
+QUERIES = 200
+
+LAT_RANGE = (31.0, 43.5)
+LNG_RANGE = (129.5, 145.5)
+
+
+def coordinates_only(lats: np.ndarray, lngs: np.ndarray) -> PointSet:
+    """A PointSet with just the columns the search reads."""
+    missing = np.full(len(lats), -1, dtype=np.int32)
+    zeros = np.zeros(len(lats), dtype=np.int64)
+    return PointSet(lats, lngs, zeros, zeros, dict.fromkeys(TEXT_FIELDS, missing), [])
+
+
+def brute_near(lats, lngs, owners, lat, lng) -> list[tuple[int, int, float]]:
+    distances = distances_from(lat, lng, lats, lngs)
+    inside = np.flatnonzero(distances <= RADIUS_KM)
+    inside = inside[np.argsort(distances[inside], kind="stable")]
+    bangumi, first, counts = np.unique(
+        owners[inside], return_index=True, return_counts=True
+    )
+    order = np.argsort(first, kind="stable")
+    return list(
+        zip(
+            bangumi[order].tolist(),
+            counts[order].tolist(),
+            distances[inside[first[order]]].tolist(),
+            strict=True,
+        )
+    )
+
+
+def bench(size: int) -> None:
+    rng = np.random.default_rng(size)
+    lats = rng.uniform(*LAT_RANGE, size)
+    lngs = rng.uniform(*LNG_RANGE, size)
+    owners = np.arange(size) // POINTS_PER_BANGUMI
+    origins = np.column_stack(
+        [rng.uniform(34.0, 36.0, QUERIES), rng.uniform(135.0, 140.0, QUERIES)]
+    )
+
+    start = time.perf_counter()
+    index = NearbyBangumiIndex(
+        (
+            {"id": str(b), "title": f"作品{b}"},
+            coordinates_only(
+                lats[b * POINTS_PER_BANGUMI : (b + 1) * POINTS_PER_BANGUMI],
+                lngs[b * POINTS_PER_BANGUMI : (b + 1) * POINTS_PER_BANGUMI],
+            ),
+        )
+        for b in range(size // POINTS_PER_BANGUMI)
+    )
+    build_ms = (time.perf_counter() - start) * 1000
+
+    for lat, lng in origins[:20]:
+        expected = brute_near(lats, lngs, owners, lat, lng)
+        actual = [
+            (int(item["id"]), item["points_count"], item["distance"])
+            for item in index.near(lat, lng, RADIUS_KM)
+        ]
+        assert [a[:2] for a in actual] == [e[:2] for e in expected]
+        assert np.allclose([a[2] for a in actual], [e[2] for e in expected])
+
+    start = time.perf_counter()
+    for lat, lng in origins:
+        brute_near(lats, lngs, owners, lat, lng)
+    brute_us = (time.perf_counter() - start) / QUERIES * 1e6
+
+    start = time.perf_counter()
+    for lat, lng in origins:
+        index.near(lat, lng, RADIUS_KM)
+    local_us = (time.perf_counter() - start) / QUERIES * 1e6
+
+    print(
+        f"{size:>9,} points  build {build_ms:>7.0f} ms  "
+        f"brute {brute_us:>9.0f} us  index {local_us:>6.0f} us  "
+        f"{brute_us / local_us:>6.0f}x"
+    )
+
+
+def main() -> None:
+    print(f"/near-style search, {RADIUS_KM} km radius, mean of {QUERIES} queries")
+    for size in SIZES:
+        bench(size)
+
+
+if __name__ == "__main__":
+    main()
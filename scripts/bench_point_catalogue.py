@@ -0,0 +1,166 @@
+"""
+Compare loading a point catalogue from JSON and from the binary format.
+
+A 1M-point catalogue (2,000 bangumi x 500 points) is written both as JSON
+(raw Anitabi items per bangumi, as the mirror stores them) and as a
+memory-mapped catalogue. Each loader runs in a fresh process, which reports
+its load time and resident memory growth:
+
+- json load:       json.load only
+- json + parse:    json.load, then parse_point_set per bangumi (usable data)
+- catalogue open:  PointCatalogue(); nothing else is read yet
+- catalogue scan:  open, then a vectorised pass over every bangumi's columns
+
+Memory is split into private (anonymous) pages and file-backed pages; the
+latter are shared with every other process mapping the same catalogue.
+
+Usage:
+    uv run python scripts/bench_point_catalogue.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from clients.anitabi import parse_point_set  # noqa: E402
+from domain.point_catalogue import PointCatalogue, write_catalogue  # noqa: E402
+
+BANGUMI = 2_000
+POINTS_PER_BANGUMI = 500
+MODES = ("json load", "json + parse", "catalogue open", "catalogue scan")
+
+
+def make_raw_catalogue() -> dict[str, list[dict]]:
+    """Raw /points/detail items for every bangumi, around Japan."""
+    rng = np.random.default_rng(42)
+    catalogue = {}
+    for b in range(BANGUMI):
+        bangumi_id = str(100_000 + b)
+        lats = np.round(rng.uniform(31.0, 43.5, POINTS_PER_BANGUMI), 6).tolist()
+        lngs = np.round(rng.uniform(129.5, 145.5, POINTS_PER_BANGUMI), 6).tolist()
+        catalogue[bangumi_id] = [
+            {
+                "id": f"{bangumi_id}{i:06x}",
+                "name": f"スポット{i}",
+                "cn": f"地点{i}",
+                "image": f"/points/{bangumi_id}/{i:06x}.jpg",
+                "ep": i % 13,
+                "s": (i * 37) % 1440,
+                "geo": [lats[i], lngs[i]],
+            }
+            for i in range(POINTS_PER_BANGUMI)
+        ]
+    return catalogue
+
+
+def memory_kib() -> dict[str, int]:
+    """Resident anonymous and file-backed memory of this process."""
+    values = {}
+    for line in Path("/proc/self/status").read_text().splitlines():
+        key, _, rest = line.partition(":")
+        if key in ("RssAnon", "RssFile"):
+            values[key] = int(rest.split()[0])
+    return values
+
+
+def child(mode: str, json_path: str, catalogue_path: str) -> None:
+    """Run one loader and print its cost as JSON."""
+    before = memory_kib()
+    start = time.perf_counter()
+
+    if mode.startswith("json"):
+        with open(json_path, encoding="utf-8") as f:
+            raw = json.load(f)
+        points = sum(len(items) for items in raw.values())
+        if mode == "json + parse":
+            loaded = {b: parse_point_set(items, b) for b, items in raw.items()}
+            del raw
+            points = sum(len(point_set) for point_set in loaded.values())
+    else:
+        catalogue = PointCatalogue(catalogue_path)
+        points = len(catalogue)
+        if mode == "catalogue scan":
+            points = 0
+            for _, point_set in catalogue:
+                points += int(np.count_nonzero(point_set.latitude > 0))
+
+    elapsed = time.perf_counter() - start
+    after = memory_kib()
+    print(
+        json.dumps(
+            {
+                "points": points,
+                "seconds": elapsed,
+                "anon_kib": after["RssAnon"] - before["RssAnon"],
+                "file_kib": after["RssFile"] - before["RssFile"],
+            }
+        )
+    )
+
+
+def run_child(mode: str, json_path: Path, catalogue_path: Path) -> dict:
+    output = subprocess.run(
+        [
+            sys.executable,
+            __file__,
+            "--child",
+            mode,
+            str(json_path),
+            str(catalogue_path),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "points.json"
+        catalogue_path = Path(tmp) / "points.cat"
+
+        raw = make_raw_catalogue()
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(raw, f, ensure_ascii=False)
+        count = write_catalogue(
+            catalogue_path,
+            ((b, parse_point_set(items, b)) for b, items in raw.items()),
+        )
+        del raw
+
+        # Spot-check that the catalogue holds what JSON parsing produces
+        with open(json_path, encoding="utf-8") as f:
+            first_id, first_items = next(iter(json.load(f).items()))
+        assert (
+            PointCatalogue(catalogue_path).points(first_id)
+            == parse_point_set(first_items, first_id).to_points()
+        )
+
+        print(
+            f"{count:,} points in {BANGUMI:,} bangumi; "
+            f"JSON {os.path.getsize(json_path) / 2**20:.0f} MiB, "
+            f"catalogue {os.path.getsize(catalogue_path) / 2**20:.0f} MiB"
+        )
+        print(f"{'loader':<16} {'seconds':>8} {'private MiB':>12} {'shared MiB':>11}")
+        for mode in MODES:
+            result = run_child(mode, json_path, catalogue_path)
+            print(
+                f"{mode:<16} {result['seconds']:>8.3f} "
+                f"{result['anon_kib'] / 1024:>12.1f} {result['file_kib'] / 1024:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3], sys.argv[4])
+    else:
+        main()
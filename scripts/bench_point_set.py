@@ -0,0 +1,152 @@
+"""
+Compare list[Point] with the columnar PointSet.
+
+10,000 points for one bangumi are held both ways. For each we record the
+memory allocated to hold them (tracemalloc), and the time to filter by
+episode and bounding box and to sort by episode and timestamp.
+
+Usage:
+    uv run python scripts/bench_point_set.py
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from domain.entities import Coordinates, Point  # noqa: E402
+from domain.point_set import PointSet  # noqa: E402
+
+POINTS = 10_000
+ROUNDS = 20
+
+# Uji, roughly: the bounding box used for the filter benchmark
+LAT_RANGE = (34.87, 34.91)
+LNG_RANGE = (135.78, 135.82)
+EPISODES = (3, 8)
+
+
+def make_columns(count: int) -> dict[str, list]:
+    """Generate raw columns clustered around Kyoto with a shared bangumi title."""
+    rng = random.Random(42)
+    return {
+        "latitude": [rng.uniform(34.8, 35.1) for _ in range(count)],
+        "longitude": [rng.uniform(135.7, 135.9) for _ in range(count)],
+        "episode": [rng.randrange(1, 14) for _ in range(count)],
+        "time_seconds": [rng.randrange(0, 1440) for _ in range(count)],
+        "id": [f"{i:024x}" for i in range(count)],
+        "name": [f"スポット{i}" for i in range(count)],
+        "cn_name": [f"地点{i}" for i in range(count)],
+        "bangumi_id": ["115908"] * count,
+        "bangumi_title": ["響け！ユーフォニアム"] * count,
+        "screenshot_url": [
+            f"https://image.anitabi.cn/points/{i // 100}/{i:024x}.jpg"
+            for i in range(count)
+        ],
+    }
+
+
+def make_points(columns: dict[str, list]) -> list[Point]:
+    """Build validated Point entities from raw columns."""
+    return [
+        Point(
+            id=columns["id"][i],
+            name=columns["name"][i],
+            cn_name=columns["cn_name"][i],
+            coordinates=Coordinates(
+                latitude=columns["latitude"][i], longitude=columns["longitude"][i]
+            ),
+            bangumi_id=columns["bangumi_id"][i],
+            bangumi_title=columns["bangumi_title"][i],
+            episode=columns["episode"][i],
+            time_seconds=columns["time_seconds"][i],
+            screenshot_url=columns["screenshot_url"][i],
+        )
+        for i in range(len(columns["id"]))
+    ]
+
+
+def allocated(build: Callable[[], object]) -> int:
+    """Bytes still held by ``build``'s result once its inputs are freed."""
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def best_ms(func: Callable[[], object]) -> float:
+    """Best wall time over several rounds, in milliseconds."""
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def filter_list(points: list[Point]) -> list[Point]:
+    """Episode and bounding-box filter over Point objects."""
+    return [
+        p
+        for p in points
+        if EPISODES[0] <= p.episode <= EPISODES[1]
+        and LAT_RANGE[0] <= p.coordinates.latitude <= LAT_RANGE[1]
+        and LNG_RANGE[0] <= p.coordinates.longitude <= LNG_RANGE[1]
+    ]
+
+
+def filter_set(point_set: PointSet) -> PointSet:
+    """The same filter as one vectorised mask."""
+    mask = (
+        (point_set.episode >= EPISODES[0])
+        & (point_set.episode <= EPISODES[1])
+        & (point_set.latitude >= LAT_RANGE[0])
+        & (point_set.latitude <= LAT_RANGE[1])
+        & (point_set.longitude >= LNG_RANGE[0])
+        & (point_set.longitude <= LNG_RANGE[1])
+    )
+    return point_set.filter(mask)
+
+
+def main() -> None:
+    points = make_points(make_columns(POINTS))
+    point_set = PointSet.from_columns(**make_columns(POINTS))
+    assert point_set.to_points() == points
+    assert filter_set(point_set).to_points() == filter_list(points)
+
+    # Inputs are generated inside the measurement so both sides own their
+    # strings rather than sharing them
+    list_bytes = allocated(lambda: make_points(make_columns(POINTS)))
+    set_bytes = allocated(lambda: PointSet.from_columns(**make_columns(POINTS)))
+
+    rows = [
+        ("memory (KiB)", list_bytes / 1024, set_bytes / 1024),
+        (
+            "filter (ms)",
+            best_ms(lambda: filter_list(points)),
+            best_ms(lambda: filter_set(point_set)),
+        ),
+        (
+            "sort (ms)",
+            best_ms(lambda: sorted(points, key=lambda p: (p.episode, p.time_seconds))),
+            best_ms(point_set.sorted),
+        ),
+    ]
+
+    print(f"{POINTS} points, best of {ROUNDS}")
+    print(f"{'':<14} {'list[Point]':>12} {'PointSet':>12} {'ratio':>8}")
+    for name, list_value, set_value in rows:
+        print(
+            f"{name:<14} {list_value:>12.1f} {set_value:>12.1f} "
+            f"{list_value / set_value:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Compare streaming point retrieval with materialising the full list.
+
+For one bangumi with 10,000 points in the official /points/detail schema
+(already fetched, so only parsing is measured), each query is answered two
+ways:
+
+- list:    get_bangumi_points, then filter and slice the sorted list
+- stream:  iter_bangumi_points with the same filters, which selects raw
+           items first and parses only what it yields
+
+Reported per query: time to the first point and to the last one. Both ways
+must return the same points.
+
+Usage:
+    uv run python scripts/bench_point_streaming.py
+"""
+
+import asyncio
+import gc
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from clients.anitabi import AnitabiClient  # noqa: E402
+
+POINTS = 10_000
+ROUNDS = 5
+KANTO = (35.0, 138.8, 36.5, 140.5)
+
+QUERIES = {
+    "everything": {},
+    "first 20": {"limit": 20},
+    "episode 3": {"episodes": [3]},
+    "Kanto box": {"bbox": KANTO},
+    "Kanto, ep 1-4, 50": {"bbox": KANTO, "episodes": range(1, 5), "limit": 50},
+}
+
+
+def make_raw_points(count: int) -> list[dict]:
+    """Official-schema items with varied episodes and coordinates."""
+    rng = random.Random(42)
+    return [
+        {
+            "id": f"{i:024x}",
+            "name": f"スポット{i}",
+            "cn": f"地点{i}",
+            "geo": [rng.uniform(24.0, 45.5), rng.uniform(123.0, 146.0)],
+            "ep": rng.randrange(1, 25),
+            "s": rng.randrange(0, 1440),
+            "image": f"/points/{i // 100}/{i:024x}.jpg?plan=h160",
+        }
+        for i in range(count)
+    ]
+
+
+def matches(point, bbox=None, episodes=None) -> bool:
+    if bbox is not None and not (
+        bbox[0] <= point.coordinates.latitude <= bbox[2]
+        and bbox[1] <= point.coordinates.longitude <= bbox[3]
+    ):
+        return False
+    return episodes is None or point.episode in episodes
+
+
+async def run_list(client: AnitabiClient, query: dict) -> tuple[float, float, list]:
+    start = time.perf_counter()
+    # Without a cache the list is parsed again on every call
+    points = await client.get_bangumi_points("115908")
+    selected = [
+        p for p in points if matches(p, query.get("bbox"), query.get("episodes"))
+    ][: query.get("limit")]
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, selected
+
+
+async def run_stream(client: AnitabiClient, query: dict) -> tuple[float, float, list]:
+    start = time.perf_counter()
+    first = None
+    selected = []
+    async for point in client.iter_bangumi_points("115908", **query):
+        if first is None:
+            first = time.perf_counter() - start
+        selected.append(point)
+    return first or 0.0, time.perf_counter() - start, selected
+
+
+async def main() -> None:
+    raw_points = make_raw_points(POINTS)
+    client = AnitabiClient(use_cache=False, use_mirror=False)
+
+    async def fetch(bangumi_id: str) -> list[dict]:
+        return raw_points
+
+    client._fetch_raw_points = fetch
+
+    print(f"{POINTS:,} points, best of {ROUNDS} (ms)")
+    print(f"{'query':<18} {'points':>6} {'list':>8} {'first':>8} {'stream':>8}")
+    for name, query in QUERIES.items():
+        best = {"list": (float("inf"),) * 2, "stream": (float("inf"),) * 2}
+        for _ in range(ROUNDS):
+            gc.collect()
+            list_first, list_last, expected = await run_list(client, query)
+            gc.collect()
+            first, last, streamed = await run_stream(client, query)
+            assert streamed == expected, name
+            count = len(expected)
+            del expected, streamed
+            best["list"] = min(best["list"], (list_first, list_last))
+            best["stream"] = min(best["stream"], (first, last))
+        print(
+            f"{name:<18} {count:>6} {best['list'][1] * 1000:>8.1f} "
+            f"{best['stream'][0] * 1000:>8.2f} {best['stream'][1] * 1000:>8.1f}"
+        )
+    await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""
+Compare the FIFO rate limiter with the previous polling implementation.
+
+1,000 callers queue on a drained bucket at once. For each limiter we record
+wall time, CPU time spent by the process, how late each caller was served
+relative to its ideal FIFO slot, and how many callers overtook an earlier
+arrival.
+
+Usage:
+    uv run python scripts/bench_rate_limiter.py
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.retry import RateLimiter  # noqa: E402
+from utils.logger import setup_logging  # noqa: E402
+
+WAITERS = 1000
+CALLS_PER_PERIOD = 100
+PERIOD_SECONDS = 0.1
+
+
+class PollingRateLimiter:
+    """The previous limiter: every waiter sleeps and re-checks the bucket."""
+
+    def __init__(self, calls_per_period: int, period_seconds: float):
+        self.max_tokens = calls_per_period
+        self.tokens = float(calls_per_period)
+        self.refill_rate = calls_per_period / period_seconds
+        self.last_refill = time.monotonic()
+
+    def _refill_tokens(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.max_tokens, self.tokens + (now - self.last_refill) * self.refill_rate
+        )
+        self.last_refill = now
+
+    async def acquire(self, tokens: int = 1) -> bool:
+        while True:
+            self._refill_tokens()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            await asyncio.sleep((tokens - self.tokens) / self.refill_rate)
+
+
+async def run(limiter) -> dict[str, float]:
+    """Drain the bucket, queue every waiter, and measure how they are served."""
+    for _ in range(CALLS_PER_PERIOD):
+        await limiter.acquire()
+
+    served: list[tuple[int, float]] = []
+
+    async def waiter(index: int) -> None:
+        await limiter.acquire()
+        served.append((index, time.monotonic()))
+
+    cpu_start = time.process_time()
+    start = time.monotonic()
+    await asyncio.gather(*(waiter(i) for i in range(WAITERS)))
+    wall = time.monotonic() - start
+    cpu = time.process_time() - cpu_start
+
+    slot = 1 / limiter.refill_rate
+    lateness = [t - start - (i + 1) * slot for i, t in served]
+    order = [i for i, _ in served]
+    inversions = sum(1 for a, b in zip(order, order[1:], strict=False) if b < a)
+
+    return {
+        "wall": wall,
+        "cpu": cpu,
+        "late_stdev": statistics.pstdev(lateness),
+        "late_max": max(lateness),
+        "inversions": inversions,
+    }
+
+
+def summarize(name: str, result: dict[str, float]) -> None:
+    """Print one result row."""
+    print(
+        f"{name:<8} wall={result['wall']:5.2f}s cpu={result['cpu']:5.2f}s "
+        f"lateness stdev={result['late_stdev'] * 1000:7.1f}ms "
+        f"max={result['late_max'] * 1000:7.1f}ms "
+        f"inversions={result['inversions']:4d}"
+    )
+
+
+async def main() -> None:
+    setup_logging("WARNING")
+    print(
+        f"{WAITERS} waiters, {CALLS_PER_PERIOD} calls per {PERIOD_SECONDS}s "
+        f"(ideal wall {WAITERS * PERIOD_SECONDS / CALLS_PER_PERIOD:.2f}s)"
+    )
+    summarize(
+        "polling", await run(PollingRateLimiter(CALLS_PER_PERIOD, PERIOD_SECONDS))
+    )
+    summarize("fifo", await run(RateLimiter(CALLS_PER_PERIOD, PERIOD_SECONDS)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
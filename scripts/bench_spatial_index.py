@@ -0,0 +1,133 @@
+"""
+Compare SpatialIndex queries with a brute-force scan.
+
+For 1k, 10k, 100k and 1M random points across Japan we time, per query:
+- radius: every point within 2 km
+- nearest: the 10 closest points
+- bbox: every point inside a box about 5 km across
+
+Brute force is the vectorised scan over every point (domain.geo), not a
+Python loop, so the comparison measures the index rather than NumPy.
+Indexed results are checked against brute force before timing.
+
+Usage:
+    uv run python scripts/bench_spatial_index.py
+"""
+
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from domain.geo import distances_from  # noqa: E402
+from domain.spatial_index import SpatialIndex  # noqa: E402
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+QUERIES = 200
+RADIUS_KM = 2.0
+K = 10
+BOX_DEGREES = 0.05
+
+# Roughly the main islands of Japan
+LAT_RANGE = (31.0, 43.5)
+LNG_RANGE = (129.5, 145.5)
+
+
+def make_columns(count: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return rng.uniform(*LAT_RANGE, count), rng.uniform(*LNG_RANGE, count)
+
+
+def brute_radius(lats, lngs, lat, lng) -> np.ndarray:
+    distances = distances_from(lat, lng, lats, lngs)
+    inside = np.flatnonzero(distances <= RADIUS_KM)
+    return inside[np.argsort(distances[inside], kind="stable")]
+
+
+def brute_nearest(lats, lngs, lat, lng) -> np.ndarray:
+    distances = distances_from(lat, lng, lats, lngs)
+    nearest = np.argpartition(distances, K)[:K]
+    return np.sort(distances[nearest])
+
+
+def brute_bbox(lats, lngs, lat, lng) -> np.ndarray:
+    return np.flatnonzero(
+        (lats >= lat)
+        & (lats <= lat + BOX_DEGREES)
+        & (lngs >= lng)
+        & (lngs <= lng + BOX_DEGREES)
+    )
+
+
+def mean_us(query: Callable[[float, float], object], origins: np.ndarray) -> float:
+    """Mean latency per query in microseconds."""
+    start = time.perf_counter()
+    for lat, lng in origins:
+        query(lat, lng)
+    return (time.perf_counter() - start) / len(origins) * 1e6
+
+
+def bench_size(size: int) -> tuple[float, dict[str, tuple[float, float]]]:
+    """Check and time each query type for one index size."""
+    lats, lngs = make_columns(size, seed=42)
+    origins = np.column_stack(make_columns(QUERIES, seed=7)).tolist()
+
+    start = time.perf_counter()
+    index = SpatialIndex(cell_km=RADIUS_KM)
+    index.insert_many(lats, lngs)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    for lat, lng in origins[:20]:
+        ids, _ = index.within_radius(lat, lng, RADIUS_KM)
+        assert ids.tolist() == brute_radius(lats, lngs, lat, lng).tolist()
+        _, distances = index.nearest(lat, lng, K)
+        np.testing.assert_allclose(distances, brute_nearest(lats, lngs, lat, lng))
+        box = (lat, lng, lat + BOX_DEGREES, lng + BOX_DEGREES)
+        assert (
+            index.within_bbox(*box).tolist()
+            == brute_bbox(lats, lngs, lat, lng).tolist()
+        )
+
+    timings = {
+        "radius": (
+            mean_us(lambda lat, lng: brute_radius(lats, lngs, lat, lng), origins),
+            mean_us(lambda lat, lng: index.within_radius(lat, lng, RADIUS_KM), origins),
+        ),
+        "nearest": (
+            mean_us(lambda lat, lng: brute_nearest(lats, lngs, lat, lng), origins),
+            mean_us(lambda lat, lng: index.nearest(lat, lng, K), origins),
+        ),
+        "bbox": (
+            mean_us(lambda lat, lng: brute_bbox(lats, lngs, lat, lng), origins),
+            mean_us(
+                lambda lat, lng: index.within_bbox(
+                    lat, lng, lat + BOX_DEGREES, lng + BOX_DEGREES
+                ),
+                origins,
+            ),
+        ),
+    }
+    return build_ms, timings
+
+
+def main() -> None:
+    print(f"mean of {QUERIES} queries, {RADIUS_KM:g} km cells")
+    print(
+        f"{'points':>9} {'build ms':>9} {'query':<8} "
+        f"{'brute us':>10} {'index us':>10} {'speedup':>8}"
+    )
+    for size in SIZES:
+        build_ms, timings = bench_size(size)
+        for name, (brute, indexed) in timings.items():
+            print(
+                f"{size:>9} {build_ms:>9.1f} {name:<8} "
+                f"{brute:>10.1f} {indexed:>10.1f} {brute / indexed:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Measure Stage 2 points latency with and without speculative prefetch.
+
+Simulated sessions arrive every ARRIVAL_S on average, each get five
+Bangumi candidates, read them for a while and pick one, mostly near the top
+of the list. PointsSearchAgent then needs the chosen bangumi's points.
+Upstream point fetches take LATENCY_S.
+
+- cold:      no prefetch; the points are fetched when the choice is made
+- prefetch:  the top CANDIDATES are prefetched when the list is shown, two
+             at a time (the default SPECULATIVE_PREFETCH_CONCURRENCY), and
+             the choice is claimed before fetching, as in the agent
+
+Each mode runs at a normal arrival rate and at one that overloads the two
+prefetch slots. Times are simulated at TIME_SCALE and reported unscaled.
+
+Reported: p50 / p95 time to the chosen points, prefetch hit ratio (and the
+share of claims whose prefetch had already completed), wasted prefetch
+ratio and upstream fetches per session.
+
+Usage:
+    uv run python scripts/bench_speculative_prefetch.py
+"""
+
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from clients.anitabi import AnitabiClient  # noqa: E402
+from services.prefetch import SpeculativePrefetcher  # noqa: E402
+from utils.logger import setup_logging  # noqa: E402
+
+SESSIONS = 60
+CANDIDATES = 3
+CONCURRENCY = 2
+LATENCY_S = 0.4
+THINK_S = (2.0, 10.0)
+ARRIVALS_S = {"normal": 1.0, "overload": 0.1}
+TIME_SCALE = 0.25
+# Probability of picking each of the five candidates shown
+CHOICE_WEIGHTS = (0.55, 0.2, 0.1, 0.08, 0.07)
+
+
+def make_raw_points(bangumi_id: str, count: int = 150) -> list[dict]:
+    rng = random.Random(bangumi_id)
+    return [
+        {
+            "id": f"{bangumi_id}-{i}",
+            "name": f"スポット{i}",
+            "geo": [rng.uniform(34.0, 36.5), rng.uniform(135.0, 140.5)],
+            "ep": rng.randrange(1, 13),
+            "s": rng.randrange(0, 1440),
+            "image": f"/points/{bangumi_id}/{i}.jpg",
+        }
+        for i in range(count)
+    ]
+
+
+def new_client(fetches: list[str]) -> AnitabiClient:
+    client = AnitabiClient(rate_limit_calls=10_000, use_mirror=False)
+
+    async def fetch(bangumi_id: str) -> list[dict]:
+        fetches.append(bangumi_id)
+        await asyncio.sleep(LATENCY_S * TIME_SCALE)
+        return make_raw_points(bangumi_id)
+
+    client._fetch_raw_points = fetch
+    return client
+
+
+async def session(
+    number: int,
+    client: AnitabiClient,
+    prefetcher: SpeculativePrefetcher | None,
+    rng: random.Random,
+    arrival_s: float,
+) -> float:
+    await asyncio.sleep(number * arrival_s * TIME_SCALE)
+    candidates = [str(number * 10 + i) for i in range(len(CHOICE_WEIGHTS))]
+    session_id = f"session-{number}"
+    if prefetcher is not None:
+        prefetcher.schedule(session_id, candidates[:CANDIDATES])
+
+    await asyncio.sleep(rng.uniform(*THINK_S) * TIME_SCALE)
+    chosen = rng.choices(candidates, CHOICE_WEIGHTS)[0]
+
+    start = time.perf_counter()
+    if prefetcher is not None:
+        prefetcher.claim(session_id, chosen)
+    await client.get_bangumi_point_set(chosen)
+    return (time.perf_counter() - start) / TIME_SCALE
+
+
+async def run(
+    use_prefetch: bool, arrival_s: float
+) -> tuple[list[float], int, dict | None]:
+    fetches: list[str] = []
+    client = new_client(fetches)
+    prefetcher = (
+        SpeculativePrefetcher(client.get_bangumi_point_set, max_concurrency=CONCURRENCY)
+        if use_prefetch
+        else None
+    )
+    rng = random.Random(50)
+    timings = await asyncio.gather(
+        *(session(n, client, prefetcher, rng, arrival_s) for n in range(SESSIONS))
+    )
+    # Let cancelled prefetches settle before reading the counters
+    await asyncio.sleep(0)
+    await client.close()
+    return sorted(timings), len(fetches), prefetcher and prefetcher.stats.summary()
+
+
+async def main() -> None:
+    setup_logging("WARNING")
+    print(
+        f"{SESSIONS} sessions, upstream {LATENCY_S * 1000:.0f} ms, "
+        f"think {THINK_S[0]}-{THINK_S[1]} s, prefetch top {CANDIDATES}"
+    )
+    print(
+        f"{'load':<9} {'mode':<9} {'p50 ms':>7} {'p95 ms':>7} {'hit':>6} "
+        f"{'done':>6} {'wasted':>7} {'fetches/session':>16}"
+    )
+    for load, arrival_s in ARRIVALS_S.items():
+        for use_prefetch in (False, True):
+            timings, fetches, stats = await run(use_prefetch, arrival_s)
+            p50 = timings[len(timings) // 2] * 1000
+            p95 = timings[int(len(timings) * 0.95)] * 1000
+            hit = f"{stats['hit_ratio']:.0%}" if stats else "-"
+            claims = stats and stats["hits"] + stats["partial_hits"] + stats["misses"]
+            done = f"{stats['hits'] / claims:.0%}" if claims else "-"
+            wasted = f"{stats['wasted_ratio']:.0%}" if stats else "-"
+            print(
+                f"{load:<9} {'prefetch' if use_prefetch else 'cold':<9} "
+                f"{p50:>7.1f} {p95:>7.1f} {hit:>6} {done:>6} {wasted:>7} "
+                f"{fetches / SESSIONS:>16.2f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,182 @@
+"""
+Measure station gazetteer accuracy and latency on multilingual queries.
+
+The query set mixes the ways users name stations: Japanese with and without
+駅, hiragana and katakana, Hepburn, Kunrei and macron romaji, simplified
+and traditional Chinese with 站, full-width text, typos, and names the
+gazetteer does not know (which must fall through to the API, not resolve to
+a wrong station).
+
+Reported per query group:
+- correct:  resolved to the expected station (or, for unknown names,
+            correctly left unresolved)
+- wrong:    resolved to a different station
+- fallback: left to the /station API although the station is known
+
+The baseline is an exact-name lookup, standing in for the /station
+endpoint's exact matching.
+
+Usage:
+    uv run python scripts/bench_station_gazetteer.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.station_gazetteer import shared_gazetteer  # noqa: E402
+
+# (query, expected station name or None for a name that must not resolve)
+QUERIES: dict[str, list[tuple[str, str | None]]] = {
+    "japanese": [
+        ("宇治", "宇治駅"),
+        ("宇治駅", "宇治駅"),
+        ("京都", "京都駅"),
+        ("秋葉原", "秋葉原駅"),
+        ("新宿駅", "新宿駅"),
+        ("鷲宮", "鷲宮駅"),
+        ("四谷", "四ツ谷駅"),
+        ("江の島", "江ノ島駅"),
+        ("お茶の水", "御茶ノ水駅"),
+        ("聖蹟桜ケ丘", "聖蹟桜ヶ丘駅"),
+        ("飛騨古川駅", "飛騨古川駅"),
+        ("豊郷", "豊郷駅"),
+        ("梅田", "大阪駅"),
+        ("三宮", "三ノ宮駅"),
+    ],
+    "kana": [
+        ("うじ", "宇治駅"),
+        ("ウジ", "宇治駅"),
+        ("あきはばら", "秋葉原駅"),
+        ("アキハバラ", "秋葉原駅"),
+        ("しんじゅくえき", "新宿駅"),
+        ("ぬまづ", "沼津駅"),
+        ("ｶﾏｸﾗ", "鎌倉駅"),
+        ("わしのみや", "鷲宮駅"),
+        ("たかやま", "高山駅"),
+        ("おおあらい", "大洗駅"),
+    ],
+    "romaji": [
+        ("Uji", "宇治駅"),
+        ("Uji Station", "宇治駅"),
+        ("uji eki", "宇治駅"),
+        ("Tokyo", "東京駅"),
+        ("Tōkyō", "東京駅"),
+        ("Toukyou", "東京駅"),
+        ("Shimbashi", "新橋駅"),
+        ("Shinbashi", "新橋駅"),
+        ("Sinzyuku", "新宿駅"),
+        ("Ōarai", "大洗駅"),
+        ("Oarai Sta.", "大洗駅"),
+        ("Hida-Furukawa", "飛騨古川駅"),
+        ("hida furukawa", "飛騨古川駅"),
+        ("Namba", "難波駅"),
+        ("KAMAKURA", "鎌倉駅"),
+        ("Ｎｕｍａｚｕ", "沼津駅"),
+        ("Washinomiya", "鷲宮駅"),
+        ("Chichibu", "西武秩父駅"),
+    ],
+    "chinese": [
+        ("京都站", "京都駅"),
+        ("宇治站", "宇治駅"),
+        ("东京站", "東京駅"),
+        ("秋叶原", "秋葉原駅"),
+        ("涩谷站", "渋谷駅"),
+        ("澀谷站", "渋谷駅"),
+        ("新桥站", "新橋駅"),
+        ("镰仓高校前站", "鎌倉高校前駅"),
+        ("鎌倉高校前站", "鎌倉高校前駅"),
+        ("江之岛站", "江ノ島駅"),
+        ("飞驒古川站", "飛騨古川駅"),
+        ("丰乡", "豊郷駅"),
+        ("豐鄉站", "豊郷駅"),
+        ("大阪车站", "大阪駅"),
+        ("横滨", "横浜駅"),
+        ("廣島站", "広島駅"),
+    ],
+    "typos": [
+        ("Akihabra", "秋葉原駅"),
+        ("Shinjiku", "新宿駅"),
+        ("Tokio", "東京駅"),
+        ("Kamakra", "鎌倉駅"),
+        ("Ikebukro", "池袋駅"),
+        ("Hakodat", "函館駅"),
+        ("Kichijyoji", "吉祥寺駅"),
+        ("Shimokitazwa", "下北沢駅"),
+    ],
+    "unknown": [
+        ("Kobe", None),
+        ("立川", None),
+        ("Nikko", None),
+        ("青森站", None),
+        ("ほげほげ", None),
+        ("Kyoto Tower", None),
+        ("Shin-Osaka", None),
+        ("名古屋港", None),
+        ("Roppongi", None),
+    ],
+}
+
+
+def main() -> None:
+    gazetteer = shared_gazetteer()
+    all_queries = [query for group in QUERIES.values() for query in group]
+    exact_names = {
+        match.station.name
+        for query, expected in all_queries
+        if expected
+        for match in gazetteer.search(expected, limit=1)
+    }
+
+    print(f"{len(gazetteer)} stations, {len(all_queries)} queries")
+    print(
+        f"{'group':<10} {'queries':>7} {'correct':>8} {'wrong':>6} "
+        f"{'fallback':>9} {'baseline':>9}"
+    )
+    totals = [0, 0, 0, 0, 0]
+    for group, queries in QUERIES.items():
+        correct = wrong = fallback = baseline = 0
+        for query, expected in queries:
+            station = gazetteer.resolve(query)
+            if station is None:
+                correct += expected is None
+                fallback += expected is not None
+            elif station.name == expected:
+                correct += 1
+            else:
+                wrong += 1
+            # Exact matching knows only canonical names and misses the rest
+            known = query if query in exact_names else None
+            baseline += known == expected
+        for i, value in enumerate((len(queries), correct, wrong, fallback, baseline)):
+            totals[i] += value
+        print(
+            f"{group:<10} {len(queries):>7} {correct:>8} {wrong:>6} "
+            f"{fallback:>9} {baseline:>9}"
+        )
+    count, correct, wrong, fallback, baseline = totals
+    print(
+        f"{'total':<10} {count:>7} {correct:>8} {wrong:>6} {fallback:>9} "
+        f"{baseline:>9}   accuracy {correct / count:.1%} "
+        f"(exact-name baseline {baseline / count:.1%})"
+    )
+
+    # Latency: every query many times, exact and fuzzy paths together
+    rounds = 200
+    timings = []
+    for query, _ in all_queries:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            gazetteer.resolve(query)
+        timings.append((time.perf_counter() - start) / rounds * 1e6)
+    timings.sort()
+    print(
+        f"latency per lookup: mean {sum(timings) / len(timings):.1f} us, "
+        f"median {timings[len(timings) // 2]:.1f} us, max {timings[-1]:.1f} us"
+    )
+
+
+if __name__ == "__main__":
+    main()
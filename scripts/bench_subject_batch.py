@@ -0,0 +1,93 @@
+"""
+Measure candidate enrichment latency: sequential vs batched subject fetches.
+
+The candidate formatter needs air date and summary for the top 3-5 search
+results. Fetched one subject at a time, as separate get_bangumi_subject
+tool calls do, the round trips add up; get_subjects issues them together.
+The network is simulated by a fixed LATENCY_MS per request behind the
+client's real rate limiter and caches. Each client gets a fresh limiter
+budget (30 calls a minute, as in production), so rows do not drain each
+other's bucket.
+
+Reported per batch size: end-to-end time to enrich the candidates
+- sequential: get_subject for each ID in turn
+- batched:    get_subjects for all IDs, cold
+- warm:       get_subjects again for an overlapping batch (one new ID)
+
+Usage:
+    uv run python scripts/bench_subject_batch.py
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import clients.base  # noqa: E402
+from clients.bangumi import BangumiClient  # noqa: E402
+from services.rate_limit_backends import InProcessRateLimitBackend  # noqa: E402
+
+LATENCY_MS = 150
+BATCH_SIZES = (3, 5, 10)
+
+
+def subject(subject_id: int) -> dict:
+    return {
+        "id": subject_id,
+        "name": f"作品{subject_id}",
+        "name_cn": f"作品{subject_id}",
+        "air_date": "2016-08-26",
+        "summary": "あらすじ" * 200,
+        "images": {"large": f"https://lain.bgm.tv/pic/cover/l/{subject_id}.jpg"},
+        "rating": {"total": 50000, "score": 8.5},
+    }
+
+
+async def fake_request(*, url: str, **kwargs) -> dict:
+    await asyncio.sleep(LATENCY_MS / 1000)
+    return subject(int(url.rsplit("/", 1)[1]))
+
+
+def new_client() -> BangumiClient:
+    clients.base.create_rate_limit_backend = lambda url: InProcessRateLimitBackend()
+    client = BangumiClient(use_title_index=False)
+    client._make_request = fake_request
+    return client
+
+
+async def timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return (time.perf_counter() - start) * 1000
+
+
+async def sequential(client: BangumiClient, ids: list[int]) -> None:
+    for subject_id in ids:
+        await client.get_subject(subject_id)
+
+
+async def main() -> None:
+    print(f"simulated latency {LATENCY_MS} ms per request (ms)")
+    print(f"{'ids':>4} {'sequential':>11} {'batched':>8} {'warm':>8} {'speedup':>8}")
+    base = 1000
+    for size in BATCH_SIZES:
+        ids = list(range(base, base + size))
+        base += 100
+        client = new_client()
+        seq_ms = await timed(sequential(client, ids))
+        await client.close()
+
+        client = new_client()
+        batch_ms = await timed(client.get_subjects(ids))
+        warm_ms = await timed(client.get_subjects(ids[1:] + [ids[-1] + 1]))
+        await client.close()
+        print(
+            f"{size:>4} {seq_ms:>11.0f} {batch_ms:>8.0f} {warm_ms:>8.0f} "
+            f"{seq_ms / batch_ms:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,165 @@
+"""
+Measure local title search latency and accuracy.
+
+A synthetic catalogue of SUBJECTS anime stands in for the anime subjects
+of a Bangumi Archive dump. Each has a Japanese name, a Chinese name and an
+English alias built from shared word lists, so titles overlap the way real
+series, sequels and spin-offs do. Queries are taken from the catalogue:
+
+- exact:    a full name in one of its scripts
+- width:    the Japanese name in katakana / half-width / upper case
+- prefix:   an English alias without its last word
+- cold:     titles that are not in the catalogue (must stay unresolved)
+
+Reported per query kind: accuracy and mean / p99 latency of
+TitleIndex.search, against a linear scan that normalises the keyword and
+tests it as a substring of every name. A query is answered correctly when
+its subject is among the best-scoring matches (the small word lists give
+some subjects identical names) or, for prefixes, among the confident
+candidates; a cold query is correct when it is left to the API.
+
+Usage:
+    uv run python scripts/bench_title_index.py
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.title_index import (  # noqa: E402
+    DEFAULT_MIN_SCORE,
+    TitleIndex,
+    normalise_title,
+)
+
+SUBJECTS = 20_000
+QUERIES_PER_KIND = 500
+
+JA_WORDS = (
+    "きみ そら ほし うた はる なつ あき ふゆ ゆめ こころ まち うみ かぜ ひかり よる "
+    "あさ みらい きせき まほう しょうじょ せんせい がっこう ともだち ことば はな "
+    "涼宮 君 名 空 星 歌 夢 心 街 海 風 光 夜 朝 未来 奇跡 魔法 少女 学園 友達 物語 "
+    "戦記 日常 探偵 勇者 王国 銀河 青春 恋"
+).split()
+ZH_WORDS = (
+    "你 的 名字 天空 星星 歌声 梦想 心灵 城市 大海 风 光 夜晚 早晨 未来 奇迹 魔法 "
+    "少女 学园 朋友 物语 战记 日常 侦探 勇者 王国 银河 青春 恋爱 轻音 凉宫 约定"
+).split()
+EN_WORDS = (
+    "your name sky star song dream heart city sea wind light night morning "
+    "future miracle magic girl academy friends story chronicle days detective "
+    "hero kingdom galaxy youth love melody promise"
+).split()
+
+
+def title(rng: random.Random, words: tuple | list, joiner: str) -> str:
+    return joiner.join(rng.choice(words) for _ in range(rng.randint(2, 5)))
+
+
+def make_subjects(rng: random.Random) -> list[dict]:
+    subjects = []
+    seen: set[str] = set()
+    while len(subjects) < SUBJECTS:
+        name = title(rng, JA_WORDS, "の" if rng.random() < 0.3 else "")
+        if normalise_title(name) in seen:
+            continue
+        seen.add(normalise_title(name))
+        season = rng.random() < 0.2
+        subjects.append(
+            {
+                "id": len(subjects) + 1,
+                "type": 2,
+                "name": name + (" 第2期" if season else ""),
+                "name_cn": title(rng, ZH_WORDS, ""),
+                "aliases": [title(rng, EN_WORDS, " ").title()],
+                "favorite": {"done": rng.randint(0, 50_000)},
+            }
+        )
+    return subjects
+
+
+def to_katakana(text: str) -> str:
+    return "".join(chr(ord(c) + 0x60) if "ぁ" <= c <= "ゖ" else c for c in text)
+
+
+def make_queries(rng: random.Random, subjects: list[dict]) -> dict[str, list]:
+    """(keyword, expected subject id or None) per query kind."""
+    picks = rng.sample(subjects, QUERIES_PER_KIND)
+    exact = [
+        (rng.choice([s["name"], s["name_cn"], s["aliases"][0]]), s["id"]) for s in picks
+    ]
+    width = [
+        (to_katakana(s["name"]).upper().replace(" ", "　"), s["id"]) for s in picks
+    ]
+    # All but the last word of longer aliases; a single word is shared by
+    # too many titles to point at one
+    prefix = [
+        (alias.rsplit(" ", 1)[0], s["id"])
+        for s in subjects
+        if (alias := s["aliases"][0]).count(" ") >= 2
+    ][:QUERIES_PER_KIND]
+    cold = [
+        (f"{title(rng, EN_WORDS, ' ')} {rng.randint(1000, 9999)} Zz", None)
+        for _ in range(QUERIES_PER_KIND)
+    ]
+    return {"exact": exact, "width": width, "prefix": prefix, "cold": cold}
+
+
+def linear_scan(names: list[tuple[str, int]], keyword: str) -> int | None:
+    key = normalise_title(keyword)
+    for name, subject_id in names:
+        if key in name:
+            return subject_id
+    return None
+
+
+def main() -> None:
+    rng = random.Random(48)
+    subjects = make_subjects(rng)
+    start = time.perf_counter()
+    index = TitleIndex(subjects)
+    build_s = time.perf_counter() - start
+    names = [
+        (normalise_title(name), s["id"])
+        for s in subjects
+        for name in (s["name"], s["name_cn"], *s["aliases"])
+    ]
+    queries = make_queries(rng, subjects)
+    index.search("warm up")
+
+    print(f"{len(index):,} subjects, {len(names):,} names, built in {build_s:.2f} s")
+    print(
+        f"{'kind':<7} {'accuracy':>9} {'mean us':>8} {'p99 us':>8} "
+        f"{'scan mean us':>13}"
+    )
+    for kind, pairs in queries.items():
+        correct = 0
+        timings = []
+        for keyword, expected in pairs:
+            start = time.perf_counter()
+            found = index.search(keyword, limit=10)
+            timings.append((time.perf_counter() - start) * 1e6)
+            confident = [m for m in found if m.score >= DEFAULT_MIN_SCORE]
+            if expected is None:
+                correct += not confident
+                continue
+            if kind != "prefix":
+                confident = [m for m in confident if m.score == found[0].score]
+            correct += expected in [m.subject["id"] for m in confident]
+        start = time.perf_counter()
+        for keyword, _ in pairs[:100]:
+            linear_scan(names, keyword)
+        scan_us = (time.perf_counter() - start) / 100 * 1e6
+        timings.sort()
+        print(
+            f"{kind:<7} {correct / len(pairs):>9.1%} "
+            f"{sum(timings) / len(timings):>8.0f} "
+            f"{timings[int(len(timings) * 0.99)]:>8.0f} {scan_us:>13.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
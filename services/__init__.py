@@ -1,13 +1,39 @@
 """Service layer for business logic and external integrations."""
 
-from .cache import ResponseCache
-from .retry import RateLimiter, RetryConfig, retry_async
+from .anitabi_mirror import AnitabiMirror, sync_mirror
+from .cache import CacheNamespace, ResponseCache
+from .cache_backends import CacheBackend, create_cache_backend
+from .image_cache import ImageCache
+from .nearby_search import NearbyBangumiIndex
+from .prefetch import SpeculativePrefetcher
+from .rate_limit_backends import (
+    RateLimitBackend,
+    SharedRateLimiter,
+    create_rate_limit_backend,
+)
+from .retry import Priority, RateLimiter, RetryConfig, retry_async
 from .simple_route_planner import SimpleRoutePlanner
+from .station_gazetteer import StationGazetteer
+from .title_index import TitleIndex
 
 __all__ = [
     "ResponseCache",
+    "CacheNamespace",
+    "CacheBackend",
+    "create_cache_backend",
     "RateLimiter",
+    "Priority",
+    "SharedRateLimiter",
+    "RateLimitBackend",
+    "create_rate_limit_backend",
     "RetryConfig",
     "retry_async",
     "SimpleRoutePlanner",
+    "AnitabiMirror",
+    "sync_mirror",
+    "NearbyBangumiIndex",
+    "StationGazetteer",
+    "ImageCache",
+    "TitleIndex",
+    "SpeculativePrefetcher",
 ]
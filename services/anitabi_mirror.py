@@ -0,0 +1,426 @@
+"""
+Offline mirror of Anitabi bangumi and point data.
+
+Provides:
+- AnitabiMirror: local SQLite store of bangumi info and raw point items
+- shared_mirror(): one open mirror per file for the whole process
+- shared_catalogue(): one mapped point catalogue per file for the process
+- sync_mirror(): refresh the mirror with bounded concurrency, using
+  conditional requests so unchanged bangumi cost a 304 and no re-parse
+- export_catalogue(): write the mirror out as a memory-mapped point
+  catalogue (see domain.point_catalogue)
+- A command-line entry point for running the sync as a scheduled job
+
+Raw point items are stored exactly as Anitabi returned them, so points
+served from the mirror go through the same parsing as live responses.
+"""
+
+import argparse
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from domain.entities import APIError
+from domain.point_catalogue import PointCatalogue, write_catalogue
+from utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from clients.anitabi import AnitabiClient
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bangumi (
+    id TEXT PRIMARY KEY,
+    info TEXT NOT NULL,
+    raw_points TEXT NOT NULL,
+    modified INTEGER,
+    info_etag TEXT,
+    info_last_modified TEXT,
+    points_etag TEXT,
+    points_last_modified TEXT,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Bumped in the same transaction as every put(), so readers on any
+# connection see content changes but not sync bookkeeping
+_BUMP_CONTENT_VERSION = (
+    "INSERT INTO meta VALUES ('content_version', 1) "
+    "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+)
+
+
+@dataclass
+class MirrorRecord:
+    """One mirrored bangumi with the validators of its last fetch."""
+
+    bangumi_id: str
+    info: dict[str, Any]
+    raw_points: list[dict[str, Any]]
+    modified: int | None = None
+    info_etag: str | None = None
+    info_last_modified: str | None = None
+    points_etag: str | None = None
+    points_last_modified: str | None = None
+    synced_at: float = 0.0
+
+
+@dataclass
+class SyncReport:
+    """Outcome of one sync run, by bangumi id."""
+
+    added: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+
+
+class AnitabiMirror:
+    """
+    Local copy of Anitabi data in a single SQLite file.
+
+    Methods are blocking, so async callers run them with
+    ``asyncio.to_thread``. The one connection may be used from any thread;
+    a lock serialises queries, and JSON decoding happens outside it. Use
+    ``":memory:"`` for a throwaway mirror in tests.
+    """
+
+    def __init__(self, path: str | Path):
+        """
+        Open (or create) a mirror.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.executescript(_SCHEMA)
+
+    def _fetchone(self, sql: str, params: tuple[Any, ...] = ()) -> tuple | None:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _write(self, *statements: tuple[str, tuple[Any, ...]]) -> None:
+        """Run statements in one transaction."""
+        with self._lock, self._conn:
+            for sql, params in statements:
+                self._conn.execute(sql, params)
+
+    def __len__(self) -> int:
+        return self._fetchone("SELECT COUNT(*) FROM bangumi")[0]
+
+    def __contains__(self, bangumi_id: object) -> bool:
+        row = self._fetchone("SELECT 1 FROM bangumi WHERE id = ?", (str(bangumi_id),))
+        return row is not None
+
+    def data_version(self) -> int:
+        """
+        Stamp that changes whenever mirrored bangumi info or points change.
+
+        Covers put() through any connection (such as a sync job), but not
+        mark_synced(), so a sync that finds nothing new leaves it alone.
+        """
+        row = self._fetchone("SELECT value FROM meta WHERE key = 'content_version'")
+        return 0 if row is None else row[0]
+
+    def bangumi_ids(self) -> list[str]:
+        """Ids of every mirrored bangumi."""
+        with self._lock:
+            rows = self._conn.execute("SELECT id FROM bangumi ORDER BY id").fetchall()
+        return [row[0] for row in rows]
+
+    def get(self, bangumi_id: str) -> MirrorRecord | None:
+        """
+        Load one mirrored bangumi.
+
+        Args:
+            bangumi_id: Anime identifier
+
+        Returns:
+            The record, or None if the bangumi is not mirrored
+        """
+        row = self._fetchone(
+            "SELECT id, info, raw_points, modified, info_etag, info_last_modified, "
+            "points_etag, points_last_modified, synced_at "
+            "FROM bangumi WHERE id = ?",
+            (str(bangumi_id),),
+        )
+        if row is None:
+            return None
+        return MirrorRecord(
+            bangumi_id=row[0],
+            info=json.loads(row[1]),
+            raw_points=json.loads(row[2]),
+            modified=row[3],
+            info_etag=row[4],
+            info_last_modified=row[5],
+            points_etag=row[6],
+            points_last_modified=row[7],
+            synced_at=row[8],
+        )
+
+    def get_raw_points(self, bangumi_id: str) -> list[dict[str, Any]] | None:
+        """
+        Raw point items for a bangumi, as Anitabi returned them.
+
+        Args:
+            bangumi_id: Anime identifier
+
+        Returns:
+            Point items, or None if the bangumi is not mirrored
+        """
+        row = self._fetchone(
+            "SELECT raw_points FROM bangumi WHERE id = ?", (str(bangumi_id),)
+        )
+        return None if row is None else json.loads(row[0])
+
+    def put(self, record: MirrorRecord) -> None:
+        """Insert or replace a bangumi."""
+        self._write(
+            (
+                "INSERT OR REPLACE INTO bangumi VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    str(record.bangumi_id),
+                    json.dumps(record.info, ensure_ascii=False),
+                    json.dumps(record.raw_points, ensure_ascii=False),
+                    record.modified,
+                    record.info_etag,
+                    record.info_last_modified,
+                    record.points_etag,
+                    record.points_last_modified,
+                    record.synced_at,
+                ),
+            ),
+            (_BUMP_CONTENT_VERSION, ()),
+        )
+
+    def mark_synced(self, bangumi_id: str, synced_at: float) -> None:
+        """Record that a bangumi was checked and found unchanged."""
+        self._write(
+            (
+                "UPDATE bangumi SET synced_at = ? WHERE id = ?",
+                (synced_at, str(bangumi_id)),
+            )
+        )
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
+
+
+@lru_cache
+def shared_mirror(path: str) -> AnitabiMirror:
+    """Open a mirror once per process; clients share it and never close it."""
+    return AnitabiMirror(path)
+
+
+@lru_cache
+def shared_catalogue(path: str) -> PointCatalogue:
+    """
+    Map a point catalogue once per process.
+
+    An export replaces the file atomically, so the mapping keeps serving
+    the catalogue as it was when first opened.
+    """
+    return PointCatalogue(path)
+
+
+async def _sync_one(
+    client: "AnitabiClient", mirror: AnitabiMirror, bangumi_id: str
+) -> str:
+    """Refresh one bangumi, returning "added", "updated" or "unchanged"."""
+    record = await asyncio.to_thread(mirror.get, bangumi_id)
+
+    info = await client.get_if_changed(
+        f"/{bangumi_id}/lite",
+        etag=record.info_etag if record else None,
+        last_modified=record.info_last_modified if record else None,
+    )
+    if record is not None and not info.modified:
+        await asyncio.to_thread(mirror.mark_synced, bangumi_id, time.time())
+        return "unchanged"
+
+    info_data = info.data if isinstance(info.data, dict) else {}
+    modified = info_data.get("modified")
+    updated = MirrorRecord(
+        bangumi_id=bangumi_id,
+        info=info_data,
+        raw_points=record.raw_points if record else [],
+        modified=modified,
+        info_etag=info.etag,
+        info_last_modified=info.last_modified,
+        points_etag=record.points_etag if record else None,
+        points_last_modified=record.points_last_modified if record else None,
+        synced_at=time.time(),
+    )
+
+    # Anitabi bumps ``modified`` whenever a bangumi's points change, so an
+    # unchanged stamp means the stored points are still current
+    if record is not None and modified is not None and modified == record.modified:
+        await asyncio.to_thread(mirror.put, updated)
+        return "unchanged"
+
+    points = await client.fetch_raw_points_if_changed(
+        bangumi_id,
+        etag=updated.points_etag,
+        last_modified=updated.points_last_modified,
+    )
+    if points.modified:
+        updated.raw_points = points.data
+        updated.points_etag = points.etag
+        updated.points_last_modified = points.last_modified
+    await asyncio.to_thread(mirror.put, updated)
+
+    if record is None:
+        return "added"
+    return "updated" if points.modified else "unchanged"
+
+
+async def sync_mirror(
+    client: "AnitabiClient",
+    mirror: AnitabiMirror,
+    bangumi_ids: Iterable[str] | None = None,
+    max_concurrency: int = 4,
+) -> SyncReport:
+    """
+    Bring the mirror up to date with Anitabi.
+
+    Each bangumi's info is fetched conditionally; its points are fetched
+    (also conditionally) only when the info says they changed. Requests go
+    through the client's rate limiter at background priority, so a sync
+    running next to live traffic never starves it. A bangumi that fails is
+    logged and keeps its previous mirrored data.
+
+    Args:
+        client: Anitabi client to fetch with
+        mirror: Mirror to update
+        bangumi_ids: Bangumi to mirror (defaults to those already mirrored)
+        max_concurrency: Maximum bangumi being synced at once
+
+    Returns:
+        SyncReport listing what changed
+    """
+    ids = list(
+        dict.fromkeys(
+            str(b)
+            for b in (mirror.bangumi_ids() if bangumi_ids is None else bangumi_ids)
+        )
+    )
+    semaphore = asyncio.Semaphore(max_concurrency)
+    report = SyncReport()
+
+    async def sync(bangumi_id: str) -> None:
+        async with semaphore:
+            try:
+                outcome = await _sync_one(client, mirror, bangumi_id)
+            except APIError as e:
+                logger.warning(
+                    "Mirror sync failed for bangumi",
+                    bangumi_id=bangumi_id,
+                    error=str(e),
+                )
+                report.failed.append(bangumi_id)
+                return
+            getattr(report, outcome).append(bangumi_id)
+
+    await asyncio.gather(*(sync(bangumi_id) for bangumi_id in ids))
+
+    logger.info(
+        "Mirror sync complete",
+        added=len(report.added),
+        updated=len(report.updated),
+        unchanged=len(report.unchanged),
+        failed=len(report.failed),
+    )
+    return report
+
+
+def export_catalogue(mirror: AnitabiMirror, path: str | Path) -> int:
+    """
+    Write every mirrored bangumi to a point catalogue file.
+
+    Points are parsed exactly as AnitabiClient.get_bangumi_point_set would
+    parse the live response.
+
+    Args:
+        mirror: Mirror to export
+        path: Catalogue file to (atomically) replace
+
+    Returns:
+        Number of points written
+    """
+    from clients.anitabi import parse_point_set
+
+    point_sets = (
+        (bangumi_id, parse_point_set(mirror.get_raw_points(bangumi_id), bangumi_id))
+        for bangumi_id in mirror.bangumi_ids()
+    )
+    count = write_catalogue(path, point_sets)
+    logger.info("Point catalogue exported", path=str(path), points=count)
+    return count
+
+
+def main() -> None:
+    """Sync the mirror from the command line."""
+    from clients.anitabi import AnitabiClient
+    from config.settings import get_settings
+
+    parser = argparse.ArgumentParser(description="Sync the local Anitabi mirror")
+    parser.add_argument(
+        "bangumi_ids",
+        nargs="*",
+        help="Bangumi to add or refresh (default: everything already mirrored)",
+    )
+    parser.add_argument(
+        "--db", default=get_settings().anitabi_mirror_path, help="Mirror file"
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--catalogue", help="Also export the mirror to this point catalogue file"
+    )
+    args = parser.parse_args()
+    if not args.db:
+        parser.error("--db is required when ANITABI_MIRROR_PATH is not set")
+
+    async def run() -> SyncReport:
+        mirror = AnitabiMirror(args.db)
+        # The mirror-first mode would answer from the data being refreshed
+        async with AnitabiClient(use_cache=False, use_mirror=False) as client:
+            try:
+                report = await sync_mirror(
+                    client,
+                    mirror,
+                    args.bangumi_ids or None,
+                    max_concurrency=args.concurrency,
+                )
+                if args.catalogue:
+                    export_catalogue(mirror, args.catalogue)
+                return report
+            finally:
+                mirror.close()
+
+    report = asyncio.run(run())
+    print(
+        f"added={len(report.added)} updated={len(report.updated)} "
+        f"unchanged={len(report.unchanged)} failed={len(report.failed)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,27 +3,65 @@ Response caching layer for API clients.
 
 Provides:
 - In-memory cache with TTL support
+- Optional shared backend (see services.cache_backends)
 - Thread-safe operations
 - LRU eviction policy
 - Cache statistics
-- Decorator for caching async functions
+- Single-flight decorators for caching async functions and client methods
+- Refresh-ahead of hot entries by a bounded background worker
+- TTL jitter and probabilistic early expiration against stampedes
 """
 
 import asyncio
+import contextvars
 import hashlib
 import json
+import math
+import random
+import time
+import weakref
 from collections import OrderedDict
-from collections.abc import Callable
-from dataclasses import dataclass
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from functools import wraps
 from threading import Lock
-from typing import Any
+from typing import Any, Concatenate, ParamSpec, TypeVar
 
+from services.cache_backends import CacheBackend
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+P = ParamSpec("P")
+T = TypeVar("T")
+S = TypeVar("S")
+
+# Sentinel distinguishing "not cached" from a cached None/falsy value
+_MISSING: Any = object()
+
+# Set while the refresh worker recomputes an entry
+_background_refresh: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "background_refresh", default=False
+)
+
+
+def in_background_refresh() -> bool:
+    """Return True when running inside a refresh-ahead recomputation."""
+    return _background_refresh.get()
+
+
+def _detached(value: T) -> T:
+    """
+    Shallow copy of a cached list, dict or set, so callers cannot mutate it.
+
+    Elements are shared; immutable values (tuples, PointSets, models that
+    are replaced rather than edited) are returned as they are.
+    """
+    if isinstance(value, list | dict | set):
+        return value.copy()
+    return value
+
 
 @dataclass
 class CacheEntry:
@@ -32,11 +70,73 @@ class CacheEntry:
     value: Any
     expires_at: datetime
 
+    # Refresh-ahead bookkeeping (only set for entries with a known factory)
+    ttl_seconds: float | None = None  # after jitter
+    base_ttl_seconds: float | None = None  # before jitter, reused by refreshes
+    origin_expires_at: datetime | None = None  # expiry before near-cache capping
+    refresher: Callable[[], Awaitable[Any]] | None = None
+    hits: int = 0
+    refresh_pending: bool = False
+    replaced_expiry: datetime | None = None  # expiry of the value a refresh replaced
+    compute_seconds: float | None = None  # time the factory took to produce value
+
     def is_expired(self) -> bool:
         """Check if this entry has expired."""
         return datetime.now() >= self.expires_at
 
 
+@dataclass(frozen=True)
+class CacheNamespace:
+    """
+    Cache policy for a named group of entries.
+
+    Attributes:
+        ttl_seconds: Default time-to-live for entries in this namespace
+        max_size: Maximum number of entries before LRU eviction
+        admit: Optional predicate deciding whether a value is worth caching
+        refresh_ahead: Fraction of the TTL before expiry in which hot entries
+            are refreshed in the background (0 disables refresh-ahead)
+        refresh_min_hits: Hits since the last write for an entry to count as hot
+        ttl_jitter: Fraction of the TTL randomly shaved off each write so that
+            entries written together do not expire together (0 disables)
+        early_expiration_beta: XFetch beta; entries with a known recompute
+            time are treated as expired slightly early with a probability
+            that rises towards expiry (0 disables, 1 is the usual choice)
+    """
+
+    ttl_seconds: float
+    max_size: int
+    admit: Callable[[Any], bool] | None = None
+    refresh_ahead: float = 0.0
+    refresh_min_hits: int = 3
+    ttl_jitter: float = 0.0
+    early_expiration_beta: float = 0.0
+
+
+@dataclass
+class NamespaceStats:
+    """Hit/miss/eviction counters for a single namespace."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    rejected: int = 0
+    backend_hits: int = 0
+    refreshes: int = 0
+    refresh_failures: int = 0
+    saved_misses: int = 0
+    early_expirations: int = 0
+
+
+@dataclass
+class _NamespaceStore:
+    """Entries, policy and counters backing one namespace."""
+
+    policy: CacheNamespace
+    entries: OrderedDict[str, CacheEntry] = field(default_factory=OrderedDict)
+    stats: NamespaceStats = field(default_factory=NamespaceStats)
+
+
 class ResponseCache:
     """
     Thread-safe response cache with TTL and LRU eviction.
@@ -44,35 +144,85 @@ class ResponseCache:
     Features:
     - Time-based expiration (TTL)
     - Size-based eviction (LRU)
+    - Named namespaces with independent TTL, size and admission policy
+    - Optional shared backend, with the in-process store kept as a near cache
+    - Refresh-ahead of hot entries shortly before they expire
+    - TTL jitter and XFetch-style early expiration to spread recomputation
     - Thread-safe operations
     - Cache statistics
     """
 
+    DEFAULT_NAMESPACE = "default"
+
     def __init__(
         self,
         default_ttl_seconds: float = 3600,
         max_size: int = 1000,
         cleanup_interval_seconds: float = 300,
+        namespaces: dict[str, CacheNamespace] | None = None,
+        backend: CacheBackend | None = None,
+        near_cache_ttl_seconds: float | None = 60,
+        refresh_gate: Callable[[], Awaitable[None]] | None = None,
+        refresh_queue_size: int = 64,
+        ttl_jitter: float = 0.0,
+        early_expiration_beta: float = 0.0,
+        rng: random.Random | None = None,
     ):
         """
         Initialize the response cache.
 
         Args:
             default_ttl_seconds: Default time-to-live in seconds
-            max_size: Maximum number of cache entries
+            max_size: Maximum number of entries in the default namespace
             cleanup_interval_seconds: Interval for automatic cleanup
+            namespaces: Optional named namespaces with their own policies
+            backend: Optional shared backend used behind the in-process store
+            near_cache_ttl_seconds: Cap on in-process TTL when a backend is
+                configured, bounding staleness after remote invalidation
+            refresh_gate: Awaited before each background refresh; lets the
+                owner hold refreshes back while interactive traffic is busy
+            refresh_queue_size: Maximum number of pending refreshes
+            ttl_jitter: TTL jitter fraction for the default namespace
+            early_expiration_beta: XFetch beta for the default namespace
+            rng: Random source for jitter and early expiration
         """
         self.default_ttl_seconds = default_ttl_seconds
         self.max_size = max_size
         self.cleanup_interval_seconds = cleanup_interval_seconds
-
-        # OrderedDict for LRU behavior
-        self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.near_cache_ttl_seconds = near_cache_ttl_seconds
+        self.refresh_queue_size = refresh_queue_size
+        self._backend = backend
+        self._refresh_gate = refresh_gate
+        self._random = rng or random.Random()
+
+        # Refresh-ahead worker state (created lazily on the running loop)
+        self._refresh_queue: asyncio.Queue[tuple[str, str]] | None = None
+        self._refresh_task: asyncio.Task | None = None
+        self._refresh_dropped = 0
+
+        # One LRU-ordered store per namespace
+        self._namespaces: dict[str, _NamespaceStore] = {
+            self.DEFAULT_NAMESPACE: _NamespaceStore(
+                policy=CacheNamespace(
+                    ttl_seconds=default_ttl_seconds,
+                    max_size=max_size,
+                    ttl_jitter=ttl_jitter,
+                    early_expiration_beta=early_expiration_beta,
+                )
+            )
+        }
         self._lock = Lock()
 
+        for name, policy in (namespaces or {}).items():
+            self.configure_namespace(name, policy)
+
+        # In-flight computations keyed by (namespace, cache key)
+        self._in_flight: dict[tuple[str, str], asyncio.Future] = {}
+
         # Statistics
         self._hits = 0
         self._misses = 0
+        self._coalesced = 0
 
         # Start cleanup task
         self._cleanup_task: asyncio.Task | None = None
@@ -84,8 +234,52 @@ class ResponseCache:
             default_ttl=default_ttl_seconds,
             max_size=max_size,
             cleanup_interval=cleanup_interval_seconds,
+            namespaces=list(self._namespaces),
+            backend=type(backend).__name__ if backend is not None else None,
+        )
+
+    def configure_namespace(self, name: str, policy: CacheNamespace) -> None:
+        """
+        Create or update a namespace policy.
+
+        Existing entries are kept; if the new size budget is smaller, the
+        least recently used entries are evicted immediately.
+
+        Args:
+            name: Namespace name
+            policy: TTL, size and admission policy for the namespace
+        """
+        with self._lock:
+            store = self._namespaces.get(name)
+            if store is None:
+                self._namespaces[name] = _NamespaceStore(policy=policy)
+            else:
+                store.policy = policy
+                while len(store.entries) > policy.max_size:
+                    self._evict_lru(name, store)
+
+        logger.debug(
+            "Cache namespace configured",
+            namespace=name,
+            ttl=policy.ttl_seconds,
+            max_size=policy.max_size,
         )
 
+    def _store(self, namespace: str | None) -> tuple[str, _NamespaceStore]:
+        """Resolve a namespace name to its store (caller holds the lock)."""
+        name = namespace or self.DEFAULT_NAMESPACE
+        store = self._namespaces.get(name)
+        if store is None:
+            # Unknown namespaces inherit the default policy
+            store = _NamespaceStore(
+                policy=self._namespaces[self.DEFAULT_NAMESPACE].policy
+            )
+            self._namespaces[name] = store
+            logger.warning(
+                "Cache namespace not configured, using defaults", namespace=name
+            )
+        return name, store
+
     def _start_cleanup_task(self) -> None:
         """Start the background cleanup task."""
         try:
@@ -101,143 +295,501 @@ class ResponseCache:
             try:
                 await asyncio.sleep(self.cleanup_interval_seconds)
                 await self.cleanup_expired()
+                self._schedule_due_refreshes()
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error("Error in cache cleanup", error=str(e), exc_info=True)
 
-    async def get(self, key: str) -> Any | None:
+    async def get(
+        self, key: str, default: Any = None, namespace: str | None = None
+    ) -> Any | None:
         """
         Get a value from the cache.
 
+        Looks in the in-process (L1) store first, then in the shared backend
+        if one is configured; backend hits are copied into L1.
+
         Args:
             key: Cache key
+            default: Value returned when the key is missing or expired
+            namespace: Namespace to look in (default namespace if omitted)
 
         Returns:
-            Cached value or None if not found/expired
+            Cached value or ``default`` if not found/expired
         """
         with self._lock:
-            if key not in self._cache:
-                self._misses += 1
-                logger.debug("Cache miss", key=key)
-                return None
-
-            entry = self._cache[key]
+            name, store = self._store(namespace)
+            entry = store.entries.get(key)
 
-            # Check expiration
-            if entry.is_expired():
-                del self._cache[key]
-                self._misses += 1
-                logger.debug("Cache expired", key=key)
-                return None
+            if entry is not None and entry.is_expired():
+                del store.entries[key]
+                entry = None
+                logger.debug("Cache expired", key=key, namespace=name)
 
-            # Move to end for LRU (most recently used)
-            self._cache.move_to_end(key)
-            self._hits += 1
-            logger.debug("Cache hit", key=key)
+            expired_early = entry is not None and self._expires_early(
+                store.policy, entry
+            )
+            if expired_early:
+                # Only this caller recomputes; the entry keeps serving others
+                store.stats.early_expirations += 1
+                entry = None
+                logger.debug("Cache early expiration", key=key, namespace=name)
+
+            if entry is not None:
+                # Move to end for LRU (most recently used)
+                store.entries.move_to_end(key)
+                self._hits += 1
+                store.stats.hits += 1
+                entry.hits += 1
+                if (
+                    entry.replaced_expiry is not None
+                    and datetime.now() >= entry.replaced_expiry
+                ):
+                    # Without the refresh this access would have been a miss
+                    store.stats.saved_misses += 1
+                    entry.replaced_expiry = None
+                needs_refresh = self._needs_refresh(store.policy, entry)
+                if needs_refresh:
+                    entry.refresh_pending = True
+                logger.debug("Cache hit", key=key, namespace=name)
+                value = entry.value
+
+        if entry is not None:
+            if needs_refresh:
+                self._enqueue_refresh(name, key)
+            return value
+
+        if self._backend is not None and not expired_early:
+            remote = await self._backend_call("get", self._backend_key(name, key))
+            if remote is not None:
+                value, expires_at = remote
+                with self._lock:
+                    self._put_local(
+                        name, store, key, value, datetime.fromtimestamp(expires_at)
+                    )
+                    self._hits += 1
+                    store.stats.hits += 1
+                    store.stats.backend_hits += 1
+                logger.debug("Cache backend hit", key=key, namespace=name)
+                return value
 
-            return entry.value
+        with self._lock:
+            self._misses += 1
+            store.stats.misses += 1
+        logger.debug("Cache miss", key=key, namespace=name)
+        return default
 
-    async def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: float | None = None,
+        namespace: str | None = None,
+    ) -> bool:
         """
-        Set a value in the cache.
+        Set a value in the cache (and the shared backend, if configured).
 
         Args:
             key: Cache key
             value: Value to cache
             ttl_seconds: Optional TTL override
+            namespace: Namespace to store in (default namespace if omitted)
+
+        Returns:
+            True if stored, False if rejected by the namespace admission policy
         """
-        ttl = ttl_seconds if ttl_seconds is not None else self.default_ttl_seconds
-        expires_at = datetime.now() + timedelta(seconds=ttl)
+        return await self._set(key, value, ttl_seconds, namespace)
 
+    async def _set(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: float | None,
+        namespace: str | None,
+        refresher: Callable[[], Awaitable[Any]] | None = None,
+        replaced_expiry: datetime | None = None,
+        compute_seconds: float | None = None,
+    ) -> bool:
+        """Store a value, optionally remembering how to recompute it."""
         with self._lock:
-            # Check size limit
-            if len(self._cache) >= self.max_size and key not in self._cache:
-                # Evict least recently used
-                self._evict_lru()
-
-            # Add or update entry
-            self._cache[key] = CacheEntry(value=value, expires_at=expires_at)
-            # Move to end (most recently used)
-            self._cache.move_to_end(key)
+            name, store = self._store(namespace)
+            policy = store.policy
+
+            if policy.admit is not None and not policy.admit(value):
+                store.stats.rejected += 1
+                logger.debug("Cache admission rejected", key=key, namespace=name)
+                return False
+
+            base_ttl = ttl_seconds if ttl_seconds is not None else policy.ttl_seconds
+            ttl = base_ttl
+            if policy.ttl_jitter > 0:
+                # Only ever shorten the TTL so freshness bounds still hold
+                ttl *= 1 - policy.ttl_jitter * self._random.random()
+            expires_at = datetime.now() + timedelta(seconds=ttl)
+            self._put_local(
+                name,
+                store,
+                key,
+                value,
+                expires_at,
+                ttl_seconds=ttl,
+                base_ttl_seconds=base_ttl,
+                refresher=refresher,
+                replaced_expiry=replaced_expiry,
+                compute_seconds=compute_seconds,
+            )
 
             logger.debug(
-                "Cache set", key=key, ttl=ttl, expires_at=expires_at.isoformat()
+                "Cache set",
+                key=key,
+                namespace=name,
+                ttl=ttl,
+                expires_at=expires_at.isoformat(),
+            )
+
+        if self._backend is not None:
+            await self._backend_call(
+                "set", self._backend_key(name, key), value, expires_at.timestamp()
+            )
+        return True
+
+    def _put_local(
+        self,
+        name: str,
+        store: _NamespaceStore,
+        key: str,
+        value: Any,
+        expires_at: datetime,
+        ttl_seconds: float | None = None,
+        base_ttl_seconds: float | None = None,
+        refresher: Callable[[], Awaitable[Any]] | None = None,
+        replaced_expiry: datetime | None = None,
+        compute_seconds: float | None = None,
+    ) -> None:
+        """Insert into the L1 store (caller holds the lock)."""
+        origin_expires_at = expires_at
+        if self._backend is not None and self.near_cache_ttl_seconds is not None:
+            # Bound how long L1 can miss invalidations made by other workers
+            expires_at = min(
+                expires_at,
+                datetime.now() + timedelta(seconds=self.near_cache_ttl_seconds),
+            )
+
+        # Check size limit
+        if len(store.entries) >= store.policy.max_size and key not in store.entries:
+            # Evict least recently used
+            self._evict_lru(name, store)
+
+        # Add or update entry
+        store.entries[key] = CacheEntry(
+            value=value,
+            expires_at=expires_at,
+            ttl_seconds=ttl_seconds,
+            base_ttl_seconds=base_ttl_seconds,
+            origin_expires_at=origin_expires_at,
+            refresher=refresher,
+            replaced_expiry=replaced_expiry,
+            compute_seconds=compute_seconds,
+        )
+        # Move to end (most recently used)
+        store.entries.move_to_end(key)
+
+    def _expires_early(self, policy: CacheNamespace, entry: CacheEntry) -> bool:
+        """
+        XFetch check: decide whether to treat a live entry as expired.
+
+        An entry is recomputed early when ``now - delta * beta * ln(rand)``
+        passes its expiry, where ``delta`` is how long the value took to
+        compute. Recomputation thus spreads out ahead of the real expiry,
+        favouring expensive entries.
+        """
+        if (
+            policy.early_expiration_beta <= 0
+            or not entry.compute_seconds
+            or entry.refresh_pending
+        ):
+            return False
+        expires_at = entry.origin_expires_at or entry.expires_at
+        # 1 - random() lies in (0, 1], keeping the logarithm finite
+        gap = (
+            -entry.compute_seconds
+            * policy.early_expiration_beta
+            * math.log(1 - self._random.random())
+        )
+        return datetime.now() + timedelta(seconds=gap) >= expires_at
+
+    def _needs_refresh(self, policy: CacheNamespace, entry: CacheEntry) -> bool:
+        """Check whether an entry is hot and inside its refresh-ahead window."""
+        if (
+            policy.refresh_ahead <= 0
+            or entry.refresher is None
+            or entry.refresh_pending
+            or entry.ttl_seconds is None
+            or entry.hits < policy.refresh_min_hits
+        ):
+            return False
+        expires_at = entry.origin_expires_at or entry.expires_at
+        remaining = (expires_at - datetime.now()).total_seconds()
+        return remaining <= policy.refresh_ahead * entry.ttl_seconds
+
+    def _schedule_due_refreshes(self) -> int:
+        """Queue refreshes for every hot entry inside its refresh window."""
+        due: list[tuple[str, str]] = []
+        with self._lock:
+            for name, store in self._namespaces.items():
+                for key, entry in store.entries.items():
+                    if not entry.is_expired() and self._needs_refresh(
+                        store.policy, entry
+                    ):
+                        entry.refresh_pending = True
+                        due.append((name, key))
+
+        for name, key in due:
+            self._enqueue_refresh(name, key)
+        return len(due)
+
+    def _enqueue_refresh(self, name: str, key: str) -> None:
+        """Hand an entry to the refresh worker, dropping it if the queue is full."""
+        loop = asyncio.get_running_loop()
+        if self._refresh_task is None or self._refresh_task.get_loop() is not loop:
+            self._refresh_queue = asyncio.Queue(maxsize=self.refresh_queue_size)
+            # A fresh context: refreshes must not inherit the request
+            # deadline (or anything else) of whoever enqueued first
+            self._refresh_task = loop.create_task(
+                self._refresh_worker(), context=contextvars.Context()
+            )
+        assert self._refresh_queue is not None
+
+        try:
+            self._refresh_queue.put_nowait((name, key))
+        except asyncio.QueueFull:
+            self._refresh_dropped += 1
+            with self._lock:
+                entry = self._namespaces[name].entries.get(key)
+                if entry is not None:
+                    entry.refresh_pending = False
+            logger.debug("Cache refresh queue full", key=key, namespace=name)
+
+    async def _refresh_worker(self) -> None:
+        """Background task recomputing hot entries one at a time."""
+        assert self._refresh_queue is not None
+        queue = self._refresh_queue
+        while True:
+            name, key = await queue.get()
+            try:
+                await self._refresh_entry(name, key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    "Error in cache refresh", key=key, error=str(e), exc_info=True
+                )
+            finally:
+                queue.task_done()
+
+    async def _refresh_entry(self, name: str, key: str) -> None:
+        """Recompute one entry and store it with a fresh TTL."""
+        with self._lock:
+            store = self._namespaces[name]
+            entry = store.entries.get(key)
+            if entry is None or entry.is_expired() or entry.refresher is None:
+                return
+            refresher = entry.refresher
+            previous_expiry = entry.origin_expires_at or entry.expires_at
+            # Jittered again by _set, so start from the unjittered TTL
+            ttl = entry.base_ttl_seconds
+
+        # Stay behind interactive traffic sharing the same upstream budget
+        if self._refresh_gate is not None:
+            await self._refresh_gate()
+
+        token = _background_refresh.set(True)
+        started = time.monotonic()
+        try:
+            value = await refresher()
+        except Exception as e:
+            with self._lock:
+                store.stats.refresh_failures += 1
+                current = store.entries.get(key)
+                if current is entry:
+                    entry.refresh_pending = False
+            logger.warning(
+                "Cache refresh failed", key=key, namespace=name, error=str(e)
             )
+            return
+        finally:
+            _background_refresh.reset(token)
+
+        stored = await self._set(
+            key,
+            value,
+            ttl,
+            name,
+            refresher=refresher,
+            replaced_expiry=previous_expiry,
+            compute_seconds=time.monotonic() - started,
+        )
+        with self._lock:
+            if stored:
+                store.stats.refreshes += 1
+            elif store.entries.get(key) is entry:
+                entry.refresh_pending = False
+        logger.debug("Cache entry refreshed", key=key, namespace=name)
+
+    def _evict_lru(self, name: str, store: _NamespaceStore) -> None:
+        """Evict the least recently used entry of a namespace."""
+        if store.entries:
+            lru_key = next(iter(store.entries))
+            del store.entries[lru_key]
+            store.stats.evictions += 1
+            logger.debug("Cache evicted LRU", key=lru_key, namespace=name)
+
+    def _backend_key(self, name: str, key: str) -> str:
+        """Build the shared-backend key for a namespaced entry."""
+        return f"{name}:{key}"
+
+    async def _backend_call(self, operation: str, *args: Any) -> Any:
+        """
+        Call the shared backend, degrading to L1-only behaviour on failure.
 
-    def _evict_lru(self) -> None:
-        """Evict the least recently used entry."""
-        if self._cache:
-            lru_key = next(iter(self._cache))
-            del self._cache[lru_key]
-            logger.debug("Cache evicted LRU", key=lru_key)
+        Returns:
+            The backend result, or None if the backend is unavailable
+        """
+        assert self._backend is not None
+        try:
+            return await getattr(self._backend, operation)(*args)
+        except Exception as e:
+            logger.warning(
+                "Cache backend call failed", operation=operation, error=str(e)
+            )
+            return None
 
-    async def delete(self, key: str) -> bool:
+    async def delete(self, key: str, namespace: str | None = None) -> bool:
         """
-        Delete a key from the cache.
+        Delete a key from the cache and the shared backend.
 
         Args:
             key: Cache key
+            namespace: Namespace to delete from (default namespace if omitted)
 
         Returns:
             True if deleted, False if not found
         """
         with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                logger.debug("Cache deleted", key=key)
-                return True
-            return False
+            name, store = self._store(namespace)
+            deleted = store.entries.pop(key, None) is not None
+
+        if self._backend is not None:
+            deleted = (
+                bool(await self._backend_call("delete", self._backend_key(name, key)))
+                or deleted
+            )
 
-    async def clear(self) -> None:
-        """Clear all cache entries."""
+        if deleted:
+            logger.debug("Cache deleted", key=key, namespace=name)
+        return deleted
+
+    async def clear(self, namespace: str | None = None) -> None:
+        """
+        Clear cache entries and statistics.
+
+        Args:
+            namespace: Only clear this namespace (all namespaces if omitted)
+        """
         with self._lock:
-            size = len(self._cache)
-            self._cache.clear()
-            self._hits = 0
-            self._misses = 0
-            logger.info("Cache cleared", entries_removed=size)
+            if namespace is not None:
+                _, store = self._store(namespace)
+                size = len(store.entries)
+                store.entries.clear()
+                store.stats = NamespaceStats()
+                logger.info(
+                    "Cache namespace cleared", namespace=namespace, entries_removed=size
+                )
+            else:
+                size = sum(len(store.entries) for store in self._namespaces.values())
+                for store in self._namespaces.values():
+                    store.entries.clear()
+                    store.stats = NamespaceStats()
+                self._hits = 0
+                self._misses = 0
+                self._coalesced = 0
+                logger.info("Cache cleared", entries_removed=size)
+
+        if self._backend is not None:
+            prefix = self._backend_key(namespace, "") if namespace is not None else ""
+            await self._backend_call("clear", prefix)
 
     async def cleanup_expired(self) -> int:
         """
-        Remove expired entries from the cache.
+        Remove expired entries from every namespace.
 
         Returns:
             Number of entries removed
         """
         with self._lock:
-            expired_keys = [
-                key for key, entry in self._cache.items() if entry.is_expired()
-            ]
+            removed = 0
+            for store in self._namespaces.values():
+                expired_keys = [
+                    key for key, entry in store.entries.items() if entry.is_expired()
+                ]
+                for key in expired_keys:
+                    del store.entries[key]
+                removed += len(expired_keys)
 
-            for key in expired_keys:
-                del self._cache[key]
-
-            if expired_keys:
-                logger.info(
-                    "Cache cleanup completed", entries_removed=len(expired_keys)
-                )
+            if removed:
+                logger.info("Cache cleanup completed", entries_removed=removed)
 
-            return len(expired_keys)
+            return removed
 
     async def get_stats(self) -> dict[str, Any]:
         """
         Get cache statistics.
 
         Returns:
-            Dictionary with cache statistics
+            Dictionary with aggregate statistics and a per-namespace breakdown
         """
         with self._lock:
             total_requests = self._hits + self._misses
             hit_rate = self._hits / total_requests if total_requests > 0 else 0
 
+            namespaces = {}
+            for name, store in self._namespaces.items():
+                ns_requests = store.stats.hits + store.stats.misses
+                namespaces[name] = {
+                    "hits": store.stats.hits,
+                    "misses": store.stats.misses,
+                    "evictions": store.stats.evictions,
+                    "rejected": store.stats.rejected,
+                    "backend_hits": store.stats.backend_hits,
+                    "refreshes": store.stats.refreshes,
+                    "refresh_failures": store.stats.refresh_failures,
+                    "saved_misses": store.stats.saved_misses,
+                    "early_expirations": store.stats.early_expirations,
+                    "size": len(store.entries),
+                    "max_size": store.policy.max_size,
+                    "ttl_seconds": store.policy.ttl_seconds,
+                    "hit_rate": (
+                        store.stats.hits / ns_requests if ns_requests > 0 else 0
+                    ),
+                }
+
             return {
                 "hits": self._hits,
                 "misses": self._misses,
-                "size": len(self._cache),
+                "size": sum(ns["size"] for ns in namespaces.values()),
                 "max_size": self.max_size,
                 "hit_rate": hit_rate,
                 "total_requests": total_requests,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._in_flight),
+                "refreshes": sum(ns["refreshes"] for ns in namespaces.values()),
+                "saved_misses": sum(ns["saved_misses"] for ns in namespaces.values()),
+                "refresh_queue": (
+                    self._refresh_queue.qsize() if self._refresh_queue else 0
+                ),
+                "refresh_dropped": self._refresh_dropped,
+                "namespaces": namespaces,
             }
 
     def generate_key(self, endpoint: str, params: dict[str, Any] | None = None) -> str:
@@ -266,40 +818,117 @@ class ResponseCache:
 
         return f"{endpoint.split('/')[-1]}_{key_hash}"
 
-    def cached(self, endpoint: str, ttl_seconds: float | None = None) -> Callable:
+    async def get_or_compute(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[T]],
+        ttl_seconds: float | None = None,
+        namespace: str | None = None,
+    ) -> T:
+        """
+        Return the cached value for ``key`` or compute and store it.
+
+        Concurrent callers for the same key share one in-flight computation
+        instead of each calling ``factory``. Falsy and ``None`` results are
+        cached like any other value; exceptions are propagated to every
+        waiter and never cached. ``factory`` is kept with the entry only in
+        namespaces with refresh-ahead enabled, where it recomputes the value.
+
+        Args:
+            key: Cache key
+            factory: Zero-argument coroutine function producing the value
+            ttl_seconds: Optional TTL override
+            namespace: Namespace to use (default namespace if omitted)
+
+        Returns:
+            Cached or freshly computed value
+        """
+        flight_key = (namespace or self.DEFAULT_NAMESPACE, key)
+        while True:
+            value = await self.get(key, _MISSING, namespace=namespace)
+            if value is not _MISSING:
+                return value
+
+            loop = asyncio.get_running_loop()
+            pending = self._in_flight.get(flight_key)
+
+            # Futures are bound to a loop, so only coalesce within the same one
+            if pending is None or pending.get_loop() is not loop:
+                break
+
+            self._coalesced += 1
+            logger.debug("Cache joined in-flight call", key=key)
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if task is not None and task.cancelling():
+                    raise
+                # The leading call was cancelled; retry and possibly lead
+
+        future: asyncio.Future = loop.create_future()
+        self._in_flight[flight_key] = future
+        started = time.monotonic()
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark as retrieved so an unobserved failure is not logged twice
+            future.exception()
+            raise
+        else:
+            with self._lock:
+                refreshable = self._store(namespace)[1].policy.refresh_ahead > 0
+            await self._set(
+                key,
+                result,
+                ttl_seconds,
+                namespace,
+                refresher=factory if refreshable else None,
+                compute_seconds=time.monotonic() - started,
+            )
+            future.set_result(result)
+            return result
+        finally:
+            if self._in_flight.get(flight_key) is future:
+                del self._in_flight[flight_key]
+
+    def cached(
+        self,
+        endpoint: str,
+        ttl_seconds: float | None = None,
+        namespace: str | None = None,
+    ) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
         """
         Decorator to cache async function results.
 
         Args:
             endpoint: Endpoint name for cache key generation
             ttl_seconds: Optional TTL override
+            namespace: Namespace to cache in (default namespace if omitted)
 
         Returns:
             Decorated function
         """
 
-        def decorator(func: Callable) -> Callable:
+        def decorator(func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
             @wraps(func)
-            async def wrapper(*args, **kwargs):
+            async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
                 # Generate cache key from function args and kwargs
                 params = {"args": args, "kwargs": kwargs}
                 cache_key = self.generate_key(endpoint, params)
 
-                # Try to get from cache
-                cached_value = await self.get(cache_key)
-                if cached_value is not None:
-                    logger.debug(
-                        "Cache decorator hit", function=func.__name__, endpoint=endpoint
+                return _detached(
+                    await self.get_or_compute(
+                        cache_key,
+                        lambda: func(*args, **kwargs),
+                        ttl_seconds,
+                        namespace=namespace,
                     )
-                    return cached_value
-
-                # Call the function
-                result = await func(*args, **kwargs)
-
-                # Cache the result
-                await self.set(cache_key, result, ttl_seconds)
-
-                return result
+                )
 
             return wrapper
 
@@ -309,12 +938,84 @@ class ResponseCache:
         """Async context manager entry."""
         return self
 
+    async def close(self) -> None:
+        """Stop background tasks and release the shared backend."""
+        for task in (self._cleanup_task, self._refresh_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._cleanup_task = None
+        self._refresh_task = None
+        if self._backend is not None:
+            await self._backend_call("close")
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit with cleanup."""
-        if self._cleanup_task:
-            self._cleanup_task.cancel()
-            try:
-                await self._cleanup_task
-            except asyncio.CancelledError:
-                pass
+        await self.close()
         await self.cleanup_expired()
+
+
+def cached_method(
+    endpoint: str,
+    ttl_seconds: float | None = None,
+    namespace: str | None = None,
+    cache_attr: str = "_cache",
+) -> Callable[
+    [Callable[Concatenate[S, P], Awaitable[T]]],
+    Callable[Concatenate[S, P], Awaitable[T]],
+]:
+    """
+    Decorator to memoise parsed results of an async client method.
+
+    The cache is looked up on the instance at call time (``self._cache`` by
+    default), so each client keeps its own entries and caching is skipped
+    when the attribute is ``None``. ``self`` is excluded from the key.
+
+    Cached lists, dicts and sets are returned as shallow copies, so a caller
+    sorting or filtering its result in place does not change what the next
+    caller gets.
+
+    Entries hold only a weak reference to the instance, for refresh-ahead
+    to recompute them; the client owns its cache, so an entry never
+    outlives it or keeps it alive.
+
+    Args:
+        endpoint: Endpoint name for cache key generation
+        ttl_seconds: Optional TTL override (namespace TTL if omitted)
+        namespace: Namespace to cache in (default namespace if omitted)
+        cache_attr: Name of the instance attribute holding the ResponseCache
+
+    Returns:
+        Decorated method
+    """
+
+    def decorator(
+        func: Callable[Concatenate[S, P], Awaitable[T]],
+    ) -> Callable[Concatenate[S, P], Awaitable[T]]:
+        @wraps(func)
+        async def wrapper(instance: S, *args: P.args, **kwargs: P.kwargs) -> T:
+            cache: ResponseCache | None = getattr(instance, cache_attr, None)
+            if cache is None:
+                return await func(instance, *args, **kwargs)
+
+            cache_key = cache.generate_key(endpoint, {"args": args, "kwargs": kwargs})
+            owner = weakref.ref(instance)
+
+            async def compute() -> T:
+                current = owner()
+                if current is None:
+                    raise ReferenceError(f"{func.__qualname__}: instance is gone")
+                return await func(current, *args, **kwargs)
+
+            return _detached(
+                await cache.get_or_compute(
+                    cache_key, compute, ttl_seconds, namespace=namespace
+                )
+            )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,826 @@
+"""
+Shared cache backends for ResponseCache.
+
+Provides:
+- CacheBackend protocol used by ResponseCache as a shared (L2) tier
+- In-process backend shared by every cache in the current process
+- Redis-protocol (RESP) backend for multi-node deployments
+- Unix-socket backend plus a small shared-cache daemon for multi-worker
+  deployments on a single host (the daemon speaks the same RESP subset, so
+  it also serves as a local stand-in for Redis in tests)
+
+Entries are stored with their absolute expiry time so that TTL semantics
+are identical whichever backend is used. Remote backends serialise values
+as JSON, so whatever a cache server returns is decoded as data and never
+executed. Besides JSON's own types they round-trip tuples, dicts with
+non-string keys, PointSet and the domain entities clients cache; other
+values fail to encode and stay in the caller's in-process tier only.
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import json
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from threading import Lock
+from typing import Any, Protocol, runtime_checkable
+from urllib.parse import unquote, urlparse
+
+from pydantic import BaseModel, ValidationError
+
+from domain.entities import Bangumi, Coordinates, Point, Route, Station
+from domain.point_set import PointSet
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_KEY_PREFIX = "seichijunrei"
+
+
+class CacheBackendError(Exception):
+    """Raised when a shared cache backend cannot serve a request."""
+
+    pass
+
+
+@runtime_checkable
+class CacheBackend(Protocol):
+    """
+    Storage tier shared between ResponseCache instances.
+
+    Keys are plain strings; values are arbitrary Python objects. ``expires_at``
+    is a Unix timestamp, and entries past it must never be returned.
+    """
+
+    async def get(self, key: str) -> tuple[Any, float] | None:
+        """Return ``(value, expires_at)`` or None if missing/expired."""
+        ...
+
+    async def set(self, key: str, value: Any, expires_at: float) -> None:
+        """Store a value until ``expires_at``."""
+        ...
+
+    async def delete(self, key: str) -> bool:
+        """Delete a key, returning True if it existed."""
+        ...
+
+    async def clear(self, prefix: str = "") -> int:
+        """Delete every key starting with ``prefix``, returning the count."""
+        ...
+
+    async def close(self) -> None:
+        """Release connections held by the backend."""
+        ...
+
+
+class InProcessBackend:
+    """
+    Dictionary-backed backend shared by caches in the same process.
+
+    Useful when several clients (each with its own ResponseCache) live in
+    one worker, and as the reference implementation in tests.
+    """
+
+    def __init__(self, prefix: str = DEFAULT_KEY_PREFIX):
+        """
+        Initialize the in-process backend.
+
+        Args:
+            prefix: Prefix applied to every key
+        """
+        self.prefix = prefix
+        self._entries: dict[str, tuple[Any, float]] = {}
+        self._lock = Lock()
+
+    def _full_key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def get(self, key: str) -> tuple[Any, float] | None:
+        """Return ``(value, expires_at)`` or None if missing/expired."""
+        full_key = self._full_key(key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._entries[full_key]
+                return None
+            return entry
+
+    async def set(self, key: str, value: Any, expires_at: float) -> None:
+        """Store a value until ``expires_at``."""
+        if expires_at <= time.time():
+            return
+        with self._lock:
+            self._entries[self._full_key(key)] = (value, expires_at)
+
+    async def delete(self, key: str) -> bool:
+        """Delete a key, returning True if it existed."""
+        with self._lock:
+            return self._entries.pop(self._full_key(key), None) is not None
+
+    async def clear(self, prefix: str = "") -> int:
+        """Delete every key starting with ``prefix``, returning the count."""
+        full_prefix = self._full_key(prefix)
+        with self._lock:
+            keys = [k for k in self._entries if k.startswith(full_prefix)]
+            for k in keys:
+                del self._entries[k]
+            return len(keys)
+
+    async def close(self) -> None:
+        """Nothing to release for the in-process backend."""
+        return None
+
+
+# === Value serialisation ===
+
+# Key marking an encoded non-JSON value: {"__type__": tag, "value": ...}
+_TYPE_KEY = "__type__"
+
+_MODEL_TYPES: dict[str, type[BaseModel]] = {
+    cls.__name__: cls for cls in (Bangumi, Coordinates, Point, Route, Station)
+}
+
+_DECODERS: dict[str, Callable[[Any], Any]] = {
+    "tuple": lambda items: tuple(_decode_value(item) for item in items),
+    "dict": lambda items: {
+        _decode_value(key): _decode_value(value) for key, value in items
+    },
+    "PointSet": PointSet.from_json_columns,
+    **{
+        name: (lambda data, cls=cls: cls.model_validate(data))
+        for name, cls in _MODEL_TYPES.items()
+    },
+}
+
+
+def _tagged(tag: str, value: Any) -> dict[str, Any]:
+    return {_TYPE_KEY: tag, "value": value}
+
+
+def _encode_value(value: Any) -> Any:
+    """
+    Convert a cached value to JSON-compatible data.
+
+    Raises:
+        TypeError: If the value (or anything inside it) has no encoding
+    """
+    if value is None or isinstance(value, str | bool | int | float):
+        return value
+    if isinstance(value, list):
+        return [_encode_value(item) for item in value]
+    if isinstance(value, tuple):
+        return _tagged("tuple", [_encode_value(item) for item in value])
+    if isinstance(value, dict):
+        if _TYPE_KEY not in value and all(isinstance(key, str) for key in value):
+            return {key: _encode_value(item) for key, item in value.items()}
+        return _tagged(
+            "dict",
+            [[_encode_value(key), _encode_value(item)] for key, item in value.items()],
+        )
+    if isinstance(value, PointSet):
+        return _tagged("PointSet", value.to_json_columns())
+    if _MODEL_TYPES.get(type(value).__name__) is type(value):
+        return _tagged(type(value).__name__, value.model_dump(mode="json"))
+    raise TypeError(f"Cannot store {type(value).__name__} in a shared cache")
+
+
+def _decode_value(data: Any) -> Any:
+    """Rebuild a value encoded by _encode_value."""
+    if isinstance(data, list):
+        return [_decode_value(item) for item in data]
+    if not isinstance(data, dict):
+        return data
+    if _TYPE_KEY in data:
+        return _DECODERS[data[_TYPE_KEY]](data["value"])
+    return {key: _decode_value(item) for key, item in data.items()}
+
+
+def dumps_entry(value: Any, expires_at: float) -> bytes:
+    """
+    Serialise a cache entry for a remote backend.
+
+    Args:
+        value: Cached value
+        expires_at: Unix timestamp the entry expires at
+
+    Returns:
+        UTF-8 JSON payload
+
+    Raises:
+        TypeError: If the value cannot be encoded
+    """
+    return json.dumps(
+        [expires_at, _encode_value(value)], ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def loads_entry(raw: bytes) -> tuple[Any, float]:
+    """
+    Parse a payload written by dumps_entry().
+
+    Args:
+        raw: Payload read from the backend
+
+    Returns:
+        ``(value, expires_at)``
+
+    Raises:
+        CacheBackendError: If the payload is not a valid entry
+    """
+    try:
+        expires_at, data = json.loads(raw)
+        return _decode_value(data), float(expires_at)
+    except (
+        ValueError,
+        TypeError,
+        KeyError,
+        IndexError,
+        UnicodeDecodeError,
+        ValidationError,
+    ) as e:
+        raise CacheBackendError(f"Invalid cache entry: {e}") from e
+
+
+# === RESP (Redis serialization protocol) helpers ===
+
+
+class _RespError(CacheBackendError):
+    """Error reply sent by the server (the connection stays usable)."""
+
+    pass
+
+
+def _encode_command(*args: str | bytes | int) -> bytes:
+    """Encode a command as a RESP array of bulk strings."""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif isinstance(arg, int):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    """Read one RESP reply from the stream."""
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed by cache server")
+
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        raise _RespError(payload.decode())
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length == -1:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        length = int(payload)
+        if length == -1:
+            return None
+        return [await _read_reply(reader) for _ in range(length)]
+    raise CacheBackendError(f"Unexpected RESP reply: {line!r}")
+
+
+def _escape_glob(value: str) -> str:
+    """Escape glob metacharacters for a Redis MATCH pattern."""
+    for char in "\\*?[]":
+        value = value.replace(char, f"\\{char}")
+    return value
+
+
+class RedisBackend:
+    """
+    Backend speaking the Redis protocol over TCP or a Unix socket.
+
+    Uses a single lazily-opened connection per event loop; requests are
+    serialised over it. Works against Redis itself or the bundled
+    SharedCacheServer.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: str | None = None,
+        unix_path: str | None = None,
+        prefix: str = DEFAULT_KEY_PREFIX,
+        timeout: float = 2.0,
+    ):
+        """
+        Initialize the Redis-protocol backend.
+
+        Args:
+            host: Server host (ignored when unix_path is set)
+            port: Server port (ignored when unix_path is set)
+            db: Database index selected after connecting
+            password: Optional password sent with AUTH
+            unix_path: Connect over this Unix socket instead of TCP
+            prefix: Prefix applied to every key
+            timeout: Per-request timeout in seconds
+        """
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.unix_path = unix_path
+        self.prefix = prefix
+        self.timeout = timeout
+
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = DEFAULT_KEY_PREFIX) -> "RedisBackend":
+        """
+        Create a backend from a ``redis://[:password@]host[:port][/db]`` URL.
+
+        Args:
+            url: Redis URL
+            prefix: Prefix applied to every key
+
+        Returns:
+            Configured RedisBackend
+        """
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported Redis URL scheme: {parsed.scheme}")
+
+        db_path = parsed.path.lstrip("/")
+        return cls(
+            host=parsed.hostname or "localhost",
+            port=parsed.port or 6379,
+            db=int(db_path) if db_path else 0,
+            password=unquote(parsed.password) if parsed.password else None,
+            prefix=prefix,
+        )
+
+    def _full_key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def _connect(self) -> None:
+        """Open the connection and run AUTH/SELECT if configured."""
+        if self.unix_path:
+            reader, writer = await asyncio.open_unix_connection(self.unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        self._reader, self._writer = reader, writer
+
+        if self.password:
+            await self._roundtrip("AUTH", self.password)
+        if self.db:
+            await self._roundtrip("SELECT", self.db)
+
+    async def _roundtrip(self, *args: str | bytes | int) -> Any:
+        """Send one command on the open connection and read its reply."""
+        assert self._reader is not None and self._writer is not None
+        self._writer.write(_encode_command(*args))
+        await self._writer.drain()
+        return await _read_reply(self._reader)
+
+    def _drop_connection(self) -> None:
+        """Forget the current connection so the next call reconnects."""
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except RuntimeError:
+                # Transport belongs to a loop that is already closed
+                pass
+        self._reader = None
+        self._writer = None
+
+    async def execute(self, *args: str | bytes | int) -> Any:
+        """
+        Execute a command, connecting (or reconnecting) as needed.
+
+        Args:
+            *args: Command name and arguments
+
+        Returns:
+            Decoded RESP reply
+
+        Raises:
+            CacheBackendError: On connection failure or error reply
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Streams and locks are bound to the loop that created them
+            self._drop_connection()
+            self._loop = loop
+            self._lock = asyncio.Lock()
+
+        assert self._lock is not None
+        async with self._lock:
+            try:
+                async with asyncio.timeout(self.timeout):
+                    if self._writer is None:
+                        await self._connect()
+                    return await self._roundtrip(*args)
+            except _RespError:
+                raise
+            except (OSError, ConnectionError, TimeoutError, EOFError) as e:
+                self._drop_connection()
+                raise CacheBackendError(f"Cache server unavailable: {e}") from e
+
+    async def get(self, key: str) -> tuple[Any, float] | None:
+        """Return ``(value, expires_at)`` or None if missing/expired."""
+        raw = await self.execute("GET", self._full_key(key))
+        if raw is None:
+            return None
+        value, expires_at = loads_entry(raw)
+        if expires_at <= time.time():
+            return None
+        return value, expires_at
+
+    async def set(self, key: str, value: Any, expires_at: float) -> None:
+        """Store a value until ``expires_at``."""
+        ttl_ms = int((expires_at - time.time()) * 1000)
+        if ttl_ms <= 0:
+            return
+        payload = dumps_entry(value, expires_at)
+        await self.execute("SET", self._full_key(key), payload, "PX", ttl_ms)
+
+    async def delete(self, key: str) -> bool:
+        """Delete a key, returning True if it existed."""
+        return bool(await self.execute("DEL", self._full_key(key)))
+
+    async def clear(self, prefix: str = "") -> int:
+        """Delete every key starting with ``prefix``, returning the count."""
+        pattern = _escape_glob(self._full_key(prefix)) + "*"
+        removed = 0
+        cursor = b"0"
+        while True:
+            cursor, keys = await self.execute(
+                "SCAN", cursor, "MATCH", pattern, "COUNT", 500
+            )
+            if keys:
+                removed += await self.execute("DEL", *keys)
+            if cursor in (b"0", "0"):
+                return removed
+
+    async def close(self) -> None:
+        """Close the connection if one is open on the running loop."""
+        writer = self._writer
+        self._drop_connection()
+        if writer is not None and self._loop is asyncio.get_running_loop():
+            try:
+                await writer.wait_closed()
+            except (OSError, ConnectionError):
+                pass
+
+
+class UnixSocketBackend(RedisBackend):
+    """Backend talking to a SharedCacheServer over a local Unix socket."""
+
+    def __init__(
+        self,
+        socket_path: str,
+        prefix: str = DEFAULT_KEY_PREFIX,
+        timeout: float = 2.0,
+    ):
+        """
+        Initialize the Unix-socket backend.
+
+        Args:
+            socket_path: Path of the daemon's Unix socket
+            prefix: Prefix applied to every key
+            timeout: Per-request timeout in seconds
+        """
+        super().__init__(unix_path=socket_path, prefix=prefix, timeout=timeout)
+
+
+# === Shared cache daemon ===
+
+
+class SharedCacheServer:
+    """
+    Minimal RESP server holding cache entries for co-located workers.
+
+    Supports the subset of commands used by RedisBackend and the shared
+    rate limiter: PING, AUTH, SELECT, GET, SET (with EX/PX), INCRBY, DECRBY,
+    PEXPIRE, DEL, SCAN, DBSIZE and FLUSHDB. Listens
+    on a Unix socket, or on TCP when no socket path is given.
+
+    Holds at most max_entries keys, evicting the least recently used beyond
+    that (like Redis' allkeys-lru), and sweeps expired keys periodically
+    so entries nobody reads again do not linger until evicted.
+    """
+
+    def __init__(
+        self,
+        socket_path: str | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        max_entries: int = 100_000,
+        sweep_interval_seconds: float = 60.0,
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            socket_path: Unix socket path to listen on
+            host: TCP host used when socket_path is not set
+            port: TCP port used when socket_path is not set (0 = ephemeral)
+            max_entries: Keys held before the least recently used is evicted
+            sweep_interval_seconds: Seconds between expired-key sweeps
+        """
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.max_entries = max_entries
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.evictions = 0
+
+        # key -> (value, expires_at or None), least recently used first
+        self._data: OrderedDict[bytes, tuple[bytes, float | None]] = OrderedDict()
+        self._server: asyncio.AbstractServer | None = None
+        self._sweeper: asyncio.Task | None = None
+        self._connections: set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> None:
+        """Start listening for connections."""
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection, path=self.socket_path
+            )
+            # Only the owning user may read or write cache entries
+            os.chmod(self.socket_path, 0o600)
+        else:
+            self._server = await asyncio.start_server(
+                self._handle_connection, self.host, self.port
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+        self._sweeper = asyncio.create_task(self._sweep_periodically())
+
+        logger.info(
+            "Shared cache server started",
+            socket_path=self.socket_path,
+            host=None if self.socket_path else self.host,
+            port=None if self.socket_path else self.port,
+            max_entries=self.max_entries,
+        )
+
+    async def serve_forever(self) -> None:
+        """Start (if needed) and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop the server and drop every client connection."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def __aenter__(self) -> "SharedCacheServer":
+        """Async context manager entry."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Async context manager exit."""
+        await self.close()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve commands from one client until it disconnects."""
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    command = await _read_reply(reader)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    break
+                if not isinstance(command, list) or not command:
+                    writer.write(b"-ERR invalid request\r\n")
+                else:
+                    try:
+                        writer.write(self._dispatch(command))
+                    except (ValueError, IndexError):
+                        writer.write(b"-ERR syntax error\r\n")
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    def sweep(self) -> int:
+        """
+        Drop every expired key.
+
+        Returns:
+            Number of keys removed
+        """
+        now = time.time()
+        expired = [
+            key
+            for key, (_, expires_at) in self._data.items()
+            if expires_at is not None and expires_at <= now
+        ]
+        for key in expired:
+            del self._data[key]
+        return len(expired)
+
+    async def _sweep_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            removed = self.sweep()
+            if removed:
+                logger.debug(
+                    "Shared cache swept", removed=removed, size=len(self._data)
+                )
+
+    def _store(self, key: bytes, value: bytes, expires_at: float | None) -> None:
+        """Write key as most recently used, evicting beyond max_entries."""
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def _live(self, key: bytes, touch: bool = True) -> bytes | None:
+        """
+        Return the value for key unless it has expired.
+
+        Args:
+            key: Key to read
+            touch: Mark the key as recently used (False for scans)
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._data[key]
+            return None
+        if touch:
+            self._data.move_to_end(key)
+        return value
+
+    def _dispatch(self, command: list[bytes]) -> bytes:
+        """Execute one command and return its encoded reply."""
+        name = command[0].upper()
+        args = command[1:]
+
+        if name == b"PING":
+            return b"+PONG\r\n"
+        if name in (b"AUTH", b"SELECT"):
+            return b"+OK\r\n"
+        if name == b"GET" and len(args) == 1:
+            value = self._live(args[0])
+            if value is None:
+                return b"$-1\r\n"
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if name == b"SET" and len(args) >= 2:
+            expires_at = None
+            options = [a.upper() for a in args[2:]]
+            if b"PX" in options:
+                expires_at = (
+                    time.time() + int(args[2 + options.index(b"PX") + 1]) / 1000
+                )
+            elif b"EX" in options:
+                expires_at = time.time() + int(args[2 + options.index(b"EX") + 1])
+            self._store(args[0], args[1], expires_at)
+            return b"+OK\r\n"
+        if name in (b"INCRBY", b"DECRBY") and len(args) == 2:
+            step = int(args[1]) if name == b"INCRBY" else -int(args[1])
+            value = self._live(args[0])
+            expires_at = self._data[args[0]][1] if value is not None else None
+            count = int(value or 0) + step
+            self._store(args[0], str(count).encode(), expires_at)
+            return b":%d\r\n" % count
+        if name == b"PEXPIRE" and len(args) == 2:
+            value = self._live(args[0])
+            if value is None:
+                return b":0\r\n"
+            self._data[args[0]] = (value, time.time() + int(args[1]) / 1000)
+            return b":1\r\n"
+        if name == b"DEL":
+            removed = sum(1 for key in args if self._data.pop(key, None) is not None)
+            return b":%d\r\n" % removed
+        if name == b"SCAN" and args:
+            pattern = b"*"
+            if b"MATCH" in [a.upper() for a in args]:
+                pattern = args[[a.upper() for a in args].index(b"MATCH") + 1]
+            matcher = pattern.decode()
+            keys = [
+                key
+                for key in list(self._data)
+                if self._live(key, touch=False) is not None
+                and fnmatch.fnmatchcase(key.decode(errors="replace"), matcher)
+            ]
+            # Single-pass scan: always return the terminal cursor
+            reply = [b"*2\r\n$1\r\n0\r\n", b"*%d\r\n" % len(keys)]
+            reply.extend(b"$%d\r\n%s\r\n" % (len(key), key) for key in keys)
+            return b"".join(reply)
+        if name == b"DBSIZE":
+            return b":%d\r\n" % sum(
+                1 for key in list(self._data) if self._live(key, touch=False)
+            )
+        if name == b"FLUSHDB":
+            self._data.clear()
+            return b"+OK\r\n"
+        return b"-ERR unknown command or wrong number of arguments\r\n"
+
+
+# === Factory ===
+
+_shared_in_process_backend: InProcessBackend | None = None
+
+
+def create_cache_backend(
+    url: str | None, prefix: str = DEFAULT_KEY_PREFIX
+) -> CacheBackend | None:
+    """
+    Create a shared cache backend from a URL.
+
+    Supported URLs:
+    - ``""`` / None: no shared backend (in-process L1 only)
+    - ``memory://``: process-wide InProcessBackend
+    - ``unix:///path/to/socket``: UnixSocketBackend
+    - ``redis://[:password@]host[:port][/db]``: RedisBackend
+
+    Args:
+        url: Backend URL
+        prefix: Prefix applied to every key
+
+    Returns:
+        Backend instance or None
+
+    Raises:
+        ValueError: On an unsupported URL
+    """
+    global _shared_in_process_backend
+
+    if not url:
+        return None
+
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        if _shared_in_process_backend is None:
+            _shared_in_process_backend = InProcessBackend(prefix=prefix)
+        return _shared_in_process_backend
+    if parsed.scheme == "unix":
+        return UnixSocketBackend(parsed.path, prefix=prefix)
+    if parsed.scheme == "redis":
+        return RedisBackend.from_url(url, prefix=prefix)
+
+    raise ValueError(f"Unsupported cache backend URL: {url}")
+
+
+def main() -> None:
+    """Run the shared cache daemon from the command line."""
+    parser = argparse.ArgumentParser(description="Seichijunrei shared cache daemon")
+    parser.add_argument("--socket", help="Unix socket path to listen on")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host")
+    parser.add_argument("--port", type=int, default=6390, help="TCP port")
+    parser.add_argument(
+        "--max-entries",
+        type=int,
+        default=100_000,
+        help="Keys held before least recently used ones are evicted",
+    )
+    args = parser.parse_args()
+
+    server = SharedCacheServer(
+        socket_path=args.socket,
+        host=args.host,
+        port=args.port,
+        max_entries=args.max_entries,
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
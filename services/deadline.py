@@ -0,0 +1,109 @@
+"""
+Request-scoped latency budgets.
+
+Provides:
+- A contextvar holding the absolute deadline of the current user request
+- deadline() context manager and start_deadline()/clear_deadline() for
+  entry points that cannot use a ``with`` block (e.g. agent callbacks)
+- remaining_budget() and check_deadline() for honouring it on each hop
+
+The deadline is set once at the root of a request and read wherever work
+may block: HTTP calls, rate limiter waits and retry backoff. Nested
+deadlines can only shorten the budget, never extend it.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+
+# Absolute time.monotonic() deadline of the current request, if any
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when work cannot finish within the current request's budget."""
+
+    pass
+
+
+def remaining_budget() -> float | None:
+    """
+    Get the time left before the current deadline.
+
+    Returns:
+        Seconds remaining (may be negative once passed), or None when no
+        deadline is set
+    """
+    deadline_at = _deadline.get()
+    if deadline_at is None:
+        return None
+    return deadline_at - time.monotonic()
+
+
+def check_deadline(operation: str) -> float | None:
+    """
+    Fail fast if the current deadline has passed.
+
+    Args:
+        operation: What is about to run, for the error message
+
+    Returns:
+        Seconds remaining, or None when no deadline is set
+
+    Raises:
+        DeadlineExceeded: If the deadline has already passed
+    """
+    remaining = remaining_budget()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(
+            f"Deadline exceeded by {-remaining:.2f}s before {operation}"
+        )
+    return remaining
+
+
+def start_deadline(seconds: float) -> Token:
+    """
+    Set a deadline ``seconds`` from now in the current context.
+
+    An existing, earlier deadline is kept.
+
+    Args:
+        seconds: Latency budget in seconds
+
+    Returns:
+        Token for clear_deadline()
+    """
+    deadline_at = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline_at = min(current, deadline_at)
+    return _deadline.set(deadline_at)
+
+
+def clear_deadline(token: Token | None = None) -> None:
+    """
+    Restore the deadline that was active before start_deadline().
+
+    Args:
+        token: Token returned by start_deadline(); clears any deadline if None
+    """
+    if token is None:
+        _deadline.set(None)
+    else:
+        _deadline.reset(token)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Run a block under a latency budget of ``seconds``.
+
+    Args:
+        seconds: Latency budget in seconds
+    """
+    token = start_deadline(seconds)
+    try:
+        yield
+    finally:
+        clear_deadline(token)
@@ -0,0 +1,112 @@
+"""
+Geo-aware reuse of cached radius-search results.
+
+Provides:
+- RadiusCoverage: which search radii are cached around each snapped
+  centre, so a smaller-radius query can be answered from a larger one
+- within_radius(): cut a /near response down to a smaller radius
+
+Centres are snapped to a grid before querying, so searches from nearby
+coordinates (the same station looked up twice, a user nudging a map) are the
+same query. The snapped centre is what is sent upstream, which keeps reused
+answers exact: every item's distance is measured from that centre, and the
+disc of a smaller radius lies entirely inside the disc of a larger one.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any
+
+
+class RadiusCoverage:
+    """
+    Registry of cached radii per snapped centre, with LRU eviction.
+
+    The registry only says where to look; the results themselves live in the
+    response cache, which may have expired or evicted them since.
+    """
+
+    def __init__(self, grid_degrees: float = 0.002, max_centres: int = 1000):
+        """
+        Create an empty registry.
+
+        Args:
+            grid_degrees: Snapping grid in degrees (0 disables snapping)
+            max_centres: Centres remembered before the least recently used
+                is forgotten
+        """
+        if grid_degrees < 0:
+            raise ValueError("grid_degrees must not be negative")
+        self.grid_degrees = grid_degrees
+        self.max_centres = max_centres
+        self._radii: OrderedDict[tuple[float, float], set[int]] = OrderedDict()
+        self._lock = Lock()
+
+    def snap(self, lat: float, lng: float) -> tuple[float, float]:
+        """
+        Centre of the grid cell containing a coordinate.
+
+        Args:
+            lat: Latitude in degrees
+            lng: Longitude in degrees
+
+        Returns:
+            Snapped ``(lat, lng)``, rounded to 6 decimals so equal cells give
+            equal cache keys
+        """
+        if not self.grid_degrees:
+            return lat, lng
+        grid = self.grid_degrees
+        return round(round(lat / grid) * grid, 6), round(round(lng / grid) * grid, 6)
+
+    def covering(self, centre: tuple[float, float], radius_m: int) -> list[int]:
+        """
+        Cached radii around ``centre`` that contain ``radius_m``.
+
+        Returns:
+            Radii of at least ``radius_m``, smallest (cheapest to filter)
+            first
+        """
+        with self._lock:
+            radii = self._radii.get(centre)
+            if radii is None:
+                return []
+            self._radii.move_to_end(centre)
+            return sorted(r for r in radii if r >= radius_m)
+
+    def add(self, centre: tuple[float, float], radius_m: int) -> None:
+        """Record that a result for ``radius_m`` around ``centre`` was cached."""
+        with self._lock:
+            self._radii.setdefault(centre, set()).add(radius_m)
+            self._radii.move_to_end(centre)
+            while len(self._radii) > self.max_centres:
+                self._radii.popitem(last=False)
+
+    def discard(self, centre: tuple[float, float], radius_m: int) -> None:
+        """Forget a radius whose cached result is gone."""
+        with self._lock:
+            radii = self._radii.get(centre)
+            if radii is None:
+                return
+            radii.discard(radius_m)
+            if not radii:
+                del self._radii[centre]
+
+
+def within_radius(response: dict[str, Any], radius_km: float) -> dict[str, Any] | None:
+    """
+    Narrow a /near response to items within ``radius_km``.
+
+    Args:
+        response: /near response for the same centre and a larger radius
+        radius_km: Smaller radius to keep
+
+    Returns:
+        A response in the same shape, or None if some item has no numeric
+        distance (so containment cannot be decided locally)
+    """
+    items = response.get("data") or []
+    if not all(isinstance(item.get("distance"), int | float) for item in items):
+        return None
+    kept = [item for item in items if item["distance"] <= radius_km]
+    return {**response, "data": kept, "total": len(kept)}
@@ -0,0 +1,570 @@
+"""
+On-disk cache of point screenshots.
+
+Provides:
+- ImageCache: fetches images once, stores them by content hash with a
+  downscaled thumbnail, and revalidates them with conditional requests
+- ImageCacheStats: hit, revalidation and download counts, bytes saved and
+  fetch latency
+- PrefetchReport: outcome of one prefetch run, by URL
+- A command-line entry point that prefetches the screenshots of bangumi
+
+Points link to screenshots on image.anitabi.cn, and every client showing a
+point fetches the same images again. Prefetching the screenshots of the
+points a user is about to see lets them be served from a local file (or a
+local endpoint that serves the cache directory) instead.
+
+Layout under the cache directory::
+
+    index.sqlite                   url -> digest, validators, fetch time
+    originals/ab/<sha256>.jpg      image bytes, named by their content hash
+    thumbnails/ab/<sha256>.jpg     downscaled copy (needs Pillow)
+
+Content addressing means the same screenshot reachable under several URLs
+(with and without ``?plan=``, say) is stored once. Entries older than
+``max_age_seconds`` are revalidated with If-None-Match / If-Modified-Since,
+so an unchanged image costs a 304 rather than its bytes.
+
+Thumbnails need Pillow (``pip install seichijunrei[images]``). Without it
+originals are still cached and ``thumbnail`` is None.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import os
+import sqlite3
+import tempfile
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+from aiohttp import ClientError, ClientTimeout
+
+from domain.entities import APIError, Point
+from utils.logger import get_logger
+
+try:
+    from PIL import Image
+except ImportError:  # Optional: the "images" extra
+    Image = None
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_AGE_SECONDS = 7 * 24 * 3600
+DEFAULT_THUMBNAIL_HEIGHT = 160
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    url TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    suffix TEXT NOT NULL,
+    content_type TEXT,
+    size INTEGER NOT NULL,
+    has_thumbnail INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    checked_at REAL NOT NULL
+)
+"""
+
+_SUFFIXES = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
+
+
+@dataclass(frozen=True)
+class CachedImage:
+    """A cached image and where its files are."""
+
+    url: str
+    digest: str  # sha256 of the original bytes
+    path: Path
+    thumbnail: Path | None
+    size: int
+    content_type: str | None = None
+
+
+@dataclass
+class ImageCacheStats:
+    """Counters since the cache was opened."""
+
+    hits: int = 0  # Served from disk without a request
+    revalidated: int = 0  # 304: the stored copy is still current
+    downloaded: int = 0  # Full bodies fetched
+    deduplicated: int = 0  # Downloads whose content was already stored
+    failed: int = 0
+    bytes_downloaded: int = 0
+    bytes_saved: int = 0  # Image bytes served without downloading them
+    fetch_seconds: list[float] = field(default_factory=list)
+
+    def summary(self) -> dict[str, Any]:
+        """Counters with fetch latency percentiles, for logs and reports."""
+        timings = sorted(self.fetch_seconds)
+
+        def percentile(share: float) -> float:
+            if not timings:
+                return 0.0
+            return timings[min(len(timings) - 1, int(share * len(timings)))]
+
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "downloaded": self.downloaded,
+            "deduplicated": self.deduplicated,
+            "failed": self.failed,
+            "bytes_downloaded": self.bytes_downloaded,
+            "bytes_saved": self.bytes_saved,
+            "fetch_ms_mean": round(
+                sum(timings) / len(timings) * 1000 if timings else 0.0, 1
+            ),
+            "fetch_ms_p50": round(percentile(0.5) * 1000, 1),
+            "fetch_ms_p95": round(percentile(0.95) * 1000, 1),
+        }
+
+
+@dataclass
+class PrefetchReport:
+    """Outcome of one prefetch run, by URL."""
+
+    downloaded: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)  # Revalidated (304)
+    cached: list[str] = field(default_factory=list)  # Fresh on disk already
+    failed: list[str] = field(default_factory=list)
+
+
+class ImageCache:
+    """
+    Content-addressed image files with a SQLite index.
+
+    Index reads and writes are small local queries made on the event loop;
+    hashing, file writes and thumbnailing run in a worker thread.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        max_concurrency: int = 8,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        thumbnail_height: int = DEFAULT_THUMBNAIL_HEIGHT,
+        timeout: int = 30,
+        session: aiohttp.ClientSession | None = None,
+    ):
+        """
+        Open (or create) an image cache.
+
+        Args:
+            root: Cache directory
+            max_concurrency: Maximum downloads in flight at once
+            max_age_seconds: Age after which an entry is revalidated
+            thumbnail_height: Height thumbnails are scaled down to, in pixels
+            timeout: Per-download timeout in seconds
+            session: Optional aiohttp session to use
+        """
+        self.root = Path(root)
+        self.max_age_seconds = max_age_seconds
+        self.thumbnail_height = thumbnail_height
+        self.timeout = timeout
+        self.stats = ImageCacheStats()
+
+        (self.root / "originals").mkdir(parents=True, exist_ok=True)
+        (self.root / "thumbnails").mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.root / "index.sqlite")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session = session
+        self._owns_session = session is None
+        # Concurrent requests for one URL share a single fetch
+        self._in_flight: dict[str, asyncio.Future[tuple[CachedImage, str]]] = {}
+
+        if Image is None:
+            logger.info("Pillow not installed; caching images without thumbnails")
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+
+    def _original_path(self, digest: str, suffix: str) -> Path:
+        return self.root / "originals" / digest[:2] / f"{digest}{suffix}"
+
+    def _thumbnail_path(self, digest: str) -> Path:
+        return self.root / "thumbnails" / digest[:2] / f"{digest}.jpg"
+
+    def _lookup(self, url: str) -> tuple[CachedImage, dict[str, Any]] | None:
+        """Index entry for a URL, if its file is still on disk."""
+        row = self._conn.execute(
+            "SELECT digest, suffix, content_type, size, has_thumbnail, etag, "
+            "last_modified, checked_at FROM images WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        digest, suffix, content_type, size, has_thumbnail, *validators = row
+        path = self._original_path(digest, suffix)
+        if not path.exists():
+            return None
+        image = CachedImage(
+            url=url,
+            digest=digest,
+            path=path,
+            thumbnail=self._thumbnail_path(digest) if has_thumbnail else None,
+            size=size,
+            content_type=content_type,
+        )
+        etag, last_modified, checked_at = validators
+        return image, {
+            "etag": etag,
+            "last_modified": last_modified,
+            "checked_at": checked_at,
+        }
+
+    def local_path(self, url: str, thumbnail: bool = False) -> Path | None:
+        """
+        Local file for an image URL, without any network access.
+
+        Args:
+            url: Image URL as it appears on the point
+            thumbnail: Return the downscaled copy instead of the original
+
+        Returns:
+            Path to the file, or None if the image is not cached (or has no
+            thumbnail)
+        """
+        entry = self._lookup(url)
+        if entry is None:
+            return None
+        image = entry[0]
+        return image.thumbnail if thumbnail else image.path
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                timeout=ClientTimeout(total=self.timeout),
+                headers={"User-Agent": "Seichijunrei/1.0"},
+            )
+        return self._session
+
+    async def _download(
+        self, url: str, headers: dict[str, str]
+    ) -> tuple[int, bytes, Mapping[str, str]]:
+        """
+        GET an image.
+
+        Returns:
+            (status, body, response headers); the body is empty for a 304,
+            and header lookups are case-insensitive
+
+        Raises:
+            APIError: On a failed request or an error status
+        """
+        session = await self._get_session()
+        try:
+            async with session.get(url, headers=headers) as response:
+                body = b"" if response.status == 304 else await response.read()
+                if response.status >= 400:
+                    raise APIError(
+                        f"Image request failed with status {response.status}"
+                    )
+                return response.status, body, response.headers
+        except TimeoutError as e:
+            raise APIError(f"Image request timeout after {self.timeout} seconds") from e
+        except ClientError as e:
+            raise APIError(f"Image request failed: {str(e)}") from e
+
+    def _store(
+        self, body: bytes, content_type: str | None, url: str
+    ) -> tuple[CachedImage, bool]:
+        """
+        Write the original and its thumbnail (runs in a worker thread).
+
+        Returns:
+            The image, and whether its content was already stored
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        suffix = _SUFFIXES.get((content_type or "").split(";")[0].strip())
+        if suffix is None:
+            suffix = Path(url.split("?")[0]).suffix.lower() or ".bin"
+
+        path = self._original_path(digest, suffix)
+        deduplicated = path.exists()
+        if not deduplicated:
+            _write_atomic(path, body)
+
+        thumbnail = self._thumbnail_path(digest)
+        if not thumbnail.exists():
+            data = self._make_thumbnail(body)
+            if data is None:
+                thumbnail = None
+            else:
+                _write_atomic(thumbnail, data)
+
+        image = CachedImage(url, digest, path, thumbnail, len(body), content_type)
+        return image, deduplicated
+
+    def _make_thumbnail(self, body: bytes) -> bytes | None:
+        """JPEG scaled down to thumbnail_height, or None if not possible."""
+        if Image is None:
+            return None
+        try:
+            with Image.open(io.BytesIO(body)) as image:
+                # JPEGs can be decoded straight at a fraction of full size
+                image.draft("RGB", (image.width, self.thumbnail_height))
+                image.thumbnail((image.width, self.thumbnail_height))
+                out = io.BytesIO()
+                image.convert("RGB").save(out, "JPEG", quality=80, optimize=True)
+                return out.getvalue()
+        except (OSError, ValueError) as e:
+            logger.warning("Could not thumbnail image", error=str(e))
+            return None
+
+    def _record(
+        self, image: CachedImage, etag: str | None, last_modified: str | None
+    ) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                image.url,
+                image.digest,
+                image.path.suffix,
+                image.content_type,
+                image.size,
+                image.thumbnail is not None,
+                etag,
+                last_modified,
+                time.time(),
+            ),
+        )
+        self._conn.commit()
+
+    async def get(self, url: str, revalidate: bool = False) -> CachedImage:
+        """
+        Cached copy of an image, fetching or revalidating it if needed.
+
+        Args:
+            url: Image URL
+            revalidate: Check with the upstream even if the entry is fresh
+
+        Returns:
+            CachedImage with local paths
+
+        Raises:
+            APIError: If the image is not cached and cannot be fetched
+        """
+        image, _ = await self._get(url, revalidate)
+        return image
+
+    async def _get(self, url: str, revalidate: bool) -> tuple[CachedImage, str]:
+        """The image and "cached", "unchanged" or "downloaded"."""
+        entry = self._lookup(url)
+        if entry is not None and not revalidate:
+            image, validators = entry
+            if time.time() - validators["checked_at"] < self.max_age_seconds:
+                self.stats.hits += 1
+                self.stats.bytes_saved += image.size
+                return image, "cached"
+
+        pending = self._in_flight.get(url)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future: asyncio.Future[tuple[CachedImage, str]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._in_flight[url] = future
+        try:
+            result = await self._fetch(url, entry)
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the error retrieved; there may be no other waiter
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._in_flight[url]
+
+    async def _fetch(
+        self, url: str, entry: tuple[CachedImage, dict[str, Any]] | None
+    ) -> tuple[CachedImage, str]:
+        headers = {}
+        if entry is not None:
+            if entry[1]["etag"]:
+                headers["If-None-Match"] = entry[1]["etag"]
+            if entry[1]["last_modified"]:
+                headers["If-Modified-Since"] = entry[1]["last_modified"]
+
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                status, body, response_headers = await self._download(url, headers)
+            except APIError:
+                self.stats.failed += 1
+                raise
+            finally:
+                self.stats.fetch_seconds.append(time.perf_counter() - start)
+
+        if status == 304 and entry is not None:
+            image = entry[0]
+            self._conn.execute(
+                "UPDATE images SET checked_at = ? WHERE url = ?", (time.time(), url)
+            )
+            self._conn.commit()
+            self.stats.revalidated += 1
+            self.stats.bytes_saved += image.size
+            return image, "unchanged"
+        if not body:
+            self.stats.failed += 1
+            raise APIError(f"Empty image response (status {status}) for {url}")
+
+        image, deduplicated = await asyncio.to_thread(
+            self._store, body, response_headers.get("Content-Type"), url
+        )
+        self._record(
+            image, response_headers.get("ETag"), response_headers.get("Last-Modified")
+        )
+        self.stats.downloaded += 1
+        self.stats.deduplicated += deduplicated
+        self.stats.bytes_downloaded += len(body)
+        return image, "downloaded"
+
+    async def prefetch(
+        self, urls: Iterable[str], revalidate: bool = False
+    ) -> PrefetchReport:
+        """
+        Make sure images are cached, at most max_concurrency fetches at once.
+
+        Failures are logged and reported, never raised, so one broken link
+        does not stop the rest.
+
+        Args:
+            urls: Image URLs (duplicates are fetched once)
+            revalidate: Check every entry with the upstream, even fresh ones
+
+        Returns:
+            PrefetchReport listing what happened to each URL
+        """
+        report = PrefetchReport()
+
+        async def prefetch_one(url: str) -> None:
+            try:
+                _, outcome = await self._get(url, revalidate)
+            except APIError as e:
+                logger.warning("Image prefetch failed", url=url, error=str(e))
+                report.failed.append(url)
+                return
+            getattr(report, outcome).append(url)
+
+        await asyncio.gather(*(prefetch_one(url) for url in dict.fromkeys(urls)))
+
+        summary = self.stats.summary()
+        logger.info(
+            "Image prefetch complete",
+            downloaded=len(report.downloaded),
+            unchanged=len(report.unchanged),
+            cached=len(report.cached),
+            failed=len(report.failed),
+            bytes_downloaded=summary["bytes_downloaded"],
+            bytes_saved=summary["bytes_saved"],
+            fetch_ms_mean=summary["fetch_ms_mean"],
+            fetch_ms_p95=summary["fetch_ms_p95"],
+        )
+        return report
+
+    async def prefetch_points(
+        self, points: Iterable[Point], revalidate: bool = False
+    ) -> PrefetchReport:
+        """
+        Prefetch the screenshots of pilgrimage points.
+
+        Args:
+            points: Points about to be shown
+            revalidate: Check every entry with the upstream, even fresh ones
+
+        Returns:
+            PrefetchReport keyed by screenshot URL
+        """
+        return await self.prefetch(
+            (str(point.screenshot_url) for point in points), revalidate=revalidate
+        )
+
+    async def close(self) -> None:
+        """Close the HTTP session and the index."""
+        if self._session and self._owns_session:
+            await self._session.close()
+            self._session = None
+        self._conn.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write a file so readers never see it half-written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def main() -> None:
+    """Prefetch bangumi screenshots from the command line."""
+    from clients.anitabi import AnitabiClient
+    from config.settings import get_settings
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Prefetch point screenshots")
+    parser.add_argument("bangumi_ids", nargs="+", help="Bangumi to prefetch")
+    parser.add_argument("--dir", default=settings.image_cache_dir, help="Cache dir")
+    parser.add_argument(
+        "--concurrency", type=int, default=settings.image_cache_concurrency
+    )
+    parser.add_argument(
+        "--revalidate",
+        action="store_true",
+        help="Check every cached image with the upstream, even fresh ones",
+    )
+    args = parser.parse_args()
+
+    async def run() -> tuple[PrefetchReport, ImageCacheStats]:
+        async with (
+            AnitabiClient() as client,
+            ImageCache(args.dir, max_concurrency=args.concurrency) as cache,
+        ):
+            points = [
+                point
+                async for _, batch in client.get_many_bangumi_points(args.bangumi_ids)
+                for point in batch
+            ]
+            report = await cache.prefetch_points(points, revalidate=args.revalidate)
+            return report, cache.stats
+
+    report, stats = asyncio.run(run())
+    summary = stats.summary()
+    print(
+        f"downloaded={len(report.downloaded)} unchanged={len(report.unchanged)} "
+        f"cached={len(report.cached)} failed={len(report.failed)} "
+        f"bytes_downloaded={summary['bytes_downloaded']} "
+        f"bytes_saved={summary['bytes_saved']} "
+        f"fetch_ms_mean={summary['fetch_ms_mean']} "
+        f"fetch_ms_p95={summary['fetch_ms_p95']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
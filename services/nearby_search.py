@@ -0,0 +1,274 @@
+"""
+Local nearby-bangumi search over mirrored points.
+
+Provides:
+- NearbyBangumiIndex: spatial index over every point of every mirrored
+  bangumi, answering Anitabi /near queries without a network call
+- shared_nearby_index(): one index per mirror, rebuilt off the event loop
+  when the mirror changes
+- mirrored_areas(): areas where /near found nothing the mirror lacks, so
+  they can be answered locally
+
+Bangumi that are in a point catalogue take their points from it, so only
+the rest have their raw points parsed when the index is built.
+
+Results are returned as /near response items (id, title, cn_title, cover,
+points_count, distance, color), so AnitabiClient turns local and remote
+answers into Bangumi entities through the same code.
+"""
+
+import asyncio
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+from domain.point_catalogue import PointCatalogue
+from domain.point_set import PointSet
+from domain.spatial_index import SpatialIndex
+from services.anitabi_mirror import AnitabiMirror
+from services.geo_cache import RadiusCoverage
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# How long an area confirmed against /near is answered from the mirror alone
+MIRRORED_AREA_TTL_SECONDS = 6 * 3600
+
+
+def _summary(bangumi_id: str, info: dict[str, Any]) -> dict[str, Any]:
+    """The /near item fields that come from a bangumi's /lite info."""
+    title = info.get("title") or info.get("cn") or str(bangumi_id)
+    return {
+        "id": str(bangumi_id),
+        "title": title,
+        "cn_title": info.get("cn") or title,
+        "cover": info.get("cover"),
+        "color": info.get("color"),
+    }
+
+
+class NearbyBangumiIndex:
+    """
+    Answers "which bangumi have points near here" from local data.
+
+    A query is one radius search over the grid index, then a group-by on the
+    owning bangumi: the nearest point gives each bangumi's distance, and the
+    number of hits its points_count.
+    """
+
+    def __init__(
+        self,
+        bangumi: Iterable[tuple[dict[str, Any], PointSet]],
+        cell_km: float = 1.0,
+    ):
+        """
+        Index bangumi points.
+
+        Args:
+            bangumi: ``(info, PointSet)`` pairs, where ``info`` holds the
+                /lite fields (title, cn, cover, color) plus ``id``
+            cell_km: Grid cell size of the underlying SpatialIndex
+        """
+        self._summaries: list[dict[str, Any]] = []
+        owners: list[np.ndarray] = []
+        lats: list[np.ndarray] = []
+        lngs: list[np.ndarray] = []
+        for info, point_set in bangumi:
+            owners.append(np.full(len(point_set), len(self._summaries), np.int32))
+            lats.append(point_set.latitude)
+            lngs.append(point_set.longitude)
+            self._summaries.append(_summary(info["id"], info))
+
+        self._index = SpatialIndex(cell_km=cell_km)
+        if owners:
+            # SpatialIndex ids are assigned in insertion order from 0, so
+            # position i of ``_owner`` is the bangumi of point id i
+            self._index.insert_many(np.concatenate(lats), np.concatenate(lngs))
+            self._owner = np.concatenate(owners)
+        else:
+            self._owner = np.empty(0, dtype=np.int32)
+
+    @classmethod
+    def from_mirror(
+        cls,
+        mirror: AnitabiMirror,
+        catalogue: PointCatalogue | None = None,
+        cell_km: float = 1.0,
+    ) -> "NearbyBangumiIndex":
+        """
+        Index every bangumi in an offline mirror.
+
+        Points are parsed exactly as AnitabiClient would parse them, so
+        points the client would skip are not searchable either.
+
+        Args:
+            mirror: Mirror to index
+            catalogue: Catalogue to take already-parsed points from, for
+                the bangumi it holds
+            cell_km: Grid cell size
+
+        Returns:
+            NearbyBangumiIndex over the mirror's current contents
+        """
+        from clients.anitabi import parse_point_set
+
+        def entries() -> Iterable[tuple[dict[str, Any], PointSet]]:
+            for bangumi_id in mirror.bangumi_ids():
+                record = mirror.get(bangumi_id)
+                if record is None:
+                    continue
+                if catalogue is not None and bangumi_id in catalogue:
+                    point_set = catalogue.point_set(bangumi_id)
+                else:
+                    point_set = parse_point_set(record.raw_points, bangumi_id)
+                yield {**record.info, "id": bangumi_id}, point_set
+
+        return cls(entries(), cell_km=cell_km)
+
+    def __len__(self) -> int:
+        """Number of indexed bangumi."""
+        return len(self._summaries)
+
+    @property
+    def point_count(self) -> int:
+        """Number of indexed points."""
+        return len(self._owner)
+
+    def near(self, lat: float, lng: float, radius_km: float) -> list[dict[str, Any]]:
+        """
+        Bangumi with at least one point within ``radius_km``.
+
+        Args:
+            lat: Query latitude in degrees
+            lng: Query longitude in degrees
+            radius_km: Search radius in kilometres
+
+        Returns:
+            /near response items sorted by distance (nearest first); empty
+            if nothing indexed is in range
+        """
+        ids, distances = self._index.within_radius(lat, lng, radius_km)
+        if len(ids) == 0:
+            return []
+
+        # Hits are sorted by distance, so each bangumi's first hit is its
+        # nearest point, and ordering by first hit orders by distance
+        owners = self._owner[ids]
+        bangumi, first, counts = np.unique(
+            owners, return_index=True, return_counts=True
+        )
+        order = np.argsort(first, kind="stable")
+
+        return [
+            {
+                **self._summaries[b],
+                "points_count": count,
+                "distance": distance,
+            }
+            for b, count, distance in zip(
+                bangumi[order].tolist(),
+                counts[order].tolist(),
+                distances[first[order]].tolist(),
+                strict=True,
+            )
+        ]
+
+
+@dataclass
+class _SharedIndex:
+    """The current index for one mirror, and the rebuild replacing it."""
+
+    version: Any = None
+    index: NearbyBangumiIndex | None = None
+    rebuild: "asyncio.Task[None] | None" = None
+    mirrored_areas: RadiusCoverage = field(
+        default_factory=lambda: RadiusCoverage(grid_degrees=0)
+    )
+    areas_since: float = field(default_factory=time.monotonic)
+
+
+_shared: "WeakKeyDictionary[AnitabiMirror, _SharedIndex]" = WeakKeyDictionary()
+
+
+async def _rebuild(
+    shared: _SharedIndex,
+    mirror: AnitabiMirror,
+    catalogue: PointCatalogue | None,
+    version: Any,
+) -> None:
+    start = time.perf_counter()
+    try:
+        index = await asyncio.to_thread(
+            NearbyBangumiIndex.from_mirror, mirror, catalogue
+        )
+    except Exception as e:
+        logger.error("Nearby search index build failed", error=str(e), exc_info=True)
+        return
+    finally:
+        shared.rebuild = None
+    shared.version, shared.index = version, index
+    logger.info(
+        "Nearby search index built",
+        bangumi=len(index),
+        points=index.point_count,
+        elapsed_ms=round((time.perf_counter() - start) * 1000, 1),
+    )
+
+
+async def shared_nearby_index(
+    mirror: AnitabiMirror, catalogue: PointCatalogue | None = None
+) -> NearbyBangumiIndex | None:
+    """
+    The index for a mirror, built on first use and rebuilt after changes.
+
+    The mirror's version is read and builds run in a worker thread. While a
+    rebuild is in progress the previous index keeps answering; only the
+    very first build is waited on.
+
+    Args:
+        mirror: Mirror to search
+        catalogue: Catalogue to take already-parsed points from
+
+    Returns:
+        The latest NearbyBangumiIndex built, or None if none could be built
+    """
+    data_version = await asyncio.to_thread(mirror.data_version)
+    version = (data_version, catalogue.path if catalogue else None)
+    shared = _shared.get(mirror)
+    if shared is None:
+        shared = _shared[mirror] = _SharedIndex()
+    if shared.version != version and shared.rebuild is None:
+        shared.rebuild = asyncio.create_task(
+            _rebuild(shared, mirror, catalogue, version)
+        )
+    if shared.index is None and shared.rebuild is not None:
+        await asyncio.shield(shared.rebuild)
+    return shared.index
+
+
+def mirrored_areas(mirror: AnitabiMirror) -> RadiusCoverage:
+    """
+    Areas where /near listed only bangumi that the mirror holds.
+
+    Only these areas can be answered from the mirror alone: elsewhere a
+    bangumi missing from the mirror would silently drop out of the results.
+    Areas are forgotten after MIRRORED_AREA_TTL_SECONDS, so bangumi added
+    upstream since are picked up.
+
+    Args:
+        mirror: Mirror the areas were checked against
+
+    Returns:
+        Coverage of ``(snapped centre, radius in metres)`` areas
+    """
+    shared = _shared.get(mirror)
+    if shared is None:
+        shared = _shared[mirror] = _SharedIndex()
+    if time.monotonic() - shared.areas_since > MIRRORED_AREA_TTL_SECONDS:
+        shared.mirrored_areas = RadiusCoverage(grid_degrees=0)
+        shared.areas_since = time.monotonic()
+    return shared.mirrored_areas
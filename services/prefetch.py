@@ -0,0 +1,249 @@
+"""
+Speculative prefetching of what a user will probably ask for next.
+
+Provides:
+- SpeculativePrefetcher: bounded, low-priority fetches per session that are
+  cancelled when the session moves on
+- PrefetchStats: hit and wasted-fetch counts and ratios
+
+After a Bangumi search the user almost always picks one of the top few
+candidates, and spends a while reading the list first. Fetching each
+candidate's points in that pause lets the next stage find them cached.
+The prefetcher only starts fetches; results land wherever the fetch
+function caches them (AnitabiClient's memoised get_bangumi_point_set, for
+instance), so the request that follows needs nothing but a claim() to
+report whether the guess paid off.
+
+Prefetches run at Priority.SPECULATIVE, so they never use rate limit budget
+reserved for interactive requests, and without the request deadline of the
+turn that scheduled them. A claimed prefetch that has not reached upstream
+yet is therefore cancelled rather than joined: behind the interactive
+reserve it could wait longer than the request would on its own.
+"""
+
+import asyncio
+import contextvars
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from services.retry import Priority, request_priority, waiting_for_tokens
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class PrefetchStats:
+    """Counters since the prefetcher was created."""
+
+    scheduled: int = 0
+    dropped: int = 0  # Not started: too many prefetches pending
+    completed: int = 0  # Fetched successfully
+    failed: int = 0
+    cancelled: int = 0  # Stopped before finishing
+    hits: int = 0  # Claimed after the prefetch completed
+    partial_hits: int = 0  # Claimed while the prefetch was in flight
+    misses: int = 0  # Claimed without a successful prefetch of that key
+    wasted: int = 0  # Completed, never claimed
+
+    def summary(self) -> dict[str, Any]:
+        """Counters with hit and wasted-fetch ratios, for logs and reports."""
+        claims = self.hits + self.partial_hits + self.misses
+        return {
+            "scheduled": self.scheduled,
+            "dropped": self.dropped,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "hits": self.hits,
+            "partial_hits": self.partial_hits,
+            "misses": self.misses,
+            "wasted": self.wasted,
+            "hit_ratio": round((claims - self.misses) / claims, 3) if claims else 0.0,
+            "wasted_ratio": (
+                round(self.wasted / self.completed, 3) if self.completed else 0.0
+            ),
+        }
+
+
+class SpeculativePrefetcher:
+    """
+    Run fetches ahead of the request expected to need them.
+
+    Prefetches are grouped by session. Scheduling for a session replaces
+    whatever it had pending, and claim() ends its speculation: the claimed
+    fetch is left to finish (the request joins it through the cache), the
+    rest are cancelled or, if already complete, counted as wasted. A
+    claimed prefetch still queued for a slot or for rate limit tokens is
+    cancelled too, so the request goes out at once at its own priority
+    rather than behind speculative work.
+
+    Example:
+        >>> prefetcher = SpeculativePrefetcher(client.get_bangumi_point_set)
+        >>> prefetcher.schedule(session_id, ["115908", "362577"])
+        >>> # ... later, when the user has chosen
+        >>> prefetcher.claim(session_id, "115908")
+        True
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[Any]],
+        max_concurrency: int = 2,
+        max_pending: int = 20,
+        max_sessions: int = 100,
+    ):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            fetch: Coroutine function fetching (and caching) one key
+            max_concurrency: Prefetches allowed in flight at once
+            max_pending: Prefetches allowed queued or in flight; beyond it
+                new ones are dropped
+            max_sessions: Sessions tracked; the oldest is cancelled beyond it
+        """
+        self._fetch = fetch
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_pending = max_pending
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, dict[str, asyncio.Task]] = OrderedDict()
+        # Strong references: the event loop only keeps weak ones
+        self._running: set[asyncio.Task] = set()
+        # Prefetches holding a concurrency slot
+        self._started: set[asyncio.Task] = set()
+        self.stats = PrefetchStats()
+
+    def schedule(self, session_id: str, keys: Iterable[str]) -> int:
+        """
+        Start prefetching keys for a session, replacing its earlier ones.
+
+        Must be called from a running event loop.
+
+        Args:
+            session_id: Session the prefetches belong to
+            keys: Keys to fetch, most likely first
+
+        Returns:
+            Number of prefetches started
+        """
+        self._end_session(session_id)
+        loop = asyncio.get_running_loop()
+
+        keys = list(dict.fromkeys(keys))
+        tasks: dict[str, asyncio.Task] = {}
+        for key in keys:
+            if len(self._running) >= self.max_pending:
+                self.stats.dropped += 1
+                continue
+            # A fresh context: no request deadline, no background-refresh flag
+            task = loop.create_task(self._run(key), context=contextvars.Context())
+            task.add_done_callback(self._finished)
+            self._running.add(task)
+            tasks[key] = task
+        self.stats.scheduled += len(tasks)
+
+        if keys:
+            # Tracked even if every prefetch was dropped, so its claim
+            # counts as the miss it is
+            self._sessions[session_id] = tasks
+            while len(self._sessions) > self.max_sessions:
+                self._end_session(next(iter(self._sessions)))
+            logger.info(
+                "Speculative prefetch scheduled",
+                session_id=session_id,
+                keys=list(tasks),
+                dropped=len(keys) - len(tasks),
+            )
+        return len(tasks)
+
+    def claim(self, session_id: str, key: str) -> bool:
+        """
+        Record that a session now needs key, and end its speculation.
+
+        Call just before fetching key for real. Sessions nothing was
+        scheduled for are not counted.
+
+        Args:
+            session_id: Session making the request
+            key: Key about to be fetched
+
+        Returns:
+            True if key was prefetched (complete or already sent upstream)
+        """
+        tasks = self._sessions.get(session_id)
+        if tasks is None:
+            return False
+
+        task = tasks.pop(key, None)
+        hit = True
+        if task is None or task.cancelled():
+            hit = False
+        elif not task.done() and (
+            task not in self._started or waiting_for_tokens(task)
+        ):
+            # Still queued, for a slot or in the speculative rate limit lane:
+            # waiting for it would only delay the request
+            task.cancel()
+            hit = False
+        elif not task.done():
+            self.stats.partial_hits += 1
+        elif task.exception() is not None:
+            hit = False
+        else:
+            self.stats.hits += 1
+        if not hit:
+            self.stats.misses += 1
+        self._end_session(session_id)
+
+        summary = self.stats.summary()
+        logger.info(
+            "Speculative prefetch claimed",
+            session_id=session_id,
+            key=key,
+            hit=hit,
+            hit_ratio=summary["hit_ratio"],
+            wasted_ratio=summary["wasted_ratio"],
+        )
+        return hit
+
+    def cancel(self, session_id: str) -> None:
+        """
+        Drop a session's prefetches without claiming any.
+
+        Args:
+            session_id: Session that moved on
+        """
+        self._end_session(session_id)
+
+    def cancel_all(self) -> None:
+        """Drop every session's prefetches (e.g. on shutdown)."""
+        for session_id in list(self._sessions):
+            self._end_session(session_id)
+
+    def _end_session(self, session_id: str) -> None:
+        """Cancel a session's unfinished prefetches and count finished ones."""
+        for task in self._sessions.pop(session_id, {}).values():
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled() and task.exception() is None:
+                self.stats.wasted += 1
+
+    async def _run(self, key: str) -> None:
+        async with self._semaphore:
+            self._started.add(asyncio.current_task())
+            with request_priority(Priority.SPECULATIVE):
+                await self._fetch(key)
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self._started.discard(task)
+        if task.cancelled():
+            self.stats.cancelled += 1
+        elif task.exception() is not None:
+            self.stats.failed += 1
+            logger.warning("Speculative prefetch failed", error=str(task.exception()))
+        else:
+            self.stats.completed += 1
@@ -0,0 +1,930 @@
+"""
+Shared rate limit backends for multi-worker deployments.
+
+Provides:
+- RateLimitBackend protocol: atomic "reserve N tokens" against a named budget
+- In-process backend shared by every client in the current process
+- Lock-file backend shared by every process on one host
+- Redis-protocol backend for multi-node deployments (also works against
+  the bundled SharedCacheServer)
+- SharedRateLimiter, a RateLimiter whose bucket lives in a backend
+
+Backends hand out reservations rather than yes/no answers: a caller is told
+how long to wait for the tokens it has just been allotted, so callers never
+re-poll and are served in the order they reserved, whichever process they
+run in.
+
+Backends also hold what clients learn about an upstream: the limit its
+headers advertise (or a 429 implies), calls it says are left, and how long
+it asked everyone to back off. Clients are often created per call, so this
+state is kept per budget key in the backend, where the next client of the
+same host picks it up.
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import math
+import os
+import struct
+import time
+from collections.abc import Callable, Coroutine
+from threading import Lock
+from typing import Any, Protocol, TypeVar, runtime_checkable
+from urllib.parse import urlparse
+
+from services.cache_backends import (
+    DEFAULT_KEY_PREFIX,
+    CacheBackendError,
+    RedisBackend,
+    UnixSocketBackend,
+)
+from services.deadline import DeadlineExceeded, check_deadline
+from services.retry import Priority, RateLimiter, awaiting_tokens
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+@runtime_checkable
+class RateLimitBackend(Protocol):
+    """
+    Storage for token buckets shared between RateLimiter instances.
+
+    ``rate`` is the refill rate in tokens per second and ``capacity`` the
+    bucket size; callers sharing a key should pass the same values.
+    """
+
+    async def reserve(
+        self, key: str, tokens: int, rate: float, capacity: float
+    ) -> tuple[float, float]:
+        """
+        Reserve tokens from the bucket ``key``.
+
+        Returns:
+            ``(delay, remaining)``: seconds to wait before using the tokens,
+            and tokens left in the bucket after this reservation
+        """
+        ...
+
+    async def try_reserve(
+        self, key: str, tokens: int, rate: float, capacity: float, floor: float
+    ) -> tuple[float, float]:
+        """
+        Reserve tokens only if at least ``floor`` would be left right now.
+
+        Returns:
+            ``(wait, remaining)``: 0 and the tokens left if reserved, otherwise
+            the seconds until it may succeed (nothing is reserved)
+        """
+        ...
+
+    async def reset(self, key: str) -> None:
+        """Refill the bucket ``key`` to capacity."""
+        ...
+
+    async def drain(
+        self, key: str, remaining: float, rate: float, capacity: float
+    ) -> None:
+        """Lower the bucket ``key`` to at most ``remaining`` tokens."""
+        ...
+
+    async def publish_limit(
+        self,
+        key: str,
+        calls_per_period: int,
+        period_seconds: float,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        """
+        Record the limit learned for ``key``.
+
+        ``ttl_seconds`` forgets the limit after that long; None keeps it
+        for as long as the backend keeps learned limits.
+        """
+        ...
+
+    async def block(self, key: str, seconds: float) -> None:
+        """Hold every caller of ``key`` for at least ``seconds``."""
+        ...
+
+    async def limits(self, key: str) -> tuple[tuple[int, float] | None, float]:
+        """
+        Return what has been learned about ``key``.
+
+        Returns:
+            ``(limit, blocked_for)``: the learned ``(calls_per_period,
+            period_seconds)`` or None, and seconds callers must still wait
+        """
+        ...
+
+    async def close(self) -> None:
+        """Release resources held by the backend."""
+        ...
+
+
+def _drained_tat(
+    tat: float, now: float, remaining: float, rate: float, capacity: float
+) -> float:
+    """TAT of a bucket lowered to at most ``remaining`` tokens (never raised)."""
+    return max(tat, now + max(0.0, capacity - remaining) / rate)
+
+
+def _gcra_reserve(
+    tat: float,
+    now: float,
+    tokens: int,
+    rate: float,
+    capacity: float,
+    floor: float | None = None,
+) -> tuple[float, float, float]:
+    """
+    Reserve tokens with the generic cell rate algorithm.
+
+    The bucket is stored as a single "theoretical arrival time": the moment
+    the bucket would be full again if nothing else were reserved.
+
+    Args:
+        tat: Stored theoretical arrival time (0 for a new bucket)
+        now: Current time on the backend's clock
+        tokens: Tokens to reserve
+        rate: Refill rate in tokens per second
+        capacity: Bucket size
+        floor: If set, only reserve when this many tokens would be left now;
+            otherwise leave ``tat`` untouched and return the wait instead
+
+    Returns:
+        ``(new_tat, delay, remaining)``
+    """
+    interval = 1 / rate
+    new_tat = max(tat, now) + tokens * interval
+    if floor is not None:
+        wait = new_tat - (capacity - floor) * interval - now
+        if wait > 0:
+            return tat, wait, max(0.0, capacity - (max(tat, now) - now) * rate)
+    delay = max(0.0, new_tat - capacity * interval - now)
+    remaining = max(0.0, capacity - (new_tat - now) * rate)
+    return new_tat, delay, remaining
+
+
+class InProcessRateLimitBackend:
+    """
+    Token buckets shared by every limiter in the current process.
+
+    Lets short-lived client instances draw on one budget per upstream
+    instead of each starting with a full bucket.
+    """
+
+    def __init__(self):
+        """Initialize the in-process backend."""
+        self._tats: dict[str, float] = {}
+        # key -> (calls_per_period, period_seconds, expires_at)
+        self._limits: dict[str, tuple[int, float, float]] = {}
+        self._blocked_until: dict[str, float] = {}
+        self._lock = Lock()
+
+    async def reserve(
+        self, key: str, tokens: int, rate: float, capacity: float
+    ) -> tuple[float, float]:
+        """Reserve tokens from the bucket ``key``."""
+        with self._lock:
+            tat, delay, remaining = _gcra_reserve(
+                self._tats.get(key, 0.0), time.monotonic(), tokens, rate, capacity
+            )
+            self._tats[key] = tat
+        return delay, remaining
+
+    async def try_reserve(
+        self, key: str, tokens: int, rate: float, capacity: float, floor: float
+    ) -> tuple[float, float]:
+        """Reserve tokens only if at least ``floor`` would be left right now."""
+        with self._lock:
+            tat, wait, remaining = _gcra_reserve(
+                self._tats.get(key, 0.0),
+                time.monotonic(),
+                tokens,
+                rate,
+                capacity,
+                floor,
+            )
+            self._tats[key] = tat
+        return wait, remaining
+
+    async def reset(self, key: str) -> None:
+        """Refill the bucket ``key`` to capacity."""
+        with self._lock:
+            self._tats.pop(key, None)
+
+    async def drain(
+        self, key: str, remaining: float, rate: float, capacity: float
+    ) -> None:
+        """Lower the bucket ``key`` to at most ``remaining`` tokens."""
+        with self._lock:
+            self._tats[key] = _drained_tat(
+                self._tats.get(key, 0.0), time.monotonic(), remaining, rate, capacity
+            )
+
+    async def publish_limit(
+        self,
+        key: str,
+        calls_per_period: int,
+        period_seconds: float,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        """Record the limit learned for ``key``."""
+        expires_at = math.inf if ttl_seconds is None else time.monotonic() + ttl_seconds
+        with self._lock:
+            self._limits[key] = (calls_per_period, period_seconds, expires_at)
+
+    async def block(self, key: str, seconds: float) -> None:
+        """Hold every caller of ``key`` for at least ``seconds``."""
+        with self._lock:
+            self._blocked_until[key] = max(
+                self._blocked_until.get(key, 0.0), time.monotonic() + seconds
+            )
+
+    async def limits(self, key: str) -> tuple[tuple[int, float] | None, float]:
+        """Return the learned limit for ``key`` and the seconds it is blocked."""
+        now = time.monotonic()
+        with self._lock:
+            blocked = self._blocked_until.get(key, 0.0) - now
+            limit = self._limits.get(key)
+            if limit is not None and limit[2] <= now:
+                del self._limits[key]
+                limit = None
+        return (limit[:2] if limit else None), max(0.0, blocked)
+
+    async def close(self) -> None:
+        """Nothing to release."""
+        pass
+
+
+class FileLockRateLimitBackend:
+    """
+    Token buckets stored in lock files shared by processes on one host.
+
+    Each bucket is a small file holding its theoretical arrival time, the
+    time it is blocked until and the learned limit (0 when unknown) with
+    the time it expires (0 for never);
+    updates read and rewrite it under an exclusive ``flock``, so the
+    critical section is two small syscalls. The lock is taken without
+    blocking and retried with an async sleep while another process holds
+    it, so a busy bucket never stalls the event loop. Uses the wall clock,
+    which every process on the host agrees on.
+    """
+
+    # Backoff between attempts to take a lock held by another process
+    LOCK_RETRY_SECONDS = 0.001
+    MAX_LOCK_RETRY_SECONDS = 0.05
+
+    # tat, blocked_until, calls_per_period, period_seconds, limit_expires_at
+    _STATE = struct.Struct("5d")
+
+    def __init__(self, directory: str, prefix: str = DEFAULT_KEY_PREFIX):
+        """
+        Initialize the lock-file backend.
+
+        Args:
+            directory: Directory holding the bucket files (created if missing)
+            prefix: Prefix applied to every bucket name
+        """
+        self.directory = directory
+        self.prefix = prefix
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha1(f"{self.prefix}:{key}".encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"{digest}.bucket")
+
+    async def _locked_update(self, key: str, change: Callable[[list[float]], T]) -> T:
+        """Apply ``change`` to the stored state while holding the file lock."""
+        # Opened per call: flock locks belong to the open file description,
+        # which a forked worker would otherwise share with its parent
+        fd = os.open(self._path(key), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            retry = self.LOCK_RETRY_SECONDS
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    await asyncio.sleep(retry)
+                    retry = min(retry * 2, self.MAX_LOCK_RETRY_SECONDS)
+            raw = os.pread(fd, self._STATE.size, 0)
+            # Files written before the state grew hold only its first fields
+            if len(raw) in (0, 8, 32):
+                raw = raw.ljust(self._STATE.size, b"\0")
+            state = list(self._STATE.unpack(raw))
+            result = change(state)
+            os.pwrite(fd, self._STATE.pack(*state), 0)
+            return result
+        finally:
+            os.close(fd)
+
+    async def _reserve(
+        self,
+        key: str,
+        tokens: int,
+        rate: float,
+        capacity: float,
+        floor: float | None = None,
+    ) -> tuple[float, float]:
+        def change(state: list[float]) -> tuple[float, float]:
+            state[0], delay, remaining = _gcra_reserve(
+                state[0], time.time(), tokens, rate, capacity, floor
+            )
+            return delay, remaining
+
+        return await self._locked_update(key, change)
+
+    async def reserve(
+        self, key: str, tokens: int, rate: float, capacity: float
+    ) -> tuple[float, float]:
+        """Reserve tokens from the bucket ``key``."""
+        return await self._reserve(key, tokens, rate, capacity)
+
+    async def try_reserve(
+        self, key: str, tokens: int, rate: float, capacity: float, floor: float
+    ) -> tuple[float, float]:
+        """Reserve tokens only if at least ``floor`` would be left right now."""
+        return await self._reserve(key, tokens, rate, capacity, floor)
+
+    async def reset(self, key: str) -> None:
+        """Refill the bucket ``key`` to capacity."""
+
+        def change(state: list[float]) -> None:
+            state[0] = 0.0
+
+        await self._locked_update(key, change)
+
+    async def drain(
+        self, key: str, remaining: float, rate: float, capacity: float
+    ) -> None:
+        """Lower the bucket ``key`` to at most ``remaining`` tokens."""
+
+        def change(state: list[float]) -> None:
+            state[0] = _drained_tat(state[0], time.time(), remaining, rate, capacity)
+
+        await self._locked_update(key, change)
+
+    async def publish_limit(
+        self,
+        key: str,
+        calls_per_period: int,
+        period_seconds: float,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        """Record the limit learned for ``key``."""
+        expires_at = 0.0 if ttl_seconds is None else time.time() + ttl_seconds
+
+        def change(state: list[float]) -> None:
+            state[2:5] = [calls_per_period, period_seconds, expires_at]
+
+        await self._locked_update(key, change)
+
+    async def block(self, key: str, seconds: float) -> None:
+        """Hold every caller of ``key`` for at least ``seconds``."""
+
+        def change(state: list[float]) -> None:
+            state[1] = max(state[1], time.time() + seconds)
+
+        await self._locked_update(key, change)
+
+    async def limits(self, key: str) -> tuple[tuple[int, float] | None, float]:
+        """Return the learned limit for ``key`` and the seconds it is blocked."""
+        _, blocked_until, calls, period, expires_at = await self._locked_update(
+            key, lambda state: tuple(state)
+        )
+        now = time.time()
+        limit = None
+        if calls > 0 and period > 0 and not 0 < expires_at <= now:
+            limit = (int(calls), period)
+        return limit, max(0.0, blocked_until - now)
+
+    async def close(self) -> None:
+        """Nothing to release."""
+        pass
+
+
+class RedisRateLimitBackend:
+    """
+    Token buckets kept on a Redis-protocol server for multi-node setups.
+
+    Uses fixed windows of ``capacity / rate`` seconds, one counter key per
+    window, updated with INCRBY so any Redis-compatible server will do (no
+    scripting required). A caller that overflows the current window rolls
+    its reservation into the next one with room, so waits are still known
+    up front. Window boundaries follow the wall clock, so keep node clocks
+    in sync.
+
+    Learned limits and blocks are plain keys next to the counters. They are
+    written with SET, so two nodes learning at once keep the last write
+    rather than the stricter one; either is a limit upstream reported.
+    """
+
+    # Learned limits are dropped after a day without being re-learned
+    LIMIT_TTL_SECONDS = 86400
+
+    # Give up looking for room after this many windows ahead
+    MAX_WINDOWS_AHEAD = 1000
+
+    def __init__(self, connection: RedisBackend):
+        """
+        Initialize the Redis-protocol backend.
+
+        Args:
+            connection: Connection used to talk to the server
+        """
+        self.connection = connection
+
+    @classmethod
+    def from_url(
+        cls, url: str, prefix: str = DEFAULT_KEY_PREFIX
+    ) -> "RedisRateLimitBackend":
+        """Create a backend from a ``redis://`` or ``unix://`` URL."""
+        parsed = urlparse(url)
+        if parsed.scheme == "unix":
+            return cls(UnixSocketBackend(parsed.path, prefix=prefix))
+        return cls(RedisBackend.from_url(url, prefix=prefix))
+
+    def _window_key(self, key: str, window: int) -> str:
+        return f"{self.connection.prefix}:ratelimit:{key}:{window}"
+
+    def _state_key(self, key: str, name: str) -> str:
+        return f"{self.connection.prefix}:ratelimit-{name}:{key}"
+
+    async def reserve(
+        self, key: str, tokens: int, rate: float, capacity: float
+    ) -> tuple[float, float]:
+        """Reserve tokens from the bucket ``key``."""
+        period = capacity / rate
+        now = time.time()
+        current = math.floor(now / period)
+        limit = math.floor(capacity)
+
+        for window in range(current, current + self.MAX_WINDOWS_AHEAD):
+            window_key = self._window_key(key, window)
+            count = await self.connection.execute("INCRBY", window_key, tokens)
+            if count == tokens:
+                # First reservation in this window: let the counter expire
+                ttl_ms = math.ceil(((window + 2) * period - now) * 1000)
+                await self.connection.execute("PEXPIRE", window_key, ttl_ms)
+            if count <= limit:
+                delay = max(0.0, window * period - now)
+                remaining = limit - count if window == current else 0.0
+                return delay, remaining
+            await self.connection.execute("DECRBY", window_key, tokens)
+
+        raise CacheBackendError(f"Rate limit backlog too deep for {key}")
+
+    async def try_reserve(
+        self, key: str, tokens: int, rate: float, capacity: float, floor: float
+    ) -> tuple[float, float]:
+        """Reserve tokens only if at least ``floor`` would be left right now."""
+        period = capacity / rate
+        now = time.time()
+        current = math.floor(now / period)
+        limit = math.floor(capacity)
+        window_key = self._window_key(key, current)
+
+        count = await self.connection.execute("INCRBY", window_key, tokens)
+        if count == tokens:
+            ttl_ms = math.ceil(((current + 2) * period - now) * 1000)
+            await self.connection.execute("PEXPIRE", window_key, ttl_ms)
+        if count <= limit - floor:
+            return 0.0, limit - count
+
+        await self.connection.execute("DECRBY", window_key, tokens)
+        # The current window cannot fit us; retry when the next one opens
+        return (current + 1) * period - now, max(0.0, limit - count + tokens)
+
+    async def reset(self, key: str) -> None:
+        """Refill the bucket ``key`` by dropping its window counters."""
+        await self.connection.clear(f"ratelimit:{key}:")
+
+    async def drain(
+        self, key: str, remaining: float, rate: float, capacity: float
+    ) -> None:
+        """Count the current window as used down to ``remaining`` calls."""
+        period = capacity / rate
+        now = time.time()
+        current = math.floor(now / period)
+        window_key = self._window_key(key, current)
+        used = max(0, math.floor(capacity) - math.floor(remaining))
+
+        count = int(await self.connection.execute("GET", window_key) or 0)
+        if count < used:
+            await self.connection.execute("INCRBY", window_key, used - count)
+            ttl_ms = math.ceil(((current + 2) * period - now) * 1000)
+            await self.connection.execute("PEXPIRE", window_key, ttl_ms)
+
+    async def publish_limit(
+        self,
+        key: str,
+        calls_per_period: int,
+        period_seconds: float,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        """Record the limit learned for ``key``."""
+        if ttl_seconds is None:
+            ttl_seconds = self.LIMIT_TTL_SECONDS
+        await self.connection.execute(
+            "SET",
+            self._state_key(key, "limit"),
+            f"{calls_per_period} {period_seconds}",
+            "PX",
+            max(1, math.ceil(ttl_seconds * 1000)),
+        )
+
+    async def block(self, key: str, seconds: float) -> None:
+        """Hold every caller of ``key`` for at least ``seconds``."""
+        ttl_ms = math.ceil(seconds * 1000)
+        if ttl_ms <= 0:
+            return
+        await self.connection.execute(
+            "SET",
+            self._state_key(key, "blocked"),
+            repr(time.time() + seconds),
+            "PX",
+            ttl_ms,
+        )
+
+    async def limits(self, key: str) -> tuple[tuple[int, float] | None, float]:
+        """Return the learned limit for ``key`` and the seconds it is blocked."""
+        raw_limit = await self.connection.execute("GET", self._state_key(key, "limit"))
+        raw_blocked = await self.connection.execute(
+            "GET", self._state_key(key, "blocked")
+        )
+        limit = None
+        if raw_limit is not None:
+            calls, period = raw_limit.split()
+            limit = (int(calls), float(period))
+        blocked = float(raw_blocked) - time.time() if raw_blocked is not None else 0.0
+        return limit, max(0.0, blocked)
+
+    async def close(self) -> None:
+        """Close the server connection."""
+        await self.connection.close()
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    Rate limiter drawing on a bucket held by a shared backend.
+
+    Every limiter created with the same backend and key enforces a single
+    budget, across client instances, worker processes or hosts depending
+    on the backend. If the backend is unreachable the limiter falls back to
+    its own in-process bucket rather than failing requests.
+
+    A caller cancelled while waiting keeps its reservation: the tokens are
+    spent, which errs on the side of staying under the upstream quota.
+
+    Interactive callers reserve straight away. Speculative and background
+    callers hold no reservation while they wait: they only take tokens when
+    the shared bucket, as seen by the backend, has more than the interactive
+    reserve left, and otherwise sleep for the backend's hint and try again.
+    That keeps interactive requests from queueing behind deferrable work in
+    any process sharing the budget.
+
+    Limits learned from upstream responses (resize, sync_remaining and
+    block_for) are written to the backend as well as applied locally, and
+    every limiter picks up what others learned before reserving, so a
+    client created after a 429 waits out the same Retry-After. Limits only
+    guessed from bare 429s are shared for GUESSED_LIMIT_TTL_SECONDS: short-
+    lived clients never see enough successes to grow them back, so they
+    expire instead, and limiters return to their configured limit.
+    """
+
+    # Seconds between reads of the limits other limiters have learned
+    LIMITS_REFRESH_SECONDS = 1.0
+
+    # How long a limit cut on bare 429s is shared before it is forgotten
+    GUESSED_LIMIT_TTL_SECONDS = 300.0
+
+    def __init__(
+        self,
+        calls_per_period: int,
+        period_seconds: float,
+        backend: RateLimitBackend,
+        key: str,
+        burst_multiplier: float = 1.0,
+        interactive_reserve: float = 0.0,
+    ):
+        """
+        Initialize the shared rate limiter.
+
+        Args:
+            calls_per_period: Number of calls allowed per period
+            period_seconds: Period duration in seconds
+            backend: Backend holding the shared bucket
+            key: Budget name, typically the upstream host
+            burst_multiplier: Multiplier for burst capacity (default 1.0)
+            interactive_reserve: Share of the bucket (0-1) only interactive
+                callers may use
+        """
+        super().__init__(
+            calls_per_period, period_seconds, burst_multiplier, interactive_reserve
+        )
+        self.backend = backend
+        self.key = key
+        self._configured_limit = (self.calls_per_period, self.period_seconds)
+        # Limit in use that the backend may forget; undone once it has
+        self._expiring_limit: tuple[int, float] | None = None
+
+        # Last known state of the shared bucket, for synchronous estimates
+        self._observe_shared(self.max_tokens)
+
+        # Set from Retry-After and friends; upstream wants nobody calling
+        self._blocked_until = 0.0
+
+        self._limits_checked_at = -math.inf
+        # Strong references to pending writes of learned limits
+        self._publishing: set[asyncio.Task] = set()
+
+    def available_tokens(self) -> float:
+        """
+        Estimate the tokens available in the shared bucket.
+
+        Returns:
+            Tokens left after the last reservation made here, plus refill
+        """
+        if self._blocked_until > time.monotonic():
+            return 0.0
+        elapsed = time.monotonic() - self._shared_seen_at
+        return min(self.max_tokens, self._shared_remaining + elapsed * self.refill_rate)
+
+    def get_wait_time(self) -> float:
+        """
+        Estimate the time until the shared bucket has a token.
+
+        Returns:
+            Wait time in seconds (0 if a token is likely available)
+        """
+        return max(0.0, (1 - self.available_tokens()) / self.refill_rate)
+
+    async def acquire(
+        self, tokens: int = 1, priority: Priority = Priority.INTERACTIVE
+    ) -> bool:
+        """
+        Reserve tokens from the shared bucket and wait until they are due.
+
+        Args:
+            tokens: Number of tokens to acquire (default 1)
+            priority: Traffic class of the caller (default interactive)
+
+        Returns:
+            True when tokens acquired
+
+        Raises:
+            ValueError: If more tokens are requested than the bucket can hold
+            DeadlineExceeded: If the tokens cannot be had before the request
+                deadline
+        """
+        if tokens > self.max_tokens:
+            raise ValueError(
+                f"Cannot acquire {tokens} tokens from a bucket of {self.max_tokens}"
+            )
+
+        started = time.monotonic()
+        with awaiting_tokens():
+            try:
+                await self._adopt_shared_limits()
+                blocked = self._blocked_until - time.monotonic()
+                if blocked > 0:
+                    self._check_wait(blocked)
+                    await asyncio.sleep(blocked)
+
+                if priority == Priority.INTERACTIVE:
+                    delay, remaining = await self._reserve_within_deadline(tokens)
+                    self._observe_shared(remaining)
+                else:
+                    floor = self._floor(priority, tokens)
+                    while True:
+                        wait, remaining = await self.backend.try_reserve(
+                            self.key, tokens, self.refill_rate, self.max_tokens, floor
+                        )
+                        self._observe_shared(remaining)
+                        if wait <= 0:
+                            break
+                        self._check_wait(wait)
+                        await asyncio.sleep(wait)
+                    delay = 0.0
+            except DeadlineExceeded:
+                # A TimeoutError, and so an OSError, but not a backend failure
+                raise
+            except (CacheBackendError, OSError) as e:
+                logger.warning(
+                    "Shared rate limit unavailable, using local bucket",
+                    key=self.key,
+                    error=str(e),
+                )
+                return await super().acquire(tokens, priority)
+
+            if delay > 0:
+                self._check_wait(delay)
+                logger.debug(
+                    "Shared rate limit waiting for tokens",
+                    key=self.key,
+                    tokens_needed=tokens,
+                    delay=f"{delay:.3f}s",
+                    priority=priority.name.lower(),
+                )
+                await asyncio.sleep(delay)
+
+        with self._lock:
+            self._wait_histograms[priority].observe(time.monotonic() - started)
+        return True
+
+    async def _reserve_within_deadline(self, tokens: int) -> tuple[float, float]:
+        """
+        Reserve tokens, failing before reserving if they cannot arrive in time.
+
+        Without a deadline this is a plain reservation. With one, the tokens
+        are first taken only if they are free now; otherwise the backend's
+        wait hint is checked against the budget, so a caller that would time
+        out gives up without spending tokens another caller could use.
+        """
+        if check_deadline("waiting for rate limit tokens") is None:
+            return await self.backend.reserve(
+                self.key, tokens, self.refill_rate, self.max_tokens
+            )
+
+        wait, remaining = await self.backend.try_reserve(
+            self.key, tokens, self.refill_rate, self.max_tokens, 0.0
+        )
+        if wait <= 0:
+            return 0.0, remaining
+        self._check_wait(wait)
+        # Still a race: callers reserving meanwhile can push the delay past
+        # the hint, and those tokens are then spent like a cancelled wait's
+        return await self.backend.reserve(
+            self.key, tokens, self.refill_rate, self.max_tokens
+        )
+
+    def _check_wait(self, seconds: float) -> None:
+        """Fail fast if waiting ``seconds`` would overrun the deadline."""
+        remaining = check_deadline("waiting for rate limit tokens")
+        if remaining is not None and seconds >= remaining:
+            raise DeadlineExceeded(
+                f"Rate limit wait of {seconds:.2f}s exceeds the remaining "
+                f"{remaining:.2f}s budget"
+            )
+
+    async def _adopt_shared_limits(self) -> None:
+        """Apply the limit and block other limiters of this key have learned."""
+        now = time.monotonic()
+        if now - self._limits_checked_at < self.LIMITS_REFRESH_SECONDS:
+            return
+        limit, blocked = await self.backend.limits(self.key)
+        self._limits_checked_at = now
+        current = (self.calls_per_period, self.period_seconds)
+        if limit is None and current == self._expiring_limit:
+            # The backend forgot the limit: back to the configured one
+            limit = self._configured_limit
+        if limit is not None and limit != current:
+            # Local only: the backend already holds it
+            RateLimiter.resize(self, *limit)
+            self._expiring_limit = limit if limit != self._configured_limit else None
+        if blocked > 0:
+            self._blocked_until = max(self._blocked_until, now + blocked)
+
+    def resize(
+        self,
+        calls_per_period: int,
+        period_seconds: float | None = None,
+        guessed: bool = False,
+    ) -> None:
+        """
+        Change the bucket size and refill rate for every limiter of this key.
+
+        Args:
+            calls_per_period: New number of calls allowed per period
+            period_seconds: New period duration (unchanged if None)
+            guessed: The limit was inferred rather than advertised; other
+                limiters forget it after GUESSED_LIMIT_TTL_SECONDS
+        """
+        super().resize(calls_per_period, period_seconds, guessed)
+        self._expiring_limit = (
+            (self.calls_per_period, self.period_seconds) if guessed else None
+        )
+        # Newer than what the backend holds until the write below lands
+        self._limits_checked_at = time.monotonic()
+        self._publish(
+            self.backend.publish_limit(
+                self.key,
+                self.calls_per_period,
+                self.period_seconds,
+                self.GUESSED_LIMIT_TTL_SECONDS if guessed else None,
+            )
+        )
+
+    def sync_remaining(self, remaining: int) -> None:
+        """
+        Lower the shared bucket to the number of calls upstream says are left.
+
+        Args:
+            remaining: Calls remaining in the upstream's current window
+        """
+        super().sync_remaining(remaining)
+        self._observe_shared(min(self.available_tokens(), remaining))
+        self._publish(
+            self.backend.drain(self.key, remaining, self.refill_rate, self.max_tokens)
+        )
+
+    def block_for(self, seconds: float) -> None:
+        """
+        Hold every caller of this key for ``seconds``.
+
+        Args:
+            seconds: Time until the next call may be made
+        """
+        super().block_for(seconds)
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._publish(self.backend.block(self.key, seconds))
+
+    def _publish(self, update: Coroutine[Any, Any, None]) -> None:
+        """Write learned state to the backend without holding up the caller."""
+        try:
+            task = asyncio.get_running_loop().create_task(update)
+        except RuntimeError:
+            # No loop to write from: the limit still applies locally
+            update.close()
+            return
+        self._publishing.add(task)
+        task.add_done_callback(self._published)
+
+    def _published(self, task: asyncio.Task) -> None:
+        self._publishing.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(
+                "Could not share learned rate limit",
+                key=self.key,
+                error=str(task.exception()),
+            )
+
+    def _observe_shared(self, remaining: float) -> None:
+        """Remember the shared bucket level reported by the backend."""
+        self._shared_remaining = remaining
+        self._shared_seen_at = time.monotonic()
+
+    async def reset_shared(self) -> None:
+        """Refill the shared bucket to capacity for every limiter using it."""
+        await self.backend.reset(self.key)
+        self.reset()
+        self._observe_shared(self.max_tokens)
+
+
+# === Factory ===
+
+# One backend per (URL, prefix), reused by every client for the process
+_shared_backends: dict[tuple[str, str], RateLimitBackend] = {}
+_shared_backends_lock = Lock()
+
+
+def create_rate_limit_backend(
+    url: str | None, prefix: str = DEFAULT_KEY_PREFIX
+) -> RateLimitBackend:
+    """
+    Return the process-wide rate limit backend for a URL.
+
+    Clients are often created per call, so backends are shared rather than
+    created per client: every client of a URL uses one connection (or set
+    of lock files), and none of them owns or closes it.
+
+    Supported URLs:
+    - ``""`` / None / ``memory://``: process-wide in-process buckets
+    - ``file:///path/to/dir``: lock-file buckets shared on one host
+    - ``unix:///path/to/socket``: buckets on a local SharedCacheServer
+    - ``redis://[:password@]host[:port][/db]``: buckets on a Redis server
+
+    Args:
+        url: Backend URL
+        prefix: Prefix applied to every bucket name
+
+    Returns:
+        Shared backend instance
+
+    Raises:
+        ValueError: On an unsupported URL
+    """
+    url = url or "memory://"
+    parsed = urlparse(url)
+    # In-process buckets have no key prefix to tell apart
+    cache_key = ("memory://", "") if parsed.scheme == "memory" else (url, prefix)
+    with _shared_backends_lock:
+        backend = _shared_backends.get(cache_key)
+        if backend is not None:
+            return backend
+
+        if parsed.scheme == "memory":
+            backend = InProcessRateLimitBackend()
+        elif parsed.scheme == "file":
+            backend = FileLockRateLimitBackend(parsed.path, prefix=prefix)
+        elif parsed.scheme in ("unix", "redis"):
+            backend = RedisRateLimitBackend.from_url(url, prefix=prefix)
+        else:
+            raise ValueError(f"Unsupported rate limit backend URL: {url}")
+        _shared_backends[cache_key] = backend
+        return backend
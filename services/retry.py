@@ -4,18 +4,29 @@ Retry decorators and rate limiting for API clients.
 Provides:
 - Exponential backoff with jitter
 - Configurable retry policies
-- Token bucket rate limiting
+- Fair, async-native token bucket rate limiting with priority lanes
+- A request_priority() context for the traffic class of nested requests
+- waiting_for_tokens(): whether a task is still queued for rate limit tokens
+- Rate limits learned from upstream response headers
 - Thread-safe implementations
 """
 
 import asyncio
 import random
-from collections.abc import Callable
+import time
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
-from datetime import datetime
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
 from functools import wraps
 from threading import Lock
+from weakref import WeakSet
 
+from services.deadline import DeadlineExceeded, check_deadline, remaining_budget
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -154,6 +165,17 @@ def retry_async(
                         error=str(e),
                     )
 
+                    # Give up now rather than sleep past the request deadline
+                    remaining = remaining_budget()
+                    if remaining is not None and delay >= remaining:
+                        logger.error(
+                            "Deadline leaves no time to retry",
+                            function=func.__name__,
+                            attempt=attempt + 1,
+                            budget_remaining=f"{remaining:.2f}s",
+                        )
+                        raise
+
                     # Wait before retrying
                     await asyncio.sleep(delay)
 
@@ -176,11 +198,135 @@ def retry_async(
     return decorator
 
 
+class Priority(IntEnum):
+    """Rate limiter traffic classes, highest priority first."""
+
+    INTERACTIVE = 0  # A user is waiting on the result
+    SPECULATIVE = 1  # Prefetching something a user will probably ask for
+    BACKGROUND = 2  # Cache warming and refresh-ahead
+
+
+# Traffic class of requests that do not name one, set by request_priority()
+_request_priority: ContextVar[Priority | None] = ContextVar(
+    "request_priority", default=None
+)
+
+
+def current_priority() -> Priority | None:
+    """Return the traffic class set by request_priority(), if any."""
+    return _request_priority.get()
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """
+    Send requests made in this context at the given traffic class.
+
+    For work such as speculative prefetching that calls client methods
+    which do not take a priority themselves.
+
+    Args:
+        priority: Rate limiter class for requests without an explicit one
+    """
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+# Tasks queued for rate limit tokens, by any limiter
+_token_waiters: "WeakSet[asyncio.Task]" = WeakSet()
+
+
+def waiting_for_tokens(task: asyncio.Task) -> bool:
+    """
+    Return whether a task is waiting for rate limit tokens.
+
+    Such a task has not sent the request it is waiting to make, so it can be
+    cancelled without wasting an upstream call.
+
+    Args:
+        task: Task to check
+    """
+    return task in _token_waiters
+
+
+@contextmanager
+def awaiting_tokens() -> Iterator[None]:
+    """Mark the current task as waiting for rate limit tokens (nestable)."""
+    task = asyncio.current_task()
+    if task is None or task in _token_waiters:
+        yield
+        return
+    _token_waiters.add(task)
+    try:
+        yield
+    finally:
+        _token_waiters.discard(task)
+
+
+# Upper bounds (seconds) of the wait-time histogram buckets
+WAIT_BUCKETS: tuple[float, ...] = (0.001, 0.01, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0)
+
+
+class WaitHistogram:
+    """Cumulative histogram of how long callers waited for tokens."""
+
+    def __init__(self, buckets: tuple[float, ...] = WAIT_BUCKETS):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            buckets: Sorted upper bounds of the buckets, in seconds
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Record one wait."""
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def to_dict(self) -> dict:
+        """
+        Export the histogram.
+
+        Returns:
+            Count, total and mean wait plus cumulative counts per bucket
+            (``le_<seconds>`` keys and ``le_inf``)
+        """
+        cumulative: dict[str, int] = {}
+        running = 0
+        for bound, bucket_count in zip(self.buckets, self.counts, strict=False):
+            running += bucket_count
+            cumulative[f"le_{bound:g}"] = running
+        cumulative["le_inf"] = self.count
+        return {
+            "count": self.count,
+            "total_seconds": round(self.total, 3),
+            "mean_seconds": round(self.total / self.count, 4) if self.count else 0.0,
+            "buckets": cumulative,
+        }
+
+
 class RateLimiter:
     """
     Token bucket rate limiter for API calls.
 
-    Thread-safe implementation using asyncio locks.
+    Async-native and fair: callers that cannot be served immediately join a
+    FIFO queue and are woken one at a time by a single timer that fires when
+    the head of the queue can be served, so waiters never re-poll or race.
+    Uses a monotonic clock, and a caller cancelled while waiting gives up its
+    place (or its tokens, if they were already granted).
+
+    Callers are split into priority lanes (see ``Priority``). A lane is only
+    served once every higher lane is empty, so queued speculative and
+    background work is overtaken by interactive requests, and lower lanes may
+    not dip into the ``interactive_reserve`` share of the bucket.
     """
 
     def __init__(
@@ -188,6 +334,7 @@ class RateLimiter:
         calls_per_period: int,
         period_seconds: float,
         burst_multiplier: float = 1.0,
+        interactive_reserve: float = 0.0,
     ):
         """
         Initialize rate limiter.
@@ -196,24 +343,35 @@ class RateLimiter:
             calls_per_period: Number of calls allowed per period
             period_seconds: Period duration in seconds
             burst_multiplier: Multiplier for burst capacity (default 1.0)
+            interactive_reserve: Share of the bucket (0-1) only interactive
+                callers may use
         """
         self.calls_per_period = calls_per_period
         self.period_seconds = period_seconds
         self.burst_multiplier = burst_multiplier
+        self.interactive_reserve = interactive_reserve
 
         # Token bucket parameters
         self.max_tokens = calls_per_period * burst_multiplier
         self.tokens = self.max_tokens
         self.refill_rate = calls_per_period / period_seconds
-        self.last_refill = datetime.now()
+        self.last_refill = time.monotonic()
+
+        # One FIFO of (future, tokens requested) per lane, and the single
+        # timer serving whichever head is blocked
+        self._lanes: dict[Priority, deque[tuple[asyncio.Future, int]]] = {
+            priority: deque() for priority in Priority
+        }
+        self._timer: asyncio.TimerHandle | None = None
+        self._wait_histograms = {priority: WaitHistogram() for priority in Priority}
 
         # Thread safety
         self._lock = Lock()
 
     def _refill_tokens(self) -> None:
         """Refill tokens based on elapsed time."""
-        now = datetime.now()
-        elapsed = (now - self.last_refill).total_seconds()
+        now = time.monotonic()
+        elapsed = now - self.last_refill
 
         # Calculate tokens to add
         tokens_to_add = elapsed * self.refill_rate
@@ -222,6 +380,13 @@ class RateLimiter:
         self.tokens = min(self.max_tokens, self.tokens + tokens_to_add)
         self.last_refill = now
 
+    def _floor(self, priority: Priority, tokens: int) -> float:
+        """Tokens a caller of this priority must leave in the bucket."""
+        if priority == Priority.INTERACTIVE:
+            return 0.0
+        # Never reserve so much that lower lanes could starve forever
+        return min(self.max_tokens * self.interactive_reserve, self.max_tokens - tokens)
+
     def get_wait_time(self) -> float:
         """
         Get time to wait until next token is available.
@@ -241,47 +406,417 @@ class RateLimiter:
 
             return wait_time
 
-    async def acquire(self, tokens: int = 1) -> bool:
+    def available_tokens(self) -> float:
+        """
+        Get the number of tokens currently available.
+
+        Returns:
+            Available tokens after refill (may be fractional)
+        """
+        with self._lock:
+            self._refill_tokens()
+            return self.tokens
+
+    @property
+    def queued(self) -> int:
+        """Number of callers currently waiting for tokens."""
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def get_wait_stats(self) -> dict[str, dict]:
         """
-        Acquire tokens from the bucket.
+        Get wait-time histograms per priority class.
+
+        Returns:
+            Mapping of lowercase class name to histogram data
+        """
+        with self._lock:
+            return {
+                priority.name.lower(): histogram.to_dict()
+                for priority, histogram in self._wait_histograms.items()
+            }
+
+    async def acquire(
+        self, tokens: int = 1, priority: Priority = Priority.INTERACTIVE
+    ) -> bool:
+        """
+        Acquire tokens from the bucket, waiting in FIFO order if needed.
 
         Args:
             tokens: Number of tokens to acquire (default 1)
+            priority: Traffic class of the caller (default interactive)
 
         Returns:
             True when tokens acquired
+
+        Raises:
+            ValueError: If more tokens are requested than the bucket can hold
+            DeadlineExceeded: If the request deadline passes while waiting
         """
-        while True:
-            with self._lock:
-                self._refill_tokens()
-
-                if self.tokens >= tokens:
-                    # Consume tokens
-                    self.tokens -= tokens
-                    logger.debug(
-                        "Rate limit tokens acquired",
-                        tokens_acquired=tokens,
-                        tokens_remaining=self.tokens,
-                        max_tokens=self.max_tokens,
-                    )
-                    return True
+        if tokens > self.max_tokens:
+            raise ValueError(
+                f"Cannot acquire {tokens} tokens from a bucket of {self.max_tokens}"
+            )
+        budget = check_deadline("waiting for rate limit tokens")
 
-                # Calculate wait time
-                tokens_needed = tokens - self.tokens
-                wait_time = tokens_needed / self.refill_rate
+        started = time.monotonic()
+        with self._lock:
+            self._refill_tokens()
 
-            # Wait for tokens to refill
+            # Fast path: nobody queued at or above our priority and enough
+            # tokens above this class's floor
+            if not any(
+                self._lanes[p] for p in Priority if p <= priority
+            ) and self.tokens - tokens >= self._floor(priority, tokens):
+                self.tokens -= tokens
+                self._wait_histograms[priority].observe(0.0)
+                logger.debug(
+                    "Rate limit tokens acquired",
+                    tokens_acquired=tokens,
+                    tokens_remaining=self.tokens,
+                    max_tokens=self.max_tokens,
+                    priority=priority.name.lower(),
+                )
+                return True
+
+            future = asyncio.get_running_loop().create_future()
+            self._lanes[priority].append((future, tokens))
             logger.debug(
                 "Rate limit waiting for tokens",
-                wait_time=f"{wait_time:.2f}s",
                 tokens_needed=tokens,
                 tokens_available=self.tokens,
+                queue_position=len(self._lanes[priority]),
+                priority=priority.name.lower(),
             )
-            await asyncio.sleep(wait_time)
+            self._serve_waiters()
+
+        try:
+            with awaiting_tokens():
+                async with asyncio.timeout(budget):
+                    await future
+        except (asyncio.CancelledError, TimeoutError) as e:
+            with self._lock:
+                if future.done() and not future.cancelled():
+                    # Tokens were granted as we were cancelled: give them back
+                    self.tokens = min(self.max_tokens, self.tokens + tokens)
+                else:
+                    self._remove_waiter(priority, future)
+                self._serve_waiters()
+            if isinstance(e, TimeoutError):
+                raise DeadlineExceeded(
+                    "Deadline reached while waiting for rate limit tokens"
+                ) from None
+            raise
+
+        with self._lock:
+            self._wait_histograms[priority].observe(time.monotonic() - started)
+        return True
+
+    def _remove_waiter(self, priority: Priority, future: asyncio.Future) -> None:
+        """Drop a waiter from its lane (caller holds the lock)."""
+        lane = self._lanes[priority]
+        for index, (waiter, _) in enumerate(lane):
+            if waiter is future:
+                del lane[index]
+                return
+
+    def _serve_waiters(self) -> None:
+        """
+        Grant tokens to waiters, highest lane first.
+
+        Lower lanes are only served once every higher lane is empty. Schedules
+        a single timer for when the first blocked head can be served. Caller
+        holds the lock.
+        """
+        self._refill_tokens()
+
+        for priority, lane in self._lanes.items():
+            while lane:
+                future, needed = lane[0]
+                if future.done():
+                    lane.popleft()
+                    continue
+                floor = self._floor(priority, needed)
+                if self.tokens - needed < floor:
+                    # One timer, for the moment this head can be served
+                    delay = (needed + floor - self.tokens) / self.refill_rate
+                    self._cancel_timer()
+                    self._timer = future.get_loop().call_later(delay, self._on_timer)
+                    return
+                self.tokens -= needed
+                lane.popleft()
+                future.set_result(True)
+
+        self._cancel_timer()
+
+    def _cancel_timer(self) -> None:
+        """Cancel the pending wake-up timer (caller holds the lock)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _on_timer(self) -> None:
+        """Timer callback: serve whoever can now be served."""
+        with self._lock:
+            self._timer = None
+            self._serve_waiters()
 
     def reset(self) -> None:
         """Reset the rate limiter to full capacity."""
         with self._lock:
             self.tokens = self.max_tokens
-            self.last_refill = datetime.now()
+            self.last_refill = time.monotonic()
             logger.debug("Rate limiter reset", tokens=self.tokens)
+            if self.queued:
+                self._serve_waiters()
+
+    def resize(
+        self,
+        calls_per_period: int,
+        period_seconds: float | None = None,
+        guessed: bool = False,
+    ) -> None:
+        """
+        Change the bucket size and refill rate, keeping queued callers.
+
+        Args:
+            calls_per_period: New number of calls allowed per period
+            period_seconds: New period duration (unchanged if None)
+            guessed: The limit was inferred from bare 429s rather than
+                advertised (only matters to limiters that share limits)
+        """
+        with self._lock:
+            self._refill_tokens()
+            self.calls_per_period = calls_per_period
+            if period_seconds is not None:
+                self.period_seconds = period_seconds
+            self.max_tokens = calls_per_period * self.burst_multiplier
+            self.refill_rate = calls_per_period / self.period_seconds
+            self.tokens = min(self.tokens, self.max_tokens)
+            logger.info(
+                "Rate limiter resized",
+                rate_limit=f"{calls_per_period}/{self.period_seconds}s",
+            )
+            if self.queued:
+                self._serve_waiters()
+
+    def sync_remaining(self, remaining: int) -> None:
+        """
+        Lower the bucket to the number of calls upstream says are left.
+
+        Args:
+            remaining: Calls remaining in the upstream's current window
+        """
+        with self._lock:
+            self._refill_tokens()
+            self.tokens = min(self.tokens, remaining)
+
+    def block_for(self, seconds: float) -> None:
+        """
+        Hold every caller for ``seconds``, e.g. after a Retry-After.
+
+        Args:
+            seconds: Time until the next call may be made
+        """
+        with self._lock:
+            self._refill_tokens()
+            # The bucket reaches one token exactly ``seconds`` from now
+            self.tokens = min(self.tokens, 1 - seconds * self.refill_rate)
+            logger.warning("Rate limiter blocked", seconds=round(seconds, 2))
+            if self.queued:
+                self._serve_waiters()
+
+
+# === Learning limits from upstream responses ===
+
+
+@dataclass
+class RateLimitHeaders:
+    """Rate limit information advertised by an upstream response."""
+
+    limit: int | None = None
+    remaining: int | None = None
+    reset_seconds: float | None = None  # Until the current window resets
+    window_seconds: float | None = None  # Length of the window, if advertised
+    retry_after: float | None = None
+
+    @property
+    def present(self) -> bool:
+        """Whether the response carried any rate limit headers."""
+        return any(
+            value is not None
+            for value in (
+                self.limit,
+                self.remaining,
+                self.reset_seconds,
+                self.window_seconds,
+                self.retry_after,
+            )
+        )
+
+
+def _header_number(headers: Mapping[str, str], *names: str) -> float | None:
+    """Return the first parseable numeric header among ``names``."""
+    for name in names:
+        value = headers.get(name)
+        if not isinstance(value, str):
+            continue
+        try:
+            return float(value.split(",")[0].strip())
+        except ValueError:
+            continue
+    return None
+
+
+def parse_rate_limit_headers(
+    headers: Mapping[str, str], now: float | None = None
+) -> RateLimitHeaders:
+    """
+    Parse rate limit headers from an HTTP response.
+
+    Understands ``X-RateLimit-Limit/Remaining/Reset``, their unprefixed IETF
+    ``RateLimit-*`` counterparts, ``RateLimit-Policy`` (``30;w=60``) and
+    ``Retry-After`` as seconds or an HTTP date. Reset values that look like
+    Unix timestamps are converted to seconds from now. Malformed values are
+    ignored.
+
+    Args:
+        headers: Response headers (case-insensitive mapping)
+        now: Current Unix time (defaults to time.time())
+
+    Returns:
+        Parsed RateLimitHeaders; fields are None when absent
+    """
+    now = time.time() if now is None else now
+    parsed = RateLimitHeaders()
+
+    limit = _header_number(headers, "X-RateLimit-Limit", "RateLimit-Limit")
+    if limit is not None and limit > 0:
+        parsed.limit = int(limit)
+
+    remaining = _header_number(headers, "X-RateLimit-Remaining", "RateLimit-Remaining")
+    if remaining is not None and remaining >= 0:
+        parsed.remaining = int(remaining)
+
+    reset = _header_number(headers, "X-RateLimit-Reset", "RateLimit-Reset")
+    if reset is not None:
+        # Large values are epoch timestamps rather than delta-seconds
+        parsed.reset_seconds = max(0.0, reset - now if reset > 1e9 else reset)
+
+    policy = headers.get("RateLimit-Policy") or headers.get("X-RateLimit-Policy")
+    if isinstance(policy, str):
+        for param in policy.split(",")[0].split(";")[1:]:
+            name, _, value = param.strip().partition("=")
+            if name == "w":
+                try:
+                    parsed.window_seconds = float(value)
+                except ValueError:
+                    pass
+
+    retry_after = headers.get("Retry-After")
+    if isinstance(retry_after, str):
+        try:
+            parsed.retry_after = max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after).timestamp()
+                parsed.retry_after = max(0.0, retry_at - now)
+            except (TypeError, ValueError):
+                pass
+
+    return parsed
+
+
+class RateLimitLearner:
+    """
+    Adjust a RateLimiter to what an upstream actually allows.
+
+    When responses carry rate limit headers the bucket is resized to the
+    advertised limit and drained to the advertised remaining calls. When an
+    upstream answers 429 without any, the limit is cut multiplicatively on
+    each one and grows back by one call after every run of successes, never
+    above the last known good limit. Such guessed limits are resized with
+    ``guessed=True``, so a shared limiter lets them expire.
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter,
+        decrease_factor: float = 0.5,
+        min_calls: int = 1,
+        recovery_successes: int = 10,
+    ):
+        """
+        Initialize the learner.
+
+        Args:
+            limiter: Limiter to adjust
+            decrease_factor: Multiplier applied to the limit on a bare 429
+            min_calls: Lowest calls-per-period the limit is cut to
+            recovery_successes: Successful calls before the limit grows by one
+        """
+        self.limiter = limiter
+        self.decrease_factor = decrease_factor
+        self.min_calls = min_calls
+        self.recovery_successes = recovery_successes
+
+        # Best known upstream limit: configured guess until headers say otherwise
+        self.ceiling = limiter.calls_per_period
+        self.learned_from_headers = False
+        self._successes = 0
+
+    def observe(self, status: int, headers: Mapping[str, str]) -> float | None:
+        """
+        Update the limiter from one upstream response.
+
+        Args:
+            status: HTTP status code
+            headers: Response headers
+
+        Returns:
+            Seconds the limiter is now blocked for after a 429 (None if the
+            upstream gave no hint)
+        """
+        info = parse_rate_limit_headers(headers)
+        limiter = self.limiter
+
+        if info.limit is not None:
+            period = info.window_seconds or limiter.period_seconds
+            if (info.limit, period) != (
+                limiter.calls_per_period,
+                limiter.period_seconds,
+            ):
+                limiter.resize(info.limit, period)
+            self.ceiling = info.limit
+            self.learned_from_headers = True
+
+        if info.remaining is not None:
+            limiter.sync_remaining(info.remaining)
+
+        wait = info.retry_after
+        if wait is None and info.remaining == 0 and info.reset_seconds is not None:
+            wait = info.reset_seconds
+
+        if status == 429:
+            self._successes = 0
+            if not info.present:
+                calls = max(
+                    self.min_calls,
+                    int(limiter.calls_per_period * self.decrease_factor),
+                )
+                if calls < limiter.calls_per_period:
+                    limiter.resize(calls, guessed=True)
+            if wait is not None:
+                limiter.block_for(wait)
+            return wait
+
+        if wait is not None and info.remaining == 0:
+            # Upstream window exhausted: wait for the reset, not a 429
+            limiter.block_for(wait)
+
+        if not self.learned_from_headers and limiter.calls_per_period < self.ceiling:
+            self._successes += 1
+            if self._successes >= self.recovery_successes:
+                self._successes = 0
+                limiter.resize(limiter.calls_per_period + 1, guessed=True)
+
+        return None
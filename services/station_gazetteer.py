@@ -0,0 +1,335 @@
+"""
+Local station gazetteer with fuzzy, multilingual name matching.
+
+Provides:
+- normalise_name(): the canonical form station names are matched in
+- StationGazetteer: index over every name of every known station, resolving
+  user-typed locations without a network call
+- shared_gazetteer(): one loaded gazetteer per file for the whole process
+
+Users write the same station many ways: 宇治, 宇治駅, うじ, Uji, Uji Station,
+宇治站. Each station carries its Japanese name plus kana, romaji and
+simplified/traditional Chinese names, and both those names and queries are
+normalised the same way before matching:
+
+- NFKC, so full-width letters and half-width kana fold to one form
+- katakana to hiragana
+- case, spaces and punctuation ignored
+- a trailing 駅 / 站 / 车站 / えき / eki / station / sta removed
+- romaji macrons dropped, long vowels shortened (Tōkyō, Toukyou -> tokyo),
+  Kunrei spellings mapped to Hepburn (si -> shi) and m before b/p to n
+
+search() ranks candidates from a character bigram index by Dice
+similarity. resolve() is stricter, since its answer is used without asking
+the API: it accepts a normalised exact match, or a romaji name within a
+small edit distance of the whole query (Akihabra, Shinjiku). A query that
+merely contains a known name (Shin-Osaka, 名古屋港, Kyoto Tower) is left
+to the API, as is any typo in kana or kanji, where one character is
+usually a different place.
+
+The bundled data/stations.json is a seed list of major and pilgrimage
+stations; point STATION_GAZETTEER_PATH at a larger file in the same format
+to extend it.
+"""
+
+import json
+import re
+import unicodedata
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from domain.entities import Coordinates, Station
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BUNDLED_GAZETTEER = Path(__file__).resolve().parent.parent / "data" / "stations.json"
+
+# Romaji typos resolve() forgives, by normalised query length
+_TYPOS_BY_LENGTH = ((9, 2), (5, 1))
+
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+_SEPARATORS = re.compile(r"[\s\-‐‑–—_・·.,'’()（）「」]+")
+# Longest first, so 车站 is removed whole rather than leaving 车
+_SUFFIXES = ("station", "车站", "車站", "えき", "eki", "sta", "stn", "駅", "站", "驿")
+_ROMAJI_RULES = (
+    # Kunrei-shiki to Hepburn
+    (re.compile(r"sy"), "sh"),
+    (re.compile(r"[tc]y"), "ch"),
+    (re.compile(r"[zj]y"), "j"),
+    (re.compile(r"si"), "shi"),
+    (re.compile(r"ti"), "chi"),
+    (re.compile(r"tu"), "tsu"),
+    (re.compile(r"(?<![sc])hu"), "fu"),
+    (re.compile(r"zi"), "ji"),
+    # Syllabic n before labials is often written m (Shimbashi, Namba)
+    (re.compile(r"m(?=[bp])"), "n"),
+    # Long vowels: ou/oo/oh -> o, uu -> u, and doubled a/e/i
+    (re.compile(r"o(?:u|o|h(?![aeiou]))"), "o"),
+    (re.compile(r"uu"), "u"),
+    (re.compile(r"([aei])\1"), r"\1"),
+)
+
+
+def _is_latin(text: str) -> bool:
+    return all(ord(char) < 0x250 for char in text)
+
+
+def _romaji(text: str) -> str:
+    text = "".join(
+        char
+        for char in unicodedata.normalize("NFKD", text)
+        if not unicodedata.combining(char)
+    )
+    for pattern, replacement in _ROMAJI_RULES:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def normalise_name(name: str) -> str:
+    """
+    Canonical form of a station name or query.
+
+    Args:
+        name: Station name in any supported script
+
+    Returns:
+        Normalised key (empty if nothing is left)
+    """
+    text = unicodedata.normalize("NFKC", name).casefold()
+    text = text.translate(_KATAKANA_TO_HIRAGANA)
+    text = _SEPARATORS.sub("", text)
+    stripped = True
+    while stripped:
+        stripped = False
+        for suffix in _SUFFIXES:
+            if text.endswith(suffix) and len(text) > len(suffix):
+                text = text[: -len(suffix)]
+                stripped = True
+                break
+    if _is_latin(text):
+        text = _romaji(text)
+    return text
+
+
+def _max_typos(key: str) -> int:
+    """Edits resolve() allows between a query and a name (0 outside romaji)."""
+    if not _is_latin(key):
+        return 0
+    for length, typos in _TYPOS_BY_LENGTH:
+        if len(key) >= length:
+            return typos
+    return 0
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance, counting a swap of neighbours as one.
+
+    Returns:
+        The distance, or ``limit + 1`` once it is known to exceed ``limit``
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (a[i - 1] != b[j - 1]),
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+def _bigrams(key: str) -> set[str]:
+    padded = f"^{key}$"
+    return {padded[i : i + 2] for i in range(len(padded) - 1)}
+
+
+@dataclass(frozen=True)
+class StationMatch:
+    """One gazetteer hit for a query."""
+
+    station: Station
+    score: float  # 1.0 for a normalised exact match, Dice similarity otherwise
+    matched: str  # The station name that matched
+
+
+class StationGazetteer:
+    """
+    In-memory index of station names.
+
+    Lookups are a dictionary probe for exact matches, plus a bigram posting
+    list scan for fuzzy ones; both take microseconds.
+    """
+
+    def __init__(self, entries: Iterable[dict[str, Any]]):
+        """
+        Index stations.
+
+        Args:
+            entries: Station records with ``name``, ``lat``, ``lng``,
+                optional ``city`` and ``prefecture``, a ``names`` mapping of
+                other-language names (kana, romaji, zh-Hans, zh-Hant, ...)
+                and an optional list of extra ``aliases``
+        """
+        self._stations: list[Station] = []
+        self._exact: dict[str, tuple[int, str]] = {}
+        # Station, name, normalised key, gram count
+        self._aliases: list[tuple[int, str, str, int]] = []
+        self._postings: dict[str, list[int]] = {}
+
+        for entry in entries:
+            index = len(self._stations)
+            self._stations.append(
+                Station(
+                    name=entry["name"],
+                    coordinates=Coordinates(
+                        latitude=entry["lat"], longitude=entry["lng"]
+                    ),
+                    city=entry.get("city"),
+                    prefecture=entry.get("prefecture"),
+                )
+            )
+            names = [
+                entry["name"],
+                *entry.get("names", {}).values(),
+                *entry.get("aliases", []),
+            ]
+            seen: set[str] = set()
+            for name in names:
+                key = normalise_name(name)
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                # The first station listed keeps a shared name
+                self._exact.setdefault(key, (index, name))
+                grams = _bigrams(key)
+                alias_id = len(self._aliases)
+                self._aliases.append((index, name, key, len(grams)))
+                for gram in grams:
+                    self._postings.setdefault(gram, []).append(alias_id)
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "StationGazetteer":
+        """
+        Load a gazetteer from a JSON array of station records.
+
+        Args:
+            path: JSON file in the format of data/stations.json
+
+        Returns:
+            StationGazetteer over the file's stations
+        """
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        """Number of stations."""
+        return len(self._stations)
+
+    def search(self, query: str, limit: int = 5) -> list[StationMatch]:
+        """
+        Best-matching stations for a query.
+
+        Args:
+            query: Station name as the user typed it
+            limit: Maximum matches returned
+
+        Returns:
+            Matches by descending score (ties keep gazetteer order), at most
+            one per station
+        """
+        key = normalise_name(query)
+        if not key:
+            return []
+
+        exact = self._exact.get(key)
+        if exact is not None:
+            index, name = exact
+            return [StationMatch(self._stations[index], 1.0, name)][:limit]
+
+        grams = _bigrams(key)
+        shared = Counter(
+            alias_id for gram in grams for alias_id in self._postings.get(gram, ())
+        )
+        best: dict[int, tuple[float, str]] = {}
+        for alias_id, count in shared.items():
+            index, name, _, gram_count = self._aliases[alias_id]
+            score = 2 * count / (len(grams) + gram_count)
+            if score > best.get(index, (0.0, ""))[0]:
+                best[index] = (score, name)
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], item[0]))
+        return [
+            StationMatch(self._stations[index], score, name)
+            for index, (score, name) in ranked[:limit]
+        ]
+
+    def resolve(self, query: str) -> Station | None:
+        """
+        The station a query names, when that is certain enough to skip the API.
+
+        Args:
+            query: Station name as the user typed it
+
+        Returns:
+            The station with a normalised name equal to the query, or, for
+            romaji, the only station with a name a typo or two away from the
+            whole query; otherwise None
+        """
+        key = normalise_name(query)
+        if not key:
+            return None
+        exact = self._exact.get(key)
+        if exact is not None:
+            return self._stations[exact[0]]
+
+        typos = _max_typos(key)
+        if not typos:
+            return None
+        # Each edit changes at most two of the query's bigrams
+        grams = _bigrams(key)
+        shared = Counter(
+            alias_id for gram in grams for alias_id in self._postings.get(gram, ())
+        )
+        best = typos + 1
+        stations: set[int] = set()
+        for alias_id, count in shared.items():
+            if count < len(grams) - 2 * typos:
+                continue
+            index, _, alias_key, _ = self._aliases[alias_id]
+            distance = _edit_distance(key, alias_key, typos)
+            if distance > typos:
+                continue
+            if distance < best:
+                best, stations = distance, {index}
+            elif distance == best:
+                stations.add(index)
+        if len(stations) != 1:
+            return None
+        return self._stations[stations.pop()]
+
+
+@lru_cache
+def shared_gazetteer(path: str | None = None) -> StationGazetteer:
+    """Load a gazetteer once per process (the bundled one by default)."""
+    gazetteer = StationGazetteer.from_file(path or BUNDLED_GAZETTEER)
+    logger.info(
+        "Station gazetteer loaded",
+        path=str(path or BUNDLED_GAZETTEER),
+        stations=len(gazetteer),
+    )
+    return gazetteer
@@ -3,19 +3,24 @@ Unit tests for Anitabi API client.
 
 Tests cover:
 - Bangumi search near stations
-- Point retrieval for specific bangumi
+- Point retrieval for specific bangumi, singly and in bulk
+- Trusted batch parsing matching full validation
+- Columnar PointSet results
+- Streaming points with area, episode and count filters
 - Station information lookup
 - Error handling for invalid responses
-- Response caching behavior
+- Response caching behavior, including reuse of larger-radius searches
 - Rate limiting
 """
 
+import asyncio
 from unittest.mock import AsyncMock, patch
 
 import pytest
 from aiohttp import ClientError
 
-from clients.anitabi import AnitabiClient
+import clients.anitabi
+from clients.anitabi import AnitabiClient, parse_points
 from domain.entities import (
     APIError,
     Bangumi,
@@ -25,6 +30,7 @@ from domain.entities import (
     Point,
     Station,
 )
+from domain.point_set import PointSet
 
 
 class TestAnitabiClient:
@@ -138,10 +144,12 @@ class TestAnitabiClient:
             mock_get.assert_called_once_with(
                 "/near",
                 params={
-                    "lat": 35.681236,
-                    "lng": 139.767125,
+                    # Centre snapped to the 0.002° grid
+                    "lat": 35.682,
+                    "lng": 139.768,
                     "radius": 5000,  # Convert km to meters
                 },
+                cache_namespace="near",
             )
 
             # Verify results
@@ -176,7 +184,9 @@ class TestAnitabiClient:
 
             # Verify API call
             mock_get.assert_called_once_with(
-                "/bangumi_1/points/detail", params={"haveImage": "true"}
+                "/bangumi_1/points/detail",
+                params={"haveImage": "true"},
+                cache_namespace="points",
             )
 
             # Verify results
@@ -188,6 +198,35 @@ class TestAnitabiClient:
             assert points[0].episode == 1
             assert points[0].time_formatted == "2:05"
 
+    @pytest.mark.asyncio
+    async def test_get_bangumi_points_memoised(self, client, mock_points_response):
+        """Test that parsed points are reused without re-fetching."""
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = mock_points_response
+
+            points1 = await client.get_bangumi_points("bangumi_1")
+            points2 = await client.get_bangumi_points("bangumi_1")
+
+            mock_get.assert_called_once()
+            assert points2 == points1
+
+    @pytest.mark.asyncio
+    async def test_get_bangumi_points_mutation_does_not_leak(
+        self, client, mock_points_response
+    ):
+        """Test that changing a returned list leaves the cached one intact."""
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = mock_points_response
+
+            points1 = await client.get_bangumi_points("bangumi_1")
+            points1.sort(key=lambda p: p.id, reverse=True)
+            points1.append(points1[0])
+            points2 = await client.get_bangumi_points("bangumi_1")
+
+        assert points2 is not points1
+        assert len(points2) == 2
+        assert [p.id for p in points2] == ["point_1", "point_2"]
+
     @pytest.mark.asyncio
     async def test_get_bangumi_points_invalid_id(self, client):
         """Test point retrieval with invalid bangumi ID."""
@@ -197,16 +236,227 @@ class TestAnitabiClient:
             with pytest.raises(APIError, match="404"):
                 await client.get_bangumi_points("invalid_id")
 
+    @pytest.mark.asyncio
+    async def test_get_bangumi_point_set(self, client, mock_points_response):
+        """Test that the columnar result matches the Point list."""
+        raw_points = [
+            mock_points_response["data"][1],
+            dict(mock_points_response["data"][0], lat=95.0, id="bad_point"),
+            mock_points_response["data"][0],
+        ]
+
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = {"data": raw_points}
+
+            point_set = await client.get_bangumi_point_set("bangumi_1")
+            points = await client.get_bangumi_points("bangumi_1")
+
+        # The invalid item is skipped and the rest sorted, as for Point lists
+        assert isinstance(point_set, PointSet)
+        assert point_set.to_points() == points
+        assert point_set.column("id") == ["point_1", "point_2"]
+
+    @staticmethod
+    def _many_raw_points(count: int) -> list[dict]:
+        """Official-schema items spread over episodes, in shuffled order."""
+        return [
+            {
+                "id": f"p{i}",
+                "name": f"地点{i}",
+                "cn": f"地点{i}",
+                "geo": [34.0 + (i % 50) * 0.02, 135.0 + (i % 37) * 0.02],
+                "ep": (i * 7) % 12,
+                "s": (i * 13) % 1400,
+                "image": f"/points/1/p{i}.jpg",
+            }
+            for i in range(count)
+        ]
+
+    async def test_iter_bangumi_points_matches_list(self):
+        """Test that the stream yields get_bangumi_points, in order."""
+        client = AnitabiClient(use_cache=False)
+        raw_points = self._many_raw_points(300)
+        raw_points[5]["geo"] = [95.0, 135.0]  # Invalid, skipped by both
+
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = raw_points
+            streamed = [p async for p in client.iter_bangumi_points("1")]
+            listed = await client.get_bangumi_points("1")
+        await client.close()
+
+        assert len(streamed) == 299
+        assert streamed == listed
+
+    async def test_iter_bangumi_points_filters(self, client):
+        """Test bbox, episode and limit filters against the full list."""
+        bbox = (34.2, 135.1, 34.6, 135.4)
+
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = self._many_raw_points(400)
+            listed = await client.get_bangumi_points("1")
+            streamed = [
+                p
+                async for p in client.iter_bangumi_points(
+                    "1", bbox=bbox, episodes={2, 3}, limit=6
+                )
+            ]
+
+        expected = [
+            p
+            for p in listed
+            if bbox[0] <= p.coordinates.latitude <= bbox[2]
+            and bbox[1] <= p.coordinates.longitude <= bbox[3]
+            and p.episode in {2, 3}
+        ]
+        assert len(expected) > 6
+        assert streamed == expected[:6]
+
+    async def test_iter_bangumi_points_antimeridian_bbox(self, client):
+        """Test that a box with min_lng > max_lng wraps around 180°."""
+        raw_points = [
+            {"id": "east", "geo": [0.0, 179.5], "image": "/a.jpg"},
+            {"id": "west", "geo": [0.0, -179.5], "image": "/b.jpg"},
+            {"id": "far", "geo": [0.0, 0.0], "image": "/c.jpg"},
+        ]
+
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = raw_points
+            ids = [
+                p.id
+                async for p in client.iter_bangumi_points(
+                    "1", bbox=(-1.0, 179.0, 1.0, -179.0)
+                )
+            ]
+
+        assert ids == ["east", "west"]
+
+    async def test_iter_bangumi_points_parses_only_what_is_needed(self, client):
+        """Test that filtered-out items and items past the limit are not parsed."""
+        parsed = []
+        parse = clients.anitabi._parse_points_validated
+
+        def counting_parse(items, bangumi_id):
+            parsed.extend(items)
+            return parse(items, bangumi_id)
+
+        with (
+            patch.object(client, "get", new_callable=AsyncMock) as mock_get,
+            patch("clients.anitabi._parse_points_validated", counting_parse),
+        ):
+            mock_get.return_value = self._many_raw_points(1000)
+            stream = client.iter_bangumi_points("1", episodes=[0], limit=5)
+            first = await anext(stream)
+            rest = [p async for p in stream]
+
+        assert first.episode == 0
+        assert len(rest) == 4
+        assert len(parsed) == 5
+
+    def test_parse_points_normalises_values(self, mock_points_response):
+        """Test that coordinates are rounded and relative images made absolute."""
+        raw_points = mock_points_response["data"] + [
+            {
+                "id": "point_3",
+                "name": "",
+                "cn": "修学院站",
+                "geo": [35.0508213, 135.7913456],
+                "ep": "3",
+                "s": 75,
+                "image": "/points/1/point_3.jpg",
+            }
+        ]
+
+        points = parse_points(raw_points, "bangumi_1")
+
+        assert points[2].coordinates.longitude == 135.791346
+        assert str(points[2].screenshot_url).startswith("https://image.anitabi.cn/")
+
+    def test_parse_points_skips_invalid_items(self, mock_points_response):
+        """Test that an out-of-range item is dropped and the rest kept."""
+        raw_points = [
+            dict(mock_points_response["data"][0], lat=95.0),
+            mock_points_response["data"][1],
+        ]
+
+        points = parse_points(raw_points, "bangumi_1")
+
+        assert [p.id for p in points] == ["point_2"]
+
+    @pytest.mark.asyncio
+    async def test_get_many_bangumi_points_dedupes(self, client, mock_points_response):
+        """Test that bulk fetches skip repeated bangumi and repeated points."""
+        second_season = {
+            "data": [
+                dict(mock_points_response["data"][1], bangumi_id="bangumi_2"),
+                dict(mock_points_response["data"][0], id="point_3"),
+            ]
+        }
+        responses = {
+            "/bangumi_1/points/detail": mock_points_response,
+            "/bangumi_2/points/detail": second_season,
+        }
+
+        async def fake_get(endpoint, **kwargs):
+            return responses[endpoint]
+
+        with patch.object(client, "get", side_effect=fake_get) as mock_get:
+            await client.get_bangumi_points("bangumi_1")
+
+            results = [
+                result
+                async for result in client.get_many_bangumi_points(
+                    ["bangumi_1", "bangumi_2", "bangumi_1"]
+                )
+            ]
+
+        # bangumi_1 came from the memoised result; bangumi_2 was fetched once
+        assert mock_get.call_count == 2
+        by_id = dict(results)
+        assert len(results) == 2
+        assert [p.id for p in by_id["bangumi_1"]] == ["point_1", "point_2"]
+        assert [p.id for p in by_id["bangumi_2"]] == ["point_3"]
+
+    @pytest.mark.asyncio
+    async def test_get_many_bangumi_points_streams_and_skips_failures(
+        self, client, mock_points_response
+    ):
+        """Test that results arrive as fetched and failures do not abort."""
+        release_slow = asyncio.Event()
+
+        async def fake_get(endpoint, **kwargs):
+            if endpoint.startswith("/slow/"):
+                await release_slow.wait()
+                return mock_points_response
+            if endpoint.startswith("/broken/"):
+                raise APIError("API request failed with status 500")
+            return {"data": []}
+
+        with patch.object(client, "get", side_effect=fake_get):
+            stream = client.get_many_bangumi_points(["slow", "broken", "fast"])
+
+            # The fast bangumi is yielded while the slow one is still pending
+            assert await anext(stream) == ("fast", [])
+
+            release_slow.set()
+            rest = [result async for result in stream]
+
+        assert [bangumi_id for bangumi_id, _ in rest] == ["slow"]
+        assert len(rest[0][1]) == 2
+
     @pytest.mark.asyncio
     async def test_get_station_info_success(self, client, mock_station_response):
         """Test successful station information lookup."""
+        # The gazetteer knows 東京駅; exercise the /station endpoint instead
+        client.gazetteer = None
         with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
             mock_get.return_value = mock_station_response
 
             station = await client.get_station_info("東京駅")
 
             # Verify API call
-            mock_get.assert_called_once_with("/station", params={"name": "東京駅"})
+            mock_get.assert_called_once_with(
+                "/station", params={"name": "東京駅"}, cache_namespace="station"
+            )
 
             # Verify results
             assert isinstance(station, Station)
@@ -266,6 +516,59 @@ class TestAnitabiClient:
             # Should make two API calls (different parameters)
             assert mock_request.call_count == 2
 
+    @pytest.mark.asyncio
+    async def test_smaller_radius_served_from_larger(
+        self, client, mock_bangumi_response
+    ):
+        """Test that a cached larger-radius result answers smaller radii."""
+        station = Station(
+            name="Test Station", coordinates=Coordinates(latitude=35.0, longitude=135.0)
+        )
+
+        with patch.object(
+            client, "_make_request", new_callable=AsyncMock
+        ) as mock_request:
+            mock_request.return_value = mock_bangumi_response
+
+            wide = await client.search_bangumi(station, radius_km=10.0)
+            medium = await client.search_bangumi(station, radius_km=5.0)
+            narrow = await client.search_bangumi(station, radius_km=3.0)
+
+            # Only the 10km search reaches the API; 5km and 3km filter it
+            assert mock_request.call_count == 1
+            assert medium == wide
+            assert [b.id for b in narrow] == ["bangumi_1"]
+
+            # Nothing within 1km is a definite answer too
+            with pytest.raises(NoBangumiFoundError):
+                await client.search_bangumi(station, radius_km=1.0)
+            assert mock_request.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_nearby_centres_share_results(self, client, mock_bangumi_response):
+        """Test that coordinates in the same grid cell share cache entries."""
+        first = Station(
+            name="A", coordinates=Coordinates(latitude=35.0003, longitude=135.0004)
+        )
+        second = Station(
+            name="B", coordinates=Coordinates(latitude=34.9996, longitude=134.9991)
+        )
+
+        with patch.object(
+            client, "_make_request", new_callable=AsyncMock
+        ) as mock_request:
+            mock_request.return_value = mock_bangumi_response
+
+            await client.search_bangumi(first, radius_km=5.0)
+            await client.search_bangumi(second, radius_km=5.0)
+
+            assert mock_request.call_count == 1
+            assert mock_request.call_args.kwargs["params"] == {
+                "lat": 35.0,
+                "lng": 135.0,
+                "radius": 5000,
+            }
+
     @pytest.mark.asyncio
     async def test_malformed_response_handling(self, client):
         """Test handling of malformed API responses."""
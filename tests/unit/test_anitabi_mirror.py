@@ -0,0 +1,320 @@
+"""
+Unit tests for the offline Anitabi mirror.
+
+Tests cover:
+- Initial sync, and incremental syncs driven by ETags and ``modified``
+- Failed bangumi keeping their previous data
+- Bounded sync concurrency, and reads from worker threads
+- AnitabiClient answering point lookups from the mirror first
+- AnitabiClient answering point lookups from a point catalogue
+- Exporting the mirror as a point catalogue
+"""
+
+import asyncio
+
+import pytest
+
+from clients.anitabi import AnitabiClient
+from domain.entities import APIError
+from domain.point_catalogue import PointCatalogue
+from services.anitabi_mirror import (
+    AnitabiMirror,
+    MirrorRecord,
+    export_catalogue,
+    sync_mirror,
+)
+
+BASE_URL = "https://api.anitabi.cn/bangumi"
+
+
+def raw_point(point_id: str, lat: float = 34.8843, episode: int = 1) -> dict:
+    """A point item in the official /points/detail schema."""
+    return {
+        "id": point_id,
+        "name": f"スポット {point_id}",
+        "cn": f"地点 {point_id}",
+        "image": f"/points/115908/{point_id}.jpg",
+        "ep": episode,
+        "s": 120,
+        "geo": [lat, 135.8075],
+    }
+
+
+class FakeAnitabi:
+    """Upstream stand-in that serves resources with ETags and answers 304s."""
+
+    def __init__(self):
+        self.resources: dict[str, tuple[str, object]] = {}
+        self.calls: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def publish(self, bangumi_id: str, modified: int, points: list[dict]) -> None:
+        version = f"v{modified}"
+        self.resources[f"/{bangumi_id}/lite"] = (
+            f'"{bangumi_id}-lite-{version}"',
+            {
+                "id": int(bangumi_id),
+                "title": f"Anime {bangumi_id}",
+                "modified": modified,
+            },
+        )
+        self.resources[f"/{bangumi_id}/points/detail"] = (
+            f'"{bangumi_id}-points-{version}"',
+            points,
+        )
+
+    async def __call__(self, method, url, headers, response_meta=None, **kwargs):
+        path = url.removeprefix(BASE_URL)
+        self.calls.append(path)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.001)
+            if path not in self.resources:
+                raise APIError("API request failed with status 404: not found")
+            etag, body = self.resources[path]
+            if response_meta is not None:
+                not_modified = headers.get("If-None-Match") == etag
+                response_meta.update(
+                    status=304 if not_modified else 200,
+                    etag=etag,
+                    last_modified=None,
+                )
+                if not_modified:
+                    return {}
+            return body
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def upstream():
+    fake = FakeAnitabi()
+    fake.publish("115908", 100, [raw_point("a"), raw_point("b", episode=2)])
+    fake.publish("253", 200, [raw_point("c")])
+    return fake
+
+
+def make_client(**kwargs) -> AnitabiClient:
+    """A client whose rate limit never holds up the tests."""
+    return AnitabiClient(
+        use_cache=False, rate_limit_calls=10_000, rate_limit_period=1.0, **kwargs
+    )
+
+
+@pytest.fixture
+async def client(upstream, monkeypatch):
+    client = make_client(use_mirror=False)
+    monkeypatch.setattr(client, "_make_request", upstream)
+    yield client
+    await client.close()
+
+
+@pytest.fixture
+def mirror():
+    mirror = AnitabiMirror(":memory:")
+    yield mirror
+    mirror.close()
+
+
+class TestSync:
+    """Keeping the mirror up to date."""
+
+    async def test_initial_sync_adds_everything(self, client, mirror, upstream):
+        """Test that new bangumi are fetched in full."""
+        report = await sync_mirror(client, mirror, ["115908", "253", "115908"])
+
+        assert sorted(report.added) == ["115908", "253"]
+        assert mirror.bangumi_ids() == ["115908", "253"]
+        assert [p["id"] for p in mirror.get_raw_points("115908")] == ["a", "b"]
+        record = mirror.get("115908")
+        assert record.modified == 100
+        assert record.info["title"] == "Anime 115908"
+        assert record.points_etag == '"115908-points-v100"'
+
+    async def test_unchanged_bangumi_cost_one_304(self, client, mirror, upstream):
+        """Test that a repeat sync only revalidates the info endpoint."""
+        await sync_mirror(client, mirror, ["115908", "253"])
+        upstream.calls.clear()
+
+        report = await sync_mirror(client, mirror)
+
+        assert sorted(report.unchanged) == ["115908", "253"]
+        assert sorted(upstream.calls) == ["/115908/lite", "/253/lite"]
+
+    async def test_changed_bangumi_refetch_points(self, client, mirror, upstream):
+        """Test that a bumped ``modified`` stamp refreshes the points."""
+        await sync_mirror(client, mirror, ["115908", "253"])
+        upstream.publish("253", 201, [raw_point("c"), raw_point("d")])
+        upstream.calls.clear()
+
+        report = await sync_mirror(client, mirror)
+
+        assert report.updated == ["253"]
+        assert "/115908/points/detail" not in upstream.calls
+        assert [p["id"] for p in mirror.get_raw_points("253")] == ["c", "d"]
+
+    async def test_info_change_alone_keeps_points(self, client, mirror, upstream):
+        """Test that new info with the same ``modified`` skips the points."""
+        await sync_mirror(client, mirror, ["115908"])
+        etag, info = upstream.resources["/115908/lite"]
+        upstream.resources["/115908/lite"] = ('"new-etag"', {**info, "title": "New"})
+        upstream.calls.clear()
+
+        report = await sync_mirror(client, mirror)
+
+        assert report.unchanged == ["115908"]
+        assert upstream.calls == ["/115908/lite"]
+        assert mirror.get("115908").info["title"] == "New"
+
+    async def test_failures_keep_previous_data(self, client, mirror, upstream):
+        """Test that a failing bangumi is reported and left as it was."""
+        await sync_mirror(client, mirror, ["115908"])
+        del upstream.resources["/115908/lite"]
+
+        report = await sync_mirror(client, mirror, ["115908", "999"])
+
+        assert sorted(report.failed) == ["115908", "999"]
+        assert [p["id"] for p in mirror.get_raw_points("115908")] == ["a", "b"]
+        assert "999" not in mirror
+
+    async def test_concurrency_is_bounded(self, client, mirror, upstream):
+        """Test that no more than max_concurrency bangumi sync at once."""
+        ids = [str(1000 + i) for i in range(12)]
+        for bangumi_id in ids:
+            upstream.publish(bangumi_id, 1, [raw_point(f"p{bangumi_id}")])
+
+        report = await sync_mirror(client, mirror, ids, max_concurrency=3)
+
+        assert len(report.added) == 12
+        assert upstream.max_in_flight == 3
+
+    def test_mirror_persists_to_disk(self, tmp_path):
+        """Test that a file-backed mirror survives reopening."""
+        path = tmp_path / "mirror" / "anitabi.sqlite3"
+        mirror = AnitabiMirror(path)
+        mirror.put(MirrorRecord("253", {"title": "x"}, [raw_point("c")]))
+        mirror.close()
+
+        reopened = AnitabiMirror(path)
+        assert reopened.get_raw_points("253") == [raw_point("c")]
+        reopened.close()
+
+    async def test_mirror_reads_from_worker_threads(self, mirror):
+        """Test that one mirror serves concurrent reads off the event loop."""
+        mirror.put(MirrorRecord("253", {"title": "x"}, [raw_point("c")]))
+
+        results = await asyncio.gather(
+            *(asyncio.to_thread(mirror.get_raw_points, "253") for _ in range(8)),
+            asyncio.to_thread(mirror.get, "253"),
+        )
+
+        assert results[:8] == [[raw_point("c")]] * 8
+        assert results[8].info == {"title": "x"}
+
+    async def test_export_catalogue(self, client, mirror, tmp_path):
+        """Test that exported points match a live point set lookup."""
+        await sync_mirror(client, mirror, ["115908", "253"])
+
+        count = export_catalogue(mirror, tmp_path / "points.cat")
+
+        catalogue = PointCatalogue(tmp_path / "points.cat")
+        assert count == len(catalogue) == 3
+        for bangumi_id in ("115908", "253"):
+            live = await client.get_bangumi_point_set(bangumi_id)
+            assert catalogue.points(bangumi_id) == live.to_points()
+
+
+class TestMirrorFirstClient:
+    """AnitabiClient reading from the mirror."""
+
+    async def test_points_served_without_upstream(self, client, mirror, upstream):
+        """Test that mirrored bangumi never reach the API."""
+        live = await client.get_bangumi_points("115908")
+        await sync_mirror(client, mirror, ["115908"])
+
+        offline = make_client(mirror=mirror)
+        offline._make_request = upstream
+        upstream.calls.clear()
+
+        assert await offline.get_bangumi_points("115908") == live
+        assert len(await offline.get_bangumi_point_set("115908")) == 2
+        assert upstream.calls == []
+        await offline.close()
+
+    async def test_unmirrored_bangumi_go_upstream(self, mirror, upstream):
+        """Test the fallback to the live API."""
+        offline = make_client(mirror=mirror)
+        offline._make_request = upstream
+
+        points = await offline.get_bangumi_points("253")
+
+        assert [p.id for p in points] == ["c"]
+        assert upstream.calls == ["/253/points/detail"]
+        await offline.close()
+
+    async def test_use_mirror_false_ignores_mirror(self, mirror, tmp_path):
+        """Test that the mirror and catalogue can be switched off explicitly."""
+        export_catalogue(mirror, tmp_path / "points.cat")
+        client = make_client(
+            mirror=mirror,
+            catalogue=PointCatalogue(tmp_path / "points.cat"),
+            use_mirror=False,
+        )
+        assert client.mirror is None
+        assert client.catalogue is None
+        await client.close()
+
+
+class TestCatalogueFirstClient:
+    """AnitabiClient reading from an exported point catalogue."""
+
+    @pytest.fixture
+    async def offline(self, client, mirror, upstream, tmp_path):
+        await sync_mirror(client, mirror, ["115908"])
+        export_catalogue(mirror, tmp_path / "points.cat")
+        # No mirror, so anything not in the catalogue goes upstream
+        offline = make_client(catalogue=PointCatalogue(tmp_path / "points.cat"))
+        offline._make_request = upstream
+        upstream.calls.clear()
+        yield offline
+        await offline.close()
+
+    async def test_points_served_without_upstream(self, client, offline, upstream):
+        """Test that catalogued bangumi match live lookups with no API call."""
+        point_set = await offline.get_bangumi_point_set("115908")
+        points = await offline.get_bangumi_points("115908")
+        streamed = [
+            p async for p in offline.iter_bangumi_points("115908", episodes=[2])
+        ]
+        assert upstream.calls == []
+
+        live = await client.get_bangumi_points("115908")
+        assert points == point_set.to_points() == live
+        assert streamed == [p for p in live if p.episode == 2]
+
+    @pytest.mark.parametrize("limit", [None, 0, 1, 5])
+    async def test_stream_limit_matches_live(self, client, offline, limit):
+        """Test that both paths stop at the same limit."""
+        catalogued = [
+            p async for p in offline.iter_bangumi_points("115908", limit=limit)
+        ]
+        live = [p async for p in client.iter_bangumi_points("115908", limit=limit)]
+
+        assert catalogued == live
+        assert len(live) == min(2, 2 if limit is None else limit)
+
+    async def test_stream_rejects_negative_limit(self, client, offline):
+        """Test that a negative limit is an error on both paths."""
+        for source in (client, offline):
+            with pytest.raises(ValueError):
+                async for _ in source.iter_bangumi_points("115908", limit=-1):
+                    pass
+
+    async def test_uncatalogued_bangumi_go_upstream(self, offline, upstream):
+        """Test the fallback to the live API."""
+        points = await offline.get_bangumi_points("253")
+
+        assert [p.id for p in points] == ["c"]
+        assert upstream.calls == ["/253/points/detail"]
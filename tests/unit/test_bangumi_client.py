@@ -4,12 +4,14 @@ Unit tests for Bangumi API client.
 Tests cover:
 - Subject search by keyword
 - Subject details retrieval
+- Batched subject retrieval (order, projection, per-ID caching, failures)
 - Error handling for invalid parameters
 - Response caching behavior
 - Rate limiting
 - Context manager lifecycle
 """
 
+import asyncio
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -28,6 +30,7 @@ class TestBangumiClient:
             use_cache=True,
             rate_limit_calls=10,
             rate_limit_period=1.0,
+            use_title_index=False,
         )
 
     @pytest.fixture
@@ -250,7 +253,7 @@ class TestBangumiClient:
     async def test_context_manager(self, mock_search_response):
         """Test client works as async context manager."""
         client = None
-        async with BangumiClient() as ctx_client:
+        async with BangumiClient(use_title_index=False) as ctx_client:
             client = ctx_client
             assert client is not None
 
@@ -301,3 +304,101 @@ class TestBangumiClient:
                 "%E3%81%91%E3%81%84%E3%81%8A%E3%82%93" in call_args[0][0]
                 or "けいおん" in call_args[0][0]
             )
+
+    @pytest.mark.asyncio
+    async def test_get_subjects_ordered_and_projected(self, client):
+        """Test that batches keep input order and only candidate fields."""
+
+        async def fake_get(endpoint, **kwargs):
+            subject_id = int(endpoint.rsplit("/", 1)[1])
+            return {
+                "id": subject_id,
+                "name": f"name {subject_id}",
+                "name_cn": f"名 {subject_id}",
+                "air_date": "2016-08-26",
+                "summary": "A summary.",
+                "images": {"large": "https://example.com/image.jpg"},
+                "rating": {"score": 8.5},
+            }
+
+        with patch.object(client, "get", side_effect=fake_get) as mock_get:
+            subjects = await client.get_subjects([30, 10, 20, 10])
+
+            assert mock_get.call_count == 3
+        assert [s["id"] for s in subjects] == [30, 10, 20, 10]
+        assert set(subjects[0]) == set(BangumiClient.CANDIDATE_FIELDS)
+        assert subjects[1]["summary"] == "A summary."
+
+    @pytest.mark.asyncio
+    async def test_get_subjects_concurrent(self, client):
+        """Test that a batch's fetches are in flight together."""
+        in_flight = 0
+        peak = 0
+
+        async def slow_get(endpoint, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"id": int(endpoint.rsplit("/", 1)[1])}
+
+        with patch.object(client, "get", side_effect=slow_get):
+            await client.get_subjects([1, 2, 3, 4, 5])
+
+        assert peak == 5
+
+    @pytest.mark.asyncio
+    async def test_get_subjects_cached_per_id(self, client):
+        """Test that an overlapping batch only fetches the new IDs."""
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.side_effect = lambda endpoint, **kwargs: {
+                "id": int(endpoint.rsplit("/", 1)[1])
+            }
+
+            await client.get_subjects([1, 2, 3])
+            await client.get_subjects([3, 2, 4])
+
+            fetched = [call.args[0] for call in mock_get.call_args_list]
+        assert fetched.count("/subject/2") == 1
+        assert "/subject/4" in fetched
+        assert len(fetched) == 4
+
+    @pytest.mark.asyncio
+    async def test_get_subjects_v0_date_and_full_subject(self, client):
+        """Test date mapping to air_date, and fields=None keeping everything."""
+        subject = {"id": 7, "name": "x", "date": "2006-04-02", "eps": 14}
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = subject
+
+            projected = await client.get_subjects([7])
+            full = await client.get_subjects([7], fields=None)
+
+        assert projected[0]["air_date"] == "2006-04-02"
+        assert projected[0]["summary"] is None
+        assert full == [subject]
+
+    @pytest.mark.asyncio
+    async def test_get_subjects_failure_leaves_gap(self, client):
+        """Test that one failed ID does not fail the batch."""
+
+        async def flaky_get(endpoint, **kwargs):
+            if endpoint.endswith("/2"):
+                raise APIError("Subject not found (404)")
+            return {"id": int(endpoint.rsplit("/", 1)[1])}
+
+        with patch.object(client, "get", side_effect=flaky_get):
+            subjects = await client.get_subjects([1, 2, 3])
+
+        assert subjects[0]["id"] == 1
+        assert subjects[1] is None
+        assert subjects[2]["id"] == 3
+
+    @pytest.mark.asyncio
+    async def test_get_subjects_invalid_id(self, client):
+        """Test that a non-positive ID is rejected before any fetch."""
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            with pytest.raises(ValueError, match="subject_id must be positive"):
+                await client.get_subjects([1, 0])
+
+            mock_get.assert_not_called()
@@ -4,11 +4,13 @@ Unit tests for the base HTTP client.
 Tests cover:
 - HTTP request methods (GET, POST, PUT, DELETE)
 - Retry integration
-- Rate limiting integration
+- Rate limiting integration and request priorities
 - Cache integration
 - Error handling for various HTTP status codes
 - Request/response logging
 - Session management
+- Request deadlines
+- Conditional GETs
 """
 
 import asyncio
@@ -16,9 +18,14 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import aiohttp
 import pytest
+from multidict import CIMultiDict
 
 from clients.base import BaseHTTPClient, HTTPMethod
-from domain.entities import APIError
+from domain.entities import APIError, DeadlineExceededError
+from services.cache import CacheNamespace
+from services.deadline import deadline
+from services.rate_limit_backends import InProcessRateLimitBackend
+from services.retry import Priority, request_priority
 
 
 class TestBaseHTTPClient:
@@ -148,6 +155,123 @@ class TestBaseHTTPClient:
         assert result == {"data": "success"}
         assert mock_session.get.call_count == 3
 
+    @pytest.mark.asyncio
+    async def test_retry_after_429_honours_upstream_hint(self, mock_session):
+        """Test that a 429 blocks the limiter for Retry-After, then retries."""
+        limited_response = MagicMock()
+        limited_response.status = 429
+        limited_response.headers = CIMultiDict({"Retry-After": "0.2"})
+        limited_response.text = AsyncMock(return_value="Too Many Requests")
+        limited_response.__aenter__ = AsyncMock(return_value=limited_response)
+        limited_response.__aexit__ = AsyncMock(return_value=None)
+
+        success_response = MagicMock()
+        success_response.status = 200
+        success_response.headers = CIMultiDict(
+            {"x-ratelimit-limit": "40", "x-ratelimit-remaining": "39"}
+        )
+        success_response.json = AsyncMock(return_value={"data": "success"})
+        success_response.__aenter__ = AsyncMock(return_value=success_response)
+        success_response.__aexit__ = AsyncMock(return_value=None)
+
+        mock_session.get.side_effect = [limited_response, success_response]
+
+        client = BaseHTTPClient(
+            base_url="https://api.example.com",
+            session=mock_session,
+            rate_limit_calls=10,
+            rate_limit_period=1.0,
+            rate_limit_backend=InProcessRateLimitBackend(),
+        )
+
+        start_time = asyncio.get_event_loop().time()
+        result = await client.request(HTTPMethod.GET, "/test")
+        elapsed = asyncio.get_event_loop().time() - start_time
+
+        assert result == {"data": "success"}
+        assert mock_session.get.call_count == 2
+        # Waited for Retry-After rather than the 1s exponential backoff
+        assert 0.15 <= elapsed < 0.9
+
+        stats = client.get_rate_limit_stats()
+        assert stats["rate_limit"] == "40/1.0s"
+        assert stats["learned_from_headers"] is True
+
+    @pytest.mark.asyncio
+    async def test_get_if_changed_revalidates(self, mock_session):
+        """Test conditional GETs: validators are sent and 304 is not an error."""
+        fresh = MagicMock()
+        fresh.status = 200
+        fresh.headers = CIMultiDict({"ETag": '"v1"', "Last-Modified": "Mon"})
+        fresh.json = AsyncMock(return_value={"data": "v1"})
+        not_modified = MagicMock()
+        not_modified.status = 304
+        not_modified.headers = CIMultiDict({"ETag": '"v1"'})
+        for response in (fresh, not_modified):
+            response.__aenter__ = AsyncMock(return_value=response)
+            response.__aexit__ = AsyncMock(return_value=None)
+        mock_session.get.side_effect = [fresh, not_modified]
+
+        client = BaseHTTPClient(
+            base_url="https://api.example.com", session=mock_session
+        )
+
+        first = await client.get_if_changed("/resource")
+        second = await client.get_if_changed(
+            "/resource", etag=first.etag, last_modified=first.last_modified
+        )
+
+        assert first.modified and first.data == {"data": "v1"}
+        assert (first.etag, first.last_modified) == ('"v1"', "Mon")
+        assert not second.modified and second.data is None
+        assert second.etag == '"v1"'
+        headers = mock_session.get.call_args.kwargs["headers"]
+        assert headers["If-None-Match"] == '"v1"'
+        assert headers["If-Modified-Since"] == "Mon"
+        # Conditional responses bypass the response cache entirely
+        assert (await client._cache.get_stats())["size"] == 0
+
+    @pytest.mark.asyncio
+    async def test_request_fails_fast_past_deadline(self):
+        """Test that no call is made once the deadline has passed."""
+        client = BaseHTTPClient(base_url="https://api.example.com", use_cache=True)
+
+        with patch.object(
+            client, "_make_request", new_callable=AsyncMock
+        ) as mock_request:
+            mock_request.return_value = {"data": "test"}
+            await client.request(HTTPMethod.GET, "/cached")
+
+            with deadline(0.01):
+                await asyncio.sleep(0.02)
+
+                # Cached responses are still served
+                assert await client.request(HTTPMethod.GET, "/cached") == {
+                    "data": "test"
+                }
+
+                with pytest.raises(DeadlineExceededError):
+                    await client.request(HTTPMethod.GET, "/fresh")
+
+            assert mock_request.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_request_timeout_capped_by_deadline(self):
+        """Test that the per-call timeout never outlives the deadline."""
+        client = BaseHTTPClient(base_url="https://api.example.com", use_cache=False)
+
+        with patch.object(
+            client, "_make_request", new_callable=AsyncMock
+        ) as mock_request:
+            mock_request.return_value = {"data": "test"}
+
+            await client.request(HTTPMethod.GET, "/test")
+            assert mock_request.call_args.kwargs["timeout"] is None
+
+            with deadline(5.0):
+                await client.request(HTTPMethod.GET, "/test")
+            assert 0 < mock_request.call_args.kwargs["timeout"] <= 5.0
+
     @pytest.mark.asyncio
     async def test_no_retry_on_client_error(self, mock_session):
         """Test no retry on 4xx client errors."""
@@ -199,6 +323,33 @@ class TestBaseHTTPClient:
             assert elapsed >= 0.25  # Should wait for rate limit
             assert all(r == {"data": "test"} for r in results)
 
+    @pytest.mark.asyncio
+    async def test_request_priority_is_recorded(self):
+        """Test that request priorities reach the rate limiter."""
+        client = BaseHTTPClient(
+            base_url="https://api.example.com",
+            use_cache=False,
+            rate_limit_backend=InProcessRateLimitBackend(),
+        )
+
+        with patch.object(
+            client, "_make_request", new_callable=AsyncMock
+        ) as mock_request:
+            mock_request.return_value = {"data": "test"}
+
+            await client.request(HTTPMethod.GET, "/test")
+            await client.request(
+                HTTPMethod.GET, "/prefetch", priority=Priority.SPECULATIVE
+            )
+            with request_priority(Priority.SPECULATIVE):
+                await client.request(HTTPMethod.GET, "/prefetch/context")
+
+        stats = client.get_rate_limit_stats()
+        assert stats["key"] == "api.example.com"
+        assert stats["wait_seconds"]["interactive"]["count"] == 1
+        assert stats["wait_seconds"]["speculative"]["count"] == 2
+        assert stats["wait_seconds"]["background"]["count"] == 0
+
     @pytest.mark.asyncio
     async def test_caching_get_requests(self):
         """Test that GET requests are cached."""
@@ -225,6 +376,23 @@ class TestBaseHTTPClient:
             assert mock_request.call_count == 1
             assert result1 == result2
 
+    @pytest.mark.asyncio
+    async def test_refresh_ahead_is_opt_in(self):
+        """Test that only clients created with refresh_ahead refresh entries."""
+
+        class Client(BaseHTTPClient):
+            CACHE_NAMESPACES = {
+                "hot": CacheNamespace(ttl_seconds=60, max_size=10, refresh_ahead=0.2)
+            }
+
+        per_call = Client(base_url="https://api.example.com")
+        long_lived = Client(base_url="https://api.example.com", refresh_ahead=True)
+
+        assert per_call._cache._namespaces["hot"].policy.refresh_ahead == 0
+        assert long_lived._cache._namespaces["hot"].policy.refresh_ahead == 0.2
+        await per_call.close()
+        await long_lived.close()
+
     @pytest.mark.asyncio
     async def test_no_caching_post_requests(self):
         """Test that POST requests are not cached."""
@@ -10,11 +10,15 @@ Tests cover:
 """
 
 import asyncio
+import gc
+import random
+import weakref
 from datetime import datetime, timedelta
 
 import pytest
 
-from services.cache import CacheEntry, ResponseCache
+from services.cache import CacheEntry, CacheNamespace, ResponseCache, cached_method
+from services.deadline import check_deadline, deadline
 
 
 class TestResponseCache:
@@ -308,3 +312,414 @@ class TestResponseCache:
         stats = await cache.get_stats()
         assert stats["hits"] == 1
         assert stats["misses"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cache_decorator_caches_falsy_results(self):
+        """Test that the decorator memoises None and empty results."""
+        cache = ResponseCache(default_ttl_seconds=60)
+        call_count = 0
+
+        @cache.cached("falsy_endpoint")
+        async def returns_empty(kind: str):
+            nonlocal call_count
+            call_count += 1
+            return None if kind == "none" else []
+
+        assert await returns_empty("none") is None
+        assert await returns_empty("none") is None
+        assert await returns_empty("list") == []
+        assert await returns_empty("list") == []
+        assert call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_decorator_coalesces_concurrent_calls(self):
+        """Test that concurrent identical calls share one computation."""
+        cache = ResponseCache(default_ttl_seconds=60)
+        call_count = 0
+
+        @cache.cached("slow_endpoint")
+        async def slow_operation(param: str):
+            nonlocal call_count
+            call_count += 1
+            await asyncio.sleep(0.05)
+            return {"result": param}
+
+        results = await asyncio.gather(*[slow_operation("same") for _ in range(5)])
+
+        assert call_count == 1
+        assert all(r == {"result": "same"} for r in results)
+        stats = await cache.get_stats()
+        assert stats["coalesced"] == 4
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cache_decorator_does_not_cache_exceptions(self):
+        """Test that failures propagate to all waiters and are not cached."""
+        cache = ResponseCache(default_ttl_seconds=60)
+        call_count = 0
+
+        @cache.cached("failing_endpoint")
+        async def failing_operation():
+            nonlocal call_count
+            call_count += 1
+            await asyncio.sleep(0.01)
+            if call_count == 1:
+                raise ValueError("boom")
+            return "ok"
+
+        results = await asyncio.gather(
+            failing_operation(), failing_operation(), return_exceptions=True
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+
+        # Next call retries instead of returning a cached failure
+        assert await failing_operation() == "ok"
+        assert call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_method_uses_instance_cache(self):
+        """Test that cached_method keys on arguments and skips self."""
+
+        class Client:
+            def __init__(self, cache):
+                self._cache = cache
+                self.calls = 0
+
+            @cached_method("lookup", ttl_seconds=60)
+            async def lookup(self, name: str) -> list[str]:
+                self.calls += 1
+                return [name]
+
+        cached_client = Client(ResponseCache(default_ttl_seconds=60))
+        assert await cached_client.lookup("a") == ["a"]
+        assert await cached_client.lookup("a") == ["a"]
+        assert await cached_client.lookup("b") == ["b"]
+        assert cached_client.calls == 2
+
+        # No cache configured: every call goes through
+        uncached_client = Client(None)
+        await uncached_client.lookup("a")
+        await uncached_client.lookup("a")
+        assert uncached_client.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_method_entries_do_not_keep_instance(self):
+        """Test that refreshable entries hold the instance only weakly."""
+        cache = ResponseCache(
+            default_ttl_seconds=60,
+            namespaces={
+                "hot": CacheNamespace(ttl_seconds=60, max_size=10, refresh_ahead=0.5),
+                "cold": CacheNamespace(ttl_seconds=60, max_size=10),
+            },
+        )
+
+        class Client:
+            _cache = cache
+
+            @cached_method("hot", namespace="hot")
+            async def hot(self) -> int:
+                return 1
+
+            @cached_method("cold", namespace="cold")
+            async def cold(self) -> int:
+                return 2
+
+        client = Client()
+        await client.hot()
+        await client.cold()
+        (hot_entry,) = cache._namespaces["hot"].entries.values()
+        (cold_entry,) = cache._namespaces["cold"].entries.values()
+        assert hot_entry.refresher is not None
+        # Nothing refreshes the namespace, so nothing is kept to recompute it
+        assert cold_entry.refresher is None
+
+        alive = weakref.ref(client)
+        del client
+        gc.collect()
+        assert alive() is None
+        with pytest.raises(ReferenceError):
+            await hot_entry.refresher()
+
+    @pytest.mark.asyncio
+    async def test_namespaces_have_independent_ttl_and_size(self):
+        """Test that namespaces apply their own TTL and size budget."""
+        cache = ResponseCache(
+            default_ttl_seconds=60,
+            namespaces={
+                "short": CacheNamespace(ttl_seconds=0.1, max_size=2),
+                "long": CacheNamespace(ttl_seconds=60, max_size=10),
+            },
+        )
+
+        await cache.set("a", 1, namespace="short")
+        await cache.set("b", 2, namespace="short")
+        await cache.set("c", 3, namespace="short")  # evicts "a"
+        await cache.set("a", 10, namespace="long")
+
+        # Same key in different namespaces does not collide
+        assert await cache.get("a", namespace="short") is None
+        assert await cache.get("a", namespace="long") == 10
+
+        await asyncio.sleep(0.15)
+        assert await cache.get("b", namespace="short") is None
+        assert await cache.get("a", namespace="long") == 10
+
+        stats = await cache.get_stats()
+        short = stats["namespaces"]["short"]
+        assert short["evictions"] == 1
+        assert short["misses"] == 2
+        assert stats["namespaces"]["long"]["hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_namespace_admission_policy(self):
+        """Test that values rejected by the admission policy are not stored."""
+        cache = ResponseCache(
+            default_ttl_seconds=60,
+            namespaces={"nonempty": CacheNamespace(60, 10, admit=bool)},
+        )
+
+        assert await cache.set("empty", [], namespace="nonempty") is False
+        assert await cache.set("full", [1], namespace="nonempty") is True
+
+        assert await cache.get("empty", namespace="nonempty") is None
+        assert await cache.get("full", namespace="nonempty") == [1]
+        stats = await cache.get_stats()
+        assert stats["namespaces"]["nonempty"]["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_clear_single_namespace(self):
+        """Test clearing one namespace leaves the others intact."""
+        cache = ResponseCache(
+            default_ttl_seconds=60,
+            namespaces={"other": CacheNamespace(ttl_seconds=60, max_size=10)},
+        )
+
+        await cache.set("key", "default")
+        await cache.set("key", "other", namespace="other")
+
+        await cache.clear(namespace="other")
+
+        assert await cache.get("key") == "default"
+        assert await cache.get("key", namespace="other") is None
+
+    @pytest.mark.asyncio
+    async def test_refresh_ahead_refreshes_hot_entries(self):
+        """Test that hot entries near expiry are refreshed in the background."""
+        cache = ResponseCache(
+            default_ttl_seconds=60,
+            namespaces={
+                "hot": CacheNamespace(
+                    ttl_seconds=0.3, max_size=10, refresh_ahead=0.5, refresh_min_hits=2
+                )
+            },
+        )
+        call_count = 0
+
+        @cache.cached("points", namespace="hot")
+        async def fetch_points():
+            nonlocal call_count
+            call_count += 1
+            return call_count
+
+        assert await fetch_points() == 1
+        await fetch_points()
+        await asyncio.sleep(0.2)  # enter the refresh-ahead window
+        assert await fetch_points() == 1  # hit that triggers the refresh
+        await asyncio.sleep(0.05)
+        assert call_count == 2
+
+        # After the original expiry the refreshed value is still served
+        await asyncio.sleep(0.1)
+        assert await fetch_points() == 2
+        assert call_count == 2
+
+        stats = await cache.get_stats()
+        assert stats["namespaces"]["hot"]["refreshes"] == 1
+        assert stats["namespaces"]["hot"]["saved_misses"] == 1
+        await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_refresh_ahead_outlives_enqueuing_deadline(self):
+        """Test that refreshes do not inherit the deadline of the first request."""
+        cache = ResponseCache(
+            default_ttl_seconds=60,
+            namespaces={
+                "hot": CacheNamespace(
+                    ttl_seconds=0.3, max_size=10, refresh_ahead=0.5, refresh_min_hits=2
+                )
+            },
+        )
+        call_count = 0
+
+        @cache.cached("points", namespace="hot")
+        async def fetch_points():
+            nonlocal call_count
+            check_deadline("fetching points")
+            call_count += 1
+            return call_count
+
+        await fetch_points()
+        await fetch_points()
+        await asyncio.sleep(0.2)  # enter the refresh-ahead window
+        with deadline(0.01):
+            # Starts the refresh worker inside this request's deadline
+            assert await fetch_points() == 1
+        await asyncio.sleep(0.05)
+        assert call_count == 2
+
+        # Refresh the refreshed entry, long after that deadline passed
+        await fetch_points()
+        await asyncio.sleep(0.2)
+        await fetch_points()
+        await asyncio.sleep(0.05)
+        assert call_count == 3
+
+        stats = await cache.get_stats()
+        assert stats["namespaces"]["hot"]["refreshes"] == 2
+        assert stats["namespaces"]["hot"]["refresh_failures"] == 0
+        await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_refresh_ahead_skips_cold_entries(self):
+        """Test that rarely used entries are left to expire."""
+        cache = ResponseCache(
+            default_ttl_seconds=60,
+            namespaces={
+                "hot": CacheNamespace(
+                    ttl_seconds=0.2, max_size=10, refresh_ahead=0.5, refresh_min_hits=3
+                )
+            },
+        )
+        call_count = 0
+
+        @cache.cached("points", namespace="hot")
+        async def fetch_points():
+            nonlocal call_count
+            call_count += 1
+            return call_count
+
+        await fetch_points()
+        await asyncio.sleep(0.15)
+        await fetch_points()  # single hit: not hot
+        await asyncio.sleep(0.05)
+
+        assert call_count == 1
+        stats = await cache.get_stats()
+        assert stats["refreshes"] == 0
+
+    @pytest.mark.asyncio
+    async def test_refresh_ahead_waits_for_gate(self):
+        """Test that background refreshes wait for the refresh gate."""
+        gate = asyncio.Event()
+
+        async def refresh_gate():
+            await gate.wait()
+
+        cache = ResponseCache(
+            default_ttl_seconds=60,
+            refresh_gate=refresh_gate,
+            namespaces={
+                "hot": CacheNamespace(
+                    ttl_seconds=0.3, max_size=10, refresh_ahead=0.9, refresh_min_hits=1
+                )
+            },
+        )
+        call_count = 0
+
+        async def fetch():
+            nonlocal call_count
+            call_count += 1
+            return call_count
+
+        await cache.get_or_compute("key", fetch, namespace="hot")
+        await asyncio.sleep(0.05)
+        await cache.get_or_compute("key", fetch, namespace="hot")
+        await asyncio.sleep(0.05)
+        assert call_count == 1
+
+        gate.set()
+        await asyncio.sleep(0.01)
+        assert call_count == 2
+        await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_ttl_jitter_spreads_expiry(self):
+        """Test that jitter shortens TTLs by a bounded random amount."""
+        cache = ResponseCache(default_ttl_seconds=100, ttl_jitter=0.2)
+
+        for i in range(50):
+            await cache.set(f"key_{i}", i)
+
+        ttls = {
+            entry.ttl_seconds for entry in cache._namespaces["default"].entries.values()
+        }
+        assert len(ttls) > 1
+        assert all(80 <= ttl <= 100 for ttl in ttls)
+
+    @pytest.mark.asyncio
+    async def test_refreshes_jitter_the_base_ttl(self):
+        """Test that repeated refreshes do not compound the jitter."""
+        cache = ResponseCache(
+            default_ttl_seconds=60,
+            namespaces={
+                "hot": CacheNamespace(
+                    ttl_seconds=100, max_size=10, refresh_ahead=0.1, ttl_jitter=0.2
+                )
+            },
+        )
+
+        async def fetch():
+            return "value"
+
+        await cache.get_or_compute("key", fetch, namespace="hot")
+        for _ in range(30):
+            await cache._refresh_entry("hot", "key")
+            entry = cache._namespaces["hot"].entries["key"]
+            assert 80 <= entry.ttl_seconds <= 100
+            assert entry.base_ttl_seconds == 100
+
+        stats = await cache.get_stats()
+        assert stats["namespaces"]["hot"]["refreshes"] == 30
+        await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_early_expiration_triggers_recompute(self):
+        """Test XFetch early expiration for entries close to expiry."""
+
+        class FixedRandom(random.Random):
+            def random(self):
+                # -ln(1 - 0.999) ~= 6.9, so the early window is ~6.9x compute time
+                return 0.999
+
+        cache = ResponseCache(
+            default_ttl_seconds=1.0, early_expiration_beta=1.0, rng=FixedRandom()
+        )
+        call_count = 0
+
+        async def slow_fetch():
+            nonlocal call_count
+            call_count += 1
+            await asyncio.sleep(0.05)
+            return call_count
+
+        await cache.get_or_compute("key", slow_fetch)
+
+        # Far from expiry the entry is served as usual
+        assert await cache.get_or_compute("key", slow_fetch) == 1
+
+        # Within ~0.35s of expiry the entry is recomputed early
+        await asyncio.sleep(0.7)
+        assert await cache.get_or_compute("key", slow_fetch) == 2
+
+        stats = await cache.get_stats()
+        assert stats["namespaces"]["default"]["early_expirations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_plain_set_entries_never_expire_early(self):
+        """Test that entries without a known compute time use the exact TTL."""
+        cache = ResponseCache(default_ttl_seconds=0.2, early_expiration_beta=10.0)
+
+        await cache.set("key", "value")
+        await asyncio.sleep(0.15)
+
+        assert await cache.get("key") == "value"
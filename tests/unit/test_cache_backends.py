@@ -0,0 +1,300 @@
+"""
+Unit tests for shared cache backends.
+
+Tests cover:
+- Identical get/set/delete/clear and TTL semantics across backends
+- ResponseCache near-cache behaviour on top of a shared backend
+- JSON payloads for remote backends, refusing pickled entries
+- Graceful degradation when the backend is unavailable
+- Backend URL parsing
+"""
+
+import asyncio
+import json
+import pickle
+import time
+
+import pytest
+
+from domain.entities import Coordinates, Point
+from domain.point_set import PointSet
+from services.cache import ResponseCache
+from services.cache_backends import (
+    CacheBackendError,
+    InProcessBackend,
+    RedisBackend,
+    SharedCacheServer,
+    UnixSocketBackend,
+    create_cache_backend,
+)
+
+
+@pytest.fixture(params=["in_process", "unix_socket", "redis"])
+async def backend(request, tmp_path):
+    """Yield each backend type, starting a local server where needed."""
+    if request.param == "in_process":
+        yield InProcessBackend(prefix="test")
+        return
+
+    if request.param == "unix_socket":
+        server = SharedCacheServer(socket_path=str(tmp_path / "cache.sock"))
+        await server.start()
+        client = UnixSocketBackend(server.socket_path, prefix="test")
+    else:
+        # The shared cache daemon doubles as a local Redis stand-in over TCP
+        server = SharedCacheServer(port=0)
+        await server.start()
+        client = RedisBackend(host=server.host, port=server.port, prefix="test")
+
+    yield client
+
+    await client.close()
+    await server.close()
+
+
+class TestCacheBackends:
+    """Semantics every backend must share."""
+
+    @pytest.mark.asyncio
+    async def test_set_get_delete(self, backend):
+        """Test basic round trip of arbitrary Python values."""
+        expires_at = time.time() + 60
+        await backend.set("ns:key", {"points": [1, 2, 3]}, expires_at)
+
+        value, stored_expiry = await backend.get("ns:key")
+        assert value == {"points": [1, 2, 3]}
+        assert stored_expiry == pytest.approx(expires_at)
+
+        assert await backend.delete("ns:key") is True
+        assert await backend.get("ns:key") is None
+        assert await backend.delete("ns:key") is False
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self, backend):
+        """Test that entries past their expiry are never returned."""
+        await backend.set("short", "value", time.time() + 0.1)
+        assert await backend.get("short") is not None
+
+        await asyncio.sleep(0.15)
+        assert await backend.get("short") is None
+
+        # Already-expired writes are dropped
+        await backend.set("stale", "value", time.time() - 1)
+        assert await backend.get("stale") is None
+
+    @pytest.mark.asyncio
+    async def test_clear_by_prefix(self, backend):
+        """Test that clear only removes keys under the given prefix."""
+        expires_at = time.time() + 60
+        await backend.set("points:a", 1, expires_at)
+        await backend.set("points:b", 2, expires_at)
+        await backend.set("station:a", 3, expires_at)
+
+        assert await backend.clear("points:") == 2
+        assert await backend.get("points:a") is None
+        assert (await backend.get("station:a"))[0] == 3
+
+        assert await backend.clear() == 1
+        assert await backend.get("station:a") is None
+
+    @pytest.mark.asyncio
+    async def test_round_trips_cached_domain_values(self, backend):
+        """Test that the values clients cache come back equal."""
+        expires_at = time.time() + 60
+        point = Point(
+            id="p1",
+            name="宇治橋",
+            cn_name="宇治桥",
+            coordinates=Coordinates(latitude=34.8844, longitude=135.8077),
+            bangumi_id="115908",
+            bangumi_title="響け！ユーフォニアム",
+            episode=1,
+            time_seconds=90,
+            screenshot_url="https://image.anitabi.cn/points/p1.jpg",
+        )
+        values = {
+            "points": [point],
+            "point_set": PointSet.from_points([point]),
+            "tuple": ("a", 1, (2.5, None)),
+            "int_keys": {1: "one", "__type__": "not a tag"},
+        }
+        for key, value in values.items():
+            await backend.set(key, value, expires_at)
+
+        assert (await backend.get("points"))[0] == [point]
+        assert (await backend.get("point_set"))[0].to_points() == [point]
+        assert (await backend.get("tuple"))[0] == ("a", 1, (2.5, None))
+        assert (await backend.get("int_keys"))[0] == {
+            1: "one",
+            "__type__": "not a tag",
+        }
+
+
+class TestRemoteSerialisation:
+    """JSON payloads written to remote backends."""
+
+    @pytest.fixture
+    async def remote(self):
+        server = SharedCacheServer(port=0)
+        await server.start()
+        client = RedisBackend(host=server.host, port=server.port, prefix="test")
+        yield client
+        await client.close()
+        await server.close()
+
+    @pytest.mark.asyncio
+    async def test_payload_is_json(self, remote):
+        """Test that entries are stored as readable JSON."""
+        expires_at = time.time() + 60
+        await remote.set("key", {"points": [1, 2]}, expires_at)
+
+        raw = await remote.execute("GET", "test:key")
+
+        assert json.loads(raw) == [pytest.approx(expires_at), {"points": [1, 2]}]
+
+    @pytest.mark.asyncio
+    async def test_pickle_payload_is_rejected(self, remote):
+        """Test that a pickled entry is refused rather than unpickled."""
+        payload = pickle.dumps((time.time() + 60, ["value"]))
+        await remote.execute("SET", "test:key", payload)
+
+        with pytest.raises(CacheBackendError, match="Invalid cache entry"):
+            await remote.get("key")
+
+    @pytest.mark.asyncio
+    async def test_unsupported_value_is_not_stored(self, remote):
+        """Test that values without a JSON encoding fail to encode."""
+        with pytest.raises(TypeError, match="Cannot store object"):
+            await remote.set("key", object(), time.time() + 60)
+
+        assert await remote.get("key") is None
+
+
+class TestSharedCacheServer:
+    """Memory bounds of the shared cache daemon."""
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self):
+        """Test that the server holds at most max_entries keys."""
+        async with SharedCacheServer(port=0, max_entries=2) as server:
+            client = RedisBackend(host=server.host, port=server.port, prefix="test")
+            expires_at = time.time() + 60
+            await client.set("a", 1, expires_at)
+            await client.set("b", 2, expires_at)
+            assert await client.get("a") is not None  # b is now the oldest
+            await client.set("c", 3, expires_at)
+
+            assert await client.get("b") is None
+            assert (await client.get("a"))[0] == 1
+            assert (await client.get("c"))[0] == 3
+            assert await client.execute("DBSIZE") == 2
+            assert server.evictions == 1
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_sweeps_expired_keys(self):
+        """Test that expired keys are removed without being read."""
+        async with SharedCacheServer(port=0, sweep_interval_seconds=0.05) as server:
+            client = RedisBackend(host=server.host, port=server.port, prefix="test")
+            await client.set("short", "value", time.time() + 0.02)
+            await client.set("long", "value", time.time() + 60)
+            assert len(server._data) == 2
+
+            await asyncio.sleep(0.15)
+
+            assert list(server._data) == [b"test:long"]
+            await client.close()
+
+
+class TestResponseCacheWithBackend:
+    """ResponseCache behaviour on top of a shared backend."""
+
+    @pytest.mark.asyncio
+    async def test_caches_share_entries_through_backend(self, backend):
+        """Test that a write in one cache is visible to another."""
+        writer = ResponseCache(default_ttl_seconds=60, backend=backend)
+        reader = ResponseCache(default_ttl_seconds=60, backend=backend)
+
+        await writer.set("key", ["shared"])
+        assert await reader.get("key") == ["shared"]
+
+        stats = await reader.get_stats()
+        assert stats["namespaces"]["default"]["backend_hits"] == 1
+
+        # Second read is served from the reader's near cache
+        assert await reader.get("key") == ["shared"]
+        stats = await reader.get_stats()
+        assert stats["namespaces"]["default"]["backend_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_delete_invalidates_backend(self, backend):
+        """Test that delete and clear reach the shared tier."""
+        first = ResponseCache(default_ttl_seconds=60, backend=backend)
+        second = ResponseCache(default_ttl_seconds=60, backend=backend)
+
+        await first.set("key", "value")
+        await first.set("other", "value", namespace="points")
+        assert await first.delete("key") is True
+        assert await second.get("key") is None
+
+        await first.clear(namespace="points")
+        assert await second.get("other", namespace="points") is None
+
+    @pytest.mark.asyncio
+    async def test_near_cache_ttl_is_capped(self):
+        """Test that L1 entries expire before the shared entry when capped."""
+        backend = InProcessBackend(prefix="test")
+        cache = ResponseCache(
+            default_ttl_seconds=60, backend=backend, near_cache_ttl_seconds=0.1
+        )
+
+        await cache.set("key", "value")
+        await backend.set("default:key", "updated", time.time() + 60)
+        assert await cache.get("key") == "value"
+
+        await asyncio.sleep(0.15)
+        assert await cache.get("key") == "updated"
+
+    @pytest.mark.asyncio
+    async def test_unavailable_backend_degrades_to_local(self, tmp_path):
+        """Test that a dead backend does not break caching."""
+        backend = UnixSocketBackend(str(tmp_path / "missing.sock"), timeout=0.5)
+        cache = ResponseCache(default_ttl_seconds=60, backend=backend)
+
+        assert await cache.get("key") is None
+        await cache.set("key", "value")
+        assert await cache.get("key") == "value"
+        await cache.close()
+
+
+class TestCreateCacheBackend:
+    """Backend URL parsing."""
+
+    def test_empty_url_disables_backend(self):
+        """Test that no URL means no shared backend."""
+        assert create_cache_backend("") is None
+        assert create_cache_backend(None) is None
+
+    def test_memory_backend_is_shared(self):
+        """Test that memory:// returns one process-wide backend."""
+        first = create_cache_backend("memory://")
+        assert isinstance(first, InProcessBackend)
+        assert create_cache_backend("memory://") is first
+
+    def test_unix_and_redis_urls(self):
+        """Test socket path and Redis URL parsing."""
+        unix_backend = create_cache_backend("unix:///tmp/cache.sock")
+        assert isinstance(unix_backend, UnixSocketBackend)
+        assert unix_backend.unix_path == "/tmp/cache.sock"
+
+        redis_backend = create_cache_backend("redis://:secret@cache.local:6380/2")
+        assert isinstance(redis_backend, RedisBackend)
+        assert redis_backend.host == "cache.local"
+        assert redis_backend.port == 6380
+        assert redis_backend.db == 2
+        assert redis_backend.password == "secret"
+
+    def test_unsupported_url(self):
+        """Test that unknown schemes are rejected."""
+        with pytest.raises(ValueError, match="Unsupported cache backend URL"):
+            create_cache_backend("memcached://localhost")
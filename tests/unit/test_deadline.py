@@ -0,0 +1,75 @@
+"""
+Unit tests for request deadlines.
+
+Tests cover:
+- Setting, nesting and clearing deadlines
+- Fail-fast checks once the budget is spent
+- Isolation between concurrent tasks
+"""
+
+import asyncio
+
+import pytest
+
+from services.deadline import (
+    DeadlineExceeded,
+    check_deadline,
+    clear_deadline,
+    deadline,
+    remaining_budget,
+    start_deadline,
+)
+
+
+class TestDeadline:
+    """Test the request deadline contextvar."""
+
+    def test_no_deadline_by_default(self):
+        """Test that code outside a request has no budget limit."""
+        assert remaining_budget() is None
+        assert check_deadline("anything") is None
+
+    def test_nested_deadline_only_shortens(self):
+        """Test that an inner deadline cannot extend the outer one."""
+        with deadline(1.0):
+            with deadline(60.0):
+                assert remaining_budget() <= 1.0
+            with deadline(0.5):
+                assert remaining_budget() <= 0.5
+            assert 0.5 < remaining_budget() <= 1.0
+        assert remaining_budget() is None
+
+    @pytest.mark.asyncio
+    async def test_check_fails_fast_once_expired(self):
+        """Test that work is refused after the deadline passes."""
+        with deadline(0.01):
+            await asyncio.sleep(0.02)
+            with pytest.raises(DeadlineExceeded, match="before fetching points"):
+                check_deadline("fetching points")
+
+    def test_start_and_clear_without_block(self):
+        """Test the token-based API used by agent callbacks."""
+        token = start_deadline(5.0)
+        assert remaining_budget() is not None
+        clear_deadline(token)
+        assert remaining_budget() is None
+
+        start_deadline(5.0)
+        clear_deadline()
+        assert remaining_budget() is None
+
+    @pytest.mark.asyncio
+    async def test_tasks_inherit_but_do_not_leak(self):
+        """Test that child tasks see the deadline and siblings do not."""
+
+        async def child():
+            return remaining_budget()
+
+        async def sibling():
+            await asyncio.sleep(0)
+            return remaining_budget()
+
+        other = asyncio.create_task(sibling())
+        with deadline(5.0):
+            assert await asyncio.create_task(child()) is not None
+        assert await other is None
@@ -0,0 +1,118 @@
+"""
+Unit tests for vectorised distance utilities.
+
+Tests cover:
+- Agreement with Coordinates.distance_to in float64 and float32
+- Matrix shapes, symmetry and block boundaries
+- Input validation
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from domain import geo
+from domain.entities import Coordinates
+from domain.geo import (
+    cross_distances,
+    distances_from,
+    haversine_km,
+    pairwise_distances,
+)
+
+
+def random_coordinates(count: int, seed: int, spread: float) -> list[Coordinates]:
+    """Coordinates scattered around Kyoto, or worldwide for large spreads."""
+    rng = random.Random(seed)
+    return [
+        Coordinates(
+            latitude=max(-89.0, min(89.0, 35.0 + rng.uniform(-spread, spread) / 2)),
+            longitude=max(-180.0, min(180.0, 135.7 + rng.uniform(-spread, spread))),
+        )
+        for _ in range(count)
+    ]
+
+
+def columns(coordinates: list[Coordinates]) -> tuple[np.ndarray, np.ndarray]:
+    return (
+        np.array([c.latitude for c in coordinates]),
+        np.array([c.longitude for c in coordinates]),
+    )
+
+
+def reference_matrix(a: list[Coordinates], b: list[Coordinates]) -> np.ndarray:
+    return np.array([[x.distance_to(y) for y in b] for x in a])
+
+
+class TestDistanceAccuracy:
+    """Results must match the scalar implementation."""
+
+    @pytest.mark.parametrize("spread", [0.2, 180.0])
+    def test_cross_matches_distance_to(self, spread):
+        """Test float64 and float32 matrices against distance_to."""
+        a = random_coordinates(40, seed=1, spread=spread)
+        b = random_coordinates(25, seed=2, spread=spread)
+        expected = reference_matrix(a, b)
+
+        exact = cross_distances(*columns(a), *columns(b))
+        approx = cross_distances(*columns(a), *columns(b), dtype=np.float32)
+
+        assert exact.shape == (40, 25)
+        np.testing.assert_allclose(exact, expected, rtol=1e-9, atol=1e-9)
+        assert approx.dtype == np.float32
+        np.testing.assert_allclose(approx, expected, rtol=1e-4, atol=1e-3)
+
+    def test_distances_from_matches_distance_to(self):
+        """Test one-to-many distances from a station."""
+        kyoto = Coordinates(latitude=34.985849, longitude=135.758767)
+        points = random_coordinates(50, seed=3, spread=1.0)
+
+        distances = distances_from(kyoto.latitude, kyoto.longitude, *columns(points))
+
+        np.testing.assert_allclose(
+            distances, [kyoto.distance_to(p) for p in points], rtol=1e-9
+        )
+
+    def test_haversine_broadcasts(self):
+        """Test that element-wise distances follow NumPy broadcasting."""
+        distances = haversine_km(0.0, 0.0, [0.0, 0.0], [90.0, 180.0])
+
+        np.testing.assert_allclose(
+            distances, [np.pi / 2 * 6371.0, np.pi * 6371.0], rtol=1e-12
+        )
+
+
+class TestDistanceMatrices:
+    """Matrix structure and validation."""
+
+    def test_pairwise_is_symmetric_with_zero_diagonal(self, monkeypatch):
+        """Test pairwise output across several row blocks."""
+        monkeypatch.setattr(geo, "BLOCK_ELEMENTS", 64)
+        points = random_coordinates(30, seed=4, spread=2.0)
+
+        matrix = pairwise_distances(*columns(points))
+
+        assert matrix.shape == (30, 30)
+        np.testing.assert_array_equal(np.diag(matrix), 0.0)
+        np.testing.assert_allclose(matrix, matrix.T, rtol=1e-12)
+        np.testing.assert_allclose(
+            matrix, reference_matrix(points, points), rtol=1e-9, atol=1e-9
+        )
+
+    def test_empty_inputs(self):
+        """Test that empty sets give empty matrices."""
+        assert pairwise_distances([], []).shape == (0, 0)
+        assert cross_distances([1.0], [2.0], [], []).shape == (1, 0)
+
+    def test_rejects_mismatched_columns(self):
+        """Test that latitude and longitude must pair up."""
+        with pytest.raises(ValueError, match="equal length"):
+            pairwise_distances([1.0, 2.0], [1.0])
+        with pytest.raises(ValueError, match="equal length"):
+            distances_from(0.0, 0.0, [1.0], [[1.0]])
+
+    def test_rejects_unsupported_dtype(self):
+        """Test that only float32 and float64 are accepted."""
+        with pytest.raises(ValueError, match="float32 or float64"):
+            pairwise_distances([1.0], [1.0], dtype=np.float16)
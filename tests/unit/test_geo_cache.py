@@ -0,0 +1,101 @@
+"""
+Unit tests for geo-aware result reuse.
+
+Tests cover:
+- Snapping centres to the grid
+- Finding cached radii that contain a query, smallest first
+- Forgetting radii and least recently used centres
+- Narrowing /near responses to a smaller radius
+"""
+
+import pytest
+
+from services.geo_cache import RadiusCoverage, within_radius
+
+
+class TestRadiusCoverage:
+    """Registry of cached radii per centre."""
+
+    def test_snap(self):
+        """Test that nearby coordinates snap to the same cell centre."""
+        coverage = RadiusCoverage(grid_degrees=0.002)
+
+        assert coverage.snap(35.681236, 139.767125) == (35.682, 139.768)
+        assert coverage.snap(35.6815, 139.7675) == (35.682, 139.768)
+        assert coverage.snap(-33.8688, 151.2093) == (-33.868, 151.21)
+
+    def test_snap_disabled(self):
+        """Test that a zero grid leaves coordinates alone."""
+        coverage = RadiusCoverage(grid_degrees=0)
+
+        assert coverage.snap(35.681236, 139.767125) == (35.681236, 139.767125)
+
+    def test_covering_radii_smallest_first(self):
+        """Test that only radii containing the query are returned."""
+        coverage = RadiusCoverage()
+        centre = coverage.snap(35.0, 135.0)
+        for radius in (10_000, 3_000, 5_000):
+            coverage.add(centre, radius)
+
+        assert coverage.covering(centre, 4_000) == [5_000, 10_000]
+        assert coverage.covering(centre, 5_000) == [5_000, 10_000]
+        assert coverage.covering(centre, 20_000) == []
+        assert coverage.covering((0.0, 0.0), 1_000) == []
+
+    def test_discard(self):
+        """Test forgetting radii whose results expired."""
+        coverage = RadiusCoverage()
+        coverage.add((35.0, 135.0), 5_000)
+        coverage.add((35.0, 135.0), 10_000)
+
+        coverage.discard((35.0, 135.0), 5_000)
+        assert coverage.covering((35.0, 135.0), 1_000) == [10_000]
+
+        coverage.discard((35.0, 135.0), 10_000)
+        coverage.discard((1.0, 1.0), 10_000)
+        assert coverage.covering((35.0, 135.0), 1_000) == []
+
+    def test_least_recently_used_centre_forgotten(self):
+        """Test that the registry stays within max_centres."""
+        coverage = RadiusCoverage(max_centres=2)
+        coverage.add((1.0, 1.0), 1_000)
+        coverage.add((2.0, 2.0), 1_000)
+        coverage.covering((1.0, 1.0), 1_000)  # (2, 2) is now the oldest
+
+        coverage.add((3.0, 3.0), 1_000)
+
+        assert coverage.covering((1.0, 1.0), 1_000) == [1_000]
+        assert coverage.covering((2.0, 2.0), 1_000) == []
+        assert coverage.covering((3.0, 3.0), 1_000) == [1_000]
+
+    def test_negative_grid_rejected(self):
+        """Test input validation."""
+        with pytest.raises(ValueError):
+            RadiusCoverage(grid_degrees=-1)
+
+
+class TestWithinRadius:
+    """Narrowing /near responses."""
+
+    def test_keeps_items_inside_radius(self):
+        """Test filtering on distance, including the boundary."""
+        response = {
+            "data": [
+                {"id": "a", "distance": 0.4},
+                {"id": "b", "distance": 3.0},
+                {"id": "c", "distance": 7.2},
+            ],
+            "total": 3,
+        }
+
+        narrowed = within_radius(response, 3.0)
+
+        assert [item["id"] for item in narrowed["data"]] == ["a", "b"]
+        assert narrowed["total"] == 2
+        assert len(response["data"]) == 3
+
+    def test_unknown_distance_not_narrowed(self):
+        """Test that items without a distance make the result unusable."""
+        response = {"data": [{"id": "a", "distance": 1.0}, {"id": "b"}]}
+
+        assert within_radius(response, 5.0) is None
@@ -0,0 +1,226 @@
+"""
+Unit tests for the screenshot image cache.
+
+Tests cover:
+- Downloading, content-addressed storage and local paths
+- Fresh hits, conditional revalidation and deduplication
+- Prefetch with bounded concurrency and failure reporting
+- Thumbnails (when Pillow is installed)
+"""
+
+import asyncio
+import hashlib
+import io
+
+import pytest
+
+from domain.entities import APIError
+from services.image_cache import Image, ImageCache
+
+URL = "https://image.anitabi.cn/points/115908/qys7fu.jpg?plan=h160"
+
+
+class FakeUpstream:
+    """Image server honouring If-None-Match, counting requests."""
+
+    def __init__(self, images: dict[str, bytes], delay: float = 0.0):
+        self.images = images
+        self.delay = delay
+        self.requests: list[tuple[str, dict[str, str]]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, url, headers):
+        self.requests.append((url, headers))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if url not in self.images:
+                raise APIError("Image request failed with status 404")
+            body = self.images[url]
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            if headers.get("If-None-Match") == etag:
+                return 304, b"", {"ETag": etag}
+            return 200, body, {"ETag": etag, "Content-Type": "image/jpeg"}
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+async def cache(tmp_path):
+    cache = ImageCache(tmp_path / "images", max_concurrency=2)
+    yield cache
+    await cache.close()
+
+
+def serve(cache: ImageCache, images: dict[str, bytes], **kwargs) -> FakeUpstream:
+    upstream = FakeUpstream(images, **kwargs)
+    cache._download = upstream
+    return upstream
+
+
+class TestImageCache:
+    """Fetching and storing single images."""
+
+    async def test_download_stores_by_content_hash(self, cache):
+        """Test that the original lands under its sha256 and is indexed."""
+        serve(cache, {URL: b"jpeg bytes"})
+
+        image = await cache.get(URL)
+
+        assert image.digest == hashlib.sha256(b"jpeg bytes").hexdigest()
+        assert image.path.name == f"{image.digest}.jpg"
+        assert image.path.read_bytes() == b"jpeg bytes"
+        assert cache.local_path(URL) == image.path
+        assert cache.stats.downloaded == 1
+        assert cache.stats.bytes_downloaded == len(b"jpeg bytes")
+
+    async def test_local_path_unknown_url(self, cache):
+        """Test that uncached images have no local path."""
+        assert cache.local_path(URL) is None
+        assert cache.local_path(URL, thumbnail=True) is None
+
+    async def test_fresh_entry_is_a_hit(self, cache):
+        """Test that a fresh entry is served without a request."""
+        upstream = serve(cache, {URL: b"jpeg bytes"})
+
+        await cache.get(URL)
+        image = await cache.get(URL)
+
+        assert len(upstream.requests) == 1
+        assert image.path.exists()
+        assert cache.stats.hits == 1
+        assert cache.stats.bytes_saved == len(b"jpeg bytes")
+
+    async def test_stale_entry_revalidated(self, tmp_path):
+        """Test that a stale entry sends its ETag and a 304 keeps it."""
+        cache = ImageCache(tmp_path, max_age_seconds=0)
+        upstream = serve(cache, {URL: b"jpeg bytes"})
+
+        first = await cache.get(URL)
+        second = await cache.get(URL)
+        await cache.close()
+
+        assert second == first
+        assert upstream.requests[1][1]["If-None-Match"].startswith('"')
+        assert cache.stats.revalidated == 1
+        assert cache.stats.bytes_saved == len(b"jpeg bytes")
+
+    async def test_changed_image_replaced(self, cache):
+        """Test that a changed upstream image is downloaded again."""
+        upstream = serve(cache, {URL: b"old"})
+        await cache.get(URL)
+        upstream.images[URL] = b"new"
+
+        image = await cache.get(URL, revalidate=True)
+
+        assert image.path.read_bytes() == b"new"
+        assert cache.local_path(URL) == image.path
+
+    async def test_same_content_stored_once(self, cache):
+        """Test that identical bytes under two URLs share one file."""
+        other = URL.split("?")[0]
+        serve(cache, {URL: b"same", other: b"same"})
+
+        first = await cache.get(URL)
+        second = await cache.get(other)
+
+        assert first.path == second.path
+        assert cache.stats.deduplicated == 1
+        assert len(cache) == 2
+
+    async def test_concurrent_requests_share_a_fetch(self, cache):
+        """Test that simultaneous gets of one URL download it once."""
+        upstream = serve(cache, {URL: b"jpeg bytes"}, delay=0.01)
+
+        images = await asyncio.gather(*(cache.get(URL) for _ in range(5)))
+
+        assert len(upstream.requests) == 1
+        assert len({image.path for image in images}) == 1
+
+    async def test_failed_fetch_raises(self, cache):
+        """Test that an uncached image that cannot be fetched raises."""
+        serve(cache, {})
+
+        with pytest.raises(APIError):
+            await cache.get(URL)
+        assert cache.stats.failed == 1
+
+    async def test_index_survives_reopen(self, tmp_path):
+        """Test that a new cache on the same directory finds old entries."""
+        cache = ImageCache(tmp_path)
+        serve(cache, {URL: b"jpeg bytes"})
+        image = await cache.get(URL)
+        await cache.close()
+
+        reopened = ImageCache(tmp_path)
+        assert reopened.local_path(URL) == image.path
+        await reopened.close()
+
+
+class TestPrefetch:
+    """Prefetching many images."""
+
+    async def test_prefetch_reports_each_url(self, cache):
+        """Test the report for new, cached and broken URLs."""
+        urls = [f"https://image.anitabi.cn/points/1/{i}.jpg" for i in range(4)]
+        serve(cache, {url: url.encode() for url in urls[:3]})
+        await cache.get(urls[0])
+
+        report = await cache.prefetch([*urls, urls[1]])
+
+        assert report.cached == [urls[0]]
+        assert sorted(report.downloaded) == urls[1:3]
+        assert report.failed == [urls[3]]
+
+    async def test_prefetch_revalidate(self, cache):
+        """Test that revalidation reports unchanged images."""
+        serve(cache, {URL: b"jpeg bytes"})
+        await cache.prefetch([URL])
+
+        report = await cache.prefetch([URL], revalidate=True)
+
+        assert report.unchanged == [URL]
+
+    async def test_concurrency_is_bounded(self, cache):
+        """Test that no more than max_concurrency downloads overlap."""
+        urls = [f"https://image.anitabi.cn/points/1/{i}.jpg" for i in range(10)]
+        upstream = serve(cache, {url: url.encode() for url in urls}, delay=0.01)
+
+        report = await cache.prefetch(urls)
+
+        assert len(report.downloaded) == 10
+        assert upstream.max_in_flight == 2
+
+    async def test_stats_summary(self, cache):
+        """Test that latency and byte counts are summarised."""
+        serve(cache, {URL: b"jpeg bytes"})
+        await cache.prefetch([URL])
+        await cache.prefetch([URL])
+
+        summary = cache.stats.summary()
+
+        assert summary["downloaded"] == 1
+        assert summary["hits"] == 1
+        assert summary["bytes_saved"] == len(b"jpeg bytes")
+        assert summary["fetch_ms_p95"] >= summary["fetch_ms_p50"] >= 0
+
+
+@pytest.mark.skipif(Image is None, reason="Pillow not installed")
+class TestThumbnails:
+    """Downscaled copies."""
+
+    async def test_thumbnail_downscaled(self, tmp_path):
+        """Test that thumbnails keep the aspect ratio at the set height."""
+        original = io.BytesIO()
+        Image.new("RGB", (640, 360), "red").save(original, "PNG")
+        cache = ImageCache(tmp_path, thumbnail_height=90)
+        serve(cache, {URL: original.getvalue()})
+
+        image = await cache.get(URL)
+        assert cache.local_path(URL, thumbnail=True) == image.thumbnail
+        await cache.close()
+
+        with Image.open(image.thumbnail) as thumbnail:
+            assert thumbnail.size == (160, 90)
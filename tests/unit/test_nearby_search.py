@@ -0,0 +1,288 @@
+"""
+Unit tests for local nearby-bangumi search.
+
+Tests cover:
+- Grouping radius hits by bangumi (nearest distance, hit count, order)
+- Agreement with a brute-force search over random points
+- Checking the mirror for changes and rebuilding the shared index off the
+  event loop, but not when a sync only records that nothing changed
+- Taking indexed points from a point catalogue
+- AnitabiClient answering search_bangumi locally only in areas /near has
+  shown to be fully mirrored, and otherwise calling /near
+"""
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+
+from clients.anitabi import AnitabiClient
+from domain.entities import Coordinates, NoBangumiFoundError, Station
+from domain.geo import distances_from
+from domain.point_catalogue import PointCatalogue
+from services.anitabi_mirror import AnitabiMirror, MirrorRecord, export_catalogue
+from services.nearby_search import NearbyBangumiIndex, shared_nearby_index
+
+UJI = (34.8843, 135.8075)
+KYOTO_STATION = (34.985849, 135.758767)
+
+
+def raw_point(point_id: str, lat: float, lng: float) -> dict:
+    """A point item in the official /points/detail schema."""
+    return {
+        "id": point_id,
+        "name": f"スポット {point_id}",
+        "cn": f"地点 {point_id}",
+        "image": f"/points/{point_id}.jpg",
+        "ep": 1,
+        "s": 60,
+        "geo": [lat, lng],
+    }
+
+
+def lite_info(bangumi_id: str, title: str, cn: str) -> dict:
+    """Bangumi info in the /lite schema."""
+    return {
+        "id": int(bangumi_id),
+        "title": title,
+        "cn": cn,
+        "cover": f"https://lain.bgm.tv/pic/cover/l/{bangumi_id}.jpg",
+        "color": "#ee8a4a",
+        "modified": 1,
+    }
+
+
+@pytest.fixture
+def mirror():
+    mirror = AnitabiMirror(":memory:")
+    # Euphonium: three points in Uji, one at Kyoto station
+    mirror.put(
+        MirrorRecord(
+            "115908",
+            lite_info("115908", "響け！ユーフォニアム", "吹响吧！上低音号"),
+            [
+                raw_point("u1", UJI[0], UJI[1]),
+                raw_point("u2", UJI[0] + 0.002, UJI[1]),
+                raw_point("u3", UJI[0], UJI[1] + 0.003),
+                raw_point("u4", *KYOTO_STATION),
+            ],
+        )
+    )
+    # K-On!: one point at Kyoto station, one far away in Toyosato
+    mirror.put(
+        MirrorRecord(
+            "1424",
+            lite_info("1424", "けいおん！", "轻音少女"),
+            [
+                raw_point("k1", KYOTO_STATION[0], KYOTO_STATION[1] + 0.001),
+                raw_point("k2", 35.179798, 136.232495),
+            ],
+        )
+    )
+    yield mirror
+    mirror.close()
+
+
+def station(lat: float, lng: float) -> Station:
+    return Station(name="Test", coordinates=Coordinates(latitude=lat, longitude=lng))
+
+
+class TestNearbyBangumiIndex:
+    """Grouping radius hits into /near items."""
+
+    def test_groups_hits_by_bangumi(self, mirror):
+        """Test distance, count and ordering of each bangumi."""
+        index = NearbyBangumiIndex.from_mirror(mirror)
+
+        items = index.near(*UJI, radius_km=1.0)
+
+        assert [item["id"] for item in items] == ["115908"]
+        assert items[0]["points_count"] == 3
+        assert items[0]["distance"] == pytest.approx(0.0, abs=1e-9)
+        assert items[0]["title"] == "響け！ユーフォニアム"
+        assert items[0]["cn_title"] == "吹响吧！上低音号"
+
+        # From Kyoto station both are in range, K-On! slightly further away
+        items = index.near(*KYOTO_STATION, radius_km=1.0)
+        assert [item["id"] for item in items] == ["115908", "1424"]
+        assert [item["points_count"] for item in items] == [1, 1]
+        assert items[0]["distance"] < items[1]["distance"]
+
+    def test_nothing_in_range(self, mirror):
+        """Test an area with no mirrored points."""
+        index = NearbyBangumiIndex.from_mirror(mirror)
+
+        assert index.near(43.0687, 141.3508, radius_km=5.0) == []
+        assert len(index) == 2
+        assert index.point_count == 6
+
+    def test_matches_brute_force(self):
+        """Test random bangumi against a direct distance computation."""
+        rng = np.random.default_rng(7)
+        mirror = AnitabiMirror(":memory:")
+        points = {}
+        for b in range(30):
+            bangumi_id = str(500 + b)
+            lats = rng.uniform(34.5, 35.5, 40)
+            lngs = rng.uniform(135.0, 136.0, 40)
+            points[bangumi_id] = (lats, lngs)
+            mirror.put(
+                MirrorRecord(
+                    bangumi_id,
+                    lite_info(bangumi_id, f"作品{b}", f"作品{b}"),
+                    [
+                        raw_point(f"{bangumi_id}-{i}", lat, lng)
+                        for i, (lat, lng) in enumerate(zip(lats, lngs, strict=True))
+                    ],
+                )
+            )
+        index = NearbyBangumiIndex.from_mirror(mirror)
+
+        items = index.near(35.0, 135.5, radius_km=8.0)
+
+        expected = {}
+        for bangumi_id, (lats, lngs) in points.items():
+            # Points are stored with 6-decimal coordinates
+            distances = distances_from(35.0, 135.5, lats.round(6), lngs.round(6))
+            hits = distances[distances <= 8.0]
+            if len(hits):
+                expected[bangumi_id] = (len(hits), hits.min())
+        assert {item["id"] for item in items} == set(expected)
+        for item in items:
+            count, nearest = expected[item["id"]]
+            assert item["points_count"] == count
+            assert item["distance"] == pytest.approx(nearest)
+        distances = [item["distance"] for item in items]
+        assert distances == sorted(distances)
+        mirror.close()
+
+    def test_catalogue_points_match_parsed_points(self, mirror, tmp_path):
+        """Test that an index built from a catalogue answers identically."""
+        export_catalogue(mirror, tmp_path / "points.cat")
+        catalogue = PointCatalogue(tmp_path / "points.cat")
+
+        parsed = NearbyBangumiIndex.from_mirror(mirror)
+        with patch("clients.anitabi.parse_point_set") as parse:
+            indexed = NearbyBangumiIndex.from_mirror(mirror, catalogue)
+        parse.assert_not_called()
+
+        for lat, lng in (UJI, KYOTO_STATION):
+            assert indexed.near(lat, lng, 2.0) == parsed.near(lat, lng, 2.0)
+
+    async def test_shared_index_rebuilt_after_changes(self, mirror):
+        """Test that new mirror data is searchable without a restart."""
+        index = await shared_nearby_index(mirror)
+        assert await shared_nearby_index(mirror) is index
+
+        mirror.put(
+            MirrorRecord(
+                "362",
+                lite_info("362", "氷菓", "冰菓"),
+                [raw_point("h1", 36.1415, 137.2524)],
+            )
+        )
+
+        # The old index answers while the new one is built in a thread
+        assert await shared_nearby_index(mirror) is index
+        rebuilt = index
+        for _ in range(200):
+            rebuilt = await shared_nearby_index(mirror)
+            if rebuilt is not index:
+                break
+            await asyncio.sleep(0.005)
+        assert rebuilt is not index
+        assert [item["id"] for item in rebuilt.near(36.1415, 137.2524, 1.0)] == ["362"]
+
+    async def test_version_read_off_the_event_loop(self, mirror):
+        """Test that checking the mirror for changes does not block the loop."""
+        threads = []
+        data_version = mirror.data_version
+
+        def record_thread():
+            threads.append(threading.current_thread())
+            return data_version()
+
+        with patch.object(mirror, "data_version", record_thread):
+            await shared_nearby_index(mirror)
+
+        assert threads and threading.main_thread() not in threads
+
+    async def test_sync_bookkeeping_keeps_index(self, tmp_path):
+        """Test that only content changes, from any connection, bump the version."""
+        path = tmp_path / "anitabi.sqlite3"
+        server, sync_job = AnitabiMirror(path), AnitabiMirror(path)
+        sync_job.put(MirrorRecord("362", lite_info("362", "氷菓", "冰菓"), []))
+        version = server.data_version()
+
+        sync_job.mark_synced("362", 1.0)
+        assert server.data_version() == version
+
+        sync_job.put(MirrorRecord("362", lite_info("362", "氷菓", "冰菓"), []))
+        assert server.data_version() != version
+        server.close()
+        sync_job.close()
+
+
+class TestClientLocalSearch:
+    """AnitabiClient.search_bangumi with local search enabled."""
+
+    @pytest.fixture
+    async def client(self, mirror):
+        client = AnitabiClient(use_cache=False, mirror=mirror, local_search=True)
+        yield client
+        await client.close()
+
+    async def near_items(self, client, lat: float, lng: float, radius_km: float):
+        """What /near returns for a fully mirrored area."""
+        index = await shared_nearby_index(client.mirror)
+        return index.near(*client._near_coverage.snap(lat, lng), radius_km)
+
+    async def test_answers_locally_once_area_confirmed(self, client):
+        """Test that a fully mirrored area is answered without upstream."""
+        items = await self.near_items(client, *KYOTO_STATION, 1.0)
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = {"data": items}
+            remote = await client.search_bangumi(station(*KYOTO_STATION), 1.0)
+            local = await client.search_bangumi(station(*KYOTO_STATION), 1.0)
+            smaller = await client.search_bangumi(station(*KYOTO_STATION), 0.5)
+
+        mock_get.assert_called_once()
+        assert local == remote
+        assert [b.id for b in local] == ["115908", "1424"]
+        assert str(local[0].cover_url).endswith("/115908.jpg")
+        assert local[0].primary_color == "#ee8a4a"
+        assert [b.id for b in smaller] == [b.id for b in local if b.distance_km <= 0.5]
+
+    async def test_unmirrored_bangumi_keep_area_upstream(self, client):
+        """Test that an area with bangumi the mirror lacks is never answered locally."""
+        items = await self.near_items(client, *KYOTO_STATION, 1.0)
+        unmirrored = {**items[0], "id": "9999", "title": "Not mirrored"}
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = {"data": [*items, unmirrored]}
+            await client.search_bangumi(station(*KYOTO_STATION), 1.0)
+            found = await client.search_bangumi(station(*KYOTO_STATION), 1.0)
+
+        assert mock_get.call_count == 2
+        assert "9999" in {b.id for b in found}
+
+    async def test_falls_back_to_near_endpoint(self, client):
+        """Test that areas the mirror does not cover go upstream."""
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = {"data": []}
+
+            with pytest.raises(NoBangumiFoundError):
+                await client.search_bangumi(station(43.0687, 141.3508), 5.0)
+
+            assert mock_get.call_args.args[0] == "/near"
+
+    async def test_disabled_by_default(self, mirror):
+        """Test that a mirror alone does not change search behaviour."""
+        client = AnitabiClient(use_cache=False, mirror=mirror, local_search=False)
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = {"data": []}
+            with pytest.raises(NoBangumiFoundError):
+                await client.search_bangumi(station(*UJI), 1.0)
+            mock_get.assert_called_once()
+        await client.close()
@@ -0,0 +1,176 @@
+"""
+Unit tests for the memory-mapped point catalogue.
+
+Tests cover:
+- Lossless round trips of PointSets through the file
+- Zero-copy, read-only views and the whole-catalogue view
+- Pickling catalogue-backed sets
+- JSON columns of a view holding only the strings it uses
+- Rejecting duplicate bangumi and malformed files
+"""
+
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from domain.entities import Coordinates, Point
+from domain.point_catalogue import (
+    CatalogueFormatError,
+    PointCatalogue,
+    write_catalogue,
+)
+from domain.point_set import PointSet
+
+
+def make_points(bangumi_id: str, count: int, **overrides) -> list[Point]:
+    """Valid points for one bangumi with predictable values."""
+    return [
+        Point(
+            **{
+                "id": f"{bangumi_id}_{i}",
+                "name": f"スポット{i}",
+                "cn_name": f"地点{i}",
+                "coordinates": Coordinates(
+                    latitude=35.0 + i * 0.001234, longitude=135.768123
+                ),
+                "bangumi_id": bangumi_id,
+                "bangumi_title": f"作品 {bangumi_id}",
+                "episode": i % 3,
+                "time_seconds": 30 * i,
+                "screenshot_url": f"https://image.anitabi.cn/{bangumi_id}/{i}.jpg",
+                **overrides,
+            }
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def catalogue_points():
+    return {
+        "115908": make_points("115908", 5, address="京都府宇治市"),
+        "253": make_points("253", 3),
+        "empty": [],
+        "362": make_points("362", 4, opening_hours="9:00-17:00"),
+    }
+
+
+@pytest.fixture
+def catalogue(tmp_path, catalogue_points):
+    path = tmp_path / "points.cat"
+    write_catalogue(
+        path,
+        (
+            (bangumi_id, PointSet.from_points(points))
+            for bangumi_id, points in catalogue_points.items()
+        ),
+    )
+    return PointCatalogue(path)
+
+
+class TestRoundTrip:
+    """Data read back equals data written."""
+
+    def test_points_round_trip(self, catalogue, catalogue_points):
+        """Test every bangumi, including an empty one."""
+        assert catalogue.bangumi_ids() == ["115908", "253", "empty", "362"]
+        assert len(catalogue) == 12
+        for bangumi_id, points in catalogue_points.items():
+            assert catalogue.points(bangumi_id) == points
+            assert catalogue.point_set(bangumi_id).to_records() == [
+                p.model_dump() for p in points
+            ]
+
+    def test_strings_stored_once(self, catalogue):
+        """Test that repeated titles and names share heap entries."""
+        # Names like "スポット0" recur across bangumi and titles recur
+        # within one; each must still appear in the heap exactly once
+        strings = list(catalogue.strings)
+        assert len(strings) == len(set(strings))
+        assert "作品 115908" in strings
+
+    def test_views_are_zero_copy_and_read_only(self, catalogue):
+        """Test that columns live in the mapping and cannot be modified."""
+        point_set = catalogue.point_set("115908")
+
+        assert not point_set.latitude.flags.owndata
+        assert not point_set.latitude.flags.writeable
+        with pytest.raises(ValueError):
+            point_set.episode[0] = 1
+
+    def test_all_points_supports_vectorised_queries(self, catalogue):
+        """Test the whole-catalogue view with filtering and sorting."""
+        everything = catalogue.all_points()
+
+        first_episode = everything.filter(everything.episode == 0).sorted("latitude")
+
+        assert len(everything) == 12
+        assert set(first_episode.column("bangumi_id")) == {"115908", "253", "362"}
+        assert np.all(np.diff(first_episode.latitude) >= 0)
+
+    def test_pickles_by_path(self, catalogue, catalogue_points):
+        """Test that a catalogue-backed set survives pickling."""
+        restored = pickle.loads(pickle.dumps(catalogue.point_set("253")))
+
+        assert restored.to_points() == catalogue_points["253"]
+
+    def test_json_columns_of_a_view_are_its_own_size(self, tmp_path):
+        """Test that encoding a view leaves out the rest of the heap."""
+        path = tmp_path / "large.cat"
+        write_catalogue(
+            path,
+            (
+                (str(i), PointSet.from_points(make_points(str(i), 20)))
+                for i in range(50)
+            ),
+        )
+        view = PointCatalogue(path).point_set("7")
+        standalone = PointSet.from_points(make_points("7", 20))
+
+        data = json.loads(json.dumps(view.to_json_columns()))
+
+        assert len(json.dumps(data)) == len(json.dumps(standalone.to_json_columns()))
+        assert PointSet.from_json_columns(data).to_points() == standalone.to_points()
+
+    def test_catalogue_can_be_rewritten_from_itself(self, tmp_path, catalogue):
+        """Test that views (sharing the whole heap) re-export compactly."""
+        copy_path = tmp_path / "copy.cat"
+        write_catalogue(copy_path, [("253", catalogue.point_set("253"))])
+
+        copy = PointCatalogue(copy_path)
+        assert copy.points("253") == catalogue.points("253")
+        assert len(copy.strings) < len(catalogue.strings)
+
+
+class TestErrors:
+    """Invalid input and files."""
+
+    def test_missing_bangumi(self, catalogue):
+        """Test lookups of bangumi that are not in the catalogue."""
+        with pytest.raises(KeyError):
+            catalogue.point_set("unknown")
+        assert "unknown" not in catalogue
+        assert "253" in catalogue
+
+    def test_duplicate_bangumi_rejected(self, tmp_path):
+        """Test that each bangumi may be written once."""
+        point_set = PointSet.from_points(make_points("1", 2))
+        with pytest.raises(ValueError, match="Duplicate"):
+            write_catalogue(tmp_path / "dup.cat", [("1", point_set), ("1", point_set)])
+
+    @pytest.mark.parametrize("content", [b"", b"not a catalogue at all" * 4])
+    def test_rejects_foreign_files(self, tmp_path, content):
+        """Test that empty and non-catalogue files are refused."""
+        path = tmp_path / "bad.cat"
+        path.write_bytes(content)
+        with pytest.raises(CatalogueFormatError):
+            PointCatalogue(path)
+
+    def test_rejects_truncated_files(self, tmp_path, catalogue):
+        """Test that a cut-off file is detected rather than misread."""
+        path = tmp_path / "truncated.cat"
+        path.write_bytes(open(catalogue.path, "rb").read()[:-20])
+        with pytest.raises(CatalogueFormatError, match="Truncated"):
+            PointCatalogue(path)
@@ -0,0 +1,211 @@
+"""
+Unit tests for the columnar PointSet.
+
+Tests cover:
+- Lossless round trips through Point entities, model_dump() records and
+  JSON columns
+- Constraint checks when building from raw columns
+- Filtered, sliced and sorted views sharing one string table
+- Distances from an origin
+"""
+
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from domain.entities import Coordinates, Point
+from domain.point_set import PointSet
+
+
+def make_point(index: int, episode: int, time_seconds: int, **overrides) -> Point:
+    """Build a valid point with predictable values."""
+    values = {
+        "id": f"point_{index}",
+        "name": f"スポット{index}",
+        "cn_name": f"地点{index}",
+        "coordinates": Coordinates(
+            latitude=35.0 + index * 0.0012345678, longitude=135.7681234567
+        ),
+        "bangumi_id": "115908",
+        "bangumi_title": "響け！ユーフォニアム",
+        "episode": episode,
+        "time_seconds": time_seconds,
+        "screenshot_url": f"https://image.anitabi.cn/points/{index}.jpg",
+    }
+    values.update(overrides)
+    return Point(**values)
+
+
+@pytest.fixture
+def points():
+    """Points across three episodes, deliberately out of order."""
+    return [
+        make_point(0, 3, 90),
+        make_point(1, 1, 300, address="京都府宇治市"),
+        make_point(2, 1, 45),
+        make_point(3, 2, 600, opening_hours="9:00-17:00"),
+    ]
+
+
+def columns_for(points: list[Point]) -> dict:
+    """Raw columns equivalent to the given points."""
+    return {
+        "latitude": [p.coordinates.latitude for p in points],
+        "longitude": [p.coordinates.longitude for p in points],
+        "episode": [p.episode for p in points],
+        "time_seconds": [p.time_seconds for p in points],
+        "id": [p.id for p in points],
+        "name": [p.name for p in points],
+        "cn_name": [p.cn_name for p in points],
+        "bangumi_id": [p.bangumi_id for p in points],
+        "bangumi_title": [p.bangumi_title for p in points],
+        "screenshot_url": [str(p.screenshot_url) for p in points],
+        "address": [p.address for p in points],
+        "opening_hours": [p.opening_hours for p in points],
+    }
+
+
+class TestPointSetConversion:
+    """Round trips between PointSet and Point."""
+
+    def test_round_trip_is_lossless(self, points):
+        """Test that points come back equal, field for field."""
+        point_set = PointSet.from_points(points)
+
+        assert len(point_set) == 4
+        assert point_set.to_points() == points
+        assert point_set.to_records() == [p.model_dump() for p in points]
+        assert point_set[1] == points[1]
+        assert point_set[-1] == points[-1]
+
+    def test_strings_are_interned(self, points):
+        """Test that repeated text is stored once in the string table."""
+        point_set = PointSet.from_points(points)
+
+        # 4 ids, names, cn names and URLs, 1 bangumi id and title, 2 extras
+        assert repr(point_set) == "PointSet(4 points, 20 strings)"
+        assert point_set.column("bangumi_title") == ["響け！ユーフォニアム"] * 4
+        assert point_set.column("address") == [None, "京都府宇治市", None, None]
+
+    def test_from_columns_matches_validation(self, points):
+        """Test that column input is rounded and normalised like Point."""
+        columns = columns_for(points)
+        columns["latitude"][0] = 35.00000012
+        columns["screenshot_url"][0] = "https://image.anitabi.cn"
+
+        point_set = PointSet.from_columns(**columns)
+        first = point_set[0]
+
+        expected = Point(
+            **{
+                **points[0].model_dump(),
+                "coordinates": {"latitude": 35.00000012, "longitude": 135.7681234567},
+                "screenshot_url": "https://image.anitabi.cn",
+            }
+        )
+        assert first == expected
+        assert first.coordinates.latitude == 35.0
+        assert str(first.screenshot_url) == "https://image.anitabi.cn/"
+
+    @pytest.mark.parametrize(
+        "field, value, error",
+        [
+            ("latitude", 95.0, ValueError),
+            ("longitude", float("nan"), ValueError),
+            ("episode", -1, ValueError),
+            ("time_seconds", 1.5, TypeError),
+            ("id", "", ValueError),
+            ("name", None, TypeError),
+            ("screenshot_url", "not a url", ValueError),
+        ],
+    )
+    def test_from_columns_rejects_invalid(self, points, field, value, error):
+        """Test that values Point would reject are rejected for the batch."""
+        columns = columns_for(points)
+        columns[field][2] = value
+
+        with pytest.raises(error):
+            PointSet.from_columns(**columns)
+
+    def test_survives_pickling(self, points):
+        """Test that sets pickle with read-only columns."""
+        point_set = PointSet.from_points(points)
+
+        restored = pickle.loads(pickle.dumps(point_set))
+
+        assert restored.to_points() == points
+        assert not restored.latitude.flags.writeable
+
+    def test_json_columns_round_trip(self, points):
+        """Test that sets survive the JSON form used by shared caches."""
+        point_set = PointSet.from_points(points)
+
+        data = json.loads(json.dumps(point_set.to_json_columns()))
+        restored = PointSet.from_json_columns(data)
+
+        assert restored.to_points() == points
+        assert not restored.episode.flags.writeable
+
+    def test_json_columns_reject_bad_codes(self, points):
+        """Test that codes outside the string table are rejected."""
+        data = PointSet.from_points(points).to_json_columns()
+        data["codes"]["name"][0] = len(data["strings"])
+
+        with pytest.raises(ValueError, match="name code out of range"):
+            PointSet.from_json_columns(data)
+
+
+class TestPointSetViews:
+    """Filtering, slicing and sorting."""
+
+    def test_sorted_by_episode_and_time(self, points):
+        """Test the default sort matches sorting Point lists."""
+        point_set = PointSet.from_points(points).sorted()
+
+        expected = sorted(points, key=lambda p: (p.episode, p.time_seconds))
+        assert point_set.to_points() == expected
+
+    def test_sorted_rejects_text_fields(self, points):
+        """Test that only numeric columns are sort keys."""
+        with pytest.raises(ValueError, match="Cannot sort"):
+            PointSet.from_points(points).sorted("name")
+
+    def test_filter_shares_string_table(self, points):
+        """Test that filtered views reuse the parent's strings."""
+        point_set = PointSet.from_points(points)
+
+        episode_one = point_set.filter(point_set.episode == 1)
+
+        assert episode_one.column("id") == ["point_1", "point_2"]
+        assert episode_one._strings is point_set._strings
+        assert point_set[1:3].to_points() == points[1:3]
+        assert point_set.take([3, 0]).column("episode") == [2, 3]
+
+    def test_filter_rejects_bad_mask(self, points):
+        """Test that masks must be boolean and full length."""
+        point_set = PointSet.from_points(points)
+
+        with pytest.raises(ValueError, match="boolean mask"):
+            point_set.filter(np.array([True, False]))
+
+    def test_distances_from(self, points):
+        """Test vectorised distances against Coordinates.distance_to."""
+        uji = Coordinates(latitude=34.889, longitude=135.807)
+        point_set = PointSet.from_points(points)
+
+        distances = point_set.distances_from(uji)
+
+        np.testing.assert_allclose(
+            distances, [uji.distance_to(p.coordinates) for p in points], rtol=1e-9
+        )
+        nearby = point_set.filter(distances < 30)
+        assert len(nearby) == len(points)
+
+    def test_columns_are_read_only(self, points):
+        """Test that views cannot modify shared data."""
+        point_set = PointSet.from_points(points)
+
+        with pytest.raises(ValueError):
+            point_set.latitude[0] = 0.0
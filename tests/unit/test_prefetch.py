@@ -0,0 +1,237 @@
+"""
+Unit tests for speculative prefetching.
+
+Tests cover:
+- Hits, partial hits and misses when a session claims a key
+- Claims overtaking prefetches stuck in a saturated speculative lane
+- Cancelling and counting as wasted the prefetches a session did not use
+- Bounded concurrency, pending limits and session eviction
+- Speculative priority, and no inherited request deadline
+"""
+
+import asyncio
+
+import pytest
+
+from services.deadline import deadline, remaining_budget
+from services.prefetch import SpeculativePrefetcher
+from services.retry import Priority, RateLimiter, current_priority, waiting_for_tokens
+
+
+class FakeFetch:
+    """Fetch function recording keys, priorities and concurrency."""
+
+    def __init__(self, delay: float = 0.0, fail: frozenset[str] = frozenset()):
+        self.delay = delay
+        self.fail = fail
+        self.started: list[str] = []
+        self.finished: list[str] = []
+        self.priorities: list[Priority | None] = []
+        self.budgets: list[float | None] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, key: str) -> str:
+        self.started.append(key)
+        self.priorities.append(current_priority())
+        self.budgets.append(remaining_budget())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if key in self.fail:
+                raise RuntimeError(f"upstream failed for {key}")
+            self.finished.append(key)
+            return key
+        finally:
+            self.in_flight -= 1
+
+
+async def settle(rounds: int = 5) -> None:
+    for _ in range(rounds):
+        await asyncio.sleep(0)
+
+
+class TestSpeculativePrefetcher:
+    """Scheduling, claiming and accounting."""
+
+    async def test_hit_after_completion(self):
+        """Test that claiming a finished prefetch is a hit and ends the session."""
+        fetch = FakeFetch()
+        prefetcher = SpeculativePrefetcher(fetch)
+
+        assert prefetcher.schedule("s1", ["1", "2", "3"]) == 3
+        await settle()
+
+        assert prefetcher.claim("s1", "2") is True
+        stats = prefetcher.stats.summary()
+        assert stats["hits"] == 1
+        assert stats["wasted"] == 2
+        assert stats["hit_ratio"] == 1.0
+        assert stats["wasted_ratio"] == pytest.approx(2 / 3, abs=1e-3)
+
+    async def test_partial_hit_keeps_claimed_fetch_running(self):
+        """Test that an in-flight claim is a hit and only the others are cancelled."""
+        fetch = FakeFetch(delay=0.05)
+        prefetcher = SpeculativePrefetcher(fetch, max_concurrency=3)
+        prefetcher.schedule("s1", ["1", "2", "3"])
+        await settle()
+
+        assert prefetcher.claim("s1", "1") is True
+        await asyncio.sleep(0.1)
+
+        assert fetch.finished == ["1"]
+        stats = prefetcher.stats
+        assert stats.partial_hits == 1
+        assert stats.cancelled == 2
+        assert stats.completed == 1
+        assert stats.wasted == 0
+
+    async def test_queued_claim_is_cancelled(self):
+        """Test that a claimed prefetch still waiting for a slot is dropped."""
+        fetch = FakeFetch(delay=0.05)
+        prefetcher = SpeculativePrefetcher(fetch, max_concurrency=1)
+        prefetcher.schedule("s1", ["1", "2"])
+        await settle()
+
+        assert prefetcher.claim("s1", "2") is False
+        await asyncio.sleep(0.1)
+
+        assert fetch.started == ["1"]
+        assert prefetcher.stats.misses == 1
+        assert prefetcher.stats.cancelled == 2
+
+    async def test_claim_overtakes_saturated_speculative_lane(self):
+        """Test that a claimed prefetch waiting for tokens lets the request go."""
+        limiter = RateLimiter(10, 60, interactive_reserve=0.5)
+        # Leave only the interactive reserve in the bucket
+        await limiter.acquire(5)
+        sent: list[tuple[str, Priority]] = []
+
+        async def fetch(key: str) -> str:
+            priority = current_priority() or Priority.INTERACTIVE
+            await limiter.acquire(priority=priority)
+            sent.append((key, priority))
+            return key
+
+        prefetcher = SpeculativePrefetcher(fetch)
+        prefetcher.schedule("s1", ["1"])
+        await settle()
+        (task,) = prefetcher._sessions["s1"].values()
+        assert waiting_for_tokens(task)
+
+        assert prefetcher.claim("s1", "1") is False
+        assert await asyncio.wait_for(fetch("1"), 0.1) == "1"
+        await settle()
+
+        assert sent == [("1", Priority.INTERACTIVE)]
+        assert not waiting_for_tokens(task)
+        assert prefetcher.stats.misses == 1
+        assert prefetcher.stats.partial_hits == 0
+        assert prefetcher.stats.cancelled == 1
+
+    async def test_miss_for_unprefetched_key(self):
+        """Test that choosing something else is a miss."""
+        prefetcher = SpeculativePrefetcher(FakeFetch())
+        prefetcher.schedule("s1", ["1", "2"])
+        await settle()
+
+        assert prefetcher.claim("s1", "9") is False
+        assert prefetcher.stats.misses == 1
+        assert prefetcher.stats.wasted == 2
+        assert prefetcher.stats.summary()["hit_ratio"] == 0.0
+
+    async def test_failed_prefetch_is_a_miss(self):
+        """Test that a prefetch that failed does not count as a hit."""
+        prefetcher = SpeculativePrefetcher(FakeFetch(fail=frozenset({"1"})))
+        prefetcher.schedule("s1", ["1"])
+        await settle()
+
+        assert prefetcher.claim("s1", "1") is False
+        assert prefetcher.stats.failed == 1
+        assert prefetcher.stats.misses == 1
+
+    async def test_unknown_session_not_counted(self):
+        """Test that sessions without prefetches leave the stats alone."""
+        prefetcher = SpeculativePrefetcher(FakeFetch())
+
+        assert prefetcher.claim("nobody", "1") is False
+        assert prefetcher.stats.misses == 0
+
+    async def test_reschedule_replaces_previous(self):
+        """Test that a new search cancels the session's earlier prefetches."""
+        fetch = FakeFetch(delay=0.05)
+        prefetcher = SpeculativePrefetcher(fetch, max_concurrency=4)
+        prefetcher.schedule("s1", ["1", "2"])
+        await settle()
+
+        prefetcher.schedule("s1", ["3"])
+        await asyncio.sleep(0.1)
+
+        assert fetch.finished == ["3"]
+        assert prefetcher.stats.cancelled == 2
+        assert prefetcher.claim("s1", "3") is True
+
+    async def test_cancel(self):
+        """Test that a session can be dropped without claiming."""
+        fetch = FakeFetch(delay=0.05)
+        prefetcher = SpeculativePrefetcher(fetch)
+        prefetcher.schedule("s1", ["1", "2"])
+        await settle()
+
+        prefetcher.cancel("s1")
+        await settle()
+
+        assert prefetcher.stats.cancelled == 2
+        assert prefetcher.claim("s1", "1") is False
+
+    async def test_bounded_concurrency(self):
+        """Test that at most max_concurrency prefetches run at once."""
+        fetch = FakeFetch(delay=0.01)
+        prefetcher = SpeculativePrefetcher(fetch, max_concurrency=2)
+        prefetcher.schedule("s1", ["1", "2", "3", "4", "5"])
+        await asyncio.sleep(0.1)
+
+        assert sorted(fetch.finished) == ["1", "2", "3", "4", "5"]
+        assert fetch.max_in_flight == 2
+
+    async def test_pending_limit_drops_extra(self):
+        """Test that prefetches beyond max_pending are not started."""
+        fetch = FakeFetch(delay=0.05)
+        prefetcher = SpeculativePrefetcher(fetch, max_pending=3)
+
+        assert prefetcher.schedule("s1", ["1", "2"]) == 2
+        assert prefetcher.schedule("s2", ["3", "4"]) == 1
+        assert prefetcher.schedule("s3", ["5"]) == 0
+        assert prefetcher.stats.dropped == 2
+
+        # A session whose prefetches were all dropped still counts its miss
+        assert prefetcher.claim("s3", "5") is False
+        assert prefetcher.stats.misses == 1
+        prefetcher.cancel_all()
+
+    async def test_oldest_session_evicted(self):
+        """Test that sessions beyond max_sessions are dropped oldest first."""
+        fetch = FakeFetch(delay=0.05)
+        prefetcher = SpeculativePrefetcher(fetch, max_sessions=2)
+        for session in ("s1", "s2", "s3"):
+            prefetcher.schedule(session, [session])
+        await settle()
+
+        assert prefetcher.claim("s1", "s1") is False
+        assert prefetcher.claim("s3", "s3") is True
+        prefetcher.cancel_all()
+
+    async def test_speculative_priority_without_deadline(self):
+        """Test that prefetches are speculative and outlive the turn's deadline."""
+        fetch = FakeFetch()
+        prefetcher = SpeculativePrefetcher(fetch)
+
+        with deadline(0.01):
+            prefetcher.schedule("s1", ["1"])
+        await asyncio.sleep(0.02)
+        await settle()
+
+        assert fetch.priorities == [Priority.SPECULATIVE]
+        assert fetch.budgets == [None]
+        assert current_priority() is None
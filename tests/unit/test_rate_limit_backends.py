@@ -0,0 +1,330 @@
+"""
+Unit tests for shared rate limit backends.
+
+Tests cover:
+- Reservation semantics shared by every backend
+- One budget across limiter instances and across processes
+- Learned limits, blocks and drains shared by every limiter of a key
+- Limits guessed from bare 429s expiring back to the configured limit
+- Fallback to a local bucket when the backend is unavailable
+- Backend URL parsing
+"""
+
+import asyncio
+import fcntl
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from services.cache_backends import RedisBackend, SharedCacheServer
+from services.deadline import DeadlineExceeded, deadline
+from services.rate_limit_backends import (
+    FileLockRateLimitBackend,
+    InProcessRateLimitBackend,
+    RedisRateLimitBackend,
+    SharedRateLimiter,
+    create_rate_limit_backend,
+)
+from services.retry import Priority, RateLimitLearner
+
+
+@pytest.fixture(params=["in_process", "file_lock", "redis"])
+async def backend(request, tmp_path):
+    """Yield each backend type, starting a local Redis stand-in where needed."""
+    if request.param == "in_process":
+        yield InProcessRateLimitBackend()
+        return
+
+    if request.param == "file_lock":
+        yield FileLockRateLimitBackend(str(tmp_path / "buckets"), prefix="test")
+        return
+
+    server = SharedCacheServer(port=0)
+    await server.start()
+    client = RedisRateLimitBackend(
+        RedisBackend(host=server.host, port=server.port, prefix="test")
+    )
+
+    yield client
+
+    await client.close()
+    await server.close()
+
+
+def _reserve_in_subprocess(directory: str, count: int) -> int:
+    """Reserve tokens from a lock-file bucket and count immediate grants."""
+    backend = FileLockRateLimitBackend(directory, prefix="test")
+
+    async def reserve_all() -> int:
+        granted = 0
+        for _ in range(count):
+            delay, _ = await backend.reserve("upstream", 1, 1.0, 10)
+            granted += delay == 0
+        return granted
+
+    return asyncio.run(reserve_all())
+
+
+class TestRateLimitBackends:
+    """Semantics every backend must share."""
+
+    @pytest.mark.asyncio
+    async def test_reserve_grants_capacity_then_delays(self, backend):
+        """Test that a full bucket grants its capacity, then schedules waits."""
+        for expected_remaining in (2, 1, 0):
+            delay, remaining = await backend.reserve("upstream", 1, 0.3, 3)
+            assert delay == 0
+            assert remaining == pytest.approx(expected_remaining, abs=0.1)
+
+        delay, _ = await backend.reserve("upstream", 1, 0.3, 3)
+        assert 0 < delay <= 10.0
+
+    @pytest.mark.asyncio
+    async def test_keys_are_independent(self, backend):
+        """Test that each upstream has its own budget."""
+        for _ in range(2):
+            await backend.reserve("anitabi", 1, 2.0, 2)
+
+        delay, _ = await backend.reserve("bangumi", 1, 2.0, 2)
+        assert delay == 0
+
+    @pytest.mark.asyncio
+    async def test_reset_refills_bucket(self, backend):
+        """Test that reset makes the full capacity available again."""
+        for _ in range(2):
+            await backend.reserve("upstream", 1, 2.0, 2)
+
+        await backend.reset("upstream")
+        delay, _ = await backend.reserve("upstream", 1, 2.0, 2)
+        assert delay == 0
+
+    @pytest.mark.asyncio
+    async def test_try_reserve_respects_floor(self, backend):
+        """Test that conditional reservations leave the floor untouched."""
+        for _ in range(2):
+            wait, _ = await backend.try_reserve("upstream", 1, 0.4, 4, 2)
+            assert wait == 0
+
+        wait, remaining = await backend.try_reserve("upstream", 1, 0.4, 4, 2)
+        assert 0 < wait <= 10.0
+        assert remaining == pytest.approx(2, abs=0.1)
+
+        # The reserved share is still there for unconditional reservations
+        for _ in range(2):
+            delay, _ = await backend.reserve("upstream", 1, 0.4, 4)
+            assert delay == 0
+
+    @pytest.mark.asyncio
+    async def test_learned_limits_are_shared(self, backend):
+        """Test that learned limits, blocks and drains are stored per key."""
+        assert await backend.limits("upstream") == (None, 0.0)
+
+        await backend.publish_limit("upstream", 15, 60.0)
+        await backend.block("upstream", 0.2)
+        limit, blocked = await backend.limits("upstream")
+        assert limit == (15, 60.0)
+        assert 0.1 < blocked <= 0.2
+        assert await backend.limits("other") == (None, 0.0)
+
+        await asyncio.sleep(0.25)
+        assert await backend.limits("upstream") == ((15, 60.0), 0.0)
+
+    @pytest.mark.asyncio
+    async def test_learned_limits_can_expire(self, backend):
+        """Test that a limit published with a TTL is forgotten after it."""
+        await backend.publish_limit("upstream", 7, 60.0, ttl_seconds=0.1)
+        assert await backend.limits("upstream") == ((7, 60.0), 0.0)
+
+        await asyncio.sleep(0.15)
+        assert await backend.limits("upstream") == (None, 0.0)
+
+    @pytest.mark.asyncio
+    async def test_drain_lowers_bucket(self, backend):
+        """Test that drain leaves only the calls upstream reported."""
+        await backend.drain("upstream", 1, 0.4, 4)
+
+        delay, _ = await backend.reserve("upstream", 1, 0.4, 4)
+        assert delay == 0
+        delay, _ = await backend.reserve("upstream", 1, 0.4, 4)
+        assert delay > 0
+
+    @pytest.mark.asyncio
+    async def test_limiters_share_learned_limits(self, backend):
+        """Test that a new limiter starts from what another one learned."""
+        first = SharedRateLimiter(30, 60.0, backend=backend, key="upstream")
+        first.resize(10, 20.0)
+        first.block_for(0.2)
+        await asyncio.sleep(0.01)  # let the writes reach the backend
+
+        second = SharedRateLimiter(30, 60.0, backend=backend, key="upstream")
+        start_time = time.monotonic()
+        await second.acquire()
+
+        assert time.monotonic() - start_time >= 0.15
+        assert (second.calls_per_period, second.period_seconds) == (10, 20.0)
+
+    @pytest.mark.asyncio
+    async def test_guessed_limits_expire(self, backend, monkeypatch):
+        """Test that cuts on bare 429s fall back to the configured limit."""
+        monkeypatch.setattr(SharedRateLimiter, "GUESSED_LIMIT_TTL_SECONDS", 0.2)
+        monkeypatch.setattr(SharedRateLimiter, "LIMITS_REFRESH_SECONDS", 0.0)
+        first = SharedRateLimiter(30, 60.0, backend=backend, key="upstream")
+        learner = RateLimitLearner(first)
+        learner.observe(429, {})
+        learner.observe(429, {})
+        await asyncio.sleep(0.01)  # let the writes reach the backend
+        assert first.calls_per_period == 7
+
+        # A client created per call starts from the cut...
+        second = SharedRateLimiter(30, 60.0, backend=backend, key="upstream")
+        await second.acquire()
+        assert second.calls_per_period == 7
+
+        # ...until it expires, whether adopted or learned locally
+        await asyncio.sleep(0.25)
+        third = SharedRateLimiter(30, 60.0, backend=backend, key="upstream")
+        for limiter in (first, second, third):
+            await limiter.acquire()
+            assert limiter.calls_per_period == 30
+
+    @pytest.mark.asyncio
+    async def test_limiters_share_one_budget(self, backend):
+        """Test that separate limiter instances draw on the same bucket."""
+        first = SharedRateLimiter(3, 3.0, backend=backend, key="upstream")
+        second = SharedRateLimiter(3, 3.0, backend=backend, key="upstream")
+
+        for _ in range(3):
+            await first.acquire()
+        assert first.available_tokens() < 1
+
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(second.acquire(), timeout=0.05)
+
+
+class TestSharedRateLimiter:
+    """SharedRateLimiter behaviour beyond the backend contract."""
+
+    @pytest.mark.asyncio
+    async def test_lock_file_waits_without_blocking_loop(self, tmp_path):
+        """Test that a lock held elsewhere is awaited, not blocked on."""
+        backend = FileLockRateLimitBackend(str(tmp_path / "buckets"), prefix="test")
+        await backend.reserve("upstream", 1, 1.0, 10)
+
+        # Another open file description holds the lock, as another process would
+        fd = os.open(backend._path("upstream"), os.O_RDWR)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        reservation = asyncio.create_task(backend.reserve("upstream", 1, 1.0, 10))
+        ticks = 0
+        while ticks < 5:
+            await asyncio.sleep(0.005)
+            ticks += 1
+        assert not reservation.done()
+
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+        delay, remaining = await asyncio.wait_for(reservation, timeout=1)
+        assert delay == 0
+        assert remaining == pytest.approx(8, abs=0.1)
+
+    def test_lock_file_budget_spans_processes(self, tmp_path):
+        """Test that worker processes cannot exceed one shared budget."""
+        directory = str(tmp_path / "buckets")
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            granted = list(pool.map(_reserve_in_subprocess, [directory] * 2, [8, 8]))
+
+        # Ten tokens of capacity, refilling at one per second
+        assert 10 <= sum(granted) <= 11
+
+    @pytest.mark.asyncio
+    async def test_unavailable_backend_falls_back_to_local(self, tmp_path):
+        """Test that requests still go out when the backend is down."""
+        backend = RedisRateLimitBackend.from_url(f"unix://{tmp_path / 'missing.sock'}")
+        limiter = SharedRateLimiter(2, 1.0, backend=backend, key="upstream")
+
+        assert await limiter.acquire() is True
+        assert limiter.tokens == pytest.approx(1, abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_background_waits_for_reserve(self):
+        """Test that background callers only use the unreserved share."""
+        backend = InProcessRateLimitBackend()
+        interactive = SharedRateLimiter(
+            2, 0.2, backend=backend, key="upstream", interactive_reserve=0.5
+        )
+        background = SharedRateLimiter(
+            2, 0.2, backend=backend, key="upstream", interactive_reserve=0.5
+        )
+
+        await background.acquire(priority=Priority.BACKGROUND)
+        await interactive.acquire()
+
+        start_time = time.monotonic()
+        await background.acquire(priority=Priority.BACKGROUND)
+        assert time.monotonic() - start_time >= 0.05
+
+        stats = background.get_wait_stats()
+        assert stats["background"]["count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_deadline_failure_spends_no_tokens(self, backend):
+        """Test that a caller that would miss its deadline reserves nothing."""
+        limiter = SharedRateLimiter(1, 10.0, backend=backend, key="upstream")
+        await limiter.acquire()
+
+        for _ in range(3):
+            with deadline(0.05), pytest.raises(DeadlineExceeded):
+                await limiter.acquire()
+
+        # Only the first token is spent: the next one is one period away
+        delay, _ = await backend.reserve("upstream", 1, 0.1, 1)
+        assert delay <= 10.0
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_request(self):
+        """Test that requests larger than the bucket fail immediately."""
+        limiter = SharedRateLimiter(
+            2, 1.0, backend=InProcessRateLimitBackend(), key="upstream"
+        )
+
+        with pytest.raises(ValueError, match="Cannot acquire 3 tokens"):
+            await limiter.acquire(tokens=3)
+
+
+class TestCreateRateLimitBackend:
+    """Backend URL parsing."""
+
+    def test_default_is_process_wide(self):
+        """Test that no URL means one in-process backend for every client."""
+        first = create_rate_limit_backend("")
+        assert isinstance(first, InProcessRateLimitBackend)
+        assert create_rate_limit_backend("memory://") is first
+
+    def test_file_unix_and_redis_urls(self, tmp_path):
+        """Test lock-file directory, socket path and Redis URL parsing."""
+        file_backend = create_rate_limit_backend(f"file://{tmp_path}/buckets")
+        assert isinstance(file_backend, FileLockRateLimitBackend)
+        assert file_backend.directory == f"{tmp_path}/buckets"
+
+        unix_backend = create_rate_limit_backend("unix:///tmp/cache.sock")
+        assert isinstance(unix_backend, RedisRateLimitBackend)
+        assert unix_backend.connection.unix_path == "/tmp/cache.sock"
+
+        redis_backend = create_rate_limit_backend("redis://cache.local:6380/2")
+        assert isinstance(redis_backend, RedisRateLimitBackend)
+        assert redis_backend.connection.port == 6380
+
+    def test_backends_are_shared_per_url(self, tmp_path):
+        """Test that clients of one URL share a backend (and its connection)."""
+        url = f"unix://{tmp_path}/cache.sock"
+
+        assert create_rate_limit_backend(url) is create_rate_limit_backend(url)
+        assert create_rate_limit_backend(url) is not create_rate_limit_backend(
+            url, prefix="other"
+        )
+
+    def test_unsupported_url(self):
+        """Test that unknown schemes are rejected."""
+        with pytest.raises(ValueError, match="Unsupported rate limit backend URL"):
+            create_rate_limit_backend("memcached://localhost")
@@ -6,20 +6,26 @@ Tests cover:
 - Max retry attempts
 - Selective retry on specific exceptions
 - Rate limiting with token bucket
+- Priority lanes and wait-time histograms
+- Learning limits from upstream headers and 429s
 - Thread safety for concurrent requests
 """
 
 import asyncio
 import time
-from datetime import datetime
 from unittest.mock import AsyncMock
 
 import pytest
+from multidict import CIMultiDict
 
+from services.deadline import DeadlineExceeded, deadline
 from services.retry import (
+    Priority,
     RateLimiter,
+    RateLimitLearner,
     RetryConfig,
     exponential_backoff_with_jitter,
+    parse_rate_limit_headers,
     retry_async,
 )
 
@@ -274,8 +280,250 @@ class TestRateLimiter:
 
         # Use all tokens (synchronously for testing)
         limiter.tokens = 0
-        limiter.last_refill = datetime.now()
+        limiter.last_refill = time.monotonic()
 
         # Should need to wait for refill
         wait_time = limiter.get_wait_time()
         assert 0 < wait_time <= 0.5  # Half period for one token
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_serves_waiters_in_order(self):
+        """Test that queued callers are served first come, first served."""
+        limiter = RateLimiter(calls_per_period=10, period_seconds=0.1)
+        for _ in range(10):
+            await limiter.acquire()
+
+        order: list[int] = []
+
+        async def make_request(index: int):
+            await limiter.acquire()
+            order.append(index)
+
+        tasks = [asyncio.create_task(make_request(i)) for i in range(20)]
+        await asyncio.sleep(0)
+        assert limiter.queued == 20
+
+        await asyncio.gather(*tasks)
+        assert order == list(range(20))
+        assert limiter.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_cancelled_waiter_frees_its_place(self):
+        """Test that cancelling a waiter lets the next one through."""
+        limiter = RateLimiter(calls_per_period=1, period_seconds=0.1)
+        await limiter.acquire()
+
+        first = asyncio.create_task(limiter.acquire())
+        second = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        first.cancel()
+
+        start_time = time.monotonic()
+        assert await second is True
+        elapsed = time.monotonic() - start_time
+
+        assert first.cancelled()
+        assert elapsed < 0.15  # Served after one refill, not two
+        assert limiter.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_honours_deadline(self):
+        """Test that a waiter gives up its place when the deadline passes."""
+        limiter = RateLimiter(calls_per_period=1, period_seconds=10.0)
+        await limiter.acquire()
+
+        with deadline(0.05):
+            with pytest.raises(DeadlineExceeded):
+                await limiter.acquire()
+
+        assert limiter.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_retry_stops_when_deadline_leaves_no_time(self):
+        """Test that retries are abandoned rather than overrun the deadline."""
+        mock_func = AsyncMock(side_effect=Exception("Unavailable"))
+
+        @retry_async(max_attempts=5, base_delay=1.0)
+        async def test_func():
+            return await mock_func()
+
+        with deadline(0.2):
+            with pytest.raises(Exception, match="Unavailable"):
+                await test_func()
+
+        assert mock_func.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_rejects_oversized_request(self):
+        """Test that requests larger than the bucket fail instead of hanging."""
+        limiter = RateLimiter(calls_per_period=2, period_seconds=1.0)
+
+        with pytest.raises(ValueError, match="Cannot acquire 3 tokens"):
+            await limiter.acquire(tokens=3)
+
+
+class TestRateLimiterPriorities:
+    """Test priority lanes in the rate limiter."""
+
+    @pytest.mark.asyncio
+    async def test_interactive_overtakes_queued_background(self):
+        """Test that interactive callers are served before queued background work."""
+        limiter = RateLimiter(calls_per_period=10, period_seconds=0.1)
+        for _ in range(10):
+            await limiter.acquire()
+
+        order: list[str] = []
+
+        async def make_request(name: str, priority: Priority):
+            await limiter.acquire(priority=priority)
+            order.append(name)
+
+        background = [
+            asyncio.create_task(make_request(f"bg{i}", Priority.BACKGROUND))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(make_request("user", Priority.INTERACTIVE))
+
+        await asyncio.gather(interactive, *background)
+        assert order[0] == "user"
+        assert order[1:] == ["bg0", "bg1", "bg2"]
+
+    @pytest.mark.asyncio
+    async def test_lower_lanes_leave_interactive_reserve(self):
+        """Test that background callers cannot dip into the reserved share."""
+        limiter = RateLimiter(
+            calls_per_period=4, period_seconds=1.0, interactive_reserve=0.5
+        )
+
+        # Two tokens are free for anyone, the other two only for interactive
+        for _ in range(2):
+            await limiter.acquire(priority=Priority.BACKGROUND)
+
+        waiting = asyncio.create_task(limiter.acquire(priority=Priority.SPECULATIVE))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+
+        for _ in range(2):
+            await asyncio.wait_for(limiter.acquire(), timeout=0.05)
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert limiter.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_wait_histograms_per_class(self):
+        """Test that waits are recorded per priority class."""
+        limiter = RateLimiter(calls_per_period=1, period_seconds=0.05)
+
+        await limiter.acquire()
+        await limiter.acquire(priority=Priority.SPECULATIVE)
+
+        stats = limiter.get_wait_stats()
+        assert set(stats) == {"interactive", "speculative", "background"}
+        assert stats["interactive"]["count"] == 1
+        assert stats["interactive"]["buckets"]["le_0.001"] == 1
+        assert stats["speculative"]["count"] == 1
+        assert stats["speculative"]["buckets"]["le_0.01"] == 0
+        assert stats["speculative"]["buckets"]["le_0.1"] == 1
+        assert stats["background"]["count"] == 0
+
+
+class TestRateLimitLearning:
+    """Test learning rate limits from upstream responses."""
+
+    def test_parse_x_ratelimit_headers(self):
+        """Test parsing of the common X-RateLimit-* headers."""
+        headers = CIMultiDict(
+            {
+                "X-RateLimit-Limit": "60",
+                "X-RateLimit-Remaining": "12",
+                "X-RateLimit-Reset": "1700000030",
+            }
+        )
+
+        parsed = parse_rate_limit_headers(headers, now=1700000000.0)
+
+        assert parsed.limit == 60
+        assert parsed.remaining == 12
+        assert parsed.reset_seconds == pytest.approx(30.0)
+        assert parsed.retry_after is None
+
+    def test_parse_ietf_headers_and_retry_after_date(self):
+        """Test RateLimit-Policy windows and HTTP-date Retry-After values."""
+        headers = CIMultiDict(
+            {
+                "RateLimit-Limit": "30",
+                "RateLimit-Reset": "15",
+                "RateLimit-Policy": "30;w=60",
+                "Retry-After": "Thu, 01 Jan 1970 00:01:40 GMT",
+            }
+        )
+
+        parsed = parse_rate_limit_headers(headers, now=40.0)
+
+        assert parsed.limit == 30
+        assert parsed.reset_seconds == 15
+        assert parsed.window_seconds == 60
+        assert parsed.retry_after == pytest.approx(60.0)
+
+    def test_parse_ignores_missing_and_malformed_headers(self):
+        """Test that junk values are ignored rather than raising."""
+        parsed = parse_rate_limit_headers(
+            CIMultiDict({"X-RateLimit-Limit": "lots", "Retry-After": "soon"})
+        )
+
+        assert parsed.present is False
+
+    def test_headers_resize_bucket(self):
+        """Test that advertised limits replace the configured guess."""
+        limiter = RateLimiter(calls_per_period=30, period_seconds=60.0)
+        learner = RateLimitLearner(limiter)
+
+        learner.observe(
+            200,
+            CIMultiDict(
+                {
+                    "X-RateLimit-Limit": "120",
+                    "X-RateLimit-Remaining": "5",
+                    "RateLimit-Policy": "120;w=60",
+                }
+            ),
+        )
+
+        assert limiter.calls_per_period == 120
+        assert limiter.refill_rate == pytest.approx(2.0)
+        assert limiter.available_tokens() == pytest.approx(5, abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_retry_after_blocks_callers(self):
+        """Test that Retry-After holds the next caller for that long."""
+        limiter = RateLimiter(calls_per_period=10, period_seconds=1.0)
+        learner = RateLimitLearner(limiter)
+
+        wait = learner.observe(429, CIMultiDict({"Retry-After": "0.2"}))
+        assert wait == pytest.approx(0.2)
+
+        start_time = time.monotonic()
+        await limiter.acquire()
+        assert time.monotonic() - start_time >= 0.15
+
+    def test_bare_429s_back_off_then_recover(self):
+        """Test adaptive limits when the upstream sends no headers."""
+        limiter = RateLimiter(calls_per_period=32, period_seconds=60.0)
+        learner = RateLimitLearner(limiter, recovery_successes=2)
+
+        assert learner.observe(429, CIMultiDict()) is None
+        assert limiter.calls_per_period == 16
+        learner.observe(429, CIMultiDict())
+        assert limiter.calls_per_period == 8
+
+        for _ in range(4):
+            learner.observe(200, CIMultiDict())
+        assert limiter.calls_per_period == 10
+
+        # Recovery never exceeds the last known good limit
+        for _ in range(200):
+            learner.observe(200, CIMultiDict())
+        assert limiter.calls_per_period == 32
@@ -0,0 +1,193 @@
+"""
+Unit tests for the grid-bucket spatial index.
+
+Tests cover:
+- Radius, nearest-neighbour and bounding-box queries against brute force
+- Queries across the 180° meridian and near the poles
+- Incremental inserts and indexing a PointSet
+- Input validation
+"""
+
+import numpy as np
+import pytest
+
+from domain.entities import Coordinates, Point
+from domain.geo import distances_from
+from domain.point_set import PointSet
+from domain.spatial_index import SpatialIndex
+
+
+def random_columns(count: int, seed: int, lat_range, lng_range):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(*lat_range, count), rng.uniform(*lng_range, count)
+
+
+def brute_radius(lats, lngs, lat, lng, radius_km) -> np.ndarray:
+    distances = distances_from(lat, lng, lats, lngs)
+    return np.flatnonzero(distances <= radius_km)
+
+
+@pytest.fixture
+def kyoto():
+    """2,000 points within about 30 km of Kyoto, indexed with 1 km cells."""
+    lats, lngs = random_columns(2000, 1, (34.75, 35.25), (135.5, 136.0))
+    index = SpatialIndex(cell_km=1.0)
+    index.insert_many(lats, lngs)
+    return index, lats, lngs
+
+
+class TestQueries:
+    """Indexed queries return exactly what a full scan would."""
+
+    @pytest.mark.parametrize("radius_km", [0.2, 1.0, 3.5, 50.0])
+    def test_within_radius_matches_brute_force(self, kyoto, radius_km):
+        """Test several radii around several origins."""
+        index, lats, lngs = kyoto
+        for lat, lng in [(34.985849, 135.758767), (34.75, 135.5), (35.1, 135.9)]:
+            ids, distances = index.within_radius(lat, lng, radius_km)
+
+            expected = brute_radius(lats, lngs, lat, lng, radius_km)
+            assert sorted(ids.tolist()) == expected.tolist()
+            assert np.all(np.diff(distances) >= 0)
+            np.testing.assert_allclose(
+                distances, distances_from(lat, lng, lats[ids], lngs[ids])
+            )
+
+    @pytest.mark.parametrize("k", [1, 10, 150])
+    def test_nearest_matches_brute_force(self, kyoto, k):
+        """Test that the k nearest ids and distances are exact."""
+        index, lats, lngs = kyoto
+        ids, distances = index.nearest(34.985849, 135.758767, k)
+
+        all_distances = distances_from(34.985849, 135.758767, lats, lngs)
+        expected = np.sort(all_distances)[:k]
+        assert len(ids) == k
+        np.testing.assert_allclose(distances, expected)
+
+    def test_nearest_far_from_every_point(self, kyoto):
+        """Test that the search radius grows until it finds points."""
+        index, lats, lngs = kyoto
+        ids, distances = index.nearest(-33.86, 151.21, 3)
+
+        expected = np.sort(distances_from(-33.86, 151.21, lats, lngs))[:3]
+        np.testing.assert_allclose(distances, expected)
+
+    def test_nearest_with_k_beyond_size(self):
+        """Test that asking for more points than indexed returns them all."""
+        index = SpatialIndex()
+        index.insert_many([35.0, 35.1], [135.0, 135.1])
+
+        ids, _ = index.nearest(35.0, 135.0, 5)
+
+        assert ids.tolist() == [0, 1]
+        assert len(SpatialIndex().nearest(35.0, 135.0, 5)[0]) == 0
+
+    def test_within_bbox_matches_brute_force(self, kyoto):
+        """Test a box smaller than the data and one larger."""
+        index, lats, lngs = kyoto
+        for box in [(34.87, 135.78, 34.91, 135.82), (30.0, 130.0, 40.0, 140.0)]:
+            min_lat, min_lng, max_lat, max_lng = box
+            expected = np.flatnonzero(
+                (lats >= min_lat)
+                & (lats <= max_lat)
+                & (lngs >= min_lng)
+                & (lngs <= max_lng)
+            )
+
+            assert index.within_bbox(*box).tolist() == expected.tolist()
+
+
+class TestEdgesOfTheMap:
+    """Longitude wrap-around and polar caps."""
+
+    def test_radius_across_antimeridian(self):
+        """Test that points either side of 180° are both found."""
+        lats, lngs = random_columns(500, 2, (-20.0, -15.0), (-180.0, 180.0))
+        lngs[:250] = np.random.default_rng(3).uniform(177.0, 180.0, 250)
+        lngs[250:] = np.random.default_rng(4).uniform(-180.0, -177.0, 250)
+        index = SpatialIndex(cell_km=7.0)
+        index.insert_many(lats, lngs)
+
+        ids, _ = index.within_radius(-17.7, 179.9, 150.0)
+
+        expected = brute_radius(lats, lngs, -17.7, 179.9, 150.0)
+        assert sorted(ids.tolist()) == expected.tolist()
+        assert (lngs[ids] < 0).any() and (lngs[ids] > 0).any()
+
+    def test_bbox_across_antimeridian(self):
+        """Test a box whose western edge is east of its eastern edge."""
+        index = SpatialIndex(cell_km=5.0)
+        index.insert_many([-17.0, -17.0, -17.0], [179.5, -179.5, 170.0])
+
+        assert index.within_bbox(-18.0, 179.0, -16.0, -179.0).tolist() == [0, 1]
+
+    def test_radius_around_pole(self):
+        """Test that a polar query covers every longitude."""
+        lats, lngs = random_columns(300, 5, (85.0, 90.0), (-180.0, 180.0))
+        index = SpatialIndex(cell_km=10.0)
+        index.insert_many(lats, lngs)
+
+        ids, _ = index.within_radius(89.5, 0.0, 300.0)
+
+        expected = brute_radius(lats, lngs, 89.5, 0.0, 300.0)
+        assert sorted(ids.tolist()) == expected.tolist()
+
+
+class TestBuilding:
+    """Incremental inserts and construction."""
+
+    def test_incremental_inserts_match_bulk(self, kyoto):
+        """Test that single inserts grow the index past its capacity."""
+        bulk, lats, lngs = kyoto
+        incremental = SpatialIndex(cell_km=1.0, capacity=4)
+        for lat, lng in zip(lats[:300], lngs[:300], strict=True):
+            incremental.insert(lat, lng)
+        incremental.insert_many(lats[300:], lngs[300:])
+
+        assert len(incremental) == len(bulk) == 2000
+        np.testing.assert_array_equal(incremental.latitude, lats)
+        for lat, lng in [(34.985849, 135.758767), (35.2, 135.6)]:
+            np.testing.assert_array_equal(
+                incremental.within_radius(lat, lng, 2.0)[0],
+                bulk.within_radius(lat, lng, 2.0)[0],
+            )
+
+    def test_from_point_set_ids_are_rows(self):
+        """Test that result ids can be taken from the PointSet."""
+        points = [
+            Point(
+                id=f"point_{i}",
+                name=f"スポット{i}",
+                cn_name=f"地点{i}",
+                coordinates=Coordinates(latitude=34.88 + i * 0.01, longitude=135.8),
+                bangumi_id="115908",
+                bangumi_title="響け！ユーフォニアム",
+                episode=1,
+                time_seconds=i,
+                screenshot_url=f"https://image.anitabi.cn/points/{i}.jpg",
+            )
+            for i in range(5)
+        ]
+        point_set = PointSet.from_points(points)
+        index = SpatialIndex.from_point_set(point_set)
+
+        ids, _ = index.nearest(34.90, 135.8, 2)
+
+        assert {p.id for p in point_set.take(ids)} == {"point_1", "point_2"}
+
+    def test_coordinate_views_are_read_only(self, kyoto):
+        """Test that indexed coordinates cannot be changed in place."""
+        index, _, _ = kyoto
+        with pytest.raises(ValueError):
+            index.latitude[0] = 0.0
+
+    def test_rejects_invalid_input(self):
+        """Test cell size, shape and range validation."""
+        with pytest.raises(ValueError, match="positive"):
+            SpatialIndex(cell_km=0)
+        index = SpatialIndex()
+        with pytest.raises(ValueError, match="equal length"):
+            index.insert_many([1.0, 2.0], [1.0])
+        with pytest.raises(ValueError, match="out of range"):
+            index.insert(91.0, 0.0)
+        assert len(index) == 0
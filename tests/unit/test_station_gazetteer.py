@@ -0,0 +1,195 @@
+"""
+Unit tests for the local station gazetteer.
+
+Tests cover:
+- Name normalisation across scripts, suffixes and romaji spellings
+- Exact and fuzzy matching, and rejecting unknown names
+- The bundled gazetteer file
+- AnitabiClient resolving stations locally and falling back to /station
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from clients.anitabi import AnitabiClient
+from services.station_gazetteer import (
+    StationGazetteer,
+    normalise_name,
+    shared_gazetteer,
+)
+
+STATIONS = [
+    {
+        "name": "宇治駅",
+        "lat": 34.8891,
+        "lng": 135.8003,
+        "prefecture": "京都府",
+        "city": "宇治市",
+        "names": {
+            "kana": "うじ",
+            "romaji": "Uji",
+            "zh-Hans": "宇治站",
+            "zh-Hant": "宇治站",
+        },
+    },
+    {
+        "name": "新橋駅",
+        "lat": 35.6662,
+        "lng": 139.7586,
+        "names": {"kana": "しんばし", "romaji": "Shimbashi", "zh-Hans": "新桥站"},
+    },
+    {
+        "name": "秋葉原駅",
+        "lat": 35.6984,
+        "lng": 139.7731,
+        "names": {"kana": "あきはばら", "romaji": "Akihabara", "zh-Hans": "秋叶原站"},
+        "aliases": ["アキバ"],
+    },
+    {
+        "name": "東京駅",
+        "lat": 35.6812,
+        "lng": 139.7671,
+        "names": {"kana": "とうきょう", "romaji": "Tokyo"},
+    },
+]
+
+
+@pytest.fixture
+def gazetteer():
+    return StationGazetteer(STATIONS)
+
+
+class TestNormalise:
+    """Canonical forms of names."""
+
+    @pytest.mark.parametrize(
+        "variants",
+        [
+            ["宇治", "宇治駅", "宇治站", "宇治 駅"],
+            ["うじ", "ウジ", "ｳｼﾞ", "うじえき"],
+            ["Uji", "UJI", "Uji Station", "uji-eki", "Ｕｊｉ", "Uji Sta."],
+            ["Tokyo", "Tōkyō", "Toukyou", "Tookyoo", "Tokyo Stn"],
+            ["Shimbashi", "Shinbashi"],
+            ["Shinjuku", "Sinzyuku"],
+        ],
+    )
+    def test_variants_share_a_key(self, variants):
+        """Test that spellings of one name normalise identically."""
+        assert len({normalise_name(variant) for variant in variants}) == 1
+
+    def test_suffix_alone_is_kept(self):
+        """Test that a bare suffix is not stripped to nothing."""
+        assert normalise_name("駅") == "駅"
+        assert normalise_name("  ") == ""
+
+
+class TestStationGazetteer:
+    """Matching queries to stations."""
+
+    @pytest.mark.parametrize(
+        "query", ["宇治", "宇治駅", "うじ", "Uji", "Uji Station", "宇治站"]
+    )
+    def test_exact_matches_in_every_script(self, gazetteer, query):
+        """Test that every listed name form resolves exactly."""
+        matches = gazetteer.search(query)
+
+        assert matches[0].station.name == "宇治駅"
+        assert matches[0].score == 1.0
+        assert gazetteer.resolve(query).coordinates.latitude == 34.8891
+
+    @pytest.mark.parametrize(
+        "query, expected",
+        [
+            ("Akihabra", "秋葉原駅"),
+            ("Akihbaara", "秋葉原駅"),
+            ("Tokio", "東京駅"),
+            ("秋叶原", "秋葉原駅"),
+            ("アキバ", "秋葉原駅"),
+        ],
+    )
+    def test_fuzzy_and_alias_matches(self, gazetteer, query, expected):
+        """Test romaji typos, Chinese names and extra aliases."""
+        assert gazetteer.resolve(query).name == expected
+
+    def test_fuzzy_scores_rank_candidates(self, gazetteer):
+        """Test that partial matches score below 1 in descending order."""
+        matches = gazetteer.search("Tokio", limit=3)
+
+        assert matches[0].station.name == "東京駅"
+        assert 0.6 <= matches[0].score < 1.0
+        scores = [match.score for match in matches]
+        assert scores == sorted(scores, reverse=True)
+
+    @pytest.mark.parametrize(
+        "query", ["Kobe", "大阪", "", "!!!", "Ujj", "宇冶", "Akihabara Tower"]
+    )
+    def test_unknown_names_not_resolved(self, gazetteer, query):
+        """Test that weak, kanji-typo and empty matches are left to the API."""
+        assert gazetteer.resolve(query) is None
+
+    @pytest.mark.parametrize(
+        "query, wrong",
+        [
+            ("Shin-Osaka", "大阪駅"),
+            ("新大阪", "大阪駅"),
+            ("名古屋港", "名古屋駅"),
+            ("Kyoto Tower", "京都駅"),
+            ("京都タワー", "京都駅"),
+        ],
+    )
+    def test_names_containing_a_station_not_resolved(self, query, wrong):
+        """Test that a query is not resolved to a station whose name it contains."""
+        gazetteer = shared_gazetteer()
+        assert wrong in [match.station.name for match in gazetteer.search(query)]
+
+        assert gazetteer.resolve(query) is None
+
+    def test_bundled_gazetteer(self):
+        """Test that the shipped data loads and covers pilgrimage stations."""
+        gazetteer = shared_gazetteer()
+
+        assert len(gazetteer) > 50
+        for query in ("宇治", "Washinomiya", "飞驒古川站", "豐鄉", "Numazu"):
+            assert gazetteer.resolve(query) is not None, query
+
+
+class TestClientGazetteer:
+    """AnitabiClient.get_station_info with a gazetteer."""
+
+    @pytest.fixture
+    async def client(self, gazetteer):
+        client = AnitabiClient(use_cache=False, gazetteer=gazetteer)
+        yield client
+        await client.close()
+
+    async def test_resolves_without_upstream(self, client):
+        """Test that known stations never reach /station."""
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            station = await client.get_station_info("Uji Station")
+
+            mock_get.assert_not_called()
+        assert station.name == "宇治駅"
+        assert station.prefecture == "京都府"
+
+    async def test_unknown_station_goes_upstream(self, client):
+        """Test the fallback to the API on a gazetteer miss."""
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = {
+                "data": {"name": "三ノ宮駅", "lat": 34.6945, "lng": 135.1955}
+            }
+
+            station = await client.get_station_info("三ノ宮")
+
+            mock_get.assert_called_once_with(
+                "/station", params={"name": "三ノ宮"}, cache_namespace="station"
+            )
+        assert station.name == "三ノ宮駅"
+
+    async def test_use_gazetteer_false(self, gazetteer):
+        """Test that the gazetteer can be switched off."""
+        client = AnitabiClient(
+            use_cache=False, gazetteer=gazetteer, use_gazetteer=False
+        )
+        assert client.gazetteer is None
+        await client.close()
@@ -0,0 +1,276 @@
+"""
+Unit tests for the local Bangumi title index.
+
+Tests cover:
+- Title normalisation across scripts and widths
+- Exact, partial and alias matching, scoring and popularity tiebreaks
+- Resolving only keywords that exactly name a subject
+- Aliases from wiki and v0 API infoboxes
+- Adding subjects and saving and loading JSON-lines files
+- BangumiClient answering exact keywords locally and learning the rest,
+  with the index on by default only when it has a file
+"""
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from clients.bangumi import BangumiClient, settings
+from services.title_index import (
+    TitleIndex,
+    append_subjects,
+    normalise_title,
+    shared_title_index,
+)
+
+SUBJECTS = [
+    {
+        "id": 485,
+        "type": 2,
+        "name": "涼宮ハルヒの憂鬱",
+        "name_cn": "凉宫春日的忧郁",
+        "date": "2006-04-02",
+        "infobox": (
+            "{{Infobox animanga/TVAnime\n|中文名= 凉宫春日的忧郁\n|别名={\n"
+            "[The Melancholy of Haruhi Suzumiya]\n[涼宮春日的憂鬱]\n}\n"
+            "|话数= 14\n}}"
+        ),
+        "favorite": {"wish": 500, "done": 9000, "doing": 100},
+    },
+    {
+        "id": 4019,
+        "type": 2,
+        "name": "涼宮ハルヒの憂鬱 (2009)",
+        "name_cn": "凉宫春日的忧郁 2009",
+        "favorite": {"done": 5000},
+    },
+    {
+        "id": 160209,
+        "type": 2,
+        "name": "君の名は。",
+        "name_cn": "你的名字。",
+        "aliases": ["Your Name."],
+        "favorite": {"done": 20000},
+    },
+    {
+        "id": 1424,
+        "type": 2,
+        "name": "けいおん!",
+        "name_cn": "轻音少女",
+        "infobox": [
+            {"key": "别名", "value": [{"v": "K-ON!"}, {"v": "輕音部"}]},
+            {"key": "话数", "value": "13"},
+        ],
+    },
+    {"id": 9999, "type": 1, "name": "けいおん!", "name_cn": "轻音少女 漫画"},
+]
+
+
+@pytest.fixture
+def index():
+    return TitleIndex(SUBJECTS)
+
+
+class TestNormalise:
+    """Canonical forms of titles."""
+
+    @pytest.mark.parametrize(
+        "variants",
+        [
+            ["けいおん!", "ケイオン！", "ｹｲｵﾝ!", "けいおん"],
+            ["Your Name.", "your name", "ＹＯＵＲ　ＮＡＭＥ", "your-name"],
+        ],
+    )
+    def test_variants_share_a_key(self, variants):
+        """Test that spellings of one title normalise identically."""
+        assert len({normalise_title(variant) for variant in variants}) == 1
+
+    def test_punctuation_only(self):
+        """Test that nothing is left of a keyword without letters."""
+        assert normalise_title("!!! 。") == ""
+
+
+class TestTitleIndex:
+    """Ranking subjects for keywords."""
+
+    @pytest.mark.parametrize(
+        "keyword, expected",
+        [
+            ("君の名は", 160209),
+            ("你的名字", 160209),
+            ("your name", 160209),
+            ("ケイオン", 1424),
+            ("K-ON", 1424),
+            ("輕音部", 1424),
+            ("The Melancholy of Haruhi Suzumiya", 485),
+            ("涼宮春日的憂鬱", 485),
+        ],
+    )
+    def test_exact_names_and_aliases(self, index, keyword, expected):
+        """Test that every listed name form matches exactly."""
+        match = index.search(keyword, limit=1)[0]
+
+        assert match.subject["id"] == expected
+        assert match.score == 1.0
+
+    def test_partial_keyword_ranks_every_season(self, index):
+        """Test that part of a title finds all subjects carrying it."""
+        matches = index.search("凉宫春日", limit=5)
+
+        assert [m.subject["id"] for m in matches[:2]] == [485, 4019]
+        assert all(0.75 <= m.score < 1.0 for m in matches[:2])
+
+    def test_popularity_breaks_ties(self):
+        """Test that equally good matches rank by collection counts."""
+        index = TitleIndex(
+            [
+                {"id": 1, "name": "とある作品", "favorite": {"done": 10}},
+                {"id": 2, "name": "とある作品", "favorite": {"done": 999}},
+            ]
+        )
+
+        assert [m.subject["id"] for m in index.search("とある作品")] == [2, 1]
+
+    def test_subject_type_filter(self, index):
+        """Test that other subject types are left out."""
+        ids = [m.subject["id"] for m in index.search("けいおん", subject_type=2)]
+
+        assert 1424 in ids
+        assert 9999 not in ids
+        assert 9999 in [m.subject["id"] for m in index.search("けいおん")]
+
+    def test_results_in_search_shape(self, index):
+        """Test that dump records gain air_date and lose the infobox."""
+        subject = index.search("凉宫春日的忧郁", limit=1)[0].subject
+
+        assert subject["air_date"] == "2006-04-02"
+        assert "infobox" not in subject
+
+    @pytest.mark.parametrize(
+        "keyword",
+        [
+            "Attack on Titan",
+            "進撃の巨人",
+            "ハルヒ",
+            "凉宫春日",
+            "君の名",
+            "K",
+            "",
+            "!!",
+        ],
+    )
+    def test_cold_and_partial_keywords_not_resolved(self, index, keyword):
+        """Test that anything but an exact name leaves the keyword to the API."""
+        assert index.resolve(keyword) is None
+
+    def test_resolve_limits_and_filters(self, index):
+        """Test that resolve returns confident subjects only."""
+        subjects = index.resolve("凉宫春日的忧郁", limit=1, subject_type=2)
+
+        assert [s["id"] for s in subjects] == [485]
+        assert index.resolve("轻音少女 漫画", subject_type=2) is None
+
+    def test_exact_match_brings_related_subjects(self, index):
+        """Test that other seasons the index knows come with an exact match."""
+        subjects = index.resolve("凉宫春日的忧郁", limit=5)
+
+        assert [s["id"] for s in subjects[:2]] == [485, 4019]
+
+    def test_add_skips_known_ids(self, index):
+        """Test that subjects are added once and become searchable."""
+        added = index.add(
+            [SUBJECTS[0], {"id": 876, "type": 2, "name": "氷菓", "name_cn": "冰菓"}]
+        )
+
+        assert [s["id"] for s in added] == [876]
+        assert len(index) == 6
+        assert 876 in index
+        assert index.search("冰菓", limit=1)[0].subject["id"] == 876
+
+    def test_save_and_load(self, index, tmp_path):
+        """Test the JSON-lines round trip, with a type filter on load."""
+        path = tmp_path / "subjects.jsonl"
+        index.save(path)
+        append_subjects(path, [{"id": 876, "type": 2, "name": "氷菓"}])
+
+        loaded = TitleIndex.from_file(path, subject_type=2)
+
+        assert len(loaded) == 5
+        assert 9999 not in loaded
+        assert loaded.search("轻音少女", limit=1)[0].subject["id"] == 1424
+        assert loaded.search("氷菓", limit=1)[0].score == 1.0
+
+    def test_shared_index_without_file(self, tmp_path):
+        """Test that a missing or empty path gives an empty index."""
+        assert len(shared_title_index("")) == 0
+        assert len(shared_title_index(str(tmp_path / "missing.jsonl"))) == 0
+
+
+class TestClientTitleIndex:
+    """BangumiClient.search_subject with a title index."""
+
+    @pytest.fixture
+    async def client(self, index):
+        client = BangumiClient(use_cache=False, title_index=index)
+        yield client
+        await client.close()
+
+    async def test_known_keyword_answered_locally(self, client):
+        """Test that an indexed keyword never reaches the API."""
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            results = await client.search_subject("君の名は")
+
+            mock_get.assert_not_called()
+        assert results[0]["id"] == 160209
+
+    async def test_cold_keyword_goes_upstream_and_is_learned(self, client, tmp_path):
+        """Test the API fallback, and that its results are indexed and saved."""
+        client._title_index_path = str(tmp_path / "learned.jsonl")
+        subject = {"id": 876, "type": 2, "name": "氷菓", "name_cn": "冰菓"}
+
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = {"list": [subject]}
+
+            first = await client.search_subject("氷菓")
+            second = await client.search_subject("冰菓")
+
+            mock_get.assert_called_once()
+        assert first == [subject]
+        assert second[0]["id"] == 876
+        saved = (tmp_path / "learned.jsonl").read_text(encoding="utf-8")
+        assert [json.loads(line)["id"] for line in saved.splitlines()] == [876]
+
+    async def test_partial_keyword_goes_upstream(self, client):
+        """Test that part of a known title is not answered from the index."""
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = {"list": [SUBJECTS[0], SUBJECTS[1]]}
+
+            results = await client.search_subject("凉宫春日")
+
+            mock_get.assert_called_once()
+        assert [s["id"] for s in results] == [485, 4019]
+
+    @pytest.mark.parametrize(
+        "enabled, path, expected",
+        [(None, "", False), (None, "subjects.jsonl", True), (False, "x.jsonl", False)],
+    )
+    async def test_enabled_only_with_a_file_by_default(
+        self, monkeypatch, tmp_path, enabled, path, expected
+    ):
+        """Test that an in-memory index is off unless asked for."""
+        monkeypatch.setattr(settings, "bangumi_title_index", enabled)
+        monkeypatch.setattr(
+            settings, "bangumi_title_index_path", str(tmp_path / path) if path else ""
+        )
+
+        client = BangumiClient()
+
+        assert (client.title_index is not None) is expected
+        await client.close()
+
+    async def test_use_title_index_false(self, index):
+        """Test that the index can be switched off."""
+        client = BangumiClient(title_index=index, use_title_index=False)
+        assert client.title_index is None
+        await client.close()